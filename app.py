@@ -1,4 +1,5 @@
 import logging
+import logging.handlers
 import os
 import sys
 import ast
@@ -39,6 +40,16 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 from utils.db_conn import get_db_connection, close_db_connection
 from utils.grade_calculation import perform_grade_computation
+from utils.grading_scales import equivalent_for
+from utils.http_cache import REVALIDATE_CACHE_CONTROL
+from utils.response_layer import init_response_layer
+from utils.assets import init_assets
+from utils.async_logging import (
+    JsonLineFormatter,
+    SamplingFilter,
+    parse_sample_rates,
+    start_queue_logging,
+)
 from utils.live import (
     initialize_live,
     register_socketio_handlers,
@@ -127,13 +138,35 @@ class _PrettyConsoleFormatter(logging.Formatter):
         return self._colorize(record.levelname, line)
 
 
+def _get_int_env(name: str, default: int = 0) -> int:
+    raw = os.environ.get(name, str(default)).strip()
+    try:
+        value = int(raw)
+        return value if value >= 0 else default
+    except Exception:
+        # May run before logging is configured (_configure_logging uses it).
+        logging.getLogger(__name__).warning(
+            f"Invalid integer for {name}: {raw!r}. Using default {default}."
+        )
+        return default
+
+
 def _configure_logging():
+    """Attach console + app.log sinks to the root logger.
+
+    By default (LOG_ASYNC) the sinks run on a QueueListener thread and the
+    root logger only gets a non-blocking queue handler, so request threads
+    never wait on stdout or disk. LOG_FORMAT=json switches both sinks to JSON
+    lines; LOG_SAMPLE="logger=N,..." keeps 1 in N info records of noisy loggers.
+    """
     root_logger = logging.getLogger()
     root_logger.setLevel(logging.INFO)
 
     pretty_console = _env_flag("LOG_PRETTY_CONSOLE", True)
     use_color = _env_flag("LOG_COLOR", True)
     hide_static_requests = _env_flag("LOG_HIDE_STATIC_REQUESTS", True)
+    json_lines = (os.environ.get("LOG_FORMAT") or "").strip().lower() == "json"
+    use_queue = _env_flag("LOG_ASYNC", True)
 
     # Remove only unmanaged console handlers to avoid duplicate lines after reload.
     for handler in list(root_logger.handlers):
@@ -143,46 +176,71 @@ def _configure_logging():
             if not getattr(handler, "_eclass_managed", False):
                 root_logger.removeHandler(handler)
 
-    managed_console_exists = any(
-        isinstance(h, logging.StreamHandler)
-        and not isinstance(h, logging.FileHandler)
-        and getattr(h, "_eclass_managed", False)
-        for h in root_logger.handlers
-    )
+    # Already configured by an earlier import of this module.
+    if any(getattr(h, "_eclass_managed", False) for h in root_logger.handlers):
+        return
 
-    if not managed_console_exists:
-        console_handler = logging.StreamHandler()
-        console_handler._eclass_managed = True  # type: ignore[attr-defined]
-        console_handler.addFilter(_TerminalNoiseFilter(hide_static_requests))
-        if pretty_console:
-            console_handler.setFormatter(_PrettyConsoleFormatter(use_color=use_color))
-        else:
-            console_handler.setFormatter(
-                logging.Formatter("%(levelname)s:%(name)s:%(message)s")
-            )
-        root_logger.addHandler(console_handler)
-
-    app_log_path = os.path.join(os.getcwd(), "app.log")
-    file_handler_exists = any(
-        isinstance(h, logging.FileHandler)
-        and os.path.abspath(getattr(h, "baseFilename", ""))
-        == os.path.abspath(app_log_path)
-        for h in root_logger.handlers
-    )
+    sinks = []
 
-    if not file_handler_exists:
-        try:
-            file_handler = logging.FileHandler(app_log_path, encoding="utf-8")
+    console_handler = logging.StreamHandler()
+    console_handler._eclass_managed = True  # type: ignore[attr-defined]
+    console_handler.addFilter(_TerminalNoiseFilter(hide_static_requests))
+    if json_lines:
+        console_handler.setFormatter(JsonLineFormatter())
+    elif pretty_console:
+        console_handler.setFormatter(_PrettyConsoleFormatter(use_color=use_color))
+    else:
+        console_handler.setFormatter(
+            logging.Formatter("%(levelname)s:%(name)s:%(message)s")
+        )
+    sinks.append(console_handler)
+
+    # Every worker process appends to the same file, so none of them may
+    # rotate it: WatchedFileHandler reopens the file after an external
+    # logrotate has moved it. LOG_FILE overrides the path.
+    app_log_path = os.environ.get("LOG_FILE") or os.path.join(app.root_path, "app.log")
+    app.config["LOG_FILE"] = app_log_path
+    file_error = None
+    try:
+        file_handler = logging.handlers.WatchedFileHandler(app_log_path, encoding="utf-8")
+        file_handler._eclass_managed = True  # type: ignore[attr-defined]
+        if json_lines:
+            file_handler.setFormatter(JsonLineFormatter())
+        else:
             file_handler.setFormatter(
                 logging.Formatter(
                     "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
                     datefmt="%Y-%m-%d %H:%M:%S",
                 )
             )
-            root_logger.addHandler(file_handler)
-            root_logger.info("File logging initialized: app.log")
-        except Exception as e:
-            root_logger.warning(f"Could not initialize file logging: {e}")
+        sinks.append(file_handler)
+    except Exception as e:
+        file_error = e
+
+    sample_rates = parse_sample_rates(os.environ.get("LOG_SAMPLE", ""))
+    filters = [SamplingFilter(sample_rates)] if sample_rates else []
+
+    if use_queue:
+        queue_handler = start_queue_logging(
+            sinks,
+            queue_size=_get_int_env("LOG_QUEUE_SIZE", 10000),
+            filters=filters,
+        )
+        queue_handler._eclass_managed = True  # type: ignore[attr-defined]
+        root_logger.addHandler(queue_handler)
+    else:
+        for sink in sinks:
+            for f in filters:
+                sink.addFilter(f)
+            root_logger.addHandler(sink)
+
+    if file_error is not None:
+        root_logger.warning(f"Could not initialize file logging: {file_error}")
+    else:
+        root_logger.info(
+            f"File logging initialized: {app_log_path} ({'async' if use_queue else 'sync'}"
+            f"{', json' if json_lines else ''})"
+        )
 
 
 _configure_logging()
@@ -227,16 +285,6 @@ if not secret_key:
 app.secret_key = secret_key
 
 
-def _get_int_env(name: str, default: int = 0) -> int:
-    raw = os.environ.get(name, str(default)).strip()
-    try:
-        value = int(raw)
-        return value if value >= 0 else default
-    except Exception:
-        logger.warning(f"Invalid integer for {name}: {raw!r}. Using default {default}.")
-        return default
-
-
 def _get_bool_env(name: str, default: bool = False) -> bool:
     raw = (os.environ.get(name) or "").strip().lower()
     if not raw:
@@ -289,6 +337,91 @@ else:
     app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 0
     logger.info("Development mode enabled")
 
+# Response layer: orjson provider (when installed) and gzip/brotli compression
+# of large API payloads. Registered before the other after_request hooks so it
+# runs last and compresses the final body.
+app.config["RESPONSE_FAST_JSON"] = _get_bool_env("RESPONSE_FAST_JSON", True)
+app.config["RESPONSE_COMPRESSION"] = _get_bool_env("RESPONSE_COMPRESSION", True)
+app.config["COMPRESS_MIN_SIZE"] = _get_int_env("COMPRESS_MIN_SIZE", 1024)
+init_response_layer(app)
+
+# Fingerprinted static assets (built by scripts/build_assets.py). Off by default
+# in development so edits under static/ show up without a rebuild.
+STATIC_FINGERPRINT = _get_bool_env("STATIC_FINGERPRINT", FLASK_ENV == "production")
+init_assets(app, enabled=STATIC_FINGERPRINT)
+
+# Auto-gibber: token TTL (seconds, unset = never expire), optional Fernet
+# encryption, and the size of the path->token / token->route caches.
+if os.environ.get("GIBBER_MAX_AGE"):
+    app.config["GIBBER_MAX_AGE"] = _get_int_env("GIBBER_MAX_AGE", 0) or None
+if os.environ.get("GIBBER_FERNET_KEY"):
+    app.config["GIBBER_FERNET_KEY"] = os.environ.get("GIBBER_FERNET_KEY")
+app.config["GIBBER_CACHE_ENABLED"] = _get_bool_env("GIBBER_CACHE_ENABLED", True)
+app.config["GIBBER_CACHE_SIZE"] = _get_int_env("GIBBER_CACHE_SIZE", 1024) or 1024
+
+# Incremental grade store (utils/grade_store.py): how many classes are kept in
+# memory and how long (seconds) a cached class is trusted before a reload.
+app.config["GRADE_STORE_ENABLED"] = _get_bool_env("GRADE_STORE_ENABLED", True)
+app.config["GRADE_STORE_MAX_CLASSES"] = _get_int_env("GRADE_STORE_MAX_CLASSES", 64) or 64
+app.config["GRADE_STORE_TTL"] = _get_int_env("GRADE_STORE_TTL", 600) or 600
+
+# Optional write-behind for /scores POST (utils/score_buffer.py): edits are
+# journaled and coalesced per class, then written in batches. Off by default;
+# the journal is per process, so only enable it with a single worker.
+app.config["SCORE_WRITE_BEHIND"] = _get_bool_env("SCORE_WRITE_BEHIND", False)
+app.config["SCORE_FLUSH_INTERVAL_MS"] = _get_int_env("SCORE_FLUSH_INTERVAL_MS", 500) or 500
+app.config["SCORE_FLUSH_MAX_BATCH"] = _get_int_env("SCORE_FLUSH_MAX_BATCH", 500) or 500
+app.config["SCORE_JOURNAL_PATH"] = os.environ.get("SCORE_JOURNAL_PATH") or os.path.join(
+    app.root_path, ".score_journal.jsonl"
+)
+
+# Admin analytics rollups (utils/analytics_rollups.py): classes touched by a
+# write are recomputed every ANALYTICS_ROLLUP_INTERVAL seconds, everything every
+# ANALYTICS_ROLLUP_FULL_INTERVAL seconds.
+app.config["ANALYTICS_ROLLUPS_ENABLED"] = _get_bool_env("ANALYTICS_ROLLUPS_ENABLED", True)
+app.config["ANALYTICS_ROLLUP_INTERVAL"] = _get_int_env("ANALYTICS_ROLLUP_INTERVAL", 30) or 30
+app.config["ANALYTICS_ROLLUP_FULL_INTERVAL"] = (
+    _get_int_env("ANALYTICS_ROLLUP_FULL_INTERVAL", 900) or 900
+)
+
+# Bulk roster import (utils/roster_import.py): rows per transaction and
+# password-hashing processes (0 = one per CPU, up to 8).
+app.config["ROSTER_IMPORT_CHUNK"] = _get_int_env("ROSTER_IMPORT_CHUNK", 500) or 500
+app.config["ROSTER_IMPORT_WORKERS"] = _get_int_env("ROSTER_IMPORT_WORKERS", 0)
+
+# Admin audit events (utils/audit_log.py) are queued and written in batches by
+# a background thread; events that cannot be queued or written go to a local
+# spill file that is replayed on the next start.
+app.config["AUDIT_LOG_ASYNC"] = _get_bool_env("AUDIT_LOG_ASYNC", True)
+app.config["AUDIT_LOG_QUEUE_SIZE"] = _get_int_env("AUDIT_LOG_QUEUE_SIZE", 10000) or 10000
+app.config["AUDIT_LOG_FLUSH_INTERVAL_MS"] = _get_int_env("AUDIT_LOG_FLUSH_INTERVAL_MS", 1000) or 1000
+app.config["AUDIT_LOG_BATCH"] = _get_int_env("AUDIT_LOG_BATCH", 500) or 500
+app.config["AUDIT_SPILL_PATH"] = os.environ.get("AUDIT_SPILL_PATH") or os.path.join(
+    app.root_path, ".audit_spill.jsonl"
+)
+
+# Registration availability probe (utils/membership_index.py): emails and
+# school IDs are kept in memory and reloaded every MEMBERSHIP_INDEX_REFRESH
+# seconds to pick up accounts created by other workers.
+app.config["MEMBERSHIP_INDEX_ENABLED"] = _get_bool_env("MEMBERSHIP_INDEX_ENABLED", True)
+app.config["MEMBERSHIP_INDEX_REFRESH"] = _get_int_env("MEMBERSHIP_INDEX_REFRESH", 300) or 300
+
+# Student dashboard aggregate (utils/student_dashboard.py), cached per student
+# and dropped on roster/release changes; 0 disables the cache.
+app.config["STUDENT_DASHBOARD_CACHE_TTL"] = _get_int_env("STUDENT_DASHBOARD_CACHE_TTL", 60)
+
+# Instructor class summaries (utils/class_summaries.py): member counts,
+# structure and release status per class, cached per instructor.
+app.config["CLASS_SUMMARY_CACHE_TTL"] = _get_int_env("CLASS_SUMMARY_CACHE_TTL", 60)
+
+# Registration photos (utils/image_pipeline.py): verified, stripped of
+# metadata and resized off the request; the review/thumbnail variants are
+# written to REGISTRATION_MEDIA_DIR (outside /static, admin-only).
+app.config["IMAGE_PIPELINE_ENABLED"] = _get_bool_env("IMAGE_PIPELINE_ENABLED", True)
+app.config["REGISTRATION_MEDIA_DIR"] = os.environ.get(
+    "REGISTRATION_MEDIA_DIR"
+) or os.path.join(app.root_path, "uploads", "registration_media")
+
 SECURITY_HEADERS_ENABLED = _get_bool_env("SECURITY_HEADERS_ENABLED", True)
 CSP_REPORT_ONLY = _get_bool_env("CSP_REPORT_ONLY", False)
 CONTENT_SECURITY_POLICY = os.environ.get(
@@ -504,7 +637,21 @@ from blueprints.compute_routes import compute_bp
 from blueprints.gradebuilder_routes import gradebuilder_bp
 from blueprints.reports_routes import reports_bp
 from blueprints.statistics_routes import statistics_bp
-from gibber import gibberize, resolve, gibber_form_token, gibber_form_action
+from utils import class_summaries, grade_store, student_dashboard
+from utils.admin_jobs import init_admin_jobs
+from utils.analytics_rollups import init_rollups
+from utils.audit_log import init_audit_writer
+from utils.image_pipeline import init_image_pipeline
+from utils.membership_index import init_membership_index
+from utils.score_buffer import init_score_buffer
+from gibber import (
+    TTLCache,
+    gibberize,
+    resolve,
+    gibber_form_token,
+    gibber_form_action,
+    set_cache_size as set_gibber_cache_size,
+)
 
 # Initialize Flask-Mail
 from flask_mail import Mail
@@ -534,11 +681,70 @@ app.register_blueprint(gradebuilder_bp)
 app.register_blueprint(reports_bp)
 app.register_blueprint(statistics_bp)
 
+grade_store.configure(
+    enabled=app.config["GRADE_STORE_ENABLED"],
+    max_classes=app.config["GRADE_STORE_MAX_CLASSES"],
+    ttl=app.config["GRADE_STORE_TTL"],
+)
+student_dashboard.configure(ttl=app.config["STUDENT_DASHBOARD_CACHE_TTL"])
+class_summaries.configure(ttl=app.config["CLASS_SUMMARY_CACHE_TTL"])
+init_admin_jobs()
+if app.config["SCORE_WRITE_BEHIND"]:
+    init_score_buffer(
+        journal_path=app.config["SCORE_JOURNAL_PATH"],
+        interval_ms=app.config["SCORE_FLUSH_INTERVAL_MS"],
+        max_batch=app.config["SCORE_FLUSH_MAX_BATCH"],
+    )
+if app.config["AUDIT_LOG_ASYNC"]:
+    init_audit_writer(
+        spill_path=app.config["AUDIT_SPILL_PATH"],
+        max_queue=app.config["AUDIT_LOG_QUEUE_SIZE"],
+        interval_ms=app.config["AUDIT_LOG_FLUSH_INTERVAL_MS"],
+        batch_size=app.config["AUDIT_LOG_BATCH"],
+    )
+if app.config["MEMBERSHIP_INDEX_ENABLED"]:
+    init_membership_index(interval=app.config["MEMBERSHIP_INDEX_REFRESH"])
+if app.config["IMAGE_PIPELINE_ENABLED"]:
+    init_image_pipeline(app.root_path, app.config["REGISTRATION_MEDIA_DIR"])
+if app.config["ANALYTICS_ROLLUPS_ENABLED"]:
+    init_rollups(
+        interval=app.config["ANALYTICS_ROLLUP_INTERVAL"],
+        full_interval=app.config["ANALYTICS_ROLLUP_FULL_INTERVAL"],
+    )
+
 # Expose form helper to templates: use `gibber_form_action('/target/path')` as form `action`
 app.jinja_env.globals.update(gibber_form_action=gibber_form_action)
 
 
 # --- Auto-Gibber middleware & resolver
+set_gibber_cache_size(app.config["GIBBER_CACHE_SIZE"])
+
+# The url_map does not change after startup, so the bound adapter (per scheme)
+# and the (path, method) -> (endpoint, args) matches can be reused. Matches are
+# keyed by the resolved path rather than the token: many tokens map to one path.
+_gib_adapters = {}
+_gib_match_cache = TTLCache(app.config["GIBBER_CACHE_SIZE"])
+_GIB_MATCH_TTL = 3600
+
+
+def _gib_match(real_path, method):
+    scheme = request.scheme
+    key = (scheme, real_path, method)
+    if app.config.get("GIBBER_CACHE_ENABLED", True):
+        cached = _gib_match_cache.get(key)
+        if cached is not None:
+            return cached[0], dict(cached[1])
+
+    adapter = _gib_adapters.get(scheme)
+    if adapter is None:
+        adapter = app.url_map.bind("", url_scheme=scheme)
+        _gib_adapters[scheme] = adapter
+    endpoint, args = adapter.match(real_path, method=method)
+    if app.config.get("GIBBER_CACHE_ENABLED", True):
+        _gib_match_cache.put(key, (endpoint, dict(args)), _GIB_MATCH_TTL)
+    return endpoint, args
+
+
 @app.before_request
 def auto_gibber_redirect():
     path = request.path
@@ -622,8 +828,20 @@ def set_cache_control_headers(response):
     # Check if user is authenticated by looking for user_id in session
     is_authenticated = "user_id" in session
 
+    # Content-hashed responses (registration media) keep their immutable
+    # Cache-Control; their URL changes whenever the content does.
+    if response.cache_control.immutable:
+        return response
+
+    # Conditional-GET responses (see utils.http_cache) must stay revalidatable;
+    # no-store would stop the browser from ever sending If-None-Match.
+    if response.headers.get("ETag") and not path.startswith("/static"):
+        response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+        response.headers.pop("Pragma", None)
+        response.headers.pop("Expires", None)
+
     # For authenticated users on protected pages, set no-cache headers
-    if is_authenticated and any(path.startswith(p) for p in protected_paths):
+    elif is_authenticated and any(path.startswith(p) for p in protected_paths):
         response.headers["Cache-Control"] = (
             "no-store, no-cache, must-revalidate, max-age=0, private"
         )
@@ -632,7 +850,8 @@ def set_cache_control_headers(response):
 
     # For public pages, allow normal caching but still set private
     elif path.startswith("/static"):
-        # Static files can be cached
+        # Static files can be cached; fingerprinted /static/dist/ files are
+        # marked immutable by utils.assets.
         pass
     else:
         # Other pages should have limited caching
@@ -659,8 +878,7 @@ def gib_route(token):
             request.environ["QUERY_STRING"] = real_qs or ""
 
             # Match the endpoint for the real path using the original request method
-            adapter = app.url_map.bind("", url_scheme=request.scheme)
-            endpoint, args = adapter.match(real_path, method=request.method)
+            endpoint, args = _gib_match(real_path, request.method)
             view = app.view_functions.get(endpoint)
             if not view:
                 return "Invalid gibber endpoint", 404
@@ -688,90 +906,23 @@ def cleanup_db(exception=None):
 # Helper: get_equivalent(final_grade)
 # Used by: Reserved for grade equivalency mapping (not directly referenced by current routes)
 # Purpose: Map numeric grade to institution-style equivalent string.
-"""def get_equivalent(final_grade: float) -> str:
-    Map numeric grade to equivalent string. Placeholder scale; adjust to institution policy.
-    if final_grade >= 98 - 100:
-        return "1.00"
-    if final_grade >= 95 - 97:
-        return "1.25"
-    if final_grade >= 92 - 94:
-        return "1.50"
-    if final_grade >= 89 - 91:
-        return "1.75"
-    if final_grade >= 86 - 88:
-        return "2.00"
-    if final_grade >= 83 - 85:
-        return "2.25"
-    if final_grade >= 80 - 82:
-        return "2.50"
-    if final_grade >= 77 - 79:
-        return "2.75"
-    if final_grade >= 75 - 76:
-        return "3.00"
-    if final_grade >= 70 - 74:
-        return "5.00"
-    """
-
-
 def get_equivalent(final_grade) -> str:
     """
-    ISU (Isabela State University) official grading system:
-
-    Percent Equivalent → Grade
-    98-100   → 1.00
-    95-97    → 1.25
-    92-94    → 1.50
-    89-91    → 1.75
-    86-88    → 2.00
-    83-85    → 2.25
-    80-82    → 2.50
-    77-79    → 2.75
-    75-76    → 3.00
-    Below 75 → 5.00
-
-    Robust handling of all possible real-world inputs:
-    • Decimal/floating-point grades → fully supported
-    • Grades exactly on boundaries → correct bucket
-    • Grades above 100 → returns "" (empty string)
+    ISU (Isabela State University) official grading system, via the MAJOR
+    scale in utils.grading_scales (98+ 1.00, 95+ 1.25 ... 75+ 3.0, below 75 5.0).
+
+    • None, non-numeric or NaN → "" (empty string)
+    • Grades above 100 → "" (empty string)
     • Negative grades → treated as failing → "5.0"
-    • None (empty cell) → returns ""
-    • Non-numeric strings → returns ""
-    • Invalid types → returns "" (prevents crashes)
     """
-    # 1. Invalid inputs → return empty string
-    if final_grade is None:
-        return ""
-
-    # Try to convert to float, if impossible treat as invalid
-    try:
-        grade = float(final_grade)
-    except (TypeError, ValueError):
+    equivalent = equivalent_for(final_grade, "MAJOR")
+    if equivalent is None or float(final_grade) > 100:
         return ""
-
-    # 2. ISU grading scale logic
-    if grade < 75:
-        return "5.0"
-    if grade < 77:
-        return "3.0"
-    if grade < 80:
-        return "2.75"
-    if grade < 83:
-        return "2.5"
-    if grade < 86:
-        return "2.25"
-    if grade < 89:
-        return "2.0"
-    if grade < 92:
-        return "1.75"
-    if grade < 95:
-        return "1.5"
-    if grade < 98:
-        return "1.25"
-    if grade <= 100:
+    # This helper has always labelled 98-100 "1.00"; released grades (which
+    # share MAJOR@v1) store "1.0", so only this label differs here.
+    if equivalent == "1.0":
         return "1.00"
-
-    # Anything > 100
-    return ""
+    return equivalent
 
 
 # Helper: validate_structure_json(structure)
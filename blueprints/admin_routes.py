@@ -4,12 +4,20 @@ import uuid
 import random
 import threading
 from datetime import datetime
-from flask import Blueprint, request, jsonify, session
+from flask import Blueprint, current_app, request, jsonify, send_from_directory, session, url_for
 from werkzeug.security import generate_password_hash
 
+from utils import (
+    analytics_rollups,
+    bulk_actions,
+    image_pipeline,
+    membership_index,
+    roster_import,
+)
 from utils.db_conn import get_db_connection
-from utils.auth_utils import login_required, validate_password_policy
+from utils.auth_utils import audit_context, login_required, validate_password_policy
 from utils.email_service import email_service
+from utils.pagination import Sort, decode_cursor, like_prefix, page, parse_limit
 
 
 def _send_email_async(email_fn, *args, **kwargs):
@@ -263,6 +271,7 @@ def create_instructor():
                 )
 
         get_db_connection().commit()
+        membership_index.add(email=email, school_id=school_id)
 
         logger.info(
             f"Instructor created successfully: {first_name} {last_name} ({school_id}) by admin {session.get('school_id')}"
@@ -418,123 +427,199 @@ def validate_instructor_workload():
         return jsonify({"success": False, "error": "Failed to validate workload"}), 500
 
 
+INSTRUCTOR_SORTS = {
+    "newest": Sort(["i.id"], ["id"], descending=True),
+    "oldest": Sort(["i.id"], ["id"]),
+    "name": Sort(
+        ["COALESCE(pi.last_name, '')", "COALESCE(pi.first_name, '')", "i.id"],
+        ["sort_last_name", "sort_first_name", "id"],
+    ),
+    "school_id": Sort(["u.school_id", "i.id"], ["school_id", "id"]),
+}
+
+
+def _instructor_filters(args, with_status=True):
+    """WHERE clause and params for the admin instructor list filters."""
+    where = []
+    params = []
+    department = (args.get("department") or "").strip()
+    if department:
+        where.append("i.department = %s")
+        params.append(department)
+    status = (args.get("status") or "").strip().lower()
+    if with_status and status:
+        if status == "suspended":
+            where.append("i.status <> 'active'")
+        else:
+            where.append("i.status = %s")
+            params.append(status)
+    q = (args.get("q") or "").strip()
+    if q:
+        pattern = like_prefix(q)
+        where.append("(pi.last_name LIKE %s OR pi.first_name LIKE %s OR u.school_id LIKE %s)")
+        params.extend([pattern, pattern, pattern])
+    return where, params
+
+
+def _instructor_data(instructor):
+    """Serialize an instructor row for the admin list, or None if it is unusable."""
+    try:
+        # Defensive: handle None values for date fields
+        hire_date = instructor.get("hire_date")
+        created_at = instructor.get("created_at")
+
+        # Safely convert datetime to ISO format
+        hire_date_str = None
+        if hire_date:
+            try:
+                if hasattr(hire_date, "isoformat"):
+                    hire_date_str = hire_date.isoformat()
+                else:
+                    hire_date_str = str(hire_date)
+            except Exception as e:
+                logger.warning(f"Could not serialize hire_date: {e}")
+
+        created_at_str = None
+        if created_at:
+            try:
+                if hasattr(created_at, "isoformat"):
+                    created_at_str = created_at.isoformat()
+                else:
+                    created_at_str = str(created_at)
+            except Exception as e:
+                logger.warning(f"Could not serialize created_at: {e}")
+
+        return {
+            "id": int(instructor.get("id") or 0),
+            "school_id": str(instructor.get("school_id") or ""),
+            "user_role": str(instructor.get("user_role") or "instructor"),
+            "is_system_admin": str(instructor.get("user_role") or "").lower()
+            == "admin",
+            "name": f"{instructor.get('first_name') or ''} {instructor.get('last_name') or ''}".strip()
+            or f"Instructor {instructor.get('id')}",
+            "email": str(instructor.get("email") or "N/A"),
+            "department": str(instructor.get("department") or "Not specified"),
+            "specialization": str(instructor.get("specialization") or "Not specified"),
+            "employee_id": str(instructor.get("employee_id") or "Not specified"),
+            "status": str(instructor.get("status") or "active"),
+            "hire_date": hire_date_str,
+            "created_at": created_at_str,
+            "class_count": 0,
+        }
+    except Exception as e:
+        logger.error(f"Error processing instructor {instructor.get('id')}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return None
+
+
 @admin_bp.route("/api/admin/instructors", methods=["GET"], endpoint="get_instructors")
 @login_required
 def get_instructors():
+    """List instructors.
+
+    Same pagination as get_students: ?limit=N pages by keyset with
+    ?cursor=<next_cursor>; without it the whole (filtered) list is returned.
+    Filters: department, status (active/suspended) and q (prefix of last
+    name, first name or school ID). Sorts: newest (default), oldest, name,
+    school_id.
+    """
     err = _require_admin()
     if err:
         return err
 
+    sort = INSTRUCTOR_SORTS.get(request.args.get("sort") or "newest")
+    if sort is None:
+        return jsonify({"error": "Unknown sort"}), 400
+    paginated = "limit" in request.args or "cursor" in request.args
+    limit = parse_limit(request.args.get("limit")) if paginated else None
+
     try:
+        where, params = _instructor_filters(request.args)
+        if request.args.get("cursor"):
+            try:
+                after_sql, after_params = sort.after(
+                    decode_cursor(request.args["cursor"])
+                )
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+            where.append(after_sql)
+            params.extend(after_params)
+
+        base_from = """FROM instructors i
+                JOIN users u ON i.user_id = u.id
+                LEFT JOIN personal_info pi ON i.personal_info_id = pi.id"""
+        columns = """i.id, i.user_id, i.personal_info_id, i.department, i.specialization,
+                         i.employee_id, i.hire_date, i.status, i.created_at, i.updated_at,
+                         u.school_id, u.role as user_role, pi.first_name, pi.last_name, pi.email"""
+
         conn = get_db_connection()
         conn.ping(reconnect=True)  # Ensure connection is alive
 
         with conn.cursor() as cursor:
+            sql = f"""SELECT {columns},
+                         COALESCE(pi.last_name, '') AS sort_last_name,
+                         COALESCE(pi.first_name, '') AS sort_first_name
+                {base_from}
+                {"WHERE " + " AND ".join(where) if where else ""}
+                ORDER BY {sort.order_by()}"""
+            if limit is not None:
+                sql += " LIMIT %s"
+                params.append(limit + 1)
+            cursor.execute(sql, params)
+            instructors = cursor.fetchall() or []
+            next_cursor = None
+            if limit is not None:
+                instructors, next_cursor = page(instructors, limit, sort)
+
+            logger.info(f"Fetched {len(instructors)} instructors from database")
+
+            count_where, count_params = _instructor_filters(
+                request.args, with_status=False
+            )
             cursor.execute(
-                """SELECT i.id, i.user_id, i.personal_info_id, i.department, i.specialization,
-                         i.employee_id, i.hire_date, i.status, i.created_at, i.updated_at,
-                         u.school_id, u.role as user_role, pi.first_name, pi.last_name, pi.email
-                FROM instructors i
-                JOIN users u ON i.user_id = u.id
-                LEFT JOIN personal_info pi ON i.personal_info_id = pi.id
-                ORDER BY i.created_at DESC"""
+                f"""SELECT i.status, COUNT(*) AS cnt
+                {base_from}
+                {"WHERE " + " AND ".join(count_where) if count_where else ""}
+                GROUP BY i.status""",
+                count_params,
             )
-            instructors = cursor.fetchall()
+            by_status = {
+                (r["status"] or "active"): int(r["cnt"])
+                for r in cursor.fetchall() or []
+            }
 
-            logger.info(
-                f"Fetched {len(instructors) if instructors else 0} instructors from database"
+            cursor.execute(
+                f"""SELECT {columns}
+                {base_from}
+                {"WHERE " + " AND ".join(count_where) if count_where else ""}
+                ORDER BY i.created_at DESC, i.id DESC
+                LIMIT 5""",
+                count_params,
             )
+            recent_rows = cursor.fetchall() or []
 
-            if not instructors:
-                instructors = []
-
-            instructors_data = []
-            active_count = 0
-            suspended_count = 0
-
-            for instructor in instructors:
-                try:
-                    # Defensive: handle None values for date fields
-                    hire_date = instructor.get("hire_date")
-                    created_at = instructor.get("created_at")
-
-                    # Safely convert datetime to ISO format
-                    hire_date_str = None
-                    if hire_date:
-                        try:
-                            if hasattr(hire_date, "isoformat"):
-                                hire_date_str = hire_date.isoformat()
-                            else:
-                                hire_date_str = str(hire_date)
-                        except Exception as e:
-                            logger.warning(f"Could not serialize hire_date: {e}")
-
-                    created_at_str = None
-                    if created_at:
-                        try:
-                            if hasattr(created_at, "isoformat"):
-                                created_at_str = created_at.isoformat()
-                            else:
-                                created_at_str = str(created_at)
-                        except Exception as e:
-                            logger.warning(f"Could not serialize created_at: {e}")
-
-                    instructor_data = {
-                        "id": int(instructor.get("id") or 0),
-                        "school_id": str(instructor.get("school_id") or ""),
-                        "user_role": str(instructor.get("user_role") or "instructor"),
-                        "is_system_admin": str(
-                            instructor.get("user_role") or ""
-                        ).lower()
-                        == "admin",
-                        "name": f"{instructor.get('first_name') or ''} {instructor.get('last_name') or ''}".strip()
-                        or f"Instructor {instructor.get('id')}",
-                        "email": str(instructor.get("email") or "N/A"),
-                        "department": str(
-                            instructor.get("department") or "Not specified"
-                        ),
-                        "specialization": str(
-                            instructor.get("specialization") or "Not specified"
-                        ),
-                        "employee_id": str(
-                            instructor.get("employee_id") or "Not specified"
-                        ),
-                        "status": str(instructor.get("status") or "active"),
-                        "hire_date": hire_date_str,
-                        "created_at": created_at_str,
-                        "class_count": 0,
-                    }
-
-                    if instructor_data["status"] == "active":
-                        active_count += 1
-                    else:
-                        suspended_count += 1
-
-                    instructors_data.append(instructor_data)
-                except Exception as e:
-                    logger.error(
-                        f"Error processing instructor {instructor.get('id')}: {str(e)}"
-                    )
-                    logger.error(traceback.format_exc())
-                    continue
-
-            recent_instructors = sorted(
-                instructors_data, key=lambda x: x["created_at"] or "", reverse=True
-            )[:5]
-
-            analytics = {
-                "total_instructors": len(instructors_data),
-                "active_instructors": active_count,
-                "suspended_instructors": suspended_count,
-                "recent_instructors": recent_instructors,
-            }
+        instructors_data = [
+            d for d in (_instructor_data(row) for row in instructors) if d is not None
+        ]
+        total = sum(by_status.values())
+        active_count = by_status.get("active", 0)
+        analytics = {
+            "total_instructors": total,
+            "active_instructors": active_count,
+            "suspended_instructors": total - active_count,
+            "recent_instructors": [
+                d for d in (_instructor_data(row) for row in recent_rows) if d is not None
+            ],
+        }
 
         logger.info(
             f"Admin {session.get('school_id')} retrieved instructor analytics: {len(instructors_data)} instructors"
         )
-        return jsonify(
-            {"success": True, "instructors": instructors_data, "analytics": analytics}
-        )
+        response = {"success": True, "instructors": instructors_data, "analytics": analytics}
+        if paginated:
+            response["next_cursor"] = next_cursor
+            response["counts"] = {"total": total, "by_status": by_status}
+        return jsonify(response)
 
     except Exception as e:
         logger.error(f"Failed to get instructors: {str(e)}")
@@ -545,6 +630,24 @@ def get_instructors():
         )
 
 
+@admin_bp.route(
+    "/api/admin/instructors/search", methods=["GET"], endpoint="search_instructors"
+)
+@login_required
+def search_instructors():
+    """Typeahead: instructors whose last name, first name or school ID starts with ?q."""
+    err = _require_admin()
+    if err:
+        return err
+    return _typeahead(
+        """SELECT i.id, u.school_id, pi.first_name, pi.last_name
+        FROM instructors i
+        JOIN users u ON i.user_id = u.id
+        LEFT JOIN personal_info pi ON i.personal_info_id = pi.id""",
+        "i.id",
+    )
+
+
 @admin_bp.route(
     "/api/admin/instructors/<int:instructor_id>",
     methods=["GET"],
@@ -812,6 +915,7 @@ def delete_instructor(instructor_id):
             cursor.execute("DELETE FROM users WHERE id = %s", (instructor["user_id"],))
 
         get_db_connection().commit()
+        membership_index.discard(school_id=instructor["school_id"])
 
         logger.info(
             f"Admin {session.get('school_id')} deleted instructor: {instructor['school_id']}"
@@ -824,87 +928,264 @@ def delete_instructor(instructor_id):
         return jsonify({"error": "Failed to delete instructor"}), 500
 
 
+STUDENT_SORTS = {
+    "newest": Sort(["s.id"], ["id"], descending=True),
+    "oldest": Sort(["s.id"], ["id"]),
+    "name": Sort(
+        ["COALESCE(pi.last_name, '')", "COALESCE(pi.first_name, '')", "s.id"],
+        ["sort_last_name", "sort_first_name", "id"],
+    ),
+    "school_id": Sort(["u.school_id", "s.id"], ["school_id", "id"]),
+}
+
+
+def _student_filters(args, with_status=True):
+    """WHERE clause and params for the admin student list filters."""
+    where = []
+    params = []
+    for arg, column in (("course", "s.course"), ("section", "s.section"), ("track", "s.track")):
+        value = (args.get(arg) or "").strip()
+        if value:
+            where.append(f"{column} = %s")
+            params.append(value)
+    year_level = args.get("year_level", type=int)
+    if year_level:
+        where.append("s.year_level = %s")
+        params.append(year_level)
+    approval = (args.get("approval_status") or "").strip()
+    if approval:
+        where.append("s.approval_status = %s")
+        params.append(approval)
+    status = (args.get("status") or "").strip().lower()
+    if with_status and status:
+        if status == "active":
+            where.append("(u.account_status IS NULL OR u.account_status <> 'suspended')")
+        else:
+            where.append("u.account_status = %s")
+            params.append(status)
+    q = (args.get("q") or "").strip()
+    if q:
+        pattern = like_prefix(q)
+        where.append("(pi.last_name LIKE %s OR pi.first_name LIKE %s OR u.school_id LIKE %s)")
+        params.extend([pattern, pattern, pattern])
+    return where, params
+
+
+def _student_data(student, dropped_count):
+    return {
+        "id": student["id"],
+        "user_id": student["user_id"],
+        "school_id": student["school_id"],
+        "first_name": student["first_name"] or "",
+        "middle_name": student.get("middle_name") or "",
+        "last_name": student["last_name"] or "",
+        "name": f"{student['first_name'] or ''} {student['last_name'] or ''}".strip()
+        or f"Student {student['id']}",
+        "email": student["email"] or "N/A",
+        "course": student["course"] or "Not specified",
+        "track": student["track"] or "Not specified",
+        "year_level": student["year_level"] or "Not specified",
+        "section": student["section"] or "Not specified",
+        "approval_status": student.get("approval_status") or "approved",
+        "account_status": student.get("account_status") or "active",
+        "is_dropped": dropped_count > 0,
+        "dropped_class_count": dropped_count,
+        "created_at": (
+            student["created_at"].isoformat() if student["created_at"] else None
+        ),
+    }
+
+
 @admin_bp.route("/api/admin/students", methods=["GET"], endpoint="get_students")
 @login_required
 def get_students():
+    """List students.
+
+    Without ?limit the whole (filtered) list is returned as before. With
+    ?limit=N the list is paginated by keyset: pass the returned next_cursor
+    as ?cursor= for the next page. Filters: course, section, track,
+    year_level, approval_status, status (active/suspended) and q (prefix of
+    last name, first name or school ID). Sorts (?sort=): newest (default),
+    oldest, name, school_id. Counts ignore the status filter and the cursor.
+    """
     err = _require_admin()
     if err:
         return err
 
+    sort = STUDENT_SORTS.get(request.args.get("sort") or "newest")
+    if sort is None:
+        return jsonify({"error": "Unknown sort"}), 400
+    paginated = "limit" in request.args or "cursor" in request.args
+    limit = parse_limit(request.args.get("limit")) if paginated else None
+
     try:
-        with get_db_connection().cursor() as cursor:
-            cursor.execute(
-                """SELECT s.*, u.school_id, u.account_status,
-                         pi.first_name, pi.middle_name, pi.last_name, pi.email,
-                         (
-                             SELECT COUNT(*)
-                             FROM student_classes sc
-                             WHERE sc.student_id = s.id AND sc.is_dropped = 1
-                         ) AS dropped_class_count
-                FROM students s
+        where, params = _student_filters(request.args)
+        if request.args.get("cursor"):
+            try:
+                after_sql, after_params = sort.after(
+                    decode_cursor(request.args["cursor"])
+                )
+            except ValueError:
+                return jsonify({"error": "Invalid cursor"}), 400
+            where.append(after_sql)
+            params.extend(after_params)
+
+        base_from = """FROM students s
                 JOIN users u ON s.user_id = u.id
                 LEFT JOIN personal_info pi ON s.personal_info_id = pi.id"""
-            )
-            students = cursor.fetchall()
-
-            students_data = []
-            active_count = 0
-            suspended_count = 0
-
-            for student in students:
-                student_data = {
-                    "id": student["id"],
-                    "user_id": student["user_id"],
-                    "school_id": student["school_id"],
-                    "first_name": student["first_name"] or "",
-                    "middle_name": student.get("middle_name") or "",
-                    "last_name": student["last_name"] or "",
-                    "name": f"{student['first_name'] or ''} {student['last_name'] or ''}".strip()
-                    or f"Student {student['id']}",
-                    "email": student["email"] or "N/A",
-                    "course": student["course"] or "Not specified",
-                    "track": student["track"] or "Not specified",
-                    "year_level": student["year_level"] or "Not specified",
-                    "section": student["section"] or "Not specified",
-                    "approval_status": student.get("approval_status") or "approved",
-                    "account_status": student.get("account_status") or "active",
-                    "is_dropped": (student.get("dropped_class_count") or 0) > 0,
-                    "dropped_class_count": int(student.get("dropped_class_count") or 0),
-                    "created_at": (
-                        student["created_at"].isoformat()
-                        if student["created_at"]
-                        else None
-                    ),
-                }
 
-                if student_data["account_status"] == "suspended":
-                    suspended_count += 1
-                else:
-                    active_count += 1
+        with get_db_connection().cursor() as cursor:
+            sql = f"""SELECT s.*, u.school_id, u.account_status,
+                         pi.first_name, pi.middle_name, pi.last_name, pi.email,
+                         COALESCE(pi.last_name, '') AS sort_last_name,
+                         COALESCE(pi.first_name, '') AS sort_first_name
+                {base_from}
+                {"WHERE " + " AND ".join(where) if where else ""}
+                ORDER BY {sort.order_by()}"""
+            if limit is not None:
+                sql += " LIMIT %s"
+                params.append(limit + 1)
+            cursor.execute(sql, params)
+            students = cursor.fetchall() or []
+            next_cursor = None
+            if limit is not None:
+                students, next_cursor = page(students, limit, sort)
+
+            # Dropped-class counts for the rows being returned only.
+            dropped = {}
+            ids = [st["id"] for st in students]
+            for start in range(0, len(ids), 1000):
+                chunk = ids[start : start + 1000]
+                cursor.execute(
+                    f"""SELECT student_id, COUNT(*) AS cnt
+                    FROM student_classes
+                    WHERE is_dropped = 1 AND student_id IN ({",".join(["%s"] * len(chunk))})
+                    GROUP BY student_id""",
+                    chunk,
+                )
+                dropped.update(
+                    {r["student_id"]: int(r["cnt"]) for r in cursor.fetchall() or []}
+                )
 
-                students_data.append(student_data)
+            count_where, count_params = _student_filters(request.args, with_status=False)
+            cursor.execute(
+                f"""SELECT u.account_status, COUNT(*) AS cnt
+                {base_from}
+                {"WHERE " + " AND ".join(count_where) if count_where else ""}
+                GROUP BY u.account_status""",
+                count_params,
+            )
+            by_status = {
+                (r["account_status"] or "active"): int(r["cnt"])
+                for r in cursor.fetchall() or []
+            }
 
-            recent_students = sorted(
-                students_data, key=lambda x: x["created_at"] or "", reverse=True
-            )[:5]
+            cursor.execute(
+                f"""SELECT s.*, u.school_id, u.account_status,
+                         pi.first_name, pi.middle_name, pi.last_name, pi.email
+                {base_from}
+                {"WHERE " + " AND ".join(count_where) if count_where else ""}
+                ORDER BY s.created_at DESC, s.id DESC
+                LIMIT 5""",
+                count_params,
+            )
+            recent_rows = cursor.fetchall() or []
+            ids = [r["id"] for r in recent_rows if r["id"] not in dropped]
+            if ids:
+                cursor.execute(
+                    f"""SELECT student_id, COUNT(*) AS cnt
+                    FROM student_classes
+                    WHERE is_dropped = 1 AND student_id IN ({",".join(["%s"] * len(ids))})
+                    GROUP BY student_id""",
+                    ids,
+                )
+                dropped.update(
+                    {r["student_id"]: int(r["cnt"]) for r in cursor.fetchall() or []}
+                )
 
-            analytics = {
-                "total_students": len(students_data),
-                "active_students": active_count,
-                "suspended_students": suspended_count,
-                "recent_students": recent_students,
-            }
+        students_data = [_student_data(st, dropped.get(st["id"], 0)) for st in students]
+        total = sum(by_status.values())
+        suspended_count = by_status.get("suspended", 0)
+        analytics = {
+            "total_students": total,
+            "active_students": total - suspended_count,
+            "suspended_students": suspended_count,
+            "recent_students": [
+                _student_data(st, dropped.get(st["id"], 0)) for st in recent_rows
+            ],
+        }
 
         logger.info(f"Admin {session.get('school_id')} retrieved student analytics")
-        return jsonify(
-            {"success": True, "students": students_data, "analytics": analytics}
-        )
+        response = {"success": True, "students": students_data, "analytics": analytics}
+        if paginated:
+            response["next_cursor"] = next_cursor
+            response["counts"] = {"total": total, "by_status": by_status}
+        return jsonify(response)
 
     except Exception as e:
         logger.error(f"Failed to get students: {str(e)}")
         return jsonify({"error": "Failed to retrieve students"}), 500
 
 
+@admin_bp.route(
+    "/api/admin/students/search", methods=["GET"], endpoint="search_students"
+)
+@login_required
+def search_students():
+    """Typeahead: students whose last name, first name or school ID starts with ?q."""
+    err = _require_admin()
+    if err:
+        return err
+    return _typeahead(
+        """SELECT s.id, u.school_id, pi.first_name, pi.last_name
+        FROM students s
+        JOIN users u ON s.user_id = u.id
+        LEFT JOIN personal_info pi ON s.personal_info_id = pi.id""",
+        "s.id",
+    )
+
+
+def _typeahead(select_from, id_column):
+    q = (request.args.get("q") or "").strip()
+    limit = parse_limit(request.args.get("limit"), default=10, maximum=25)
+    if len(q) < 2:
+        return jsonify({"success": True, "results": []})
+    pattern = like_prefix(q)
+    try:
+        results = {}
+        with get_db_connection().cursor() as cursor:
+            # One prefix range scan per indexed column, rather than an OR that
+            # the optimizer may answer with a full scan.
+            for column in ("u.school_id", "pi.last_name", "pi.first_name"):
+                cursor.execute(
+                    f"{select_from} WHERE {column} LIKE %s ORDER BY {column}, {id_column} LIMIT %s",
+                    (pattern, limit),
+                )
+                for r in cursor.fetchall() or []:
+                    results.setdefault(r["id"], r)
+        rows = sorted(
+            results.values(),
+            key=lambda r: ((r["last_name"] or "").lower(), (r["first_name"] or "").lower(), r["id"]),
+        )[:limit]
+        return jsonify(
+            {
+                "success": True,
+                "results": [
+                    {
+                        "id": r["id"],
+                        "school_id": r["school_id"],
+                        "name": f"{r['first_name'] or ''} {r['last_name'] or ''}".strip()
+                        or r["school_id"],
+                    }
+                    for r in rows
+                ],
+            }
+        )
+    except Exception as e:
+        logger.error(f"Typeahead search failed: {str(e)}")
+        return jsonify({"error": "Search failed"}), 500
+
+
 @admin_bp.route("/api/admin/students", methods=["POST"], endpoint="create_student")
 @login_required
 def create_student():
@@ -1000,6 +1281,7 @@ def create_student():
             student_id = cursor.lastrowid
 
         get_db_connection().commit()
+        membership_index.add(email=email, school_id=school_id)
         logger.info(
             "Admin %s created student account %s",
             session.get("school_id"),
@@ -1025,6 +1307,81 @@ def create_student():
         return jsonify({"error": "Failed to create student"}), 500
 
 
+_IMPORT_ROLES = {"students": "student", "instructors": "instructor"}
+
+
+@admin_bp.route(
+    "/api/admin/imports/<role>", methods=["POST"], endpoint="import_roster"
+)
+@login_required
+def import_roster(role):
+    """Start a bulk import from an uploaded CSV/XLSX roster (see utils/roster_import.py).
+
+    ?dry_run=1 validates the file and returns the per-row errors without
+    creating anything.
+    """
+    err = _require_admin()
+    if err:
+        return err
+    if role not in _IMPORT_ROLES:
+        return jsonify({"error": "Role must be students or instructors"}), 404
+
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"error": "Choose a .csv or .xlsx file"}), 400
+    try:
+        records = roster_import.read_roster(upload.stream, upload.filename)
+    except roster_import.RosterError as e:
+        return jsonify({"error": str(e)}), 400
+    if not records:
+        return jsonify({"error": "Roster has no rows"}), 400
+
+    role = _IMPORT_ROLES[role]
+    if request.args.get("dry_run") in ("1", "true"):
+        try:
+            with get_db_connection().cursor() as cursor:
+                valid, errors = roster_import.validate_roster(cursor, role, records)
+            return jsonify(
+                {
+                    "success": True,
+                    "total": len(records),
+                    "valid": len(valid),
+                    "failed": len(errors),
+                    "errors": errors,
+                }
+            )
+        except Exception as e:
+            logger.error(f"Roster validation failed: {str(e)}")
+            return jsonify({"error": "Failed to validate roster"}), 500
+
+    job = roster_import.start_import(
+        role,
+        records,
+        approved_by=session.get("user_id"),
+        admin=session.get("school_id"),
+        chunk_size=current_app.config.get("ROSTER_IMPORT_CHUNK", roster_import.DEFAULT_CHUNK),
+        workers=current_app.config.get("ROSTER_IMPORT_WORKERS") or None,
+    )
+    logger.info(
+        f"Admin {session.get('school_id')} started {role} import {job.id} ({job.total} rows)"
+    )
+    return jsonify({"success": True, **job.to_dict()}), 202
+
+
+@admin_bp.route(
+    "/api/admin/imports/<job_id>", methods=["GET"], endpoint="get_import_status"
+)
+@login_required
+def get_import_status(job_id):
+    err = _require_admin()
+    if err:
+        return err
+    job = roster_import.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Import job not found"}), 404
+    return jsonify({"success": True, **job.to_dict()})
+
+
 @admin_bp.route(
     "/api/admin/students/<int:student_id>", methods=["PUT"], endpoint="update_student"
 )
@@ -1148,6 +1505,8 @@ def update_student(student_id):
             )
 
         get_db_connection().commit()
+        membership_index.discard(email=student["email"], school_id=student["school_id"])
+        membership_index.add(email=email, school_id=school_id)
         logger.info(
             "Admin %s updated student %s",
             session.get("school_id"),
@@ -1198,65 +1557,45 @@ def bulk_student_action():
             "unsuspend": "unsuspend",
             "drop": "drop",
             "delete": "delete",
+            "approve": "approve",
+            "reject": "reject",
         }
         normalized_action = action_map.get(action)
         if not normalized_action:
             return jsonify({"error": "Unsupported bulk action"}), 400
 
-        placeholders = ",".join(["%s"] * len(student_ids))
-
-        with get_db_connection().cursor() as cursor:
-            cursor.execute(
-                f"""SELECT s.id, s.user_id, s.personal_info_id, u.school_id
-                FROM students s
-                JOIN users u ON s.user_id = u.id
-                WHERE s.id IN ({placeholders})""",
-                tuple(student_ids),
+        student_ids = sorted(set(student_ids))
+        reason = str(data.get("reason") or "").strip()
+
+        if len(student_ids) > bulk_actions.CHUNK:
+            job = bulk_actions.start_job(
+                normalized_action,
+                student_ids,
+                admin_id=session.get("user_id"),
+                admin=session.get("school_id"),
+                reason=reason,
+                audit=audit_context(),
+            )
+            return (
+                jsonify(
+                    {
+                        "success": True,
+                        "action": normalized_action,
+                        "target_count": len(student_ids),
+                        **job.to_dict(),
+                    }
+                ),
+                202,
             )
-            targets = cursor.fetchall()
-
-            if not targets:
-                return jsonify({"error": "No matching students found"}), 404
-
-            affected = 0
-
-            if normalized_action == "suspend":
-                user_ids = [row["user_id"] for row in targets]
-                user_placeholders = ",".join(["%s"] * len(user_ids))
-                cursor.execute(
-                    f"UPDATE users SET account_status = 'suspended' WHERE id IN ({user_placeholders}) AND role = 'student'",
-                    tuple(user_ids),
-                )
-                affected = cursor.rowcount
-
-            elif normalized_action == "unsuspend":
-                user_ids = [row["user_id"] for row in targets]
-                user_placeholders = ",".join(["%s"] * len(user_ids))
-                cursor.execute(
-                    f"UPDATE users SET account_status = 'active' WHERE id IN ({user_placeholders}) AND role = 'student'",
-                    tuple(user_ids),
-                )
-                affected = cursor.rowcount
-
-            elif normalized_action == "drop":
-                cursor.execute(
-                    f"UPDATE student_classes SET is_dropped = 1 WHERE student_id IN ({placeholders})",
-                    tuple(student_ids),
-                )
-                affected = cursor.rowcount
-
-            elif normalized_action == "delete":
-                for row in targets:
-                    cursor.execute("DELETE FROM students WHERE id = %s", (row["id"],))
-                    cursor.execute("DELETE FROM users WHERE id = %s", (row["user_id"],))
-                    if row.get("personal_info_id"):
-                        cursor.execute(
-                            "DELETE FROM personal_info WHERE id = %s",
-                            (row["personal_info_id"],),
-                        )
-                    affected += 1
 
-        get_db_connection().commit()
+        affected, notify = bulk_actions.run(
+            get_db_connection(),
+            normalized_action,
+            student_ids,
+            admin_id=session.get("user_id"),
+            audit=audit_context(),
+        )
+        bulk_actions.send_notifications_async(normalized_action, notify, reason)
 
         logger.info(
             "Admin %s executed student bulk action %s for %s targets",
@@ -1280,6 +1619,22 @@ def bulk_student_action():
         return jsonify({"error": "Failed to run student bulk action"}), 500
 
 
+@admin_bp.route(
+    "/api/admin/students/bulk-action/<job_id>",
+    methods=["GET"],
+    endpoint="get_bulk_action_status",
+)
+@login_required
+def get_bulk_action_status(job_id):
+    err = _require_admin()
+    if err:
+        return err
+    job = bulk_actions.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Bulk action job not found"}), 404
+    return jsonify({"success": True, **job.to_dict()})
+
+
 @admin_bp.route(
     "/api/admin/students/<int:student_id>",
     methods=["GET"],
@@ -1540,241 +1895,150 @@ def get_instructor_classes(instructor_id):
         )
 
 
+_INSTRUCTOR_NAME_SQL = "TRIM(CONCAT(COALESCE(pi.first_name, ''), ' ', COALESCE(pi.middle_name, ''), ' ', COALESCE(pi.last_name, '')))"
+
+
+def _instructor_analytics_row(row):
+    instructor_name = (row["instructor_name"] or "").strip()
+    if not instructor_name:
+        instructor_name = f"Instructor {row['instructor_id']}"
+    return {
+        "instructor_id": int(row["instructor_id"]),
+        "instructor_name": instructor_name,
+        "department": str(row["department"] or "Not specified"),
+        "total_classes": int(row["total_classes"] or 0),
+        "total_snapshots": int(row["total_snapshots"] or 0),
+        "total_releases": int(row["total_releases"] or 0),
+        "avg_students_per_class": float(row["avg_students_per_class"] or 0),
+    }
+
+
 @admin_bp.route("/api/admin/system-analytics", methods=["GET"])
 @login_required
 def get_system_analytics():
+    """Per-instructor class, snapshot and release totals.
+
+    Read from the analytics rollup tables (utils/analytics_rollups.py).
+    Unfiltered requests read instructor_rollups directly; year, course,
+    section and subject filters aggregate class_rollups of the matching
+    classes.
+    """
     err = _require_admin()
     if err:
         return err
 
-    try:
-        # Check if requesting specific instructor stats
-        instructor_id = request.args.get("instructor_id", "").strip()
-        print(f"[DEBUG] instructor_id received: {instructor_id}")
-        logger.info(f"[DEBUG] instructor_id received: {instructor_id}")
-
-        # Fallback: treat 'undefined', empty, or None as not provided
-        if not instructor_id or instructor_id.lower() == "undefined":
-            instructor_id = None
-
-        if instructor_id:
-            # Return stats for a specific instructor
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    conn = get_db_connection()
-                    conn.ping(reconnect=True)  # Ensure connection is alive
-                    with conn.cursor() as cursor:
-                        query = """
-                            SELECT
-                                i.id as instructor_id,
-                                TRIM(CONCAT(COALESCE(pi.first_name, ''), ' ', COALESCE(pi.middle_name, ''), ' ', COALESCE(pi.last_name, ''))) as instructor_name,
-                                i.department,
-                                COUNT(DISTINCT c.id) as total_classes,
-                                COUNT(DISTINCT CASE WHEN gs.status = 'final' THEN gs.id END) as total_snapshots,
-                                COUNT(DISTINCT rg.id) as total_releases,
-                                ROUND(COALESCE(AVG(CASE WHEN sc_count.student_count > 0 THEN sc_count.student_count ELSE NULL END), 0), 1) as avg_students_per_class
-                            FROM instructors i
-                            JOIN users u ON i.user_id = u.id
-                            LEFT JOIN personal_info pi ON i.personal_info_id = pi.id
-                            LEFT JOIN classes c ON i.id = c.instructor_id
-                            LEFT JOIN grade_snapshots gs ON c.id = gs.class_id AND gs.status = 'final'
-                            LEFT JOIN released_grades rg ON c.id = rg.class_id
-                            LEFT JOIN (
-                                SELECT c.id as class_id, COUNT(sc.student_id) as student_count
-                                FROM classes c
-                                LEFT JOIN student_classes sc ON c.id = sc.class_id
-                                GROUP BY c.id
-                            ) sc_count ON c.id = sc_count.class_id
-                            WHERE i.id = %s AND i.status = 'active'
-                            GROUP BY i.id, pi.first_name, pi.middle_name, pi.last_name, i.department
-                        """
-
-                        cursor.execute(query, (instructor_id,))
-                        result = cursor.fetchone()
-
-                        if result:
-                            instructor_name = result["instructor_name"].strip()
-                            if not instructor_name:
-                                instructor_name = (
-                                    f"Instructor {result['instructor_id']}"
-                                )
-
-                            analytics_data = [
-                                {
-                                    "instructor_id": int(result["instructor_id"]),
-                                    "instructor_name": instructor_name,
-                                    "department": str(
-                                        result["department"] or "Not specified"
-                                    ),
-                                    "total_classes": int(result["total_classes"] or 0),
-                                    "total_snapshots": int(
-                                        result["total_snapshots"] or 0
-                                    ),
-                                    "total_releases": int(
-                                        result["total_releases"] or 0
-                                    ),
-                                    "avg_students_per_class": float(
-                                        result["avg_students_per_class"] or 0
-                                    ),
-                                }
-                            ]
-                        else:
-                            analytics_data = []
-
-                    log_instructor = (
-                        instructor_id if instructor_id else "None or not provided"
-                    )
-                    logger.info(
-                        f"Admin {session.get('school_id')} retrieved analytics for instructor {log_instructor}"
-                    )
-                    print(
-                        f"[DEBUG] Analytics for instructor_id={log_instructor}: {analytics_data}"
-                    )
-                    return jsonify({"success": True, "analytics": analytics_data})
-                except Exception as e:
-                    logger.warning(
-                        f"Attempt {attempt + 1}/{max_retries} failed to get analytics for instructor {instructor_id}: {str(e)}"
-                    )
-                    if attempt < max_retries - 1:
-                        import time
-
-                        time.sleep(1)  # Wait 1 second before retry
-                        continue
-                    else:
-                        logger.error(
-                            f"Failed to get analytics for instructor {instructor_id} after {max_retries} attempts: {str(e)}"
-                        )
-                        logger.error(traceback.format_exc())
-                        print(
-                            f"[ERROR] Failed to get analytics for instructor {instructor_id}: {str(e)}"
-                        )
-                        print(traceback.format_exc())
-                        return (
-                            jsonify(
-                                {
-                                    "success": False,
-                                    "error": "Failed to retrieve instructor analytics",
-                                }
-                            ),
-                            500,
-                        )
-
-        else:
-            # Original system-wide analytics (for backward compatibility)
-            # Get filter parameters
-            instructor_filter = request.args.get("instructor", "").strip()
-            year_filter = request.args.get("year", "").strip()
-            course_filter = request.args.get("course", "").strip()
-            section_filter = request.args.get("section", "").strip()
-            subject_filter = request.args.get("subject", "").strip()
-
-            try:
-                with get_db_connection().cursor() as cursor:
-                    # Build the main query with filters
-                    query = """
-                        SELECT
-                            i.id as instructor_id,
-                            TRIM(CONCAT(COALESCE(pi.first_name, ''), ' ', COALESCE(pi.middle_name, ''), ' ', COALESCE(pi.last_name, ''))) as instructor_name,
-                            i.department,
-                            COUNT(DISTINCT c.id) as total_classes,
-                            COUNT(DISTINCT CASE WHEN gs.status = 'final' THEN gs.id END) as total_snapshots,
-                            COUNT(DISTINCT rg.id) as total_releases,
-                            ROUND(COALESCE(AVG(CASE WHEN sc_count.student_count > 0 THEN sc_count.student_count ELSE NULL END), 0), 1) as avg_students_per_class
-                        FROM instructors i
-                        JOIN users u ON i.user_id = u.id
-                        LEFT JOIN personal_info pi ON i.personal_info_id = pi.id
-                        LEFT JOIN classes c ON i.id = c.instructor_id
-                        LEFT JOIN grade_snapshots gs ON c.id = gs.class_id AND gs.status = 'final'
-                        LEFT JOIN released_grades rg ON c.id = rg.class_id
-                        LEFT JOIN (
-                            SELECT c.id as class_id, COUNT(sc.student_id) as student_count
-                            FROM classes c
-                            LEFT JOIN student_classes sc ON c.id = sc.class_id
-                            GROUP BY c.id
-                        ) sc_count ON c.id = sc_count.class_id
-                        WHERE i.status = 'active'
-                    """
-
-                    params = []
-
-                    # Apply filters
-                    if instructor_filter:
-                        query += " AND TRIM(CONCAT(COALESCE(pi.first_name, ''), ' ', COALESCE(pi.middle_name, ''), ' ', COALESCE(pi.last_name, ''))) LIKE %s"
-                        params.append(f"%{instructor_filter}%")
-
-                    if year_filter:
-                        query += " AND c.year = %s"
-                        params.append(year_filter)
-
-                    if course_filter:
-                        query += " AND c.course = %s"
-                        params.append(course_filter)
-
-                    if section_filter:
-                        query += " AND c.section = %s"
-                        params.append(section_filter)
-
-                    if subject_filter:
-                        query += " AND c.subject LIKE %s"
-                        params.append(f"%{subject_filter}%")
+    # Check if requesting specific instructor stats
+    instructor_id = request.args.get("instructor_id", "").strip()
+    # Fallback: treat 'undefined', empty, or None as not provided
+    if not instructor_id or instructor_id.lower() == "undefined":
+        instructor_id = None
 
-                    query += """
-                        GROUP BY i.id, pi.first_name, pi.middle_name, pi.last_name, i.department
-                        HAVING COUNT(DISTINCT c.id) > 0
-                        ORDER BY instructor_name
-                    """
+    instructor_filter = request.args.get("instructor", "").strip()
+    year_filter = request.args.get("year", "").strip()
+    course_filter = request.args.get("course", "").strip()
+    section_filter = request.args.get("section", "").strip()
+    subject_filter = request.args.get("subject", "").strip()
 
-                    cursor.execute(query, params)
-                    results = cursor.fetchall()
-
-                    analytics_data = []
-                    for row in results:
-                        instructor_name = row["instructor_name"].strip()
-                        if not instructor_name:
-                            instructor_name = f"Instructor {row['instructor_id']}"
-
-                        analytics_data.append(
-                            {
-                                "instructor_id": int(row["instructor_id"]),
-                                "instructor_name": instructor_name,
-                                "department": str(row["department"] or "Not specified"),
-                                "total_classes": int(row["total_classes"] or 0),
-                                "total_snapshots": int(row["total_snapshots"] or 0),
-                                "total_releases": int(row["total_releases"] or 0),
-                                "avg_students_per_class": float(
-                                    row["avg_students_per_class"] or 0
-                                ),
-                            }
-                        )
-
-                logger.info(
-                    f"Admin {session.get('school_id')} retrieved system analytics with filters: instructor={instructor_filter}, year={year_filter}, course={course_filter}, section={section_filter}, subject={subject_filter}"
+    try:
+        with get_db_connection().cursor() as cursor:
+            if instructor_id:
+                source, params = analytics_rollups.instructor_source(cursor)
+                cursor.execute(
+                    f"""
+                    SELECT ir.instructor_id, {_INSTRUCTOR_NAME_SQL} AS instructor_name,
+                           i.department, ir.total_classes, ir.total_snapshots,
+                           ir.total_releases, ir.avg_students_per_class
+                    FROM {source} ir
+                    JOIN instructors i ON i.id = ir.instructor_id
+                    LEFT JOIN personal_info pi ON i.personal_info_id = pi.id
+                    WHERE i.id = %s AND i.status = 'active'
+                    """,
+                    params + [instructor_id],
                 )
-                print(
-                    f"[DEBUG] System analytics with filters: instructor={instructor_filter}, year={year_filter}, course={course_filter}, section={section_filter}, subject={subject_filter}"
+                row = cursor.fetchone()
+                analytics_data = [_instructor_analytics_row(row)] if row else []
+                logger.info(
+                    f"Admin {session.get('school_id')} retrieved analytics for instructor {instructor_id}"
                 )
-                print(f"[DEBUG] Analytics data: {analytics_data}")
                 return jsonify({"success": True, "analytics": analytics_data})
-            except Exception as e:
-                logger.error(f"Failed to get system analytics: {str(e)}")
-                logger.error(traceback.format_exc())
-                print(f"[ERROR] Failed to get system analytics: {str(e)}")
-                print(traceback.format_exc())
-                return (
-                    jsonify(
-                        {
-                            "success": False,
-                            "error": "Failed to retrieve system analytics",
-                        }
-                    ),
-                    500,
+
+            where = ["i.status = 'active'"]
+            params = []
+            if instructor_filter:
+                where.append(f"{_INSTRUCTOR_NAME_SQL} LIKE %s")
+                params.append(f"%{instructor_filter}%")
+
+            class_filters = []
+            class_params = []
+            if year_filter:
+                class_filters.append("c.year = %s")
+                class_params.append(year_filter)
+            if course_filter:
+                class_filters.append("c.course = %s")
+                class_params.append(course_filter)
+            if section_filter:
+                class_filters.append("c.section = %s")
+                class_params.append(section_filter)
+            if subject_filter:
+                class_filters.append("c.subject LIKE %s")
+                class_params.append(f"%{subject_filter}%")
+
+            if class_filters:
+                source, source_params = analytics_rollups.class_source(cursor)
+                cursor.execute(
+                    f"""
+                    SELECT i.id AS instructor_id, {_INSTRUCTOR_NAME_SQL} AS instructor_name,
+                           i.department,
+                           COUNT(c.id) AS total_classes,
+                           COALESCE(SUM(cr.final_snapshots), 0) AS total_snapshots,
+                           COALESCE(SUM(cr.released_grades), 0) AS total_releases,
+                           ROUND(COALESCE(AVG(NULLIF(cr.student_count, 0)), 0), 1) AS avg_students_per_class
+                    FROM instructors i
+                    LEFT JOIN personal_info pi ON i.personal_info_id = pi.id
+                    JOIN classes c ON c.instructor_id = i.id
+                    LEFT JOIN {source} cr ON cr.class_id = c.id
+                    WHERE {" AND ".join(where + class_filters)}
+                    GROUP BY i.id, pi.first_name, pi.middle_name, pi.last_name, i.department
+                    ORDER BY instructor_name
+                    """,
+                    source_params + params + class_params,
                 )
+            else:
+                source, source_params = analytics_rollups.instructor_source(cursor)
+                cursor.execute(
+                    f"""
+                    SELECT ir.instructor_id, {_INSTRUCTOR_NAME_SQL} AS instructor_name,
+                           i.department, ir.total_classes, ir.total_snapshots,
+                           ir.total_releases, ir.avg_students_per_class
+                    FROM {source} ir
+                    JOIN instructors i ON i.id = ir.instructor_id
+                    LEFT JOIN personal_info pi ON i.personal_info_id = pi.id
+                    WHERE {" AND ".join(where)} AND ir.total_classes > 0
+                    ORDER BY instructor_name
+                    """,
+                    source_params + params,
+                )
+            analytics_data = [
+                _instructor_analytics_row(row) for row in cursor.fetchall() or []
+            ]
+
+        logger.info(
+            f"Admin {session.get('school_id')} retrieved system analytics with filters: instructor={instructor_filter}, year={year_filter}, course={course_filter}, section={section_filter}, subject={subject_filter}"
+        )
+        return jsonify({"success": True, "analytics": analytics_data})
 
     except Exception as e:
         logger.error(f"Failed to get system analytics: {str(e)}")
         logger.error(traceback.format_exc())
-        return jsonify({"error": "Failed to retrieve system analytics"}), 500
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "error": "Failed to retrieve system analytics",
+                }
+            ),
+            500,
+        )
 
 
 @admin_bp.route(
@@ -1802,17 +2066,26 @@ def get_class_overview():
             semester_stats = cursor.fetchall()
 
             # 2. Classes per department/course/track
-            cursor.execute(
+            if analytics_rollups.rollups_ready(cursor):
+                cursor.execute(
+                    """
+                    SELECT department, total_classes
+                    FROM department_rollups
+                    ORDER BY total_classes DESC
                 """
-                SELECT
-                    COALESCE(i.department, 'Not Assigned') as department,
-                    COUNT(DISTINCT c.id) as total_classes
-                FROM classes c
-                LEFT JOIN instructors i ON c.instructor_id = i.id
-                GROUP BY i.department
-                ORDER BY total_classes DESC
-            """
-            )
+                )
+            else:
+                cursor.execute(
+                    """
+                    SELECT
+                        COALESCE(i.department, 'Not Assigned') as department,
+                        COUNT(DISTINCT c.id) as total_classes
+                    FROM classes c
+                    LEFT JOIN instructors i ON c.instructor_id = i.id
+                    GROUP BY i.department
+                    ORDER BY total_classes DESC
+                """
+                )
             department_stats = cursor.fetchall()
 
             cursor.execute(
@@ -1980,8 +2253,9 @@ def get_grade_release_monitoring():
     try:
         with get_db_connection().cursor() as cursor:
             # Get all classes with instructor info and grade release status
+            source, params = analytics_rollups.class_source(cursor)
             cursor.execute(
-                """
+                f"""
                 SELECT
                     c.id,
                     c.year,
@@ -1994,24 +2268,19 @@ def get_grade_release_monitoring():
                     c.join_code,
                     c.created_at,
                     i.id as instructor_id,
-                    TRIM(CONCAT(COALESCE(pi.first_name, ''), ' ', COALESCE(pi.middle_name, ''), ' ', COALESCE(pi.last_name, ''))) as instructor_name,
+                    {_INSTRUCTOR_NAME_SQL} as instructor_name,
                     i.department,
-                    CASE WHEN rg.id IS NOT NULL THEN 1 ELSE 0 END as grade_released,
-                    rg.released_at as release_date,
-                    rg.created_at as release_created_at,
-                    COUNT(DISTINCT sc.student_id) as total_students,
-                    COUNT(DISTINCT CASE WHEN sg.student_id IS NOT NULL THEN sg.student_id END) as graded_students
+                    CASE WHEN cr.released_grades > 0 THEN 1 ELSE 0 END as grade_released,
+                    cr.last_released_at as release_date,
+                    COALESCE(cr.student_count, 0) as total_students,
+                    COALESCE(cr.graded_students, 0) as graded_students
                 FROM classes c
                 LEFT JOIN instructors i ON c.instructor_id = i.id
                 LEFT JOIN personal_info pi ON i.personal_info_id = pi.id
-                LEFT JOIN released_grades rg ON c.id = rg.class_id
-                LEFT JOIN student_classes sc ON c.id = sc.class_id
-                LEFT JOIN student_grades sg ON c.id = sg.class_id
-                GROUP BY c.id, c.year, c.semester, c.course, c.section, c.subject, c.schedule,
-                         c.class_code, c.join_code, c.created_at, i.id, pi.first_name, pi.middle_name,
-                         pi.last_name, i.department, rg.id, rg.released_at, rg.created_at
+                LEFT JOIN {source} cr ON cr.class_id = c.id
                 ORDER BY c.year DESC, c.semester DESC, c.course, c.section
-                """
+                """,
+                params,
             )
             classes = cursor.fetchall()
 
@@ -2130,8 +2399,9 @@ def get_pending_registrations():
 
     try:
         with get_db_connection().cursor() as cursor:
+            with_variants = image_pipeline.variants_available(cursor)
             cursor.execute(
-                """
+                f"""
                 SELECT 
                     s.id as student_id,
                     u.id as user_id,
@@ -2149,7 +2419,7 @@ def get_pending_registrations():
                     u.account_status,
                     s.id_front_path,
                     s.id_back_path,
-                    s.face_photo_path
+                    s.face_photo_path{", s.photo_variants" if with_variants else ""}
                 FROM students s
                 INNER JOIN users u ON s.user_id = u.id
                 INNER JOIN personal_info pi ON s.personal_info_id = pi.id
@@ -2159,6 +2429,9 @@ def get_pending_registrations():
             )
             pending_students = cursor.fetchall()
 
+        def media_url(filename):
+            return url_for("admin.registration_media", filename=filename)
+
         # Format the data
         students_data = []
         for student in pending_students:
@@ -2188,6 +2461,7 @@ def get_pending_registrations():
                     "id_front_path": student.get("id_front_path", ""),
                     "id_back_path": student.get("id_back_path", ""),
                     "face_photo_path": student.get("face_photo_path", ""),
+                    **image_pipeline.variant_urls(student, media_url),
                 }
             )
 
@@ -2202,6 +2476,29 @@ def get_pending_registrations():
         return jsonify({"error": "Failed to retrieve pending registrations"}), 500
 
 
+@admin_bp.route(
+    "/admin/registration-media/<path:filename>",
+    methods=["GET"],
+    endpoint="registration_media",
+)
+@login_required
+def registration_media(filename):
+    """Serve a processed registration photo (utils/image_pipeline.py).
+
+    Names are content hashes, so a response never changes; it is still
+    private to the admin who requested it.
+    """
+    err = _require_admin()
+    if err:
+        return err
+
+    response = send_from_directory(current_app.config["REGISTRATION_MEDIA_DIR"], filename)
+    response.cache_control.private = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
+
+
 @admin_bp.route(
     "/admin/approve-registration/<int:student_id>",
     methods=["POST"],
@@ -2369,6 +2666,7 @@ def reject_registration(student_id):
                 )
 
         get_db_connection().commit()
+        membership_index.discard(email=student["email"], school_id=student["school_id"])
 
         full_name = f"{student['first_name']} {student['last_name']}"
         _send_email_async(
@@ -1,6 +1,7 @@
 import json
 import logging
 from flask import Blueprint, request, jsonify, session
+from utils import class_versions
 from utils.db_conn import get_db_connection
 
 logger = logging.getLogger(__name__)
@@ -233,6 +234,7 @@ def api_create_assessment():
                 (subcategory_id, name, float(max_score), int(next_pos)),
             )
             aid = cursor.lastrowid
+            class_versions.bump(cursor, class_versions.assessment_class(cursor, aid))
         get_db_connection().commit()
         return jsonify({"success": True, "assessment_id": aid}), 201
     except Exception as e:
@@ -264,6 +266,7 @@ def api_update_assessment(assessment_id):
             )
             if cursor.rowcount == 0:
                 return jsonify({"error": "not_found"}), 404
+            class_versions.bump(cursor, class_versions.assessment_class(cursor, assessment_id))
         get_db_connection().commit()
         return jsonify({"success": True}), 200
     except Exception as e:
@@ -279,11 +282,13 @@ def api_delete_assessment(assessment_id):
         return err
     try:
         with get_db_connection().cursor() as cursor:
+            class_id = class_versions.assessment_class(cursor, assessment_id)
             cursor.execute(
                 "DELETE FROM grade_assessments WHERE id = %s", (assessment_id,)
             )
             if cursor.rowcount == 0:
                 return jsonify({"error": "not_found"}), 404
+            class_versions.bump(cursor, class_id)
         get_db_connection().commit()
         return jsonify({"success": True}), 200
     except Exception as e:
@@ -505,6 +510,7 @@ def api_create_assessment_simple():
                 (subcategory_id, name, float(max_score), int(next_pos)),
             )
             aid = cursor.lastrowid
+            class_versions.bump(cursor, class_versions.assessment_class(cursor, aid))
         get_db_connection().commit()
         return jsonify({"success": True, "assessment_id": aid}), 201
     except Exception as e:
@@ -23,6 +23,7 @@ from flask import (
 from werkzeug.security import generate_password_hash, check_password_hash
 from werkzeug.utils import secure_filename
 
+from utils import image_pipeline, membership_index
 from utils.db_conn import get_db_connection
 from utils.email_service import email_service
 from utils.rate_limiter import get_login_limiter
@@ -1686,8 +1687,12 @@ def register():
                         face_photo_relative_path,
                     ),
                 )
+                student_id = cursor.lastrowid
 
             get_db_connection().commit()
+            membership_index.add(email=email, school_id=school_id)
+            # Verify, strip and thumbnail the photos off the request.
+            image_pipeline.submit(student_id)
 
             # Send registration confirmation email
             full_name = f"{first_name} {last_name}"
@@ -1743,44 +1748,35 @@ def check_registration_availability():
         if not field_type or not field_value:
             return jsonify({"available": False, "message": "Invalid request"}), 400
 
+        if field_type not in ("email", "school_id"):
+            return (
+                jsonify({"available": False, "message": "Invalid field type"}),
+                400,
+            )
+
         with get_db_connection().cursor() as cursor:
-            if field_type == "email":
-                cursor.execute(
-                    "SELECT id FROM personal_info WHERE email = %s",
-                    (field_value,),
-                )
-                result = cursor.fetchone()
-                if result:
-                    return jsonify(
-                        {
-                            "available": False,
-                            "message": f"❌ This email address is already registered. Please use another email.",
-                        }
-                    )
-                return jsonify({"available": True, "message": "✓ Email is available"})
+            taken = membership_index.get_index().is_registered(
+                cursor, field_type, field_value, client=request.remote_addr or ""
+            )
 
-            elif field_type == "school_id":
-                cursor.execute(
-                    "SELECT id FROM users WHERE school_id = %s",
-                    (field_value,),
-                )
-                result = cursor.fetchone()
-                if result:
-                    return jsonify(
-                        {
-                            "available": False,
-                            "message": f"❌ This School ID is already registered. Please use another School ID.",
-                        }
-                    )
+        if field_type == "email":
+            if taken:
                 return jsonify(
-                    {"available": True, "message": "✓ School ID is available"}
-                )
-
-            else:
-                return (
-                    jsonify({"available": False, "message": "Invalid field type"}),
-                    400,
+                    {
+                        "available": False,
+                        "message": f"❌ This email address is already registered. Please use another email.",
+                    }
                 )
+            return jsonify({"available": True, "message": "✓ Email is available"})
+
+        if taken:
+            return jsonify(
+                {
+                    "available": False,
+                    "message": f"❌ This School ID is already registered. Please use another School ID.",
+                }
+            )
+        return jsonify({"available": True, "message": "✓ School ID is available"})
 
     except Exception as e:
         logger.error(f"Error checking registration availability: {str(e)}")
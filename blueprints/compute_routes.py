@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request
 from utils.auth_utils import login_required
 from utils.db_conn import get_db_connection
+from utils.grading_scales import get_scale
 
 compute_bp = Blueprint("compute", __name__)
 
@@ -35,6 +36,30 @@ def _normalize_groups(groups: dict) -> dict:
     return norm_groups
 
 
+def _group_metrics(total: float, max_total: float, subweight: float):
+    """Metrics for one student's group total; returns (result, unrounded reqpct)."""
+    max_total = float(max_total or 0.0)
+    subweight = float(subweight or 0.0)
+    # === EQUIVALENTS COMPUTATION ===
+    eq_pct = (
+        (float(total) / float(max_total) * 100.0)
+        if max_total and max_total > 0
+        else 0.0
+    )
+    # === TOTAL GRADE COMPUTATION ===
+    reqpct_raw = (eq_pct * subweight) / 100.0 if subweight else 0.0
+    reqpct = round(reqpct_raw, 2)
+    return (
+        {
+            "total": round(total, 2),
+            "eq_pct": round(eq_pct, 2),
+            "reqpct": reqpct,
+            "reqpct_display": round(reqpct, 2),
+        },
+        reqpct_raw,
+    )
+
+
 def _compute_group_metrics(groups: dict, students: list):
     """Sum per-assessment scores and derive group-level totals/weights for each student."""
     norm_groups = _normalize_groups(groups)
@@ -56,12 +81,9 @@ def _compute_group_metrics(groups: dict, students: list):
         category_weighted_raw = {}
 
         for gkey, g in norm_groups.items():
-            ids = g.get("ids", [])
-            maxTotal = float(g.get("maxTotal") or 0.0)
-            subweight = float(g.get("subweight") or 0.0)
             # === TOTAL RAW GRADES COMPUTATION ===
             total = 0.0
-            for aid in ids:
+            for aid in g.get("ids", []):
                 v = score_map.get(aid)
                 if v is None:
                     continue
@@ -69,21 +91,9 @@ def _compute_group_metrics(groups: dict, students: list):
                     total += float(v)
                 except Exception:
                     continue
-            # === EQUIVALENTS COMPUTATION ===
-            eq_pct = (
-                (float(total) / float(maxTotal) * 100.0)
-                if maxTotal and maxTotal > 0
-                else 0.0
+            stud_res[gkey], reqpct_raw = _group_metrics(
+                total, g.get("maxTotal"), g.get("subweight")
             )
-            # === TOTAL GRADE COMPUTATION ===
-            reqpct_raw = (eq_pct * subweight) / 100.0 if subweight else 0.0
-            reqpct = round(reqpct_raw, 2)
-            stud_res[gkey] = {
-                "total": round(total, 2),
-                "eq_pct": round(eq_pct, 2),
-                "reqpct": reqpct,
-                "reqpct_display": round(reqpct, 2),
-            }
 
             cat_label = (gkey.split("::", 1)[0] or "").strip().upper()
             if cat_label:
@@ -103,6 +113,50 @@ def _compute_group_metrics(groups: dict, students: list):
     return results, aggregates
 
 
+def _major_summary(weighted_raw: dict, has_lab: bool) -> dict:
+    """MAJOR summary from a student's per-category weighted sums."""
+    weighted_raw = weighted_raw or {}
+    if has_lab:
+        # MAJOR with LAB: Apply 60% LECTURE + 40% LABORATORY, then transform
+        # Get weighted percentages (sum of all reqpct values per category)
+        lecture_sum = weighted_raw.get("LECTURE", 0.0)
+        laboratory_sum = weighted_raw.get("LABORATORY", 0.0)
+
+        # Apply 60% to LECTURE and 40% to LABORATORY (matching frontend)
+        lecture_weighted = lecture_sum * 0.6
+        laboratory_weighted = laboratory_sum * 0.4
+
+        # Add weighted values to get initial grade (RAW GRADE in UI)
+        initial_grade = round(lecture_weighted + laboratory_weighted, 2)
+
+        # Apply transformation: initial_grade * 0.625 + 37.5 (TOTAL GRADE in UI)
+        final_grade = round((initial_grade * 0.625 + 37.5), 2)
+
+        return {
+            "lecture": round(lecture_weighted, 2),
+            "laboratory": round(laboratory_weighted, 2),
+            "initial_grade": initial_grade,
+            "final_grade": final_grade,
+            "has_laboratory": True
+        }
+
+    # MAJOR without LAB: Use 100% Lecture with transformation
+    lecture_raw = weighted_raw.get("LECTURE", 0.0)
+
+    # Apply transmutation for MAJOR without lab: initial_grade * 0.625 + 37.5
+    final_grade = round(lecture_raw * 0.625 + 37.5, 2)
+
+    return {
+        "lecture": round(lecture_raw, 2),
+        "final_grade": final_grade,
+        "has_laboratory": False
+    }
+
+
+def _has_laboratory(groups) -> bool:
+    return any('LABORATORY' in key.upper() for key in (groups or {}).keys())
+
+
 def compute_major_grade(groups: dict, students: list) -> dict:
     """Return MAJOR-class group metrics.
     
@@ -112,119 +166,63 @@ def compute_major_grade(groups: dict, students: list) -> dict:
     results, aggregates = _compute_group_metrics(groups, students)
     
     # Check if any laboratory groups exist
-    has_lab = any('LABORATORY' in key.upper() for key in (groups or {}).keys())
-    
-    if has_lab:
-        # MAJOR with LAB: Apply 60% LECTURE + 40% LABORATORY, then transform
-        for sid, agg in aggregates.items():
-            weighted_raw = agg.get("category_weighted_raw", {}) or {}
-            
-            # Get weighted percentages (sum of all reqpct values per category)
-            lecture_sum = weighted_raw.get("LECTURE", 0.0)
-            laboratory_sum = weighted_raw.get("LABORATORY", 0.0)
-            
-            # Apply 60% to LECTURE and 40% to LABORATORY (matching frontend)
-            lecture_weighted = lecture_sum * 0.6
-            laboratory_weighted = laboratory_sum * 0.4
-            
-            # Add weighted values to get initial grade (RAW GRADE in UI)
-            initial_grade = round(lecture_weighted + laboratory_weighted, 2)
-            
-            # Apply transformation: initial_grade * 0.625 + 37.5 (TOTAL GRADE in UI)
-            final_grade = round((initial_grade * 0.625 + 37.5), 2)
-            
-            # Add summary to results
-            if sid not in results:
-                results[sid] = {}
-            results[sid]["_summary"] = {
-                "lecture": round(lecture_weighted, 2),
-                "laboratory": round(laboratory_weighted, 2),
-                "initial_grade": initial_grade,
-                "final_grade": final_grade,
-                "has_laboratory": True
-            }
-    else:
-        # MAJOR without LAB: Use 100% Lecture with transformation
-        for sid, agg in aggregates.items():
-            weighted_raw = agg.get("category_weighted_raw", {}) or {}
-            lecture_raw = weighted_raw.get("LECTURE", 0.0)
-            
-            # Apply transmutation for MAJOR without lab: initial_grade * 0.625 + 37.5
-            final_grade = round(lecture_raw * 0.625 + 37.5, 2)
-            
-            # Add summary to results
-            if sid not in results:
-                results[sid] = {}
-            results[sid]["_summary"] = {
-                "lecture": round(lecture_raw, 2),
-                "final_grade": final_grade,
-                "has_laboratory": False
-            }
+    has_lab = _has_laboratory(groups)
+
+    for sid, agg in aggregates.items():
+        # Add summary to results
+        if sid not in results:
+            results[sid] = {}
+        results[sid]["_summary"] = _major_summary(
+            agg.get("category_weighted_raw", {}), has_lab
+        )
     
     return results
 
 
 def _map_minor_equivalent(score: float) -> str:
     """
-    Translate a MINOR final grade into the ISU transmuted equivalent scale.
-    Based on Isabela State University official grading system:
-    - 1.0  = 98-100
-    - 1.25 = 95-97
-    - 1.5  = 92-94
-    - 1.75 = 89-91
-    - 2.0  = 86-88
-    - 2.25 = 83-85
-    - 2.5  = 80-82
-    - 2.75 = 77-79
-    - 3.0  = 75-76
-    - 5.0  = Below 75 (Failure)
+    Translate a MINOR final grade into the ISU transmuted equivalent scale
+    (MINOR scale in utils.grading_scales: 98+ 1.0 ... 75+ 3.0, below 75 5.0).
     """
-    if score >= 98:
-        return "1.0"
-    if score >= 95:
-        return "1.25"
-    if score >= 92:
-        return "1.50"
-    if score >= 89:
-        return "1.75"
-    if score >= 86:
-        return "2.00"
-    if score >= 83:
-        return "2.25"
-    if score >= 80:
-        return "2.50"
-    if score >= 77:
-        return "2.75"
-    if score >= 75:
-        return "3.0"
-    return "5.0"
+    return get_scale("MINOR").equivalent(score)
+
+
+def _minor_summary(weighted_raw: dict) -> dict:
+    """MINOR summary (without equivalent) from per-category weighted sums."""
+    lecture_raw = (weighted_raw or {}).get("LECTURE", 0.0)
+
+    # MINOR uses LECTURE only (no laboratory component)
+    # === TOTAL RAW GRADES COMPUTATION ===
+    initial_grade_raw = lecture_raw
+
+    # === TOTAL GRADE COMPUTATION ===
+    # Apply transmutation: 50% of lecture score + base 50
+    final_grade = round(initial_grade_raw * 0.5 + 50, 2)
+
+    return {
+        "lecture": round(lecture_raw, 2),
+        "initial_grade": round(initial_grade_raw, 2),
+        "final_grade": final_grade,
+        "has_laboratory": False
+    }
 
 
 def compute_minor_grade(groups: dict, students: list) -> tuple[dict, dict]:
     """Produce MINOR-class group metrics (LECTURE only, no laboratory)."""
     results, aggregates = _compute_group_metrics(groups, students)
-    summaries = {}
+    summaries = {
+        sid: _minor_summary(agg.get("category_weighted_raw", {}))
+        for sid, agg in aggregates.items()
+    }
 
-    for sid, agg in aggregates.items():
-        weighted_raw = agg.get("category_weighted_raw", {}) or {}
-        lecture_raw = weighted_raw.get("LECTURE", 0.0)
-        
-        # MINOR uses LECTURE only (no laboratory component)
-        # === TOTAL RAW GRADES COMPUTATION ===
-        initial_grade_raw = lecture_raw
-        
-        # === TOTAL GRADE COMPUTATION ===
-        # Apply transmutation: 50% of lecture score + base 50
-        final_grade = round(initial_grade_raw * 0.5 + 50, 2)
-        
-        # === EQUIVALENTS COMPUTATION ===
-        summaries[sid] = {
-            "lecture": round(lecture_raw, 2),
-            "initial_grade": round(initial_grade_raw, 2),
-            "final_grade": final_grade,
-            "equivalent": _map_minor_equivalent(final_grade),
-            "has_laboratory": False
-        }
+    # === EQUIVALENTS COMPUTATION ===
+    # One lookup for the whole class instead of a per-student if-chain.
+    sids = list(summaries)
+    equivalents = get_scale("MINOR").equivalents(
+        [summaries[sid]["final_grade"] for sid in sids]
+    )
+    for sid, equivalent in zip(sids, equivalents):
+        summaries[sid]["equivalent"] = equivalent
 
     return results, summaries
 
@@ -5,6 +5,7 @@ import os
 import sys
 from flask import (
     Blueprint,
+    current_app,
     render_template,
     request,
     redirect,
@@ -243,13 +244,15 @@ def terminal_logs():
     if session.get("role") != "admin" and not os.environ.get("FLASK_DEBUG"):
         return jsonify({"error": "Access denied"}), 403
 
-    # Default log file path
-    log_path = os.path.join(os.getcwd(), "app.log")
+    # The file app.py logs to (LOG_FILE, default app.log next to app.py)
+    log_path = current_app.config.get("LOG_FILE") or os.path.join(
+        current_app.root_path, "app.log"
+    )
     max_bytes = 100 * 1024  # read up to last 100KB
 
     try:
         if not os.path.exists(log_path):
-            return jsonify({"log": "(log file not found: app.log)"})
+            return jsonify({"log": f"(log file not found: {os.path.basename(log_path)})"})
 
         size = os.path.getsize(log_path)
         start = max(0, size - max_bytes)
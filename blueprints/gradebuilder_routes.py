@@ -6,8 +6,10 @@ from typing import Optional, Tuple
 from flask import Blueprint, jsonify, request, session
 from flask_wtf.csrf import generate_csrf
 
+from utils import class_versions, grade_store, structure_diff
 from utils.db_conn import get_db_connection
 from utils.auth_utils import login_required
+from utils.live import emit_live_version_update, invalidate_class_caches
 
 logger = logging.getLogger(__name__)
 
@@ -229,6 +231,19 @@ def gb_save():
             row = cursor.fetchone()
             next_version = (row["v"] if isinstance(row, dict) else row[0]) or 1
 
+            # the active version's normalized rows move to the new version
+            cursor.execute(
+                """
+                SELECT id FROM grade_structures
+                WHERE class_id = %s AND is_active = 1
+                ORDER BY version DESC, id DESC
+                LIMIT 1
+                """,
+                (class_id,),
+            )
+            prev = cursor.fetchone()
+            prev_id = (prev["id"] if isinstance(prev, dict) else prev[0]) if prev else None
+
             # optionally deactivate previous active structure
             try:
                 cursor.execute(
@@ -261,62 +276,38 @@ def gb_save():
                 r2 = cursor.fetchone()
                 new_id = r2["id"] if isinstance(r2, dict) else (r2[0] if r2 else None)
 
-            # --- Normalize and insert categories/subcategories ---
-            cursor.execute(
-                "SELECT id FROM grade_categories WHERE structure_id = %s", (new_id,)
-            )
-            cat_rows = cursor.fetchall() or []
-            cat_ids = [r["id"] if isinstance(r, dict) else r[0] for r in cat_rows]
-            if cat_ids:
-                placeholders = ",".join(["%s"] * len(cat_ids))
-                cursor.execute(
-                    f"DELETE FROM grade_subcategories WHERE category_id IN ({placeholders})",
-                    tuple(cat_ids),
-                )
+            # --- Apply the structure as a diff so assessment ids (and their
+            # student_scores) survive the new version ---
+            if prev_id:
                 cursor.execute(
-                    "DELETE FROM grade_categories WHERE structure_id = %s", (new_id,)
+                    "UPDATE grade_categories SET structure_id = %s WHERE structure_id = %s",
+                    (new_id, prev_id),
                 )
-
-            struct = structure_obj
-            pos_cat = 1
-            for cat_key in ("LECTURE", "LABORATORY"):
-                subs = struct.get(cat_key) or []
-                if subs:
-                    cat_weight = 0.0
-                    for s in subs:
-                        try:
-                            cat_weight += float(s.get("weight") or 0)
-                        except Exception:
-                            pass
-                    cursor.execute(
-                        """
-                        INSERT INTO grade_categories (structure_id, name, weight, position, description)
-                        VALUES (%s, %s, %s, %s, NULL)
-                        """,
-                        (new_id, cat_key, cat_weight, pos_cat),
-                    )
-                    cat_id = cursor.lastrowid
-                    pos_sub = 1
-                    for s in subs:
-                        sub_name = s.get("name")
-                        sub_weight = s.get("weight") or 0
-                        cursor.execute(
-                            """
-                            INSERT INTO grade_subcategories (category_id, name, weight, max_score, passing_score, position, description)
-                            VALUES (%s, %s, %s, %s, NULL, %s, NULL)
-                            """,
-                            (cat_id, sub_name, float(sub_weight), 100.0, pos_sub),
-                        )
-                        pos_sub += 1
-                    pos_cat += 1
+            plan = structure_diff.diff(
+                structure_diff.load(cursor, new_id), structure_obj
+            )
+            structure_diff.apply(cursor, new_id, plan)
+            class_versions.bump(cursor, class_id)
 
             # Commit transaction
             try:
                 get_db_connection().commit()
             except Exception:
                 logger.warning("Commit failed after save; attempting to continue")
+        grade_store.invalidate(class_id)
+        emit_live_version_update(class_id)
 
-        return jsonify({"message": "saved", "id": new_id, "version": next_version}), 200
+        return (
+            jsonify(
+                {
+                    "message": "saved",
+                    "id": new_id,
+                    "version": next_version,
+                    "changes": plan["summary"],
+                }
+            ),
+            200,
+        )
     except Exception as e:
         logger.error(f"Failed to save grade structure: {str(e)}")
         return jsonify({"error": "failed_to_save"}), 500
@@ -393,6 +384,7 @@ def gb_delete(structure_id: int):
             cursor.execute(
                 "DELETE FROM grade_structures WHERE id = %s", (structure_id,)
             )
+            class_versions.bump(cursor, class_id)
 
             message = "deleted"
             # Optional: if we deleted the active structure, there may now be no active version
@@ -402,6 +394,7 @@ def gb_delete(structure_id: int):
             get_db_connection().commit()
         except Exception:
             logger.warning("Commit failed after delete; attempting to continue")
+        invalidate_class_caches(class_id)
         return jsonify({"message": message})
     except Exception as e:
         logger.error(f"Failed to delete structure {structure_id}: {str(e)}")
@@ -428,13 +421,14 @@ def gb_update(structure_id: int):
         # resolve class and ownership
         with get_db_connection().cursor() as cursor:
             cursor.execute(
-                "SELECT class_id FROM grade_structures WHERE id = %s",
+                "SELECT class_id, is_active FROM grade_structures WHERE id = %s",
                 (structure_id,),
             )
             row = cursor.fetchone()
             if not row:
                 return jsonify({"error": "not_found"}), 404
             class_id = row["class_id"] if isinstance(row, dict) else row[0]
+            is_active = row["is_active"] if isinstance(row, dict) else row[1]
             if not _instructor_owns_class(class_id, instructor_id):
                 return jsonify({"error": "access_denied"}), 403
 
@@ -455,7 +449,7 @@ def gb_update(structure_id: int):
 
         structure_json_str = json.dumps(structure_obj)
 
-        # update in place and normalize categories/subcategories
+        # update in place and apply the structure as a diff against its rows
         with get_db_connection().cursor() as cursor:
             cursor.execute(
                 """
@@ -467,64 +461,27 @@ def gb_update(structure_id: int):
                 """,
                 (structure_name, structure_json_str, structure_id),
             )
-
-            # Remove ALL previous categories/subcategories for this structure
-            cursor.execute(
-                "SELECT id FROM grade_categories WHERE structure_id = %s",
-                (structure_id,),
-            )
-            cat_rows = cursor.fetchall() or []
-            cat_ids = [r["id"] if isinstance(r, dict) else r[0] for r in cat_rows]
-            if cat_ids:
-                placeholders = ",".join(["%s"] * len(cat_ids))
-                cursor.execute(
-                    f"DELETE FROM grade_subcategories WHERE category_id IN ({placeholders})",
-                    tuple(cat_ids),
-                )
-            cursor.execute(
-                "DELETE FROM grade_categories WHERE structure_id = %s", (structure_id,)
+            plan = structure_diff.diff(
+                structure_diff.load(cursor, structure_id), structure_obj
             )
-
-            # Parse the structure JSON and re-insert ALL categories/subcategories
-            struct = structure_obj
-            pos_cat = 1
-            for cat_key in ("LABORATORY", "LECTURE"):
-                subs = struct.get(cat_key)
-                # Always insert the category, even if subs is empty or None
-                cat_weight = 0.0
-                for s in subs or []:
-                    try:
-                        cat_weight += float(s.get("weight") or 0)
-                    except Exception:
-                        pass
-                cursor.execute(
-                    """
-                    INSERT INTO grade_categories (structure_id, name, weight, position, description)
-                    VALUES (%s, %s, %s, %s, NULL)
-                    """,
-                    (structure_id, cat_key, cat_weight, pos_cat),
-                )
-                cat_id = cursor.lastrowid
-                pos_sub = 1
-                for s in subs or []:
-                    sub_name = s.get("name")
-                    sub_weight = s.get("weight") or 0
-                    cursor.execute(
-                        """
-                        INSERT INTO grade_subcategories (category_id, name, weight, max_score, passing_score, position, description)
-                        VALUES (%s, %s, %s, %s, NULL, %s, NULL)
-                        """,
-                        (cat_id, sub_name, float(sub_weight), 100.0, pos_sub),
-                    )
-                    pos_sub += 1
-                pos_cat += 1
+            structure_diff.apply(cursor, structure_id, plan)
+            class_versions.bump(cursor, class_id)
 
         try:
             get_db_connection().commit()
         except Exception:
             logger.warning("Commit failed after update; attempting to continue")
+        if is_active:
+            if structure_diff.has_changes(plan):
+                grade_store.invalidate(class_id)
+            emit_live_version_update(class_id)
 
-        return jsonify({"message": "updated", "id": structure_id}), 200
+        return (
+            jsonify(
+                {"message": "updated", "id": structure_id, "changes": plan["summary"]}
+            ),
+            200,
+        )
     except Exception as e:
         logger.error(f"Failed to update grade structure {structure_id}: {str(e)}")
         return jsonify({"error": "failed_to_update"}), 500
@@ -13,12 +13,24 @@ from flask import (
     session,
     jsonify,
 )
+from utils import (
+    class_summaries,
+    class_versions,
+    grade_store,
+    gradebook_window,
+    snapshot_store,
+    student_grade_views,
+)
 from utils.auth_utils import login_required
 from utils.db_conn import get_db_connection
 from utils.email_service import email_service
+from utils.grading_scales import get_scale
+from utils.score_buffer import flush_class, get_score_buffer
+from utils.http_cache import class_version_etag
 from utils.live import (
     emit_live_version_update,
     get_cached_class_live_version,
+    invalidate_class_caches,
     _cache_get,
     _cache_put,
     _grouped_cache_get,
@@ -43,6 +55,10 @@ logger = logging.getLogger(__name__)
 
 instructor_bp = Blueprint("instructor", __name__)
 
+# Released equivalents use the MAJOR scale labels for every class type
+# (MINOR summaries keep their own labels in grade_payload.computed).
+RELEASE_SCALE = "MAJOR"
+
 
 def abbreviate_assessment(name):
     """Convert assessment name to abbreviation for remarks."""
@@ -108,10 +124,17 @@ def api_update_assessment_max_score(assessment_id):
                     "UPDATE grade_assessments SET max_score = %s WHERE id = %s",
                     (max_score, assessment_id),
                 )
+                version = class_versions.bump(cursor, class_id)
             conn.commit()
         except Exception:
             conn.rollback()
             raise
+        # Adjusts the group's max total in place; summaries re-derive lazily.
+        grade_store.apply_max_score(int(class_id), assessment_id, max_score, version)
+        try:
+            emit_live_version_update(int(class_id))
+        except Exception:
+            pass
         return (
             jsonify(
                 {
@@ -168,102 +191,6 @@ def _require_instructor():
 def _instructor_owns_class(class_id: int, user_id: int) -> bool:
     try:
         with get_db_connection().cursor() as cursor:
-            # Try to return the latest draft snapshot (normalized) if available
-            try:
-                cursor.execute(
-                    "SELECT snapshot_json, version, created_at FROM grade_snapshots "
-                    "WHERE class_id = %s AND status = 'draft' ORDER BY version DESC LIMIT 1",
-                    (class_id,),
-                )
-                sr = cursor.fetchone()
-                if sr:
-                    raw = sr.get("snapshot_json")
-                    normalized = _normalize_snapshot(raw)
-                    # fetch student metadata for display
-                    sids = [
-                        s.get("student_id")
-                        for s in normalized.get("students", [])
-                        if s.get("student_id")
-                    ]
-                    rows = {}
-                    if sids:
-                        placeholders = ",".join(["%s"] * len(sids))
-                        params = [class_id] + sids
-                        cursor.execute(
-                            f"""
-                            SELECT s.id AS student_id,
-                                   u.school_id,
-                                   pi.first_name,
-                                   pi.last_name,
-                                   pi.middle_name,
-                                   rg.status,
-                                   rg.released_at
-                            FROM students s
-                            JOIN users u ON s.user_id = u.id
-                            LEFT JOIN personal_info pi ON s.personal_info_id = pi.id
-                            LEFT JOIN released_grades rg
-                                ON rg.student_id = s.id AND rg.class_id = %s
-                            WHERE s.id IN ({placeholders})
-                            """,
-                            params,
-                        )
-                        rows = {r["student_id"]: r for r in (cursor.fetchall() or [])}
-
-                    out_students = []
-                    for s in normalized.get("students", []):
-                        sid = s.get("student_id")
-                        meta = rows.get(sid) if rows else None
-                        if meta:
-                            fn = meta.get("first_name") or ""
-                            ln = meta.get("last_name") or ""
-                            mn = meta.get("middle_name") or ""
-                            name = (
-                                f"{ln}, {fn} {mn}".strip()
-                                if fn and ln
-                                else meta.get("school_id") or f"Student {sid}"
-                            )
-                            status_val = (meta.get("status") or "").lower()
-                            is_released = status_val == "released"
-                            released_raw = meta.get("released_at")
-                            if is_released and isinstance(released_raw, datetime):
-                                released_date = released_raw.strftime("%Y-%m-%d")
-                            elif is_released and released_raw:
-                                released_date = str(released_raw)
-                            else:
-                                released_date = None
-                        else:
-                            name = None
-                            is_released = False
-                            released_date = None
-
-                        out_students.append(
-                            {
-                                "id": sid,
-                                "name": name,
-                                "school_id": meta.get("school_id") if meta else None,
-                                "final_grade": s.get("final_grade"),
-                                "equivalent": s.get("equivalent"),
-                                "is_released": is_released,
-                                "released_date": released_date,
-                                "scores": s.get("scores", []),
-                            }
-                        )
-
-                    return jsonify(
-                        {
-                            "class_id": class_id,
-                            "snapshot": {
-                                "version": sr.get("version"),
-                                "created_at": sr.get("created_at"),
-                                "assessments": normalized.get("assessments"),
-                                "students": out_students,
-                            },
-                            "total_students": len(out_students),
-                        }
-                    )
-            except Exception:
-                # If snapshot path fails, fall back to the enrolled-students path below
-                pass
             cursor.execute("SELECT id FROM instructors WHERE user_id = %s", (user_id,))
             instr = cursor.fetchone()
             if not instr:
@@ -420,8 +347,10 @@ def update_student_dropped_status(class_id, student_id):
                         """,
                         (class_id, student_id),
                     )
+                class_versions.bump(cursor, class_id)
 
             conn.commit()
+            emit_live_version_update(class_id)
             return jsonify({"success": True, "is_dropped": is_dropped}), 200
         except Exception as e:
             conn.rollback()
@@ -535,6 +464,7 @@ def api_create_assessment_simple():
                     (subcategory_id, name, None, max_score, next_pos),
                 )
                 new_id = getattr(cursor, "lastrowid", None)
+                class_versions.bump(cursor, class_id)
             conn.commit()
         except Exception:
             conn.rollback()
@@ -583,19 +513,14 @@ def get_instructor_classes():
             if not instructor:
                 return jsonify({"error": "Instructor profile not found"}), 404
 
-            cursor.execute(
-                "SELECT * FROM classes WHERE instructor_id = %s", (instructor["id"],)
+            # Member counts and statuses come from one grouped query
+            # (utils/class_summaries.py), cached per instructor.
+            classes = sorted(
+                class_summaries.get(cursor, instructor["id"]), key=lambda c: c["id"]
             )
-            classes = cursor.fetchall()
 
             classes_data = []
             for cls in classes:
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM student_classes WHERE class_id = %s",
-                    (cls["id"],),
-                )
-                member_count = cursor.fetchone()["count"]
-
                 formatted_year = cls["year"][-2:] if cls["year"] else "XX"
                 formatted_semester = (
                     "1"
@@ -635,7 +560,13 @@ def get_instructor_classes():
                         "class_id": computed_class_id,
                         "class_code": cls["class_code"],
                         "join_code": cls["join_code"],
-                        "member_count": member_count,
+                        "member_count": cls["member_count"],
+                        "approved_count": cls["approved_count"],
+                        "pending_count": cls["pending_count"],
+                        "dropped_count": cls["dropped_count"],
+                        "has_structure": cls["has_structure"],
+                        "released_count": cls["released_count"],
+                        "release_status": cls["release_status"],
                         "created_at": (
                             cls["created_at"].isoformat() if cls["created_at"] else None
                         ),
@@ -760,6 +691,7 @@ def create_class():
 
                 class_id = cursor.lastrowid
             conn.commit()
+            class_summaries.invalidate_instructor(instructor["id"])
 
             # Build returned class object after successful commit
             year_str = str(data["year"]) if data["year"] else ""
@@ -915,10 +847,12 @@ def update_class(class_id):
                         class_id,
                     ),
                 )
+                class_versions.bump(cursor, class_id)
             conn.commit()
         except Exception:
             conn.rollback()
             raise
+        invalidate_class_caches(class_id)
 
         # Build returned class object
         year_str = str(data["year"]) if data["year"] else ""
@@ -1036,6 +970,7 @@ def delete_class(class_id):
                 cursor.execute("DELETE FROM classes WHERE id = %s", (class_id,))
 
             conn.commit()
+            invalidate_class_caches(class_id)
 
             logger.info(
                 f"Instructor {session.get('school_id')} deleted class {class_id}"
@@ -1327,20 +1262,10 @@ def release_grades():
                 flash("Instructor profile not found.", "error")
                 return redirect(url_for("dashboard.instructor_dashboard"))
 
-            cursor.execute(
-                "SELECT * FROM classes WHERE instructor_id = %s ORDER BY created_at DESC",
-                (instructor["id"],),
-            )
-            classes = cursor.fetchall()
+            classes = class_summaries.get(cursor, instructor["id"])
 
             instructor_classes = []
             for cls in classes:
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM student_classes WHERE class_id = %s",
-                    (cls["id"],),
-                )
-                member_count = cursor.fetchone()["count"]
-
                 formatted_year = cls["year"][-2:] if cls["year"] else "XX"
                 formatted_semester = (
                     "1"
@@ -1372,7 +1297,9 @@ def release_grades():
                         "semester": cls["semester"],
                         "class_code": cls["class_code"],
                         "join_code": cls["join_code"],
-                        "member_count": member_count,
+                        "member_count": cls["member_count"],
+                        "released_count": cls["released_count"],
+                        "release_status": cls["release_status"],
                     }
                 )
 
@@ -1489,6 +1416,7 @@ def _normalize_snapshot(snapshot):
     endpoint="api_get_release_grades",
 )
 @login_required
+@class_version_etag()
 def api_get_release_grades(class_id):
     """Get grades data for release management - compute LIVE from current grade input."""
 
@@ -1513,59 +1441,9 @@ def api_get_release_grades(class_id):
                 else class_row[0]
             ) or "MAJOR"
 
-            # Get all assessment columns for the grade structure of this class
-            cursor.execute(
-                """
-                SELECT 
-                    ga.id,
-                    ga.max_score,
-                    ga.subcategory_id,
-                    gc.name as category_name,
-                    gs_sub.name as subcategory_name,
-                    gs_sub.weight
-                FROM grade_assessments ga
-                JOIN grade_subcategories gs_sub ON ga.subcategory_id = gs_sub.id
-                JOIN grade_categories gc ON gs_sub.category_id = gc.id
-                JOIN grade_structures gs ON gc.structure_id = gs.id
-                WHERE gs.class_id = %s
-                ORDER BY gc.name, gs_sub.name, ga.position
-                """,
-                (class_id,),
-            )
-
-            assessment_rows = cursor.fetchall() or []
-
-            # Build groups structure
-            groups = {}
-            for row in assessment_rows:
-                assessment_id = row.get("id") if isinstance(row, dict) else row[0]
-                max_score = float(
-                    row.get("max_score") if isinstance(row, dict) else row[1]
-                )
-                category = str(
-                    row.get("category_name") if isinstance(row, dict) else row[3] or ""
-                ).upper()
-                subcategory = str(
-                    row.get("subcategory_name")
-                    if isinstance(row, dict)
-                    else row[4] or ""
-                )
-                weight = float(
-                    (row.get("weight") if isinstance(row, dict) else row[5]) or 0
-                )
-
-                group_key = f"{category}::{subcategory}"
-                if group_key not in groups:
-                    groups[group_key] = {
-                        "ids": [],
-                        "maxes": [],
-                        "maxTotal": 0.0,
-                        "subweight": weight,
-                    }
-
-                groups[group_key]["ids"].append(int(assessment_id))
-                groups[group_key]["maxes"].append(max_score)
-                groups[group_key]["maxTotal"] += max_score
+            # Group totals and summaries come from the incremental grade
+            # store, which only reloads when the class changed elsewhere.
+            grades = grade_store.get_class(class_id, cursor)
 
             # Get all students in this class
             cursor.execute(
@@ -1593,74 +1471,17 @@ def api_get_release_grades(class_id):
 
             student_rows = cursor.fetchall() or []
 
-            # Build students array with scores
-            students_for_compute = []
-            for row in student_rows:
-                student_id = row.get("student_id") if isinstance(row, dict) else row[0]
-
-                # Get scores for this student
-                cursor.execute(
-                    """
-                    SELECT assessment_id, score
-                    FROM student_scores
-                    WHERE student_id = %s 
-                    AND assessment_id IN (
-                        SELECT ga.id 
-                        FROM grade_assessments ga
-                        JOIN grade_subcategories gs_sub ON ga.subcategory_id = gs_sub.id
-                        JOIN grade_categories gc ON gs_sub.category_id = gc.id
-                        JOIN grade_structures gs ON gc.structure_id = gs.id
-                        WHERE gs.class_id = %s
-                    )
-                    """,
-                    (student_id, class_id),
-                )
-
-                score_rows = cursor.fetchall() or []
-                scores = {}
-                for score_row in score_rows:
-                    aid = int(
-                        score_row.get("assessment_id")
-                        if isinstance(score_row, dict)
-                        else score_row[0]
-                    )
-                    score = (
-                        score_row.get("score")
-                        if isinstance(score_row, dict)
-                        else score_row[1]
-                    )
-                    scores[str(aid)] = float(score) if score is not None else None
-
-                students_for_compute.append(
-                    {"student_id": int(student_id), "scores": scores}
-                )
-
-            # Call the same compute logic used by grade input
-            from blueprints.compute_routes import (
-                compute_major_grade,
-                compute_minor_grade,
-            )
-
-            logger.info(
-                f"Computing grades for class {class_id}: {len(students_for_compute)} students, {len(groups)} groups"
-            )
-            logger.info(f"Groups: {list(groups.keys())}")
-            logger.info(f"Class type: {class_type}")
+            release_scale = get_scale(RELEASE_SCALE)
 
-            # Compute grades based on class type
-            summaries = {}
-            if class_type.upper() == "MINOR":
-                results, summaries = compute_minor_grade(groups, students_for_compute)
-            else:
-                # Both MAJOR and MAJOR_LAB use compute_major_grade
-                results = compute_major_grade(groups, students_for_compute)
-                # Extract summaries from results for consistent access
-                for sid, data in results.items():
-                    if "_summary" in data:
-                        summaries[sid] = data["_summary"]
+            computed = {}
+            with grades.lock:
+                for row in student_rows:
+                    sid = int(row.get("student_id") if isinstance(row, dict) else row[0])
+                    computed[sid] = (grades.summary(sid), grades.missing_groups(sid))
 
             logger.info(
-                f"Computation complete. Results for {len(results)} students, {len(summaries)} summaries"
+                f"Grades for class {class_id} ({class_type}): {len(computed)} students, "
+                f"{len(grades.groups)} groups"
             )
 
             # Build response with student info and computed grades
@@ -1723,10 +1544,7 @@ def api_get_release_grades(class_id):
                     )
                     continue
 
-                # Get computed grade from summaries (handle both int and string keys)
-                summary = summaries.get(student_id) or summaries.get(
-                    str(student_id), {}
-                )
+                summary, missing_groups = computed.get(int(student_id), ({}, []))
 
                 # Get the TOTAL GRADE (final_grade from summary)
                 final_grade = summary.get("final_grade")
@@ -1736,57 +1554,18 @@ def api_get_release_grades(class_id):
                     except:
                         final_grade = None
 
-                # Check if student has missing scores in ANY assessment category
-                student_scores = {}
-                for student_data in students_for_compute:
-                    if student_data.get("student_id") == student_id:
-                        student_scores = student_data.get("scores", {})
-                        break
-
-                # Check for missing/blank scores in ANY subcategory - collect ALL missing items
-                missing_subcategories = []
-                for group_key, group_data in groups.items():
-                    # Extract subcategory name from group_key (format: "CATEGORY::Subcategory")
-                    subcategory_name = (
-                        group_key.split("::")[-1] if "::" in group_key else group_key
-                    )
-
-                    # Check if any assessment in this subcategory is missing
-                    has_missing = False
-                    for assessment_id in group_data.get("ids", []):
-                        score_value = student_scores.get(str(assessment_id))
-                        if score_value is None or str(score_value).strip() == "":
-                            has_missing = True
-                            break
-
-                    if has_missing:
-                        missing_subcategories.append(subcategory_name)
+                # Subcategories with a missing/blank score (format: "CATEGORY::Subcategory")
+                missing_subcategories = [
+                    group_key.split("::")[-1] if "::" in group_key else group_key
+                    for group_key in missing_groups
+                ]
 
                 # Calculate equivalent (letter grade) from final grade using ISU Grading System
                 # If student has incomplete requirements, set equivalent to INC
                 if missing_subcategories:
                     equivalent = "INC"
                 elif final_grade is not None:
-                    if final_grade >= 98:
-                        equivalent = "1.0"
-                    elif final_grade >= 95:
-                        equivalent = "1.25"
-                    elif final_grade >= 92:
-                        equivalent = "1.5"
-                    elif final_grade >= 89:
-                        equivalent = "1.75"
-                    elif final_grade >= 86:
-                        equivalent = "2.0"
-                    elif final_grade >= 83:
-                        equivalent = "2.25"
-                    elif final_grade >= 80:
-                        equivalent = "2.5"
-                    elif final_grade >= 77:
-                        equivalent = "2.75"
-                    elif final_grade >= 75:
-                        equivalent = "3.0"
-                    else:
-                        equivalent = "5.0"
+                    equivalent = release_scale.equivalent(final_grade)
                 else:
                     equivalent = "N/A"
 
@@ -1872,17 +1651,49 @@ def _compose_student_display_name(first_name, last_name, middle_name, fallback):
     return fallback
 
 
-def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released_by):
-    logger.info(
-        f"_finalize_snapshot_and_store_release called: class_id={class_id}, student_ids={student_ids}, released_by={released_by}"
-    )
+def _remarks_for(equivalent, missing_subcategories):
+    """Remarks column for a released grade (missing items take precedence)."""
+    remarks = "PASSED"
+    if missing_subcategories:
+        # Create comma-separated list of abbreviations
+        abbreviations = [
+            abbreviate_assessment(subcat) for subcat in missing_subcategories
+        ]
+        remarks = ", ".join(abbreviations)
+    elif equivalent == "INC":
+        remarks = "INCOMPLETE"
+    elif equivalent == "DRP":
+        remarks = "DROPPED"
+    elif equivalent == "5.0":
+        remarks = "FAILED"
+    elif equivalent and equivalent != "N/A":
+        try:
+            eq_num = float(equivalent)
+            if eq_num > 3.0:
+                remarks = "FAILED"
+            else:
+                remarks = "PASSED"
+        except:
+            pass
+    return remarks
+
+
+def compute_release_rows(cursor, class_id, student_ids):
+    """Compute the released_grades values for `student_ids` of a class.
+
+    Shared by the release endpoints and the offline recalculation CLI
+    (recalculate_grades.py) so both always produce identical rows. Reads only;
+    the caller decides what to write.
 
+    Returns {"success": True, "rows": [...], "summaries": {...},
+    "grading_scale": "MAJOR@v1"} where each row has student_id, school_id,
+    name, final_grade, equivalent, remarks, overall_percentage, payload (dict)
+    and dropped, or {"success": False, "error": ...}.
+    """
     ids = _coerce_student_ids(student_ids)
     if not ids:
         return {"success": False, "error": "no_valid_student_ids"}
 
-    logger.info(f"Coerced student IDs: {ids}")
-
     # Get class type for correct computation
     cursor.execute("SELECT class_type FROM classes WHERE id = %s", (class_id,))
     class_row = cursor.fetchone()
@@ -1941,8 +1752,6 @@ def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released
         groups[group_key]["maxes"].append(max_score)
         groups[group_key]["maxTotal"] += max_score
 
-    # Build students array with scores for computation
-    students_for_compute = []
     placeholders = ",".join(["%s"] * len(ids))
 
     # Get student profiles
@@ -1974,39 +1783,35 @@ def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released
             ),
         }
 
-    # Get scores for each student
-    for student_id in ids:
-        cursor.execute(
-            """
-            SELECT assessment_id, score
-            FROM student_scores
-            WHERE student_id = %s 
-            AND assessment_id IN (
-                SELECT ga.id 
-                FROM grade_assessments ga
-                JOIN grade_subcategories gs_sub ON ga.subcategory_id = gs_sub.id
-                JOIN grade_categories gc ON gs_sub.category_id = gc.id
-                JOIN grade_structures gs ON gc.structure_id = gs.id
-                WHERE gs.class_id = %s
-            )
-            """,
-            (student_id, class_id),
+    # Get scores for all students in one pass
+    cursor.execute(
+        f"""
+        SELECT student_id, assessment_id, score
+        FROM student_scores
+        WHERE student_id IN ({placeholders})
+        AND assessment_id IN (
+            SELECT ga.id 
+            FROM grade_assessments ga
+            JOIN grade_subcategories gs_sub ON ga.subcategory_id = gs_sub.id
+            JOIN grade_categories gc ON gs_sub.category_id = gc.id
+            JOIN grade_structures gs ON gc.structure_id = gs.id
+            WHERE gs.class_id = %s
+        )
+        """,
+        [*ids, class_id],
+    )
+    scores_by_student = {sid: {} for sid in ids}
+    for score_row in cursor.fetchall() or []:
+        sid = int(score_row.get("student_id"))
+        score = score_row.get("score")
+        scores_by_student.setdefault(sid, {})[str(int(score_row.get("assessment_id")))] = (
+            float(score) if score is not None else None
         )
 
-        score_rows = cursor.fetchall() or []
-        scores = {}
-        for score_row in score_rows:
-            aid = int(
-                score_row.get("assessment_id")
-                if isinstance(score_row, dict)
-                else score_row[0]
-            )
-            score = (
-                score_row.get("score") if isinstance(score_row, dict) else score_row[1]
-            )
-            scores[str(aid)] = float(score) if score is not None else None
-
-        students_for_compute.append({"student_id": int(student_id), "scores": scores})
+    students_for_compute = [
+        {"student_id": int(sid), "scores": scores_by_student.get(sid, {})}
+        for sid in ids
+    ]
 
     # Call the same compute logic used by grade input
     from blueprints.compute_routes import compute_major_grade, compute_minor_grade
@@ -2031,148 +1836,46 @@ def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released
         f"Computation complete for release. Results for {len(results)} students, {len(summaries)} summaries"
     )
 
-    logger.info(f"About to create snapshot for class {class_id}")
-
-    # Create a minimal snapshot entry for backward compatibility
-    now = datetime.now()
-    released_at_value = now
-
-    # Create snapshot with computed grades
-    snapshot_data = {"students": [], "computed_at": now.isoformat()}
-
-    for sid in ids:
-        summary = summaries.get(sid) or summaries.get(str(sid), {})
-        final_grade = summary.get("final_grade")
-        if final_grade is not None:
-            try:
-                final_grade = round(float(final_grade), 2)
-            except:
-                final_grade = None
-
-        snapshot_data["students"].append(
-            {"student_id": sid, "final_grade": final_grade, "computed": summary}
-        )
-
-    # Insert snapshot
-    cursor.execute(
-        "SELECT COALESCE(MAX(version), 0) + 1 FROM grade_snapshots WHERE class_id = %s",
-        (class_id,),
-    )
-    next_version = cursor.fetchone()
-    next_version = (
-        next_version[0]
-        if isinstance(next_version, tuple)
-        else next_version.get("COALESCE(MAX(version), 0) + 1", 1)
-    )
-
     cursor.execute(
-        "INSERT INTO grade_snapshots (class_id, version, status, snapshot_json, created_by, released_at) VALUES (%s, %s, 'final', %s, %s, %s)",
-        (class_id, next_version, json.dumps(snapshot_data), released_by, now),
-    )
-
-    # Get the inserted snapshot_id using LAST_INSERT_ID()
-    cursor.execute("SELECT LAST_INSERT_ID() as id")
-    snapshot_row = cursor.fetchone()
-    snapshot_id = (
-        snapshot_row.get("id")
-        if isinstance(snapshot_row, dict)
-        else snapshot_row[0] if snapshot_row else None
-    )
-
-    logger.info(
-        f"Created snapshot {snapshot_id} for class {class_id}, version {next_version}"
+        f"""
+        SELECT student_id, is_dropped
+        FROM student_classes
+        WHERE class_id = %s AND student_id IN ({placeholders})
+        """,
+        [class_id, *ids],
     )
+    dropped_ids = {
+        int(r.get("student_id")) for r in cursor.fetchall() or [] if r.get("is_dropped")
+    }
 
-    if not snapshot_id or snapshot_id == 0:
-        logger.error(f"Failed to get snapshot_id after insert for class {class_id}")
-        return {"success": False, "error": "failed_to_create_snapshot"}
-
-    # Insert/update released grades with LIVE computed values
+    rows = []
     for sid in ids:
         profile = profile_map.get(sid, {})
-
-        # Check if student is dropped
-        cursor.execute(
-            """
-            SELECT is_dropped 
-            FROM student_classes 
-            WHERE class_id = %s AND student_id = %s
-            """,
-            (class_id, sid),
-        )
-        dropped_row = cursor.fetchone()
-        is_student_dropped = False
-        if dropped_row:
-            is_student_dropped = bool(
-                dropped_row.get("is_dropped")
-                if isinstance(dropped_row, dict)
-                else dropped_row[0]
-            )
+        base = {
+            "student_id": sid,
+            "school_id": profile.get("school_id"),
+            "name": profile.get("name") or f"Student {sid}",
+        }
 
         # If student is dropped, set grade to DRP and skip computation
-        if is_student_dropped:
-            grade_payload = json.dumps(
+        if sid in dropped_ids:
+            rows.append(
                 {
-                    "student_id": sid,
+                    **base,
                     "final_grade": None,
                     "equivalent": "DRP",
-                    "computed": {},
+                    "remarks": "DROPPED",
+                    "overall_percentage": None,
+                    "payload": {
+                        "student_id": sid,
+                        "final_grade": None,
+                        "equivalent": "DRP",
+                        "computed": {},
+                    },
+                    "dropped": True,
                 }
             )
-
-            logger.info(f"Student {sid} is DROPPED, setting DRP grade")
-
-            try:
-                cursor.execute(
-                    """
-                    INSERT INTO released_grades (
-                        class_id,
-                        snapshot_id,
-                        student_id,
-                        student_school_id,
-                        student_name,
-                        final_grade,
-                        equivalent,
-                        remarks,
-                        overall_percentage,
-                        status,
-                        grade_payload,
-                        released_by,
-                        released_at
-                    )
-                    VALUES (%s, %s, %s, %s, %s, NULL, 'DRP', 'DROPPED', NULL, 'released', %s, %s, %s)
-                    ON DUPLICATE KEY UPDATE
-                    snapshot_id = VALUES(snapshot_id),
-                    student_school_id = VALUES(student_school_id),
-                    student_name = VALUES(student_name),
-                    final_grade = NULL,
-                    equivalent = 'DRP',
-                    remarks = 'DROPPED',
-                    overall_percentage = NULL,
-                    status = 'released',
-                    grade_payload = VALUES(grade_payload),
-                    released_by = VALUES(released_by),
-                    released_at = VALUES(released_at),
-                    updated_at = NOW()
-                """,
-                    (
-                        class_id,
-                        snapshot_id,
-                        sid,
-                        profile.get("school_id"),
-                        profile.get("name") or f"Student {sid}",
-                        grade_payload,
-                        released_by,
-                        released_at_value,
-                    ),
-                )
-                logger.info(f"Successfully set DROPPED grade for student {sid}")
-            except Exception as insert_error:
-                logger.error(
-                    f"Failed to insert DROPPED grade for student {sid}: {insert_error}"
-                )
-                raise
-            continue  # Skip normal grade computation for dropped students
+            continue
 
         # Get computed grade from summaries (handle both int and string keys)
         summary = summaries.get(sid) or summaries.get(str(sid), {})
@@ -2185,14 +1888,8 @@ def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released
             except:
                 final_grade = None
 
-        # Check if student has missing scores in ANY subcategory - collect ALL missing items
-        student_scores = {}
-        for student_data in students_for_compute:
-            if student_data.get("student_id") == sid:
-                student_scores = student_data.get("scores", {})
-                break
-
-        # Check for missing/blank scores in ANY subcategory
+        # Check for missing/blank scores in ANY subcategory - collect ALL missing items
+        student_scores = scores_by_student.get(sid, {})
         missing_subcategories = []
         for group_key, group_data in groups.items():
             # Extract subcategory name from group_key (format: "CATEGORY::Subcategory")
@@ -2207,7 +1904,7 @@ def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released
                 # If score is None or blank, mark as incomplete
                 if score_value is None or str(score_value).strip() == "":
                     has_missing = True
-                    logger.info(
+                    logger.debug(
                         f"Student {sid} missing score for assessment {assessment_id} in {group_key}"
                     )
                     break
@@ -2215,58 +1912,6 @@ def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released
             if has_missing:
                 missing_subcategories.append(subcategory_name)
 
-        # Calculate equivalent (letter grade) from final grade
-        # If student has missing assessments, set equivalent to INC regardless of grade
-        if missing_subcategories:
-            equivalent = "INC"
-        elif final_grade is not None:
-            if final_grade >= 98:
-                equivalent = "1.0"
-            elif final_grade >= 95:
-                equivalent = "1.25"
-            elif final_grade >= 92:
-                equivalent = "1.5"
-            elif final_grade >= 89:
-                equivalent = "1.75"
-            elif final_grade >= 86:
-                equivalent = "2.0"
-            elif final_grade >= 83:
-                equivalent = "2.25"
-            elif final_grade >= 80:
-                equivalent = "2.5"
-            elif final_grade >= 77:
-                equivalent = "2.75"
-            elif final_grade >= 75:
-                equivalent = "3.0"
-            else:
-                equivalent = "5.0"
-        else:
-            equivalent = "N/A"
-
-        # Calculate remarks based on missing assessments or grade
-        remarks = "PASSED"
-        if missing_subcategories:
-            # Create comma-separated list of abbreviations
-            abbreviations = [
-                abbreviate_assessment(subcat) for subcat in missing_subcategories
-            ]
-            remarks = ", ".join(abbreviations)
-        elif equivalent == "INC":
-            remarks = "INCOMPLETE"
-        elif equivalent == "DRP":
-            remarks = "DROPPED"
-        elif equivalent == "5.0":
-            remarks = "FAILED"
-        elif equivalent and equivalent != "N/A":
-            try:
-                eq_num = float(equivalent)
-                if eq_num > 3.0:
-                    remarks = "FAILED"
-                else:
-                    remarks = "PASSED"
-            except:
-                pass
-
         overall_percentage = summary.get("overall_percentage")
         try:
             overall_percentage = (
@@ -2277,18 +1922,119 @@ def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released
         except Exception:
             overall_percentage = None
 
-        # Create grade payload from summary
-        grade_payload = json.dumps(
+        rows.append(
             {
-                "student_id": sid,
+                **base,
                 "final_grade": final_grade,
-                "equivalent": equivalent,
-                "computed": summary,
+                "overall_percentage": overall_percentage,
+                "missing": missing_subcategories,
+                "summary": summary,
+                "dropped": False,
             }
         )
 
-        logger.info(
-            f"About to INSERT released_grades for student {sid}: snapshot_id={snapshot_id}, final_grade={final_grade}, equivalent={equivalent}, remarks={remarks}"
+    # Calculate equivalents for the whole class in one lookup.
+    # If student has missing assessments, set equivalent to INC regardless of grade
+    scale = get_scale(RELEASE_SCALE)
+    graded = [r for r in rows if not r["dropped"]]
+    equivalents = scale.equivalents([r["final_grade"] for r in graded])
+    for row, equivalent in zip(graded, equivalents):
+        missing_subcategories = row.pop("missing")
+        summary = row.pop("summary")
+        if missing_subcategories:
+            equivalent = "INC"
+        elif equivalent is None:
+            equivalent = "N/A"
+        row["equivalent"] = equivalent
+        row["remarks"] = _remarks_for(equivalent, missing_subcategories)
+        row["payload"] = {
+            "student_id": row["student_id"],
+            "final_grade": row["final_grade"],
+            "equivalent": equivalent,
+            "computed": summary,
+            "grading_scale": scale.key,
+        }
+
+    return {
+        "success": True,
+        "rows": rows,
+        "summaries": summaries,
+        "grading_scale": scale.key,
+    }
+
+
+def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released_by):
+    ids = _coerce_student_ids(student_ids)
+    if not ids:
+        return {"success": False, "error": "no_valid_student_ids"}
+
+    logger.info(
+        f"Finalizing release: class_id={class_id}, students={len(ids)}, released_by={released_by}"
+    )
+    logger.debug(f"Release student IDs for class {class_id}: {ids}")
+
+    computed = compute_release_rows(cursor, class_id, ids)
+    if not computed.get("success"):
+        return computed
+    summaries = computed["summaries"]
+
+    logger.debug(f"About to create snapshot for class {class_id}")
+
+    # Create a minimal snapshot entry for backward compatibility
+    now = datetime.now()
+    released_at_value = now
+
+    # Create snapshot with computed grades
+    snapshot_data = {"students": [], "computed_at": now.isoformat()}
+
+    for sid in ids:
+        summary = summaries.get(sid) or summaries.get(str(sid), {})
+        final_grade = summary.get("final_grade")
+        if final_grade is not None:
+            try:
+                final_grade = round(float(final_grade), 2)
+            except:
+                final_grade = None
+
+        snapshot_data["students"].append(
+            {"student_id": sid, "final_grade": final_grade, "computed": summary}
+        )
+
+    # Insert snapshot
+    cursor.execute(
+        "SELECT COALESCE(MAX(version), 0) + 1 FROM grade_snapshots WHERE class_id = %s",
+        (class_id,),
+    )
+    next_version = cursor.fetchone()
+    next_version = (
+        next_version[0]
+        if isinstance(next_version, tuple)
+        else next_version.get("COALESCE(MAX(version), 0) + 1", 1)
+    )
+
+    snapshot_id = snapshot_store.insert_snapshot(
+        cursor,
+        class_id,
+        next_version,
+        "final",
+        snapshot_data,
+        released_by,
+        released_at=now,
+    )
+
+    logger.info(
+        f"Created snapshot {snapshot_id} for class {class_id}, version {next_version}"
+    )
+
+    if not snapshot_id or snapshot_id == 0:
+        logger.error(f"Failed to get snapshot_id after insert for class {class_id}")
+        return {"success": False, "error": "failed_to_create_snapshot"}
+
+    # Insert/update released grades with LIVE computed values
+    for row in computed["rows"]:
+        sid = row["student_id"]
+        logger.debug(
+            f"Upserting released_grades for student {sid}: snapshot_id={snapshot_id}, final_grade={row['final_grade']}, equivalent={row['equivalent']}, remarks={row['remarks']}"
         )
 
         try:
@@ -2328,26 +2074,36 @@ def _finalize_snapshot_and_store_release(cursor, class_id, student_ids, released
                     class_id,
                     snapshot_id,
                     sid,
-                    profile.get("school_id"),
-                    profile.get("name") or f"Student {sid}",
-                    final_grade,
-                    equivalent,
-                    remarks,
-                    overall_percentage,
-                    grade_payload,
+                    row["school_id"],
+                    row["name"],
+                    row["final_grade"],
+                    row["equivalent"],
+                    row["remarks"],
+                    row["overall_percentage"],
+                    json.dumps(row["payload"]),
                     released_by,
                     released_at_value,
                 ),
             )
-            logger.info(
-                f"Successfully inserted/updated released_grades for student {sid}"
-            )
         except Exception as insert_error:
             logger.error(
                 f"Failed to insert released_grades for student {sid}: {insert_error}"
             )
             raise
 
+    # The student grade view only changes on the next release, so build it now.
+    if student_grade_views.views_available(cursor):
+        student_grade_views.store_views(
+            cursor,
+            class_id,
+            student_grade_views.build_views(
+                cursor,
+                class_id,
+                {row["student_id"]: row["payload"] for row in computed["rows"]},
+            ),
+        )
+    class_versions.bump(cursor, class_id)
+
     return {
         "success": True,
         "snapshot_id": snapshot_id,
@@ -2370,6 +2126,7 @@ def _update_released_grade_status(cursor, class_id, student_ids, status):
         """,
         [status, status, class_id, *ids],
     )
+    class_versions.bump(cursor, class_id)
 
 
 @instructor_bp.route(
@@ -2395,6 +2152,9 @@ def api_toggle_student_release(student_id):
         if not _instructor_owns_class(class_id, session.get("user_id")):
             return jsonify({"error": "unauthorized_class"}), 403
 
+        # Release from the scores as saved, including buffered edits.
+        flush_class(int(class_id))
+
         released_at_value = None
         conn = get_db_connection()
         try:
@@ -2490,6 +2250,11 @@ def api_toggle_student_release(student_id):
             conn.rollback()
             raise
 
+        try:
+            emit_live_version_update(int(class_id))
+        except Exception:
+            pass
+
         released_date_value = None
         if release and released_at_value:
             if isinstance(released_at_value, datetime):
@@ -2539,6 +2304,9 @@ def api_bulk_toggle_release():
         if not _instructor_owns_class(class_id, session.get("user_id")):
             return jsonify({"error": "unauthorized_class"}), 403
 
+        # Release from the scores as saved, including buffered edits.
+        flush_class(int(class_id))
+
         conn = get_db_connection()
         try:
             with conn.cursor() as cursor:
@@ -2667,6 +2435,11 @@ def api_bulk_toggle_release():
             conn.rollback()
             raise
 
+        try:
+            emit_live_version_update(int(class_id))
+        except Exception:
+            pass
+
         released_at_value = None
         if release and release_result:
             released_at_value = release_result.get("released_at")
@@ -2693,6 +2466,7 @@ def api_bulk_toggle_release():
 
 @instructor_bp.route("/scores", methods=["GET", "POST"], endpoint="api_list_scores")
 @login_required
+@class_version_etag()
 def api_list_scores():
     instructor_id, err = _require_instructor()
     if err:
@@ -2802,6 +2576,7 @@ def api_list_scores():
                     logger.exception("Failed to validate student ids")
                     return jsonify({"error": "failed_to_validate_students"}), 500
 
+                saved_entries = []
                 for s in scores:
                     try:
                         sid = int(s.get("student_id"))
@@ -2814,7 +2589,26 @@ def api_list_scores():
                             score_val = float(val)
                     except Exception:
                         continue
-
+                    saved_entries.append((sid, aid, score_val))
+
+                # Write-behind: journal the edits and let the buffer batch the
+                # database writes; "flush": true (explicit save) writes now.
+                buffer = get_score_buffer()
+                if buffer is not None:
+                    ack = buffer.submit(cls_id, saved_entries)
+                    response = {"success": True, "saved": len(scores), "buffered": True, **ack}
+                    if data.get("flush"):
+                        try:
+                            response["flushed_seq"] = buffer.flush(cls_id)
+                        except Exception as e:
+                            # Still journaled; the background flusher retries.
+                            logger.error(f"Explicit flush failed for class {cls_id}: {e}")
+                            return jsonify({"error": "failed_to_flush_scores", **ack}), 503
+                        response["pending"] = buffer.status(cls_id)["pending"]
+                        response["version"] = get_cached_class_live_version(cls_id)
+                    return jsonify(response), 200
+
+                for sid, aid, score_val in saved_entries:
                     # Check if a student_scores row exists
                     cursor.execute(
                         "SELECT id FROM student_scores WHERE assessment_id = %s AND student_id = %s",
@@ -2831,10 +2625,24 @@ def api_list_scores():
                             "INSERT INTO student_scores (assessment_id, student_id, score) VALUES (%s, %s, %s)",
                             (aid, sid, score_val),
                         )
+                version = class_versions.bump(cursor, cls_id)
+            committed = True
             try:
                 conn.commit()
             except Exception:
-                pass
+                committed = False
+
+            # Update the cached class in place and return the affected
+            # students' summaries so the client does not recompute the class.
+            grades = {}
+            if committed:
+                try:
+                    grades = grade_store.apply_scores(cls_id, saved_entries, version)
+                except Exception as e:
+                    logger.warning(f"Grade store update failed for class {cls_id}: {e}")
+                    grade_store.invalidate(cls_id)
+            else:
+                grade_store.invalidate(cls_id)
 
             # Notify live subscribers that class data changed
             try:
@@ -2842,7 +2650,10 @@ def api_list_scores():
             except Exception:
                 pass
 
-            return jsonify({"success": True, "saved": len(scores)}), 200
+            response = {"success": True, "saved": len(scores)}
+            if grades:
+                response["grades"] = {str(sid): summary for sid, summary in grades.items()}
+            return jsonify(response), 200
         except Exception as e:
             logger.error(f"Failed to save scores: {str(e)}")
             return jsonify({"error": "failed_to_save_scores"}), 500
@@ -2854,6 +2665,11 @@ def api_list_scores():
         return jsonify({"error": "assessment_id or class_id is required"}), 400
 
     try:
+        # Read-your-writes with write-behind on (class_version_etag already
+        # flushed the class when class_id is given).
+        if not class_id and get_score_buffer() is not None:
+            get_score_buffer().flush_all()
+
         with get_db_connection().cursor() as cursor:
             if assessment_id and class_id:
                 cursor.execute(
@@ -2893,6 +2709,74 @@ def api_list_scores():
         return jsonify({"error": "failed_to_fetch_scores"}), 500
 
 
+@instructor_bp.route(
+    "/api/classes/<int:class_id>/gradebook/manifest",
+    methods=["GET"],
+    endpoint="api_gradebook_manifest",
+)
+@login_required
+@class_version_etag()
+def api_gradebook_manifest(class_id: int):
+    """Ordered student rows and assessment columns of the gradebook, without
+    scores (utils/gradebook_window.py)."""
+    instructor_id, err = _require_instructor()
+    if err:
+        return err
+    if not _instructor_owns_class(class_id, session.get("user_id")):
+        return jsonify({"error": "forbidden"}), 403
+
+    try:
+        with get_db_connection().cursor() as cursor:
+            data = gradebook_window.manifest(cursor, class_id)
+        return jsonify(data)
+    except Exception as e:
+        logger.error(f"Failed to load gradebook manifest for class {class_id}: {e}")
+        return jsonify({"error": "failed_to_load_manifest"}), 500
+
+
+@instructor_bp.route(
+    "/api/classes/<int:class_id>/gradebook/window",
+    methods=["GET"],
+    endpoint="api_gradebook_window",
+)
+@login_required
+@class_version_etag()
+def api_gradebook_window(class_id: int):
+    """Score matrix for a window of the gradebook.
+
+    Query: row_offset, row_limit (<= MAX_WINDOW_ROWS), col_offset, col_limit
+    (<= MAX_WINDOW_COLS), in manifest order.
+    """
+    instructor_id, err = _require_instructor()
+    if err:
+        return err
+    if not _instructor_owns_class(class_id, session.get("user_id")):
+        return jsonify({"error": "forbidden"}), 403
+
+    try:
+        with get_db_connection().cursor() as cursor:
+            data = gradebook_window.manifest(cursor, class_id)
+            try:
+                rows = gradebook_window.parse_range(
+                    request.args.get("row_offset"),
+                    request.args.get("row_limit"),
+                    len(data["students"]),
+                    gradebook_window.MAX_WINDOW_ROWS,
+                )
+                cols = gradebook_window.parse_range(
+                    request.args.get("col_offset"),
+                    request.args.get("col_limit"),
+                    len(data["assessments"]),
+                    gradebook_window.MAX_WINDOW_COLS,
+                )
+            except ValueError:
+                return jsonify({"error": "invalid_window"}), 400
+            return jsonify(gradebook_window.window(cursor, data, rows, cols))
+    except Exception as e:
+        logger.error(f"Failed to load gradebook window for class {class_id}: {e}")
+        return jsonify({"error": "failed_to_load_window"}), 500
+
+
 @instructor_bp.route(
     "/classes/<int:class_id>/save-snapshot",
     methods=["POST"],
@@ -2919,6 +2803,8 @@ def api_save_snapshot(class_id: int):
         return jsonify({"error": "scores_required"}), 400
 
     try:
+        # Buffered edits are older than the posted ones; write them first.
+        flush_class(class_id)
         conn = get_db_connection()
         # Begin transaction
         try:
@@ -2989,6 +2875,7 @@ def api_save_snapshot(class_id: int):
                 )
 
             # Upsert posted scores into student_scores
+            saved_entries = []
             for s in scores:
                 try:
                     sid = int(s.get("student_id"))
@@ -3024,12 +2911,15 @@ def api_save_snapshot(class_id: int):
                         "INSERT INTO student_scores (assessment_id, student_id, score) VALUES (%s, %s, %s)",
                         (aid, sid, score_val),
                     )
+                saved_entries.append((sid, aid, score_val))
+            version = class_versions.bump(cursor, class_id)
 
             # commit saved scores so recompute reads latest values
             try:
                 conn.commit()
+                grade_store.apply_scores(class_id, saved_entries, version)
             except Exception:
-                pass
+                grade_store.invalidate(class_id)
 
             # Recompute groups and per-student totals
             # Fetch assessments and their grouping info for this class
@@ -3167,9 +3057,6 @@ def api_save_snapshot(class_id: int):
                 "students": snapshot_students,
             }
 
-            # Try to include structure version if available
-            import json as _json
-
             try:
                 cursor.execute(
                     "SELECT id, version FROM grade_snapshots WHERE class_id = %s AND status = 'draft' ORDER BY version DESC LIMIT 1",
@@ -3184,9 +3071,8 @@ def api_save_snapshot(class_id: int):
                     # Update the existing draft snapshot (preserve version)
                     snap_id = existing_draft.get("id")
                     version = int(existing_draft.get("version") or 1)
-                    cursor.execute(
-                        "UPDATE grade_snapshots SET snapshot_json = %s, created_by = %s, created_at = NOW() WHERE id = %s",
-                        (_json.dumps(snapshot), session.get("user_id"), snap_id),
+                    snapshot_store.update_draft(
+                        cursor, snap_id, snapshot, session.get("user_id")
                     )
                 else:
                     # No draft exists: insert new snapshot with incremented version
@@ -3200,15 +3086,13 @@ def api_save_snapshot(class_id: int):
                     except Exception:
                         version = 1
 
-                    cursor.execute(
-                        "INSERT INTO grade_snapshots (class_id, version, status, snapshot_json, created_by) VALUES (%s, %s, %s, %s, %s)",
-                        (
-                            class_id,
-                            version,
-                            "draft",
-                            _json.dumps(snapshot),
-                            session.get("user_id"),
-                        ),
+                    snapshot_store.insert_snapshot(
+                        cursor,
+                        class_id,
+                        version,
+                        "draft",
+                        snapshot,
+                        session.get("user_id"),
                     )
 
                 try:
@@ -4915,6 +4799,7 @@ def perform_risk_prediction_analysis(cursor, class_ids, assessment_ids):
 
 @instructor_bp.route("/api/classes/<int:class_id>/calculate", methods=["GET"])
 @login_required
+@class_version_etag()
 def api_calculate_class_grades(class_id):
     """Calculate grades for all students in a class using shared computation logic."""
     # Allow both instructors and students to access, but filter appropriately
@@ -5072,17 +4957,42 @@ def api_get_class_snapshots(class_id):
     if not _instructor_owns_class(class_id, session.get("user_id")):
         return jsonify({"error": "forbidden"}), 403
 
+    # Listings read the summary columns only; documents are decoded when
+    # asked for with ?include=data.
+    include_data = request.args.get("include") == "data"
+
     try:
         with get_db_connection().cursor() as cursor:
+            if snapshot_store.storage_available(cursor):
+                columns = "student_count, assessment_count, class_average"
+                if include_data:
+                    columns += ", encoding, snapshot_blob, base_snapshot_id, snapshot_json"
+                else:
+                    # Rows not yet compacted have no summary columns: fetch
+                    # their document (and only theirs) to summarize it below.
+                    columns += ", " + ", ".join(
+                        f"CASE WHEN student_count IS NULL THEN {column} END AS {column}"
+                        for column in (
+                            "encoding",
+                            "snapshot_blob",
+                            "base_snapshot_id",
+                            "snapshot_json",
+                        )
+                    )
+            else:
+                columns = (
+                    "NULL AS student_count, NULL AS assessment_count, "
+                    "NULL AS class_average, snapshot_json"
+                )
             cursor.execute(
-                """
+                f"""
                 SELECT
                     id,
                     version,
                     status,
                     created_at,
                     released_at,
-                    snapshot_json
+                    {columns}
                 FROM grade_snapshots
                 WHERE class_id = %s
                 ORDER BY version DESC
@@ -5100,35 +5010,45 @@ def api_get_class_snapshots(class_id):
 
             snapshot_list = []
             for snap in snapshots:
-                # Parse snapshot_json to get basic info
-                try:
-                    snapshot_data = json.loads(snap.get("snapshot_json") or "{}")
-                    student_count = len(snapshot_data.get("students", []))
-                    assessment_count = len(snapshot_data.get("assessments", []))
-                except Exception:
-                    student_count = 0
-                    assessment_count = 0
-
-                snapshot_list.append(
-                    {
-                        "id": snap.get("id"),
-                        "version": snap.get("version"),
-                        "status": snap.get("status"),
-                        "created_at": (
-                            snap.get("created_at").isoformat()
-                            if snap.get("created_at")
-                            else None
-                        ),
-                        "released_at": (
-                            snap.get("released_at").isoformat()
-                            if snap.get("released_at")
-                            else None
-                        ),
-                        "student_count": student_count,
-                        "assessment_count": assessment_count,
-                        "snapshot_data": snapshot_data,
-                    }
-                )
+                snapshot_data = None
+                student_count = snap.get("student_count")
+                assessment_count = snap.get("assessment_count")
+                class_average = snap.get("class_average")
+                if include_data or student_count is None:
+                    # Rows written before migration 0003 have no summary columns.
+                    try:
+                        snapshot_data = snapshot_store.load_document(cursor, snap)
+                        summary = snapshot_store.summarize(snapshot_data)
+                        student_count = summary["student_count"]
+                        assessment_count = summary["assessment_count"]
+                        class_average = summary["class_average"]
+                    except Exception:
+                        student_count = 0
+                        assessment_count = 0
+
+                entry = {
+                    "id": snap.get("id"),
+                    "version": snap.get("version"),
+                    "status": snap.get("status"),
+                    "created_at": (
+                        snap.get("created_at").isoformat()
+                        if snap.get("created_at")
+                        else None
+                    ),
+                    "released_at": (
+                        snap.get("released_at").isoformat()
+                        if snap.get("released_at")
+                        else None
+                    ),
+                    "student_count": student_count,
+                    "assessment_count": assessment_count,
+                    "class_average": (
+                        float(class_average) if class_average is not None else None
+                    ),
+                }
+                if include_data:
+                    entry["snapshot_data"] = snapshot_data
+                snapshot_list.append(entry)
 
             return jsonify(
                 {
@@ -5151,6 +5071,43 @@ def api_get_class_snapshots(class_id):
         return jsonify({"error": "failed_to_get_snapshots"}), 500
 
 
+@instructor_bp.route(
+    "/api/instructor/classes/<int:class_id>/snapshots/diff",
+    methods=["GET"],
+    endpoint="get_class_snapshot_diff",
+)
+def api_get_class_snapshot_diff(class_id):
+    """Changed cells, final grades and equivalents between two snapshot versions.
+
+    Query: ?from=<version>&to=<version>
+    """
+    instructor_id, err = _require_instructor()
+    if err:
+        return err
+
+    if not _instructor_owns_class(class_id, session.get("user_id")):
+        return jsonify({"error": "forbidden"}), 403
+
+    from_version = request.args.get("from", type=int)
+    to_version = request.args.get("to", type=int)
+    if from_version is None or to_version is None:
+        return jsonify({"error": "from_and_to_versions_required"}), 400
+
+    try:
+        with get_db_connection().cursor() as cursor:
+            diff = snapshot_store.diff_versions(
+                cursor, class_id, from_version, to_version
+            )
+        if diff is None:
+            return jsonify({"error": "snapshot_not_found"}), 404
+        return jsonify({"class_id": class_id, **diff})
+    except Exception as e:
+        logger.error(
+            f"Failed to diff snapshots {from_version}..{to_version} for class {class_id}: {str(e)}"
+        )
+        return jsonify({"error": "failed_to_diff_snapshots"}), 500
+
+
 @instructor_bp.route(
     "/api/instructor/classes/<int:class_id>/released-grades",
     methods=["GET"],
@@ -5326,57 +5283,29 @@ def api_instructor_grades_overview():
 
     try:
         with get_db_connection().cursor() as cursor:
-            # Get all classes for this instructor
-            cursor.execute(
-                "SELECT id, class_code, course, subject, section FROM classes WHERE instructor_id = %s",
-                (instructor_id,),
+            classes = [
+                cls
+                for cls in class_summaries.get(cursor, instructor_id)
+                if cls["has_structure"]
+            ]
+            # All classes are computed from the same three queries.
+            computed = class_summaries.computed_grades(
+                cursor, [cls["id"] for cls in classes]
             )
-            classes = cursor.fetchall()
 
-            overview_data = []
-
-            for class_info in classes:
-                class_id = class_info["id"]
-
-                # Check if class has active structure
-                cursor.execute(
-                    "SELECT id FROM grade_structures WHERE class_id = %s AND is_active = 1",
-                    (class_id,),
-                )
-                structure = cursor.fetchone()
-                if not structure:
-                    continue
-
-                # Get computed grades for this class
-                try:
-                    # Reuse the calculate logic
-                    response = api_calculate_class_grades(class_id)
-                    if hasattr(response, "get_json"):
-                        computed_data = response.get_json()
-                    else:
-                        # If it's a Response object, get the data differently
-                        continue
-
-                    if "computed_grades" in computed_data:
-                        class_overview = {
-                            "class_id": class_id,
-                            "class_code": class_info["class_code"],
-                            "course": class_info["course"],
-                            "subject": class_info["subject"],
-                            "section": class_info["section"],
-                            "computed_grades": computed_data["computed_grades"],
-                        }
-                        overview_data.append(class_overview)
-
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to compute grades for class {class_id}: {str(e)}"
-                    )
-                    continue
-
-            return jsonify(
-                {"overview": overview_data, "total_classes": len(overview_data)}
-            )
+        overview_data = [
+            {
+                "class_id": cls["id"],
+                "class_code": cls["class_code"],
+                "course": cls["course"],
+                "subject": cls["subject"],
+                "section": cls["section"],
+                "computed_grades": computed[cls["id"]],
+            }
+            for cls in classes
+            if cls["id"] in computed
+        ]
+        return jsonify({"overview": overview_data, "total_classes": len(overview_data)})
 
     except Exception as e:
         logger.error(
@@ -5524,6 +5453,7 @@ def approve_join_request(request_id):
                 """,
                 (instructor["id"], request_id),
             )
+            class_versions.bump(cursor, join_request["class_id"])
 
             conn.commit()
 
@@ -5625,8 +5555,10 @@ def reject_join_request(request_id):
                 """,
                 (rejection_reason if rejection_reason else None, request_id),
             )
+            class_versions.bump(cursor, join_request["class_id"])
 
             conn.commit()
+            emit_live_version_update(int(join_request["class_id"]))
 
             student_name = f"{join_request['first_name']} {join_request['last_name']}"
 
@@ -1,6 +1,6 @@
 from flask import Blueprint, jsonify, request
 from utils.db_conn import get_db_connection
-from utils.statistics_utils import get_class_advanced_stats
+from utils.http_cache import class_version_etag
 
 statistics_bp = Blueprint("statistics", __name__)
 
@@ -237,8 +237,11 @@ def class_main_stats(class_id):
 
 
 @statistics_bp.route("/api/class/<int:class_id>/advanced-stats", methods=["GET"])
+@class_version_etag()
 def class_advanced_stats(class_id):
     try:
+        from utils.statistics_utils import get_class_advanced_stats
+
         stats = get_class_advanced_stats(class_id)
         return jsonify(stats)
     except Exception as e:
@@ -246,6 +249,7 @@ def class_advanced_stats(class_id):
 
 
 @statistics_bp.route("/api/class/<int:class_id>/performance-trends", methods=["GET"])
+@class_version_etag()
 def class_performance_trends(class_id):
     try:
         from utils.statistics_utils import calculate_performance_trends
@@ -262,6 +266,7 @@ def class_performance_trends(class_id):
 
 
 @statistics_bp.route("/api/class/<int:class_id>/difficulty-analysis", methods=["GET"])
+@class_version_etag()
 def class_difficulty_analysis(class_id):
     try:
         from utils.statistics_utils import calculate_assessment_difficulty_analysis
@@ -275,6 +280,7 @@ def class_difficulty_analysis(class_id):
 
 
 @statistics_bp.route("/api/class/<int:class_id>/progress-analysis", methods=["GET"])
+@class_version_etag()
 def class_progress_analysis(class_id):
     try:
         from utils.statistics_utils import calculate_learning_progress_analysis
@@ -290,6 +296,7 @@ def class_progress_analysis(class_id):
 @statistics_bp.route(
     "/api/class/<int:class_id>/comprehensive-analytics", methods=["GET"]
 )
+@class_version_etag()
 def class_comprehensive_analytics(class_id):
     try:
         from utils.statistics_utils import get_comprehensive_class_analytics
@@ -301,6 +308,7 @@ def class_comprehensive_analytics(class_id):
 
 
 @statistics_bp.route("/api/class/<int:class_id>/correlation-analysis", methods=["GET"])
+@class_version_etag()
 def class_correlation_analysis(class_id):
     try:
         from utils.statistics_utils import calculate_correlation_analysis
@@ -314,6 +322,7 @@ def class_correlation_analysis(class_id):
 
 
 @statistics_bp.route("/api/class/<int:class_id>/grade-distribution", methods=["GET"])
+@class_version_etag()
 def class_grade_distribution(class_id):
     try:
         from utils.statistics_utils import calculate_grade_distribution_analysis
@@ -330,6 +339,7 @@ def class_grade_distribution(class_id):
 
 
 @statistics_bp.route("/api/class/<int:class_id>/risk-analysis", methods=["GET"])
+@class_version_etag()
 def class_risk_analysis(class_id):
     try:
         from utils.statistics_utils import calculate_risk_analysis
@@ -343,6 +353,7 @@ def class_risk_analysis(class_id):
 
 
 @statistics_bp.route("/api/class/<int:class_id>/full-analytics", methods=["GET"])
+@class_version_etag()
 def class_full_analytics(class_id):
     try:
         from utils.statistics_utils import get_comprehensive_class_analytics_v2
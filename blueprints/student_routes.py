@@ -5,6 +5,12 @@ from flask import Blueprint, jsonify, render_template, request, session, url_for
 from werkzeug.utils import secure_filename
 from utils.auth_utils import login_required
 from utils.db_conn import get_db_connection
+from utils import class_versions
+from utils import membership_index
+from utils import snapshot_store
+from utils import student_dashboard
+from utils import student_grade_views
+from utils.http_cache import build_etag, class_version_etag, respond_with_etag
 from utils.live import emit_live_version_update
 
 logger = logging.getLogger(__name__)
@@ -13,107 +19,46 @@ student_bp = Blueprint("student", __name__)
 
 
 @student_bp.route(
-    "/api/student/joined-classes", methods=["GET"], endpoint="get_joined_classes"
+    "/api/student/dashboard", methods=["GET"], endpoint="get_student_dashboard"
 )
 @login_required
-def get_joined_classes():
+def get_student_dashboard():
+    """Joined classes with release status, released grades and missing
+    assessments in one response (utils/student_dashboard.py)."""
     if session.get("role") != "student":
         return jsonify({"error": "Access denied. Student privileges required."}), 403
 
     try:
         with get_db_connection().cursor() as cursor:
-            cursor.execute(
-                "SELECT id FROM students WHERE user_id = %s", (session["user_id"],)
-            )
-            student = cursor.fetchone()
-            if not student:
-                return jsonify({"error": "Student profile not found"}), 404
-
-            cursor.execute(
-                """SELECT c.*, sc.joined_at, sc.status, 
-                   pi.first_name, pi.last_name
-                   FROM classes c
-                JOIN student_classes sc ON c.id = sc.class_id
-                LEFT JOIN instructors i ON c.instructor_id = i.id
-                LEFT JOIN personal_info pi ON i.personal_info_id = pi.id
-                WHERE sc.student_id = %s AND sc.status IN ('approved', 'pending')
-                ORDER BY sc.joined_at DESC""",
-                (student["id"],),
-            )
-            enrollments = cursor.fetchall()
-
-            classes_data = []
-            for enrollment in enrollments:
-                try:
-                    # Safely coerce year/semester to strings; handle None or unexpected types
-                    year_raw = (
-                        enrollment.get("year") if isinstance(enrollment, dict) else None
-                    )
-                    year_str = str(year_raw) if year_raw is not None else ""
-                    formatted_year = year_str[-2:] if year_str else "XX"
+            dashboard = student_dashboard.get(cursor, session["user_id"])
+        if dashboard is None:
+            return jsonify({"error": "Student profile not found"}), 404
+        return jsonify(
+            {
+                "classes": dashboard["classes"],
+                "analytics": student_dashboard.analytics_view(dashboard),
+            }
+        )
+    except Exception as e:
+        logger.error(f"Failed to get student dashboard: {str(e)}")
+        return jsonify({"error": "Failed to retrieve dashboard"}), 500
 
-                    sem_raw = (
-                        enrollment.get("semester")
-                        if isinstance(enrollment, dict)
-                        else None
-                    )
-                    sem_str = str(sem_raw).lower() if sem_raw is not None else ""
-                    if "1st" in sem_str:
-                        formatted_semester = "1"
-                    elif "2nd" in sem_str:
-                        formatted_semester = "2"
-                    else:
-                        formatted_semester = "1"
-
-                    subject_code = enrollment.get('subject_code', '')
-                    subject = enrollment.get('subject', '')
-                    track = enrollment.get('track', '')
-                    subject_part = f" ({subject_code} - {subject})" if subject_code and subject else ""
-                    computed_class_id = f"{formatted_year}-{formatted_semester} {enrollment.get('course')} {enrollment.get('section')}-{track}{subject_part}"
-
-                    joined_at_val = enrollment.get("joined_at")
-                    joined_at_iso = None
-                    try:
-                        if joined_at_val:
-                            joined_at_iso = joined_at_val.isoformat()
-                    except Exception:
-                        try:
-                            joined_at_iso = str(joined_at_val)
-                        except Exception:
-                            joined_at_iso = None
 
-                    # Build instructor name
-                    first_name = enrollment.get('first_name', '')
-                    last_name = enrollment.get('last_name', '')
-                    instructor_name = f"{first_name} {last_name}".strip() if first_name or last_name else "Instructor"
+@student_bp.route(
+    "/api/student/joined-classes", methods=["GET"], endpoint="get_joined_classes"
+)
+@login_required
+def get_joined_classes():
+    if session.get("role") != "student":
+        return jsonify({"error": "Access denied. Student privileges required."}), 403
 
-                    classes_data.append(
-                        {
-                            "id": enrollment.get("id"),
-                            "class_id": computed_class_id,
-                            "year": enrollment.get("year"),
-                            "semester": enrollment.get("semester"),
-                            "course": enrollment.get("course"),
-                            "subject": enrollment.get("subject"),
-                            "subject_code": enrollment.get("subject_code"),
-                            "units": enrollment.get("units"),
-                            "track": enrollment.get("track"),
-                            "section": enrollment.get("section"),
-                            "schedule": enrollment.get("schedule"),
-                            "class_code": enrollment.get("class_code"),
-                            "join_code": enrollment.get("join_code"),
-                            "instructor_name": instructor_name,
-                            "joined_at": joined_at_iso,
-                            "status": enrollment.get("status"),
-                        }
-                    )
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to process enrollment record %s: %s", enrollment, e
-                    )
-                    # Skip problematic enrollment but continue
-                    continue
+    try:
+        with get_db_connection().cursor() as cursor:
+            dashboard = student_dashboard.get(cursor, session["user_id"])
+        if dashboard is None:
+            return jsonify({"error": "Student profile not found"}), 404
 
+        classes_data = dashboard["classes"]
         logger.info(
             f"Retrieved {len(classes_data)} joined classes for student {session.get('school_id')}"
         )
@@ -155,10 +100,18 @@ def join_class():
                 )
                 return jsonify({"error": "Student profile not found"}), 404
 
-            # Find class by join code
-            cursor.execute(
-                "SELECT * FROM classes WHERE UPPER(join_code) = %s", (join_code,)
-            )
+            # Find class by join code (join_code_norm is the indexed UPPER(join_code),
+            # see db/migrations/0002; fall back until the migration has run).
+            try:
+                cursor.execute(
+                    "SELECT * FROM classes WHERE join_code_norm = %s", (join_code,)
+                )
+            except Exception as e:
+                if "Unknown column" not in str(e):
+                    raise
+                cursor.execute(
+                    "SELECT * FROM classes WHERE UPPER(join_code) = %s", (join_code,)
+                )
             class_obj = cursor.fetchone()
             if not class_obj:
                 logger.info("join_class: no class found for join_code '%s'", join_code)
@@ -191,12 +144,14 @@ def join_class():
                         "UPDATE student_classes SET status = 'pending', joined_at = NOW(), rejection_reason = NULL WHERE id = %s",
                         (existing['id'],)
                     )
+                    class_versions.bump(cursor, class_obj["id"])
                     logger.info(
                         "join_class: student %s resubmitted join request for class %s",
                         student["id"],
                         class_obj["id"],
                     )
                     conn.commit()
+                    student_dashboard.invalidate_user(session["user_id"])
                     return jsonify(
                         {
                             "success": True,
@@ -210,7 +165,10 @@ def join_class():
                 "INSERT INTO student_classes (student_id, class_id, joined_at, status) VALUES (%s, %s, NOW(), 'pending')",
                 (student["id"], class_obj["id"]),
             )
+            class_versions.bump(cursor, class_obj["id"])
         conn.commit()
+        # The new class is not in the cached dashboard's class list yet.
+        student_dashboard.invalidate_user(session["user_id"])
 
         try:
             emit_live_version_update(int(class_obj["id"]))
@@ -329,6 +287,7 @@ def leave_class(class_id):
                     jsonify({"error": "Failed to leave class - please try again"}),
                     500,
                 )
+            class_versions.bump(cursor, class_id)
 
         get_db_connection().commit()
 
@@ -351,6 +310,49 @@ def leave_class(class_id):
         return jsonify({"error": "Failed to leave class"}), 500
 
 
+def _class_label(class_row):
+    """(class_id label, course, section) shown on the student grade view."""
+    if not class_row:
+        return "Unknown Class", "Unknown Course", "Unknown Section"
+    # Extract year and semester
+    year_str = str(class_row["year"]) if class_row["year"] else ""
+    formatted_year = year_str[-2:] if len(year_str) >= 2 else year_str
+
+    semester_str = str(class_row["semester"]) if class_row["semester"] else ""
+    formatted_semester = "1" if "1st" in semester_str else "2" if "2nd" in semester_str else semester_str
+
+    # Build standardized class_id
+    computed_class_id = f"{formatted_year}-{formatted_semester} {class_row['course']} {class_row['section']}-{class_row['track']} ({class_row['subject_code']} - {class_row['subject']})"
+    return computed_class_id, class_row["course"], class_row["section"]
+
+
+def _released_grade_view(cursor, class_id):
+    """The stored student view of a released grade, in one indexed read.
+
+    Returns None when the grade is not released or has no stored view yet.
+    """
+    if not student_grade_views.views_available(cursor):
+        return None
+    cursor.execute(
+        """
+        SELECT rg.student_id, rg.snapshot_id, rg.final_grade, rg.equivalent,
+               rg.student_view, rg.updated_at, c.updated_at AS class_updated,
+               c.year, c.semester, c.course, c.section, c.track,
+               c.subject_code, c.subject
+        FROM students s
+        JOIN released_grades rg
+          ON rg.student_id = s.id AND rg.class_id = %s AND rg.status = 'released'
+        LEFT JOIN classes c ON c.id = rg.class_id
+        WHERE s.user_id = %s
+        """,
+        (class_id, session["user_id"]),
+    )
+    row = cursor.fetchone()
+    if not row or not row["student_view"]:
+        return None
+    return row
+
+
 @student_bp.route(
     "/api/student/classes/<int:class_id>/grades",
     methods=["GET"],
@@ -360,6 +362,50 @@ def leave_class(class_id):
 def get_student_class_grades(class_id):
     if session.get("role") != "student":
         return jsonify({"error": "Access denied. Student privileges required."}), 403
+
+    # Released grades are served from the view stored at release time; its
+    # ETag only changes when the row or the class is updated.
+    try:
+        with get_db_connection().cursor() as cursor:
+            row = _released_grade_view(cursor, class_id)
+    except Exception as e:
+        logger.warning(f"Stored grade view lookup failed for class {class_id}: {e}")
+        row = None
+    if row is None:
+        return _student_class_grades_live(class_id=class_id)
+
+    def produce():
+        import json
+
+        view = json.loads(row["student_view"])
+        computed_class_id, course, section = _class_label(row)
+        return jsonify(
+            {
+                "class_id": computed_class_id,
+                "course": course,
+                "section": section,
+                "final_grade": row["final_grade"],
+                "equivalent": row["equivalent"],
+                "details": view.get("details", {}),
+                "computed": view.get("computed", {}),
+            }
+        )
+
+    etag = build_etag(
+        "get_student_class_grades",
+        class_id,
+        row["student_id"],
+        row["snapshot_id"],
+        row["updated_at"],
+        row["class_updated"],
+    )
+    return respond_with_etag(etag, produce)
+
+
+@class_version_etag()
+def _student_class_grades_live(class_id):
+    """Grade view built from live data: unreleased grades (latest snapshot) and
+    released rows that have no stored view yet."""
     try:
         import json
 
@@ -389,22 +435,7 @@ def get_student_class_grades(class_id):
                 "SELECT year, semester, course, section, track, subject_code, subject FROM classes WHERE id = %s", (class_id,)
             )
             class_row = cursor.fetchone()
-            if class_row:
-                # Extract year and semester
-                year_str = str(class_row["year"]) if class_row["year"] else ""
-                formatted_year = year_str[-2:] if len(year_str) >= 2 else year_str
-                
-                semester_str = str(class_row["semester"]) if class_row["semester"] else ""
-                formatted_semester = "1" if "1st" in semester_str else "2" if "2nd" in semester_str else semester_str
-                
-                # Build standardized class_id
-                computed_class_id = f"{formatted_year}-{formatted_semester} {class_row['course']} {class_row['section']}-{class_row['track']} ({class_row['subject_code']} - {class_row['subject']})"
-                course = class_row["course"]
-                section = class_row["section"]
-            else:
-                computed_class_id = "Unknown Class"
-                course = "Unknown Course"
-                section = "Unknown Section"
+            computed_class_id, course, section = _class_label(class_row)
 
             # If grades are released, use the released grade data
             if released_grade_row:
@@ -415,80 +446,20 @@ def get_student_class_grades(class_id):
                     final_grade = released_grade_row["final_grade"]
                     equivalent = released_grade_row["equivalent"]
 
-                    # Fetch grade structure to display breakdown
-                    cursor.execute(
-                        "SELECT structure_json FROM grade_structures WHERE class_id = %s AND is_active = 1",
-                        (class_id,),
-                    )
-                    structure_row = cursor.fetchone()
-                    structure_json = (
-                        json.loads(structure_row["structure_json"])
-                        if structure_row and structure_row["structure_json"]
-                        else {}
-                    )
-
-                    # Get all assessments with student scores
-                    cursor.execute("""
-                        SELECT 
-                            ga.id, ga.max_score, ga.position,
-                            gs_sub.name as subcategory_name,
-                            gc.name as category_name,
-                            ss.score
-                        FROM grade_assessments ga
-                        JOIN grade_subcategories gs_sub ON ga.subcategory_id = gs_sub.id
-                        JOIN grade_categories gc ON gs_sub.category_id = gc.id
-                        JOIN grade_structures gs ON gc.structure_id = gs.id
-                        LEFT JOIN student_scores ss ON ga.id = ss.assessment_id AND ss.student_id = %s
-                        WHERE gs.class_id = %s AND gs.is_active = 1
-                        ORDER BY gc.name, gs_sub.name, ga.position
-                    """, (student_id, class_id))
-                    
-                    assessment_rows = cursor.fetchall()
-                    
-                    # Build assessments array with scores
-                    assessments = []
-                    for row in assessment_rows:
-                        assessments.append({
-                            "id": row["id"] if isinstance(row, dict) else row[0],
-                            "name": f"Assessment {row['position'] if isinstance(row, dict) else row[2]}",
-                            "max_score": row["max_score"] if isinstance(row, dict) else row[1],
-                            "category": row["category_name"] if isinstance(row, dict) else row[4],
-                            "subcategory": row["subcategory_name"] if isinstance(row, dict) else row[3],
-                            "score": row["score"] if isinstance(row, dict) else row[5]
-                        })
-
-                    # Merge assessments into structure
-                    if structure_json:
-                        for category, subcats in structure_json.items():
-                            for subcat in subcats:
-                                subcat["assessments"] = [
-                                    {
-                                        "id": a["id"],
-                                        "name": a["name"],
-                                        "max_score": a["max_score"],
-                                        "released_score": a["score"],
-                                        "color": (
-                                            "red"
-                                            if a["score"] is not None and a["score"] < a["max_score"] / 3
-                                            else (
-                                                "yellow"
-                                                if a["score"] is not None
-                                                and a["score"] < 2 * a["max_score"] / 3
-                                                else "green" if a["score"] is not None else "gray"
-                                            )
-                                        ),
-                                    }
-                                    for a in assessments
-                                    if a["category"] == category and a["subcategory"] == subcat["name"]
-                                ]
-
-                    # Build scores array for backwards compatibility
-                    scores = [{"assessment_id": a["id"], "score": a["score"]} for a in assessments]
-
-                    details = {
-                        "scores": scores,
-                        "structure_json": structure_json,
-                    }
+                    # Built once here for rows released before student views
+                    # were stored; later reads take the single-row path.
+                    view = student_grade_views.build_views(
+                        cursor, class_id, {student_id: grade_payload}
+                    )[student_id]
+                    try:
+                        student_grade_views.store_views(
+                            cursor, class_id, {student_id: view}, touch=False
+                        )
+                        get_db_connection().commit()
+                    except Exception as e:
+                        get_db_connection().rollback()
+                        logger.warning(f"Could not store student grade view for class {class_id}: {e}")
+                    details = view["details"]
 
                     return jsonify(
                         {
@@ -503,12 +474,8 @@ def get_student_class_grades(class_id):
                     )
 
             # If grades not released, try to fetch from snapshot (old behavior)
-            cursor.execute(
-                "SELECT snapshot_json FROM grade_snapshots WHERE class_id = %s ORDER BY id DESC LIMIT 1",
-                (class_id,),
-            )
-            snapshot_row = cursor.fetchone()
-            if not snapshot_row:
+            snapshot = snapshot_store.latest_document(cursor, class_id, "id DESC")
+            if snapshot is None:
                 return (
                     jsonify(
                         {
@@ -518,8 +485,6 @@ def get_student_class_grades(class_id):
                     ),
                     404,
                 )
-            snapshot = json.loads(snapshot_row["snapshot_json"])
-
             # Fetch grade structure
             cursor.execute(
                 "SELECT structure_json FROM grade_structures WHERE class_id = %s AND is_active = 1",
@@ -790,6 +755,7 @@ def update_profile():
                 cursor.execute(sql, tuple(stu_params))
 
         conn.commit()
+        membership_index.add(email=pi_fields.get("email"))
 
         # Build response profile
         profile = {}
@@ -969,144 +935,10 @@ def student_analytics():
 
     try:
         with get_db_connection().cursor() as cursor:
-            # Get student ID
-            cursor.execute(
-                "SELECT id FROM students WHERE user_id = %s", (session["user_id"],)
-            )
-            student = cursor.fetchone()
-            if not student:
-                return jsonify({"error": "Student profile not found"}), 404
-            student_id = student["id"]
-
-            # Get joined classes (only approved)
-            cursor.execute(
-                """SELECT c.id, c.class_code, c.course, c.section, c.year, c.semester, c.track, c.subject_code, c.subject
-                FROM classes c
-                JOIN student_classes sc ON c.id = sc.class_id
-                WHERE sc.student_id = %s AND sc.status = 'approved'""",
-                (student_id,),
-            )
-            classes_data = cursor.fetchall()
-            classes = []
-
-            for cls in classes_data:
-                missing_assessments = []
-                try:
-                    # Get all assessments for this class
-                    cursor.execute(
-                        """
-                        SELECT ga.id, ga.name, ga.max_score, gc.name as category, gsc.name as subcategory
-                        FROM grade_assessments ga
-                        JOIN grade_subcategories gsc ON ga.subcategory_id = gsc.id
-                        JOIN grade_categories gc ON gsc.category_id = gc.id
-                        JOIN grade_structures gs ON gc.structure_id = gs.id
-                        WHERE gs.class_id = %s AND gs.is_active = 1
-                        """,
-                        (cls["id"],),
-                    )
-                    assessments = cursor.fetchall()
-
-                    # Get the latest grade_snapshot for this class
-                    cursor.execute(
-                        "SELECT snapshot_json FROM grade_snapshots WHERE class_id = %s ORDER BY created_at DESC LIMIT 1",
-                        (cls["id"],),
-                    )
-                    snapshot_row = cursor.fetchone()
-                    snapshot_scores = {}
-                    if snapshot_row and snapshot_row["snapshot_json"]:
-                        import json
-
-                        try:
-                            snapshot = json.loads(snapshot_row["snapshot_json"])
-                            # Find this student in the snapshot
-                            for student in snapshot.get("students", []):
-                                if student.get("student_id") == student_id:
-                                    for score_obj in student.get("scores", []):
-                                        snapshot_scores[score_obj["assessment_id"]] = (
-                                            score_obj.get("score")
-                                        )
-                        except Exception as e:
-                            logger.warning(f"Snapshot JSON decode failed: {e}")
-
-                    # For each assessment, check if score exists in snapshot; if not, count as missing
-                    # Only mark as missing if: 1) No grade snapshot exists, OR 2) No score recorded for this assessment
-                    # Do NOT count 0 as missing - 0 is a valid score
-                    # If there's a released grade, don't show missing assessments (student has been graded)
-                    if not snapshot_row or not snapshot_scores:
-                        # No snapshot data at all - all assessments are missing
-                        missing_assessments = [a["name"] for a in assessments]
-                    else:
-                        # Snapshot exists - only count as missing if NO score recorded (None), not if score is 0
-                        for assessment in assessments:
-                            score = snapshot_scores.get(assessment["id"])
-                            # Missing = score not recorded at all (None or key doesn't exist)
-                            # NOT missing if score is 0 or any other number (including 0)
-                            if score is None:
-                                missing_assessments.append(assessment["name"])
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to get missing assessments for class {cls['id']}: {e}"
-                    )
-                    missing_assessments = []
-
-                # Format class name
-                formatted_year = cls["year"][-2:] if cls["year"] else "XX"
-                formatted_semester = (
-                    "1"
-                    if cls["semester"] and "1st" in cls["semester"].lower()
-                    else (
-                        "2"
-                        if cls["semester"] and "2nd" in cls["semester"].lower()
-                        else "1"
-                    )
-                )
-                subject_code = cls.get('subject_code', '')
-                subject = cls.get('subject', '')
-                track = cls.get('track', '')
-                subject_part = f" ({subject_code} - {subject})" if subject_code and subject else ""
-                class_name = f"{formatted_year}-{formatted_semester} {cls['course']} {cls['section']}-{track}{subject_part}"
-
-                # Get released grades for this class
-                released_grades = []
-                try:
-                    cursor.execute(
-                        "SELECT final_grade, equivalent, released_at FROM released_grades WHERE class_id = %s AND student_id = %s AND status = 'released'",
-                        (cls["id"], student_id),
-                    )
-                    released_rows = cursor.fetchall()
-                    for row in released_rows:
-                        released_grades.append(
-                            {
-                                "final_grade": row["final_grade"],
-                                "equivalent": row["equivalent"],
-                                "released_at": (
-                                    row["released_at"].isoformat()
-                                    if row["released_at"]
-                                    else None
-                                ),
-                            }
-                        )
-                    
-                    # If there are released grades, don't show missing assessments
-                    # (The grade has been finalized, so any past missing assessments should be resolved)
-                    if released_grades:
-                        missing_assessments = []
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to get released grades for class {cls['id']}: {e}"
-                    )
-                    released_grades = []
-
-                classes.append(
-                    {
-                        "class_id": class_name,
-                        "class_name": class_name,
-                        "missing_assessments": missing_assessments,
-                        "released_grades": released_grades,
-                    }
-                )
-
-        return jsonify({"classes": classes})
+            dashboard = student_dashboard.get(cursor, session["user_id"])
+        if dashboard is None:
+            return jsonify({"error": "Student profile not found"}), 404
+        return jsonify({"classes": student_dashboard.analytics_view(dashboard)})
 
     except Exception as e:
         logger.error(f"Failed to get student analytics: {str(e)}")
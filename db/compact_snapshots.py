@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Move grade_snapshots rows still stored as snapshot_json into compressed
+storage (see utils/snapshot_store.py). Run after migration 0003:
+
+    python db/migrate.py up
+    python db/compact_snapshots.py --dry-run     # count rows and bytes only
+    python db/compact_snapshots.py
+    python db/compact_snapshots.py --class-id 12
+
+Each class is converted in one transaction, oldest version first, so finals
+can be stored as deltas against the previous final. Safe to re-run: only rows
+that still have snapshot_json and no snapshot_blob are touched.
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import snapshot_store
+from utils.db_conn import close_db_connection, get_db_connection
+
+
+def _legacy_classes(cursor, class_ids):
+    where = "snapshot_blob IS NULL AND snapshot_json IS NOT NULL"
+    params = []
+    if class_ids:
+        where += " AND class_id IN (" + ",".join(["%s"] * len(class_ids)) + ")"
+        params.extend(class_ids)
+    cursor.execute(
+        f"SELECT class_id, COUNT(*) AS n, SUM(LENGTH(snapshot_json)) AS bytes "
+        f"FROM grade_snapshots WHERE {where} GROUP BY class_id ORDER BY class_id",
+        params,
+    )
+    return cursor.fetchall() or []
+
+
+def _compact_class(conn, class_id):
+    rows = 0
+    stored = 0
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT id, class_id, version, status, snapshot_json
+            FROM grade_snapshots
+            WHERE class_id = %s AND snapshot_blob IS NULL AND snapshot_json IS NOT NULL
+            ORDER BY version, id
+            FOR UPDATE
+            """,
+            (class_id,),
+        )
+        for row in cursor.fetchall() or []:
+            stored += snapshot_store.rewrite_snapshot(cursor, row)
+            rows += 1
+    conn.commit()
+    return rows, stored
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compress legacy grade snapshots")
+    parser.add_argument("--class-id", type=int, action="append", dest="class_ids")
+    parser.add_argument("--dry-run", action="store_true", help="report only")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    try:
+        conn = get_db_connection()
+    except Exception as e:
+        print(f"Could not connect to the database: {e}")
+        return 2
+
+    try:
+        with conn.cursor() as cursor:
+            if not snapshot_store.storage_available(cursor):
+                print("grade_snapshots has no snapshot_blob column; run db/migrate.py up first.")
+                return 1
+            classes = _legacy_classes(cursor, args.class_ids)
+
+        total_rows = sum(int(c["n"]) for c in classes)
+        total_bytes = sum(int(c["bytes"] or 0) for c in classes)
+        print(f"{total_rows} legacy snapshot(s) in {len(classes)} class(es), {total_bytes} bytes of JSON")
+        if args.dry_run or not classes:
+            return 0
+
+        failed = 0
+        stored_bytes = 0
+        for c in classes:
+            try:
+                rows, stored = _compact_class(conn, c["class_id"])
+                stored_bytes += stored
+                print(f"  class {c['class_id']}: {rows} row(s), {c['bytes']} -> {stored} bytes")
+            except Exception as e:
+                conn.rollback()
+                failed += 1
+                print(f"  class {c['class_id']}: FAILED ({e})")
+        print(f"Done: {total_bytes} -> {stored_bytes} bytes, {failed} class(es) failed")
+        return 1 if failed else 0
+    finally:
+        close_db_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,6 +29,49 @@ CREATE DATABASE /*!32312 IF NOT EXISTS*/ `e_class_record` /*!40100 DEFAULT CHARA
 
 USE `e_class_record`;
 
+/*Table structure for table `audit_logs` */
+
+DROP TABLE IF EXISTS `audit_logs`;
+
+CREATE TABLE `audit_logs` (
+    `id` bigint(20) NOT NULL AUTO_INCREMENT,
+    `admin_id` int(11) NOT NULL,
+    `admin_school_id` varchar(20) NOT NULL,
+    `action` varchar(64) NOT NULL,
+    `resource_type` varchar(64) NOT NULL,
+    `resource_id` varchar(64) DEFAULT NULL,
+    `details` text DEFAULT NULL,
+    `ip_address` varchar(45) DEFAULT NULL,
+    `user_agent` varchar(255) DEFAULT NULL,
+    `created_at` datetime NOT NULL DEFAULT current_timestamp(),
+    PRIMARY KEY (`id`),
+    KEY `idx_audit_logs_admin_created` (`admin_id`, `created_at`),
+    KEY `idx_audit_logs_resource` (`resource_type`, `resource_id`),
+    KEY `idx_audit_logs_created` (`created_at`)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci;
+
+/*Data for the table `audit_logs` */
+
+/*Table structure for table `class_rollups` */
+
+DROP TABLE IF EXISTS `class_rollups`;
+
+CREATE TABLE `class_rollups` (
+    `class_id` int(11) NOT NULL,
+    `instructor_id` int(11) NOT NULL,
+    `student_count` int(11) NOT NULL DEFAULT 0,
+    `graded_students` int(11) NOT NULL DEFAULT 0,
+    `final_snapshots` int(11) NOT NULL DEFAULT 0,
+    `released_grades` int(11) NOT NULL DEFAULT 0,
+    `first_released_at` datetime DEFAULT NULL,
+    `last_released_at` datetime DEFAULT NULL,
+    `refreshed_at` datetime NOT NULL,
+    PRIMARY KEY (`class_id`),
+    KEY `idx_class_rollups_instructor` (`instructor_id`)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci;
+
+/*Data for the table `class_rollups` */
+
 /*Table structure for table `classes` */
 
 DROP TABLE IF EXISTS `classes`;
@@ -48,6 +91,7 @@ CREATE TABLE `classes` (
     `schedule` varchar(50) NOT NULL,
     `class_code` varchar(36) NOT NULL,
     `join_code` varchar(6) NOT NULL,
+    `join_code_norm` varchar(6) GENERATED ALWAYS AS (UPPER(`join_code`)) STORED,
     `grading_template_id` int(11) DEFAULT NULL,
     `created_at` datetime DEFAULT current_timestamp(),
     `updated_at` datetime DEFAULT current_timestamp() ON UPDATE current_timestamp(),
@@ -62,11 +106,29 @@ CREATE TABLE `classes` (
     KEY `idx_classes_section` (`section`),
     KEY `idx_classes_class_code` (`class_code`),
     KEY `idx_classes_join_code` (`join_code`),
+    KEY `idx_classes_join_code_norm` (`join_code_norm`),
     CONSTRAINT `classes_ibfk_1` FOREIGN KEY (`instructor_id`) REFERENCES `instructors` (`id`) ON DELETE CASCADE
 ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci;
 
 /*Data for the table `classes` */
 
+/*Table structure for table `department_rollups` */
+
+DROP TABLE IF EXISTS `department_rollups`;
+
+CREATE TABLE `department_rollups` (
+    `department` varchar(100) NOT NULL,
+    `total_classes` int(11) NOT NULL DEFAULT 0,
+    `total_instructors` int(11) NOT NULL DEFAULT 0,
+    `total_students` int(11) NOT NULL DEFAULT 0,
+    `released_classes` int(11) NOT NULL DEFAULT 0,
+    `total_releases` int(11) NOT NULL DEFAULT 0,
+    `refreshed_at` datetime NOT NULL,
+    PRIMARY KEY (`department`)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci;
+
+/*Data for the table `department_rollups` */
+
 /*Table structure for table `grade_assessments` */
 
 DROP TABLE IF EXISTS `grade_assessments`;
@@ -163,13 +225,21 @@ CREATE TABLE `grade_snapshots` (
     `class_id` int(11) NOT NULL,
     `version` int(11) NOT NULL,
     `status` enum('draft', 'final') NOT NULL DEFAULT 'draft',
-    `snapshot_json` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`snapshot_json`)),
+    `snapshot_json` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL CHECK (json_valid(`snapshot_json`)),
+    `encoding` varchar(16) DEFAULT NULL,
+    `snapshot_blob` longblob DEFAULT NULL,
+    `base_snapshot_id` int(11) DEFAULT NULL,
+    `delta_depth` smallint(6) NOT NULL DEFAULT 0,
+    `student_count` int(11) DEFAULT NULL,
+    `assessment_count` int(11) DEFAULT NULL,
+    `class_average` decimal(5,2) DEFAULT NULL,
     `created_by` int(11) NOT NULL,
     `created_at` datetime DEFAULT current_timestamp(),
     `released_at` datetime DEFAULT NULL,
     PRIMARY KEY (`id`),
     KEY `idx_class_version` (`class_id`, `version`),
     KEY `idx_class_status` (`class_id`, `status`),
+    KEY `idx_grade_snapshots_base` (`base_snapshot_id`),
     CONSTRAINT `fk_snapshots_class` FOREIGN KEY (`class_id`) REFERENCES `classes` (`id`)
 ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci;
 
@@ -216,6 +286,7 @@ CREATE TABLE `grade_structures` (
     KEY `idx_grade_structures_structure_name` (`structure_name`),
     KEY `idx_grade_structures_created_by` (`created_by`),
     KEY `idx_grade_structures_is_active` (`is_active`),
+    KEY `idx_grade_structures_class_active` (`class_id`, `is_active`),
     CONSTRAINT `grade_structures_ibfk_1` FOREIGN KEY (`class_id`) REFERENCES `classes` (`id`) ON DELETE CASCADE,
     CONSTRAINT `grade_structures_ibfk_2` FOREIGN KEY (`created_by`) REFERENCES `instructors` (`id`) ON DELETE CASCADE
 ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci;
@@ -275,6 +346,24 @@ CREATE TABLE `instructors` (
 
 /*Data for the table `instructors` */
 
+/*Table structure for table `instructor_rollups` */
+
+DROP TABLE IF EXISTS `instructor_rollups`;
+
+CREATE TABLE `instructor_rollups` (
+    `instructor_id` int(11) NOT NULL,
+    `department` varchar(100) DEFAULT NULL,
+    `total_classes` int(11) NOT NULL DEFAULT 0,
+    `total_snapshots` int(11) NOT NULL DEFAULT 0,
+    `total_releases` int(11) NOT NULL DEFAULT 0,
+    `enrolled_students` int(11) NOT NULL DEFAULT 0,
+    `avg_students_per_class` decimal(8, 1) NOT NULL DEFAULT 0,
+    `refreshed_at` datetime NOT NULL,
+    PRIMARY KEY (`instructor_id`)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci;
+
+/*Data for the table `instructor_rollups` */
+
 /*Table structure for table `login_tracker` */
 
 DROP TABLE IF EXISTS `login_tracker`;
@@ -415,6 +504,7 @@ CREATE TABLE `released_grades` (
     `overall_percentage` decimal(6, 3) DEFAULT NULL,
     `status` varchar(20) NOT NULL DEFAULT 'released',
     `grade_payload` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL CHECK (json_valid(`grade_payload`)),
+    `student_view` longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL,
     `released_by` int(11) DEFAULT NULL,
     `released_at` datetime DEFAULT current_timestamp(),
     `created_at` datetime NOT NULL DEFAULT current_timestamp(),
@@ -422,6 +512,7 @@ CREATE TABLE `released_grades` (
     PRIMARY KEY (`id`),
     UNIQUE KEY `uk_released_grades_class_student` (`class_id`, `student_id`),
     KEY `idx_released_grades_snapshot_id` (`snapshot_id`),
+    KEY `idx_released_grades_class_student_status` (`class_id`, `student_id`, `status`),
     KEY `idx_released_grades_status` (`status`),
     KEY `idx_released_grades_released_at` (`released_at`),
     KEY `released_grades_student_fk` (`student_id`),
@@ -456,6 +547,7 @@ CREATE TABLE `student_classes` (
     UNIQUE KEY `unique_student_class` (`student_id`, `class_id`),
     KEY `idx_student_classes_student_id` (`student_id`),
     KEY `idx_student_classes_class_id` (`class_id`),
+    KEY `idx_student_classes_class_status` (`class_id`, `status`),
     KEY `idx_student_classes_joined_at` (`joined_at`),
     KEY `idx_status` (`status`),
     KEY `idx_approved_by` (`approved_by`),
@@ -515,6 +607,7 @@ CREATE TABLE `student_scores` (
     PRIMARY KEY (`id`),
     KEY `idx_student_scores_assessment_id` (`assessment_id`),
     KEY `idx_student_scores_student_id` (`student_id`),
+    KEY `idx_student_scores_student_assessment` (`student_id`, `assessment_id`),
     CONSTRAINT `student_scores_fk_assessment_id` FOREIGN KEY (`assessment_id`) REFERENCES `grade_assessments` (`id`) ON DELETE CASCADE,
     CONSTRAINT `student_scores_ibfk_2` FOREIGN KEY (`student_id`) REFERENCES `students` (`id`) ON DELETE CASCADE
 ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci;
@@ -544,6 +637,7 @@ CREATE TABLE `students` (
     `id_front_path` varchar(255) DEFAULT NULL,
     `id_back_path` varchar(255) DEFAULT NULL,
     `face_photo_path` varchar(255) DEFAULT NULL,
+    `photo_variants` longtext DEFAULT NULL,
     `created_at` datetime DEFAULT current_timestamp(),
     PRIMARY KEY (`id`),
     KEY `idx_students_user_id` (`user_id`),
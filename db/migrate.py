@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Apply versioned schema migrations from db/migrations/.
+
+Uses the same database settings as the app (.env / ENVIRONMENT):
+
+    python db/migrate.py status          # list applied / pending / changed
+    python db/migrate.py up              # apply everything pending
+    python db/migrate.py up --dry-run    # show what would run
+    python db/migrate.py up --target 0001
+
+Then check that the hot queries use their indexes:
+
+    python db/verify_indexes.py
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.db_conn import close_db_connection, get_db_connection
+from utils.migrations import (
+    MigrationError,
+    ensure_ledger,
+    migration_status,
+    run_migrations,
+)
+
+
+def _status(conn):
+    with conn.cursor() as cursor:
+        ensure_ledger(cursor)
+        status = migration_status(cursor)
+    conn.commit()
+    if not status:
+        print("No migrations found in db/migrations/")
+        return 0
+    for m, state in status:
+        print(f"  [{state:<7}] {os.path.basename(m.path)}")
+    return 1 if any(state == "changed" for _, state in status) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply schema migrations")
+    parser.add_argument("command", choices=["status", "up"], nargs="?", default="status")
+    parser.add_argument("--target", help="stop after this version (e.g. 0002)")
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations only")
+    parser.add_argument(
+        "--allow-changed",
+        action="store_true",
+        help="run even if an applied migration file was edited",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+
+    try:
+        conn = get_db_connection()
+    except Exception as e:
+        print(f"Could not connect to the database: {e}")
+        return 2
+
+    try:
+        if args.command == "status":
+            return _status(conn)
+
+        migrations = run_migrations(
+            conn,
+            target=args.target,
+            dry_run=args.dry_run,
+            allow_changed=args.allow_changed,
+        )
+        if not migrations:
+            print("Schema is up to date.")
+        for m in migrations:
+            verb = "Would apply" if args.dry_run else "Applied"
+            print(f"  {verb} {os.path.basename(m.path)}")
+        return 0
+    except MigrationError as e:
+        print(f"Migration error: {e}")
+        return 1
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        return 1
+    finally:
+        close_db_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""Composite indexes for the hottest query shapes.
+
+- student_scores(student_id, assessment_id): per-student score reads during
+  compute/release and the score upsert lookup.
+- student_classes(class_id, status): approved/pending roster per class.
+- grade_structures(class_id, is_active): the active structure of a class.
+- released_grades(class_id, student_id, status): student grade view and the
+  per-class release list (class_id prefix).
+"""
+
+from utils.migrations import ensure_index
+
+
+def upgrade(cursor):
+    ensure_index(
+        cursor,
+        "student_scores",
+        "idx_student_scores_student_assessment",
+        ["student_id", "assessment_id"],
+    )
+    ensure_index(
+        cursor,
+        "student_classes",
+        "idx_student_classes_class_status",
+        ["class_id", "status"],
+    )
+    ensure_index(
+        cursor,
+        "grade_structures",
+        "idx_grade_structures_class_active",
+        ["class_id", "is_active"],
+    )
+    ensure_index(
+        cursor,
+        "released_grades",
+        "idx_released_grades_class_student_status",
+        ["class_id", "student_id", "status"],
+    )
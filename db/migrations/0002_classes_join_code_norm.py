@@ -0,0 +1,18 @@
+"""Indexed, upper-cased copy of classes.join_code.
+
+join_class looked classes up with UPPER(join_code) = %s, which cannot use the
+join_code index. join_code_norm is a stored generated column, so it is always
+in sync and can be indexed.
+"""
+
+from utils.migrations import ensure_column, ensure_index
+
+
+def upgrade(cursor):
+    ensure_column(
+        cursor,
+        "classes",
+        "join_code_norm",
+        "varchar(6) GENERATED ALWAYS AS (UPPER(`join_code`)) STORED AFTER `join_code`",
+    )
+    ensure_index(cursor, "classes", "idx_classes_join_code_norm", ["join_code_norm"])
@@ -0,0 +1,36 @@
+"""Compressed grade_snapshots storage with summary columns.
+
+New snapshots are written by utils.snapshot_store into snapshot_blob
+(columnar, zlib/zstd, optionally a delta against base_snapshot_id) and leave
+snapshot_json NULL, so that column becomes nullable. The summary columns let
+snapshot listings skip the document entirely. Existing rows keep their JSON
+until db/compact_snapshots.py converts them.
+"""
+
+from utils.migrations import ensure_column, ensure_index
+
+
+def upgrade(cursor):
+    cursor.execute(
+        """
+        SELECT IS_NULLABLE FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'grade_snapshots'
+          AND COLUMN_NAME = 'snapshot_json'
+        """
+    )
+    row = cursor.fetchone() or {}
+    if row.get("IS_NULLABLE") == "NO":
+        cursor.execute(
+            "ALTER TABLE `grade_snapshots` MODIFY `snapshot_json` longtext "
+            "CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NULL "
+            "CHECK (json_valid(`snapshot_json`))"
+        )
+
+    ensure_column(cursor, "grade_snapshots", "encoding", "varchar(16) DEFAULT NULL AFTER `snapshot_json`")
+    ensure_column(cursor, "grade_snapshots", "snapshot_blob", "longblob DEFAULT NULL AFTER `encoding`")
+    ensure_column(cursor, "grade_snapshots", "base_snapshot_id", "int(11) DEFAULT NULL AFTER `snapshot_blob`")
+    ensure_column(cursor, "grade_snapshots", "delta_depth", "smallint(6) NOT NULL DEFAULT 0 AFTER `base_snapshot_id`")
+    ensure_column(cursor, "grade_snapshots", "student_count", "int(11) DEFAULT NULL AFTER `delta_depth`")
+    ensure_column(cursor, "grade_snapshots", "assessment_count", "int(11) DEFAULT NULL AFTER `student_count`")
+    ensure_column(cursor, "grade_snapshots", "class_average", "decimal(5,2) DEFAULT NULL AFTER `assessment_count`")
+    ensure_index(cursor, "grade_snapshots", "idx_grade_snapshots_base", ["base_snapshot_id"])
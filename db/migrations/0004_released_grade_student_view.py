@@ -0,0 +1,18 @@
+"""Stored student-facing grade document per released grade.
+
+released_grades.student_view holds the document get_student_class_grades
+returns (score breakdown merged into the structure, computed summary). It is
+written at release time by utils.student_grade_views; NULL rows are built on
+first read.
+"""
+
+from utils.migrations import ensure_column
+
+
+def upgrade(cursor):
+    ensure_column(
+        cursor,
+        "released_grades",
+        "student_view",
+        "longtext CHARACTER SET utf8mb4 COLLATE utf8mb4_bin DEFAULT NULL AFTER `grade_payload`",
+    )
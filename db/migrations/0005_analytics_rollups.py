@@ -0,0 +1,61 @@
+"""Rollup tables for the admin analytics endpoints (utils/analytics_rollups.py).
+
+The tables start empty; the app's background refresher fills them on its
+first full refresh, or run:
+
+    python -c "from utils.analytics_rollups import RollupRefresher; RollupRefresher().run_once(full=True)"
+"""
+
+from utils.migrations import table_exists
+
+
+def upgrade(cursor):
+    if not table_exists(cursor, "class_rollups"):
+        cursor.execute(
+            """
+            CREATE TABLE `class_rollups` (
+                `class_id` int(11) NOT NULL,
+                `instructor_id` int(11) NOT NULL,
+                `student_count` int(11) NOT NULL DEFAULT 0,
+                `graded_students` int(11) NOT NULL DEFAULT 0,
+                `final_snapshots` int(11) NOT NULL DEFAULT 0,
+                `released_grades` int(11) NOT NULL DEFAULT 0,
+                `first_released_at` datetime DEFAULT NULL,
+                `last_released_at` datetime DEFAULT NULL,
+                `refreshed_at` datetime NOT NULL,
+                PRIMARY KEY (`class_id`),
+                KEY `idx_class_rollups_instructor` (`instructor_id`)
+            ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci
+            """
+        )
+    if not table_exists(cursor, "instructor_rollups"):
+        cursor.execute(
+            """
+            CREATE TABLE `instructor_rollups` (
+                `instructor_id` int(11) NOT NULL,
+                `department` varchar(100) DEFAULT NULL,
+                `total_classes` int(11) NOT NULL DEFAULT 0,
+                `total_snapshots` int(11) NOT NULL DEFAULT 0,
+                `total_releases` int(11) NOT NULL DEFAULT 0,
+                `enrolled_students` int(11) NOT NULL DEFAULT 0,
+                `avg_students_per_class` decimal(8, 1) NOT NULL DEFAULT 0,
+                `refreshed_at` datetime NOT NULL,
+                PRIMARY KEY (`instructor_id`)
+            ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci
+            """
+        )
+    if not table_exists(cursor, "department_rollups"):
+        cursor.execute(
+            """
+            CREATE TABLE `department_rollups` (
+                `department` varchar(100) NOT NULL,
+                `total_classes` int(11) NOT NULL DEFAULT 0,
+                `total_instructors` int(11) NOT NULL DEFAULT 0,
+                `total_students` int(11) NOT NULL DEFAULT 0,
+                `released_classes` int(11) NOT NULL DEFAULT 0,
+                `total_releases` int(11) NOT NULL DEFAULT 0,
+                `refreshed_at` datetime NOT NULL,
+                PRIMARY KEY (`department`)
+            ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci
+            """
+        )
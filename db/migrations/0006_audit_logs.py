@@ -0,0 +1,27 @@
+"""audit_logs table written by utils.auth_utils.log_admin_action (utils/audit_log.py)."""
+
+from utils.migrations import table_exists
+
+
+def upgrade(cursor):
+    if not table_exists(cursor, "audit_logs"):
+        cursor.execute(
+            """
+            CREATE TABLE `audit_logs` (
+                `id` bigint(20) NOT NULL AUTO_INCREMENT,
+                `admin_id` int(11) NOT NULL,
+                `admin_school_id` varchar(20) NOT NULL,
+                `action` varchar(64) NOT NULL,
+                `resource_type` varchar(64) NOT NULL,
+                `resource_id` varchar(64) DEFAULT NULL,
+                `details` text DEFAULT NULL,
+                `ip_address` varchar(45) DEFAULT NULL,
+                `user_agent` varchar(255) DEFAULT NULL,
+                `created_at` datetime NOT NULL DEFAULT current_timestamp(),
+                PRIMARY KEY (`id`),
+                KEY `idx_audit_logs_admin_created` (`admin_id`, `created_at`),
+                KEY `idx_audit_logs_resource` (`resource_type`, `resource_id`),
+                KEY `idx_audit_logs_created` (`created_at`)
+            ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci
+            """
+        )
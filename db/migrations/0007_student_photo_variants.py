@@ -0,0 +1,9 @@
+"""students.photo_variants: JSON map of registration photo column to the
+review/thumbnail variant names written by utils.image_pipeline. NULL until
+the pipeline has processed the row; app startup backfills those."""
+
+from utils.migrations import ensure_column
+
+
+def upgrade(cursor):
+    ensure_column(cursor, "students", "photo_variants", "longtext DEFAULT NULL AFTER `face_photo_path`")
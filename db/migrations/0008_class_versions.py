@@ -0,0 +1,18 @@
+"""class_versions: per-class write counter bumped by every grade, roster and
+structure write in its own transaction (utils/class_versions.py). It feeds
+the live version / ETags and the grade store's freshness check."""
+
+from utils.migrations import table_exists
+
+
+def upgrade(cursor):
+    if not table_exists(cursor, "class_versions"):
+        cursor.execute(
+            """
+            CREATE TABLE `class_versions` (
+                `class_id` int(11) NOT NULL,
+                `version` bigint(20) NOT NULL DEFAULT 0,
+                PRIMARY KEY (`class_id`)
+            ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci
+            """
+        )
@@ -0,0 +1,29 @@
+"""admin_jobs: status, counters and errors of background admin jobs (roster
+imports, bulk student actions), written by the worker running the job and
+read by whichever worker serves the status poll (utils/admin_jobs.py)."""
+
+from utils.migrations import table_exists
+
+
+def upgrade(cursor):
+    if not table_exists(cursor, "admin_jobs"):
+        cursor.execute(
+            """
+            CREATE TABLE `admin_jobs` (
+                `id` char(32) NOT NULL,
+                `kind` varchar(32) NOT NULL,
+                `status` varchar(20) NOT NULL,
+                `message` text DEFAULT NULL,
+                `admin` varchar(20) DEFAULT NULL,
+                `host` varchar(255) NOT NULL,
+                `pid` int(11) NOT NULL,
+                `state` text NOT NULL,
+                `errors` longtext DEFAULT NULL,
+                `started_at` datetime NOT NULL,
+                `updated_at` datetime NOT NULL,
+                `finished_at` datetime DEFAULT NULL,
+                PRIMARY KEY (`id`),
+                KEY `idx_admin_jobs_status_updated` (`status`, `updated_at`)
+            ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_unicode_ci
+            """
+        )
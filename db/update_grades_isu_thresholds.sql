@@ -1,3 +1,5 @@
+-- Superseded: thresholds now live in utils/grading_scales.py and released
+-- grades are recomputed with `python recalculate_grades.py`. Kept for reference.
 -- Update released grades with new ISU thresholds
 -- New Thresholds:
 -- 98+ → 1.0
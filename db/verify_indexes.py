@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN the hot query shapes and fail if any of them scans a whole table.
+
+    python db/verify_indexes.py              # exit 1 on any full scan
+    python db/verify_indexes.py --min-rows 50
+
+On a nearly empty database the optimizer may prefer a scan even when an index
+exists; --min-rows only reports (without failing) scans of tables whose row
+estimate is below that number.
+
+Run after `python db/migrate.py up`, and add an entry to HOT_QUERIES whenever a
+new per-request query is introduced.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.db_conn import close_db_connection, get_db_connection
+
+# (label, SQL, sample params). Parameter values only need the right type.
+HOT_QUERIES = [
+    (
+        "student scores for one class (compute/release)",
+        "SELECT assessment_id, score FROM student_scores "
+        "WHERE student_id = %s AND assessment_id IN (%s, %s, %s)",
+        (1, 1, 2, 3),
+    ),
+    (
+        "score upsert lookup",
+        "SELECT id FROM student_scores WHERE assessment_id = %s AND student_id = %s",
+        (1, 1),
+    ),
+    (
+        "approved roster",
+        "SELECT student_id FROM student_classes WHERE class_id = %s AND status = 'approved'",
+        (1,),
+    ),
+    (
+        "student's enrollments",
+        "SELECT class_id, status FROM student_classes WHERE student_id = %s",
+        (1,),
+    ),
+    (
+        "active grade structure",
+        "SELECT structure_json FROM grade_structures WHERE class_id = %s AND is_active = 1",
+        (1,),
+    ),
+    (
+        "student released grade",
+        "SELECT final_grade, equivalent FROM released_grades "
+        "WHERE class_id = %s AND student_id = %s AND status = 'released'",
+        (1, 1),
+    ),
+    (
+        "class release list",
+        "SELECT student_id, final_grade FROM released_grades "
+        "WHERE class_id = %s AND status = 'released'",
+        (1,),
+    ),
+    (
+        "join class by code",
+        "SELECT id FROM classes WHERE join_code_norm = %s",
+        ("ABC123",),
+    ),
+]
+
+
+def _row_value(row, *keys):
+    for key in keys:
+        if key in row:
+            return row[key]
+    return None
+
+
+def explain(cursor, sql, params):
+    cursor.execute("EXPLAIN " + sql, params)
+    return cursor.fetchall() or []
+
+
+def find_full_scans(plan):
+    """Return (table, estimated_rows) for every plan row with access type ALL."""
+    scans = []
+    for row in plan:
+        access = str(_row_value(row, "type", "access_type") or "").upper()
+        if access == "ALL":
+            scans.append(
+                (_row_value(row, "table") or "?", int(_row_value(row, "rows") or 0))
+            )
+    return scans
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify hot queries use indexes")
+    parser.add_argument(
+        "--min-rows",
+        type=int,
+        default=0,
+        help="ignore full scans of tables estimated below this many rows",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        conn = get_db_connection()
+    except Exception as e:
+        print(f"Could not connect to the database: {e}")
+        return 2
+
+    failures = 0
+    try:
+        with conn.cursor() as cursor:
+            for label, sql, params in HOT_QUERIES:
+                try:
+                    plan = explain(cursor, sql, params)
+                except Exception as e:
+                    print(f"  [ERROR] {label}: {e}")
+                    failures += 1
+                    continue
+
+                scans = find_full_scans(plan)
+                blocking = [s for s in scans if s[1] >= args.min_rows]
+                if blocking:
+                    failures += 1
+                    detail = ", ".join(f"{t} (~{r} rows)" for t, r in blocking)
+                    print(f"  [SCAN ] {label}: full scan of {detail}")
+                elif scans:
+                    detail = ", ".join(f"{t} (~{r} rows)" for t, r in scans)
+                    print(f"  [small] {label}: full scan of {detail} ignored")
+                else:
+                    keys = ", ".join(
+                        f"{_row_value(r, 'table')}:{_row_value(r, 'key')}" for r in plan
+                    )
+                    print(f"  [ok   ] {label}: {keys}")
+    finally:
+        close_db_connection()
+
+    if failures:
+        print(f"\n{failures} hot quer{'y' if failures == 1 else 'ies'} not covered by an index.")
+        print("Run `python db/migrate.py up` and re-check.")
+        return 1
+    print("\nAll hot queries use an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
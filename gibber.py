@@ -1,6 +1,9 @@
+import threading
+import time
+from collections import OrderedDict
 from flask import current_app
 from itsdangerous import URLSafeTimedSerializer, BadData, SignatureExpired
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 try:
     from cryptography.fernet import Fernet, InvalidToken as FernetInvalid
@@ -52,6 +55,93 @@ def _make_payload(path: str, qs: Optional[str]) -> Dict[str, Any]:
     return {"path": path, "qs": qs or ""}
 
 
+# Used when GIBBER_MAX_AGE is not configured (tokens never expire).
+_DEFAULT_CACHE_TTL = 300
+_DEFAULT_CACHE_SIZE = 1024
+
+
+class TTLCache:
+    """Small thread-safe LRU cache whose entries carry their own expiry time."""
+
+    def __init__(self, maxsize: int = _DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                self._data.pop(key, None)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# path+qs -> token, and token -> payload. Tokens are not user-bound (anyone
+# holding one can already resolve it), so sharing them across requests is safe.
+_token_cache = TTLCache()
+_payload_cache = TTLCache()
+
+
+def _cache_enabled() -> bool:
+    try:
+        return bool(current_app.config.get("GIBBER_CACHE_ENABLED", True))
+    except RuntimeError:
+        return False
+
+
+def _max_age() -> Optional[int]:
+    try:
+        return current_app.config.get("GIBBER_MAX_AGE")
+    except RuntimeError:
+        return None
+
+
+def _token_reuse_ttl() -> float:
+    """How long a minted token may be handed out again.
+
+    Half of GIBBER_MAX_AGE, so a reused token always has at least half of its
+    lifetime left when the browser follows the redirect.
+    """
+    max_age = _max_age()
+    if max_age:
+        return max(float(max_age) / 2.0, 0.0)
+    return float(_DEFAULT_CACHE_TTL)
+
+
+def set_cache_size(maxsize: int):
+    """Resize the token caches (GIBBER_CACHE_SIZE)."""
+    for cache in (_token_cache, _payload_cache):
+        cache.maxsize = max(int(maxsize), 1)
+
+
+def clear_caches():
+    """Drop all cached tokens and payloads (e.g. after rotating keys)."""
+    _token_cache.clear()
+    _payload_cache.clear()
+
+
 def gibberize(
     path: str, qs: Optional[str] = None, expires: Optional[int] = None
 ) -> str:
@@ -60,20 +150,44 @@ def gibberize(
     - `expires` is not embedded in the token but is used when resolving (max_age).
     - If `GIBBER_FERNET_KEY` is configured, the signed token is additionally encrypted with Fernet.
     """
+    use_cache = _cache_enabled()
+    # Keyed by secret too, so rotating SECRET_KEY never serves stale tokens.
+    cache_key = (_get_secret(), path, qs or "")
+    if use_cache:
+        cached = _token_cache.get(cache_key)
+        if cached:
+            return cached
+
     s = _get_serializer()
     payload = _make_payload(path, qs)
     token = s.dumps(payload)
     f = _get_fernet()
     if f:
         token = f.encrypt(token.encode()).decode()
+
+    if use_cache:
+        _token_cache.put(cache_key, token, _token_reuse_ttl())
+        # The token was minted just now, so it stays valid for the full max age.
+        max_age = _max_age()
+        ttl = float(max_age) if max_age else float(_DEFAULT_CACHE_TTL)
+        _payload_cache.put((cache_key[0], token), payload, ttl)
     return token
 
 
 def resolve(token: str, max_age: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """Resolve a token back into payload {path, qs}.
 
-    Returns dict on success or None on failure/expiration.
+    Returns dict on success or None on failure/expiration. Successfully
+    resolved tokens are cached until they would expire, so repeat hits skip
+    the signature check and Fernet decryption.
     """
+    use_cache = _cache_enabled()
+    if use_cache:
+        cache_key = (_get_secret(), token)
+        cached = _payload_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
     f = _get_fernet()
     try:
         if f:
@@ -85,8 +199,15 @@ def resolve(token: str, max_age: Optional[int] = None) -> Optional[Dict[str, Any
 
     s = _get_serializer()
     try:
-        data = s.loads(token, max_age=max_age) if max_age else s.loads(token)
+        if max_age:
+            data, signed_at = s.loads(token, max_age=max_age, return_timestamp=True)
+            remaining = float(max_age) - (time.time() - signed_at.timestamp())
+        else:
+            data = s.loads(token)
+            remaining = float(_DEFAULT_CACHE_TTL)
         if isinstance(data, dict) and "path" in data:
+            if use_cache:
+                _payload_cache.put(cache_key, dict(data), remaining)
             return data
         return None
     except SignatureExpired:
@@ -1,99 +1,332 @@
 #!/usr/bin/env python3
 """
-Script to clear released grades so they can be recalculated with new ISU thresholds
-Run this before instructors re-release grades
+Recompute released grades in place after a grading-scale or formula change.
+
+Every class with released_grades rows is recomputed with the same code the
+Release Grades page uses (compute_release_rows), and only rows whose values
+changed are rewritten, together with their stored student grade view. Release
+status, release date and snapshot links are kept, so instructors do not have
+to re-release anything.
+
+    python recalculate_grades.py --dry-run            # show what would change
+    python recalculate_grades.py                      # rewrite changed rows
+    python recalculate_grades.py --workers 8
+    python recalculate_grades.py --class-id 12 --class-id 15
+    python recalculate_grades.py --resume             # skip classes finished last run
+
+Each class is one transaction (rows are locked while it is recomputed), so an
+interrupted run can simply be started again; --resume additionally skips the
+classes recorded in the state file.
 """
 
+import argparse
+import json
 import os
 import sys
-from dotenv import load_dotenv
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from decimal import Decimal
 
 # Load environment variables
+from dotenv import load_dotenv
+
 load_dotenv()
 
-import mysql.connector
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+DEFAULT_STATE_FILE = ".recalculate_grades_state.json"
+COMPARED_FIELDS = ("final_grade", "equivalent", "remarks", "overall_percentage")
+
+
+def _norm_number(value):
+    if value is None:
+        return None
+    try:
+        return round(float(value), 2)
+    except (TypeError, ValueError):
+        return None
+
+
+def _norm_payload(value):
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        value = value.decode("utf-8")
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    # Round-trip so floats/ints compare the way they are stored.
+    return json.loads(json.dumps(value, default=str))
+
+
+def diff_release_row(existing: dict, computed: dict) -> dict:
+    """Return {field: (old, new)} for the columns that would change.
+
+    A changed grade_payload is reported as {"grade_payload": None}.
+    """
+    changes = {}
+    for field in COMPARED_FIELDS:
+        old, new = existing.get(field), computed.get(field)
+        if field in ("final_grade", "overall_percentage"):
+            old, new = _norm_number(old), _norm_number(new)
+        else:
+            old = None if old is None else str(old)
+            new = None if new is None else str(new)
+        if old != new:
+            changes[field] = (old, new)
+    if _norm_payload(existing.get("grade_payload")) != _norm_payload(
+        computed.get("payload")
+    ):
+        changes["grade_payload"] = None
+    return changes
+
+
+def recalculate_class(class_id: int, dry_run: bool = False) -> dict:
+    """Recompute one class in its own transaction. Runs inside a worker process."""
+    # Imported here so each worker opens its own thread-local connection.
+    from blueprints.instructor_routes import compute_release_rows
+    from utils import class_versions
+    from utils.db_conn import get_db_connection
+    from utils.student_grade_views import build_views, store_views, views_available
+
+    conn = get_db_connection()
+    result = {"class_id": class_id, "checked": 0, "changes": {}, "error": None}
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT student_id, final_grade, equivalent, remarks,
+                       overall_percentage, grade_payload
+                FROM released_grades
+                WHERE class_id = %s
+                {"" if dry_run else "FOR UPDATE"}
+                """,
+                (class_id,),
+            )
+            existing = {int(r["student_id"]): r for r in cursor.fetchall() or []}
+            if not existing:
+                conn.rollback()
+                return result
+
+            computed = compute_release_rows(cursor, class_id, list(existing))
+            if not computed.get("success"):
+                conn.rollback()
+                result["error"] = computed.get("error")
+                return result
+
+            for row in computed["rows"]:
+                sid = row["student_id"]
+                result["checked"] += 1
+                changes = diff_release_row(existing.get(sid, {}), row)
+                if not changes:
+                    continue
+                result["changes"][sid] = changes
+                if dry_run:
+                    continue
+                cursor.execute(
+                    """
+                    UPDATE released_grades
+                    SET final_grade = %s,
+                        equivalent = %s,
+                        remarks = %s,
+                        overall_percentage = %s,
+                        grade_payload = %s,
+                        updated_at = NOW()
+                    WHERE class_id = %s AND student_id = %s
+                    """,
+                    (
+                        row["final_grade"],
+                        row["equivalent"],
+                        row["remarks"],
+                        row["overall_percentage"],
+                        json.dumps(row["payload"]),
+                        class_id,
+                        sid,
+                    ),
+                )
+            if not dry_run and result["changes"] and views_available(cursor):
+                store_views(
+                    cursor,
+                    class_id,
+                    build_views(
+                        cursor,
+                        class_id,
+                        {
+                            row["student_id"]: row["payload"]
+                            for row in computed["rows"]
+                            if row["student_id"] in result["changes"]
+                        },
+                    ),
+                )
+            if not dry_run and result["changes"]:
+                class_versions.bump(cursor, class_id)
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    except Exception as e:
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+        result["error"] = str(e)
+    return result
+
+
+def _affected_class_ids(only_ids=None) -> list:
+    from utils.db_conn import close_db_connection, get_db_connection
 
-def get_connection():
-    """Get database connection from environment variables"""
-    return mysql.connector.connect(
-        host=os.getenv('DB_HOST'),
-        user=os.getenv('DB_USER'),
-        password=os.getenv('DB_PASSWORD'),
-        database=os.getenv('DB_NAME')
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT class_id FROM released_grades ORDER BY class_id"
+            )
+            ids = [int(r["class_id"]) for r in cursor.fetchall() or []]
+        conn.rollback()
+    finally:
+        close_db_connection()
+    if only_ids:
+        wanted = set(only_ids)
+        ids = [cid for cid in ids if cid in wanted]
+    return ids
+
+
+def _load_state(path: str) -> set:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return set(int(cid) for cid in json.load(f).get("completed", []))
+    except FileNotFoundError:
+        return set()
+    except Exception as e:
+        print(f"Ignoring unreadable state file {path}: {e}")
+        return set()
+
+
+def _save_state(path: str, completed: set):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"completed": sorted(completed), "updated_at": time.time()}, f)
+    os.replace(tmp, path)
+
+
+def _fmt(value):
+    if isinstance(value, Decimal):
+        value = float(value)
+    return "NULL" if value is None else str(value)
+
+
+def _print_changes(result: dict, limit: int):
+    shown = 0
+    for sid, changes in result["changes"].items():
+        if shown >= limit:
+            remaining = len(result["changes"]) - shown
+            print(f"      … {remaining} more student(s)")
+            break
+        detail = ", ".join(
+            "payload changed" if values is None else f"{field}: {_fmt(values[0])} -> {_fmt(values[1])}"
+            for field, values in changes.items()
+        )
+        print(f"      student {sid}: {detail}")
+        shown += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recompute released grades in place with the current grading code"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(1, min(4, os.cpu_count() or 1)),
+        help="worker processes (each opens its own DB connection)",
+    )
+    parser.add_argument(
+        "--class-id", type=int, action="append", help="only this class (repeatable)"
     )
+    parser.add_argument("--resume", action="store_true", help="skip classes finished by the last run")
+    parser.add_argument("--state-file", default=DEFAULT_STATE_FILE, help="progress file used by --resume")
+    parser.add_argument("--show", type=int, default=5, help="changed students to print per class")
+    args = parser.parse_args(argv)
 
-def clear_released_grades():
-    """Clear all released grades to force recalculation with new thresholds"""
     try:
-        conn = get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        print("=" * 60)
-        print("GRADE RECALCULATION UTILITY")
-        print("=" * 60)
-        print("\nThis will clear all released grades to recalculate with new ISU thresholds:")
-        print("  Old: 97.5(1.0), 94.5(1.25), 91.5(1.5), etc.")
-        print("  New: 98(1.0), 95(1.25), 92(1.5), etc.")
-        print("\nInstructors will need to re-release grades for them to be recalculated.\n")
-        
-        # Get count of released grades
-        cursor.execute("SELECT COUNT(*) as count FROM released_grades WHERE status = 'released'")
-        result = cursor.fetchone()
-        released_count = result[0] if result else 0
-        
-        if released_count == 0:
-            print("✓ No released grades to clear. System is ready!")
-            cursor.close()
-            conn.close()
-            return True
-        
-        print(f"Found {released_count} released grade(s) to clear.\n")
-        
-        # Ask for confirmation
-        response = input("Proceed with clearing released grades? (yes/no): ").strip().lower()
-        
-        if response not in ['yes', 'y']:
-            print("\nOperation cancelled.")
-            cursor.close()
-            conn.close()
-            return False
-        
-        # Clear released grades by setting status to 'pending'
-        delete_query = "DELETE FROM released_grades WHERE status = 'released'"
-        cursor.execute(delete_query)
-        conn.commit()
-        
-        affected_rows = cursor.rowcount
-        
-        print(f"\n✓ Successfully cleared {affected_rows} released grade(s).")
-        print("\nNext steps:")
-        print("1. Instructors should go to Release Grades page")
-        print("2. Re-release grades - they'll be calculated with new ISU thresholds")
-        print("3. Students will see updated equivalent grades (1.0-5.0 scale)")
-        print("\nISU Grading Scale (Applied):")
-        print("  98-100  → 1.0 (Excellent)")
-        print("  95-97   → 1.25")
-        print("  92-94   → 1.5")
-        print("  89-91   → 1.75")
-        print("  86-88   → 2.0")
-        print("  83-85   → 2.25")
-        print("  80-82   → 2.5")
-        print("  77-79   → 2.75")
-        print("  75-76   → 3.0")
-        print("  <75     → 5.0 (Failing)")
-        print("=" * 60)
-        
-        cursor.close()
-        conn.close()
-        return True
-        
-    except mysql.connector.Error as err:
-        print(f"❌ Database error: {err}")
-        return False
+        class_ids = _affected_class_ids(args.class_id)
     except Exception as e:
-        print(f"❌ Error: {e}")
-        return False
+        print(f"❌ Could not load classes: {e}")
+        return 1
+
+    completed = _load_state(args.state_file) if args.resume and not args.dry_run else set()
+    todo = [cid for cid in class_ids if cid not in completed]
+
+    print("=" * 60)
+    print("GRADE RECALCULATION UTILITY" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 60)
+    print(
+        f"{len(class_ids)} class(es) with released grades, {len(todo)} to process, "
+        f"{args.workers} worker(s)\n"
+    )
+    if not todo:
+        print("✓ Nothing to do.")
+        return 0
+
+    started = time.time()
+    done = 0
+    total_changed = 0
+    failed = []
+    workers = max(1, args.workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(recalculate_class, cid, args.dry_run): cid for cid in todo
+        }
+        try:
+            for future in as_completed(futures):
+                cid = futures[future]
+                done += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {"class_id": cid, "checked": 0, "changes": {}, "error": str(e)}
+
+                elapsed = time.time() - started
+                eta = elapsed / done * (len(todo) - done)
+                prefix = f"[{done}/{len(todo)} {elapsed:5.0f}s eta {eta:4.0f}s]"
+                if result["error"]:
+                    failed.append(cid)
+                    print(f"{prefix} class {cid}: ❌ {result['error']}")
+                    continue
+
+                changed = len(result["changes"])
+                total_changed += changed
+                print(
+                    f"{prefix} class {cid}: {result['checked']} checked, "
+                    f"{changed} {'would change' if args.dry_run else 'updated'}"
+                )
+                if changed and args.dry_run:
+                    _print_changes(result, args.show)
+                if not args.dry_run:
+                    completed.add(cid)
+                    _save_state(args.state_file, completed)
+        except KeyboardInterrupt:
+            print("\nInterrupted; finished classes are committed. Re-run with --resume.")
+            pool.shutdown(wait=False, cancel_futures=True)
+            return 130
+
+    print("\n" + "=" * 60)
+    verb = "would change" if args.dry_run else "updated"
+    print(f"{total_changed} released grade(s) {verb} in {time.time() - started:.1f}s")
+    if failed:
+        print(f"❌ {len(failed)} class(es) failed: {', '.join(map(str, failed))}")
+        print("   Fix the cause and re-run with --resume.")
+        return 1
+    if not args.dry_run and os.path.exists(args.state_file):
+        os.remove(args.state_file)
+    print("=" * 60)
+    return 0
+
 
 if __name__ == "__main__":
-    success = clear_released_grades()
-    sys.exit(0 if success else 1)
+    sys.exit(main())
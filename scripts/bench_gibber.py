@@ -0,0 +1,88 @@
+"""Micro-benchmark for the auto-gibber navigation layer.
+
+Measures the per-request overhead of minting a token (gibberize), resolving
+it (resolve) and matching the real path against the url_map, with the
+gibber caches disabled and enabled:
+
+    python scripts/bench_gibber.py
+    python scripts/bench_gibber.py --fernet --max-age 300 -n 20000
+
+Uses the real app's url_map, so it needs the same environment as the app
+(SECRET_KEY; a throwaway key is used if none is set).
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("SECRET_KEY", "bench-only-secret")
+
+import gibber  # noqa: E402
+from app import _gib_adapters, _gib_match, _gib_match_cache, app  # noqa: E402
+
+SAMPLE_PATHS = [
+    ("/instructor-dashboard", ""),
+    ("/student-dashboard", ""),
+    ("/instructor/class/12/grades", ""),
+    ("/student/classes/7/grades", "tab=summary"),
+]
+
+
+def _per_call_us(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def _run(label, number, max_age):
+    tokens = [gibber.gibberize(p, qs=q) for p, q in SAMPLE_PATHS]
+
+    def mint():
+        for p, q in SAMPLE_PATHS:
+            gibber.gibberize(p, qs=q)
+
+    def res():
+        for t in tokens:
+            gibber.resolve(t, max_age=max_age)
+
+    def match():
+        for p, _ in SAMPLE_PATHS:
+            _gib_match(p, "GET")
+
+    n = len(SAMPLE_PATHS)
+    print(
+        f"{label:<10} gibberize {_per_call_us(mint, number) / n:8.2f} us"
+        f"   resolve {_per_call_us(res, number) / n:8.2f} us"
+        f"   match {_per_call_us(match, number) / n:8.2f} us"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", type=int, default=5000, help="iterations per timing")
+    parser.add_argument("--max-age", type=int, default=300, help="GIBBER_MAX_AGE")
+    parser.add_argument(
+        "--fernet", action="store_true", help="also encrypt tokens with Fernet"
+    )
+    args = parser.parse_args(argv)
+
+    app.config["GIBBER_MAX_AGE"] = args.max_age or None
+    if args.fernet:
+        from cryptography.fernet import Fernet
+
+        app.config["GIBBER_FERNET_KEY"] = Fernet.generate_key()
+
+    with app.test_request_context("/"):
+        app.config["GIBBER_CACHE_ENABLED"] = False
+        _run("uncached", args.n, args.max_age)
+
+        app.config["GIBBER_CACHE_ENABLED"] = True
+        gibber.clear_caches()
+        _gib_match_cache.clear()
+        _gib_adapters.clear()
+        _run("cached", args.n, args.max_age)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""Fingerprint and precompress static assets into static/dist/.
+
+Run from the repo root after changing anything under static/ (and on every
+deploy, before restarting the app):
+
+    python scripts/build_assets.py            # hash + .gz/.br siblings
+    python scripts/build_assets.py --minify   # also minify CSS (and JS if rjsmin is installed)
+    python scripts/build_assets.py --clean    # wipe static/dist/ first
+
+The app picks the manifest up at startup when STATIC_FINGERPRINT is enabled
+(the default in production). Older hashed files are kept unless --clean is
+given so pages rendered before a deploy can still load their assets.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import sys
+
+# Ensure we can import utils from parent directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.assets import ASSET_BUNDLES, DIST_DIRNAME, MANIFEST_FILENAME
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+try:
+    import rjsmin
+except Exception:
+    rjsmin = None
+
+STATIC_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "static")
+)
+
+# User uploads are runtime content, never build inputs.
+EXCLUDED_DIRS = {DIST_DIRNAME, "uploads"}
+FINGERPRINT_EXTENSIONS = {
+    ".css",
+    ".js",
+    ".json",
+    ".svg",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".ico",
+    ".woff",
+    ".woff2",
+    ".ttf",
+    ".otf",
+}
+COMPRESS_EXTENSIONS = {".css", ".js", ".json", ".svg"}
+COMPRESS_MIN_SIZE = 512
+HASH_LENGTH = 10
+
+_CSS_URL_RE = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+_JS_IMPORT_RE = re.compile(
+    r"((?:\bfrom|\bimport)\s*\(?\s*)(['\"])(\.{1,2}/[^'\"]+)\2"
+)
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def _hashed_name(rel_path: str, digest: str) -> str:
+    root, ext = posixpath.splitext(rel_path)
+    return f"{root}.{digest}{ext}"
+
+
+def _iter_static_files():
+    for root, dirs, files in os.walk(STATIC_DIR):
+        rel_root = os.path.relpath(root, STATIC_DIR)
+        if rel_root == ".":
+            dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() not in FINGERPRINT_EXTENSIONS:
+                continue
+            rel = os.path.relpath(os.path.join(root, name), STATIC_DIR)
+            yield rel.replace(os.sep, "/")
+
+
+def minify_css(text: str) -> str:
+    """Conservative CSS minifier: drops comments and redundant whitespace.
+
+    Quoted strings are copied verbatim and whitespace next to ':' is kept,
+    because `a :hover` and `a:hover` are different selectors.
+    """
+    out = []
+    i = 0
+    n = len(text)
+    pending_space = False
+    while i < n:
+        ch = text[i]
+        if ch in "\"'":
+            j = i + 1
+            while j < n and text[j] != ch:
+                j += 2 if text[j] == "\\" else 1
+            if pending_space and out and not out[-1].endswith(("{", "}", ";", ",", ">")):
+                out.append(" ")
+            pending_space = False
+            out.append(text[i : j + 1])
+            i = j + 1
+            continue
+        if text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch.isspace():
+            pending_space = True
+            i += 1
+            continue
+        if ch in "{};,>":
+            if out and out[-1].endswith(" "):
+                out[-1] = out[-1].rstrip(" ")
+            pending_space = False
+            out.append(ch)
+            i += 1
+            continue
+        if pending_space and out and not out[-1].endswith(("{", "}", ";", ",", ">")):
+            out.append(" ")
+        pending_space = False
+        out.append(ch)
+        i += 1
+    return "".join(out).replace(";}", "}").strip() + "\n"
+
+
+def _relative_target(from_rel: str, ref: str):
+    """Resolve a relative reference inside static/ to its static-relative path."""
+    if ref.startswith(("data:", "http:", "https:", "//", "/", "#")):
+        return None
+    clean = ref.split("?", 1)[0].split("#", 1)[0]
+    return posixpath.normpath(posixpath.join(posixpath.dirname(from_rel), clean))
+
+
+def _rewrite_refs(from_rel: str, text: str, regex, group: int, assets: dict):
+    """Point relative references at hashed siblings; returns (text, unresolved)."""
+    unresolved = set()
+
+    def _sub(match):
+        ref = match.group(group)
+        target = _relative_target(from_rel, ref)
+        if target is None:
+            return match.group(0)
+        if target not in assets:
+            unresolved.add(target)
+            return match.group(0)
+        new_ref = posixpath.relpath(assets[target], posixpath.dirname(from_rel))
+        if ref.startswith("./") and not new_ref.startswith("."):
+            new_ref = "./" + new_ref
+        start, end = match.span(group)
+        whole_start = match.start(0)
+        original = match.group(0)
+        return (
+            original[: start - whole_start] + new_ref + original[end - whole_start :]
+        )
+
+    return regex.sub(_sub, text), unresolved
+
+
+def _write_output(rel_hashed: str, data: bytes, compress: bool, compressed: dict):
+    dest = os.path.join(STATIC_DIR, DIST_DIRNAME, *rel_hashed.split("/"))
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    with open(dest, "wb") as f:
+        f.write(data)
+
+    ext = posixpath.splitext(rel_hashed)[1].lower()
+    if not compress or ext not in COMPRESS_EXTENSIONS or len(data) < COMPRESS_MIN_SIZE:
+        return
+    encodings = []
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        with open(dest + ".gz", "wb") as f:
+            f.write(gz)
+        encodings.append("gzip")
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            with open(dest + ".br", "wb") as f:
+                f.write(br)
+            encodings.append("br")
+    if encodings:
+        compressed[rel_hashed] = encodings
+
+
+def _transform(rel: str, data: bytes, minify: bool, assets: dict):
+    """Apply minification and reference rewriting; returns (bytes, unresolved)."""
+    ext = posixpath.splitext(rel)[1].lower()
+    if ext == ".css":
+        text = data.decode("utf-8")
+        text, unresolved = _rewrite_refs(rel, text, _CSS_URL_RE, 2, assets)
+        if minify:
+            text = minify_css(text)
+        return text.encode("utf-8"), unresolved
+    if ext == ".js":
+        text = data.decode("utf-8")
+        text, unresolved = _rewrite_refs(rel, text, _JS_IMPORT_RE, 3, assets)
+        if minify and rjsmin is not None:
+            text = rjsmin.jsmin(text)
+        return text.encode("utf-8"), unresolved
+    return data, set()
+
+
+def build(minify: bool = False, compress: bool = True, clean: bool = False) -> dict:
+    dist_dir = os.path.join(STATIC_DIR, DIST_DIRNAME)
+    if clean and os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    os.makedirs(dist_dir, exist_ok=True)
+
+    sources = {}
+    for rel in _iter_static_files():
+        with open(os.path.join(STATIC_DIR, *rel.split("/")), "rb") as f:
+            sources[rel] = f.read()
+
+    assets = {}
+    compressed = {}
+
+    # Files referencing other assets (CSS url(), JS relative imports) are
+    # hashed after their dependencies so the hash covers the rewritten refs.
+    pending = dict(sources)
+    while pending:
+        progressed = False
+        for rel in sorted(pending):
+            data, unresolved = _transform(rel, pending[rel], minify, assets)
+            if unresolved & set(pending):
+                continue
+            hashed = _hashed_name(rel, _content_hash(data))
+            _write_output(hashed, data, compress, compressed)
+            assets[rel] = hashed
+            del pending[rel]
+            progressed = True
+        if not progressed:
+            # Circular references: hash the rest without rewriting between them.
+            for rel in sorted(pending):
+                data, _ = _transform(rel, pending[rel], minify, assets)
+                hashed = _hashed_name(rel, _content_hash(data))
+                _write_output(hashed, data, compress, compressed)
+                assets[rel] = hashed
+            pending = {}
+
+    bundles = {}
+    for name, parts in ASSET_BUNDLES.items():
+        missing = [p for p in parts if p not in assets]
+        if missing:
+            print(f"  ! bundle {name} skipped, missing: {', '.join(missing)}")
+            continue
+        chunks = []
+        for part in parts:
+            with open(os.path.join(dist_dir, *assets[part].split("/")), "rb") as f:
+                chunk = f.read()
+            # Relative url() refs were written for the part's own directory.
+            if posixpath.splitext(part)[1] == ".css":
+                chunk = _rebase_css(part, chunk.decode("utf-8")).encode("utf-8")
+            chunks.append(chunk.rstrip(b"\n") + b"\n")
+        data = b"".join(chunks)
+        hashed = _hashed_name(f"bundles/{name}", _content_hash(data))
+        _write_output(hashed, data, compress, compressed)
+        bundles[name] = hashed
+
+    manifest = {"assets": assets, "bundles": bundles, "compressed": compressed}
+    with open(os.path.join(dist_dir, MANIFEST_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def _rebase_css(part: str, text: str) -> str:
+    """Re-point relative url() refs of a hashed CSS part at the bundles/ dir."""
+
+    def _sub(match):
+        ref = match.group(2)
+        if _relative_target(part, ref) is None:
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(part), ref))
+        rebased = posixpath.relpath(target, "bundles")
+        return f"url({match.group(1)}{rebased}{match.group(1)})"
+
+    return _CSS_URL_RE.sub(_sub, text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minify", action="store_true", help="minify CSS/JS")
+    parser.add_argument(
+        "--no-compress", action="store_true", help="skip .gz/.br siblings"
+    )
+    parser.add_argument(
+        "--clean", action="store_true", help="remove static/dist before building"
+    )
+    args = parser.parse_args(argv)
+
+    manifest = build(minify=args.minify, compress=not args.no_compress, clean=args.clean)
+    print(
+        f"Fingerprinted {len(manifest['assets'])} files, "
+        f"{len(manifest['bundles'])} bundles, "
+        f"{len(manifest['compressed'])} precompressed -> static/{DIST_DIRNAME}/"
+    )
+    if brotli is None and not args.no_compress:
+        print("  (brotli not installed: only .gz siblings were written)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""Import-time report for the app, from `python -X importtime`.
+
+Imports the module in a fresh interpreter and lists the modules with the
+largest cumulative import time, plus any heavy libraries (SciPy, NumPy, PDF
+generators) that were pulled in at startup. Passenger spawns and reaps
+workers often, so everything here is paid on every cold start:
+
+    python scripts/import_time_report.py
+    python scripts/import_time_report.py --top 40 --runs 5
+
+Needs the same environment as the app (SECRET_KEY; a throwaway key is used
+if none is set).
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Only analytics, exports and imports need these; they must load on first use.
+HEAVY_MODULES = (
+    "numpy",
+    "scipy",
+    "sklearn",
+    "pandas",
+    "matplotlib",
+    "reportlab",
+    "weasyprint",
+    "openpyxl",
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)$")
+
+
+def measure(module: str = "app") -> dict:
+    """Import `module` in a new interpreter; returns {"total_us", "modules":
+    [(cumulative us, self us, depth, name)]} in import order."""
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "import-time-report")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    modules = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        modules.append((int(cumulative_us), int(self_us), depth, name))
+        if name == module and depth == 0:
+            total_us = int(cumulative_us)
+    return {"total_us": total_us, "modules": modules}
+
+
+def heavy_imports(modules) -> list:
+    """Top-level packages from HEAVY_MODULES that were imported."""
+    found = {name.split(".")[0] for _, _, _, name in modules}
+    return [name for name in HEAVY_MODULES if name in found]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--runs", type=int, default=3, help="report the fastest run")
+    args = parser.parse_args()
+
+    best = min(
+        (measure(args.module) for _ in range(max(1, args.runs))),
+        key=lambda report: report["total_us"],
+    )
+    print(f"import {args.module}: {best['total_us'] / 1000:.1f} ms "
+          f"(fastest of {max(1, args.runs)})")
+    print()
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative_us, self_us, depth, name in sorted(best["modules"], reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {'  ' * depth}{name}")
+
+    heavy = heavy_imports(best["modules"])
+    print()
+    print("heavy libraries imported at startup: " + (", ".join(heavy) if heavy else "none"))
+
+
+if __name__ == "__main__":
+    main()
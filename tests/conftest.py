@@ -0,0 +1,98 @@
+"""Shared test doubles for the PyMySQL DictCursor / connection pair.
+
+Tests subclass FakeCursor and answer statements in respond():
+
+    class _Cursor(FakeCursor):
+        def respond(self, sql, params):
+            if sql.startswith("SELECT id FROM students"):
+                return [{"id": 5}]
+
+    cursor = _Cursor()
+    conn = FakeConnection(cursor)
+
+pytest puts this directory on sys.path, so test modules import the classes
+with `from conftest import FakeConnection, FakeCursor`.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+class FakeCursor:
+    """Records every statement and serves the rows respond() returns.
+
+    execute() collapses whitespace in `sql`, appends (sql, params) to
+    `statements` and keeps respond()'s answer (a list of dict rows, one row,
+    or None for no rows) for fetchone()/fetchall(). respond() may set
+    `rowcount` / `lastrowid` as a side effect.
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.rowcount = 0
+        self.lastrowid = None
+        self._rows = []
+
+    def respond(self, sql, params):
+        return None
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self.statements.append((sql, params))
+        rows = self.respond(sql, params)
+        if rows is None:
+            rows = []
+        elif isinstance(rows, dict):
+            rows = [rows]
+        self._rows = list(rows)
+        return self.rowcount
+
+    def executemany(self, sql, seq_of_params):
+        for params in seq_of_params:
+            self.execute(sql, params)
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return list(self._rows)
+
+    @property
+    def queries(self) -> int:
+        return len(self.statements)
+
+    @property
+    def sql(self) -> list:
+        return [sql for sql, _ in self.statements]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    """Hands out one cursor and counts commits and rollbacks."""
+
+    def __init__(self, cursor=None):
+        self._cursor = cursor if cursor is not None else FakeCursor()
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        pass
@@ -0,0 +1,107 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeConnection, FakeCursor
+from utils import admin_jobs, db_conn
+
+
+class _Table:
+    """admin_jobs rows shared by every "worker" in a test."""
+
+    def __init__(self):
+        self.rows = {}
+
+
+class _Cursor(FakeCursor):
+    def __init__(self, table):
+        super().__init__()
+        self.table = table
+
+    def respond(self, sql, params):
+        if sql.startswith("INSERT INTO admin_jobs"):
+            (job_id, kind, status, message, admin, host, pid, state, errors,
+             started_at, updated_at, finished_at) = params
+            parse = lambda v: v and datetime.strptime(v, "%Y-%m-%d %H:%M:%S")  # noqa: E731
+            row = self.table.rows.setdefault(
+                job_id,
+                {"id": job_id, "kind": kind, "admin": admin, "host": host, "pid": pid,
+                 "started_at": parse(started_at), "errors": None},
+            )
+            row.update(status=status, message=message, state=state,
+                       updated_at=parse(updated_at), finished_at=parse(finished_at))
+            if errors is not None:
+                row["errors"] = errors
+        elif sql.startswith("SELECT * FROM admin_jobs"):
+            row = self.table.rows.get(params[0])
+            return dict(row) if row else None
+        elif sql.startswith("SELECT id, host, pid"):
+            return [dict(r) for r in self.table.rows.values() if r["status"] not in params]
+        elif sql.startswith("UPDATE admin_jobs SET status = 'failed'"):
+            for job_id in params[1:]:
+                row = self.table.rows[job_id]
+                row.update(status="failed", message=params[0], finished_at=row["updated_at"])
+
+
+class _CountJob(admin_jobs.Job):
+    kind = "count"
+
+    def execute(self, conn):
+        self.errors = [{"row": 2, "errors": ["bad"]}]
+        self.processed = self.total
+
+
+def test_job_state_is_readable_from_any_worker(monkeypatch):
+    table = _Table()
+    monkeypatch.setattr(admin_jobs, "_available", True)
+    monkeypatch.setattr(db_conn, "get_db_connection", lambda: FakeConnection(_Cursor(table)))
+    monkeypatch.setattr(db_conn, "close_db_connection", lambda: None)
+    monkeypatch.setattr("utils.live.emit_admin_event", lambda *a: None)
+
+    job = _CountJob(total=3, admin="admin-1")
+    job.save()
+    # Another worker never saw the Job object, only the table.
+    admin_jobs._jobs.clear()
+    assert admin_jobs.get(job.id).to_dict()["status"] == "queued"
+
+    job.run()
+
+    polled = admin_jobs.get(job.id, kind="count").to_dict()
+    assert polled["status"] == "completed"
+    assert polled["processed"] == 3 and polled["total"] == 3
+    assert polled["errors"] == [{"row": 2, "errors": ["bad"]}]
+    assert admin_jobs.get(job.id, kind="other") is None
+    assert admin_jobs.get("missing") is None
+
+
+def test_jobs_of_exited_workers_are_failed(monkeypatch):
+    table = _Table()
+    monkeypatch.setattr(admin_jobs, "_available", True)
+    now = datetime.now().replace(microsecond=0)
+    for job_id, host, pid, age in (
+        ("live", admin_jobs._HOST, 101, 0),
+        ("dead", admin_jobs._HOST, 102, 0),
+        ("remote", "other-host", 103, 0),
+        ("silent", "other-host", 104, admin_jobs.STALE_AFTER + 60),
+    ):
+        table.rows[job_id] = {
+            "id": job_id, "kind": "count", "status": "running", "message": None,
+            "host": host, "pid": pid, "state": "{}", "errors": None,
+            "started_at": now - timedelta(seconds=age + 5),
+            "updated_at": now - timedelta(seconds=age), "finished_at": None,
+        }
+    monkeypatch.setattr(admin_jobs, "_pid_alive", lambda pid: pid == 101)
+
+    # A poll already reports a silent job as failed.
+    assert admin_jobs.StoredJob(table.rows["silent"]).to_dict()["status"] == "failed"
+
+    assert admin_jobs.fail_orphans(_Cursor(table)) == 2
+    assert {k: r["status"] for k, r in table.rows.items()} == {
+        "live": "running",
+        "dead": "failed",
+        "remote": "running",
+        "silent": "failed",
+    }
+    assert table.rows["dead"]["message"] == admin_jobs._LOST
@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeCursor
+from utils import analytics_rollups
+from utils.analytics_rollups import class_rollup_select, mark_dirty
+
+
+def _db():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(
+        """
+        CREATE TABLE classes (id INTEGER PRIMARY KEY, instructor_id INTEGER);
+        CREATE TABLE student_classes (student_id INTEGER, class_id INTEGER);
+        CREATE TABLE student_grades (student_id INTEGER, class_id INTEGER);
+        CREATE TABLE grade_snapshots (class_id INTEGER, status TEXT);
+        CREATE TABLE released_grades (student_id INTEGER, class_id INTEGER, released_at TEXT);
+        INSERT INTO classes VALUES (1, 7), (2, 7), (3, 8);
+        INSERT INTO student_classes VALUES (1, 1), (2, 1), (3, 1), (1, 2);
+        INSERT INTO student_grades VALUES (1, 1), (1, 1), (2, 1);
+        INSERT INTO grade_snapshots VALUES (1, 'final'), (1, 'draft'), (1, 'final'), (3, 'draft');
+        INSERT INTO released_grades VALUES
+            (1, 1, '2026-01-02'), (2, 1, '2026-01-05'), (3, 1, '2026-01-03');
+        """
+    )
+    return conn
+
+
+def _rows(conn, class_ids=None):
+    sql, params = class_rollup_select(class_ids)
+    rows = conn.execute(sql.replace("%s", "?") + " ORDER BY c.id", params)
+    return {r["class_id"]: dict(r) for r in rows}
+
+
+def test_class_rollup_has_one_row_per_class():
+    rows = _rows(_db())
+    assert sorted(rows) == [1, 2, 3]
+    one = rows[1]
+    assert (one["student_count"], one["graded_students"]) == (3, 2)
+    assert (one["final_snapshots"], one["released_grades"]) == (2, 3)
+    assert (one["first_released_at"], one["last_released_at"]) == ("2026-01-02", "2026-01-05")
+    assert rows[3]["final_snapshots"] == 0
+    assert rows[2]["released_grades"] == 0 and rows[2]["last_released_at"] is None
+
+
+def test_class_rollup_can_be_scoped_to_dirty_classes():
+    rows = _rows(_db(), [2, 3])
+    assert sorted(rows) == [2, 3]
+    assert rows[2]["student_count"] == 1
+
+
+def test_mark_dirty_only_queues_once_the_refresher_runs(monkeypatch):
+    monkeypatch.setattr(analytics_rollups, "_refresher", None)
+    analytics_rollups._take_dirty()
+    mark_dirty(5)
+    assert analytics_rollups._take_dirty() == set()
+
+    monkeypatch.setattr(analytics_rollups, "_refresher", object())
+    mark_dirty(5)
+    mark_dirty("6")
+    mark_dirty(None)
+    assert analytics_rollups._take_dirty() == {5, 6}
+    assert analytics_rollups._take_dirty() == set()
+
+
+def test_readers_use_the_inline_query_until_the_rollups_are_filled(monkeypatch):
+    class _Cursor(FakeCursor):
+        tables = False
+        rows = False
+
+        def respond(self, sql, params):
+            if "information_schema" in sql:
+                return {"cnt": 1 if self.tables else 0}
+            return {"1": 1} if self.rows else None
+
+    monkeypatch.setattr(analytics_rollups, "_tables", False)
+    monkeypatch.setattr(analytics_rollups, "_filled", False)
+    cursor = _Cursor()
+
+    assert analytics_rollups.class_source(cursor)[0].startswith("(")
+    cursor.tables = True
+    # Migrated but not refreshed yet: still inline, and nothing cached.
+    assert analytics_rollups.class_source(cursor)[0].startswith("(")
+    cursor.rows = True
+    assert analytics_rollups.class_source(cursor) == ("class_rollups", [])
+    assert analytics_rollups.instructor_source(cursor) == ("instructor_rollups", [])
@@ -0,0 +1,61 @@
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask, url_for
+
+import utils.assets as assets
+
+
+def _make_app(tmp_path):
+    static = tmp_path / "static"
+    (static / "dist" / "css").mkdir(parents=True)
+    (static / "css").mkdir()
+    (static / "css" / "site.css").write_text("body{color:red}")
+    hashed = static / "dist" / "css" / "site.abc123.css"
+    hashed.write_text("body{color:red}")
+    (static / "dist" / "css" / "site.abc123.css.gz").write_bytes(
+        gzip.compress(b"body{color:red}")
+    )
+    (static / "dist" / "manifest.json").write_text(
+        json.dumps(
+            {
+                "assets": {"css/site.css": "css/site.abc123.css"},
+                "bundles": {},
+                "compressed": {"css/site.abc123.css": ["gzip"]},
+            }
+        )
+    )
+    app = Flask(__name__, static_folder=str(static))
+    assets.init_assets(app, enabled=True)
+    return app
+
+
+def test_url_for_uses_hashed_name(tmp_path):
+    app = _make_app(tmp_path)
+    with app.test_request_context():
+        assert url_for("static", filename="css/site.css") == (
+            "/static/dist/css/site.abc123.css"
+        )
+        assert url_for("static", filename="images/other.png") == (
+            "/static/images/other.png"
+        )
+
+
+def test_precompressed_sibling_served_immutable(tmp_path):
+    client = _make_app(tmp_path).test_client()
+    resp = client.get(
+        "/static/dist/css/site.abc123.css", headers={"Accept-Encoding": "gzip"}
+    )
+    assert resp.status_code == 200
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.mimetype == "text/css"
+    assert "immutable" in resp.headers["Cache-Control"]
+    assert gzip.decompress(resp.get_data()) == b"body{color:red}"
+
+    plain = client.get("/static/dist/css/site.abc123.css")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_data() == b"body{color:red}"
@@ -0,0 +1,54 @@
+import json
+import logging
+import os
+import queue
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.async_logging import (
+    JsonLineFormatter,
+    QueueingHandler,
+    SamplingFilter,
+    parse_sample_rates,
+)
+
+
+def _record(name="utils.db_conn", level=logging.INFO, msg="hello %s", args=("x",)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_sampling_keeps_one_in_n_and_all_warnings():
+    rates = parse_sample_rates("utils.db_conn=3, bad, blueprints=x, other=1")
+    assert rates == {"utils.db_conn": 3}
+    f = SamplingFilter(rates)
+    kept = [f.filter(_record()) for _ in range(6)]
+    assert kept == [True, False, False, True, False, False]
+    assert f.filter(_record(level=logging.WARNING))
+    assert f.filter(_record(name="utils.live"))
+
+
+def test_queueing_handler_merges_args_and_counts_drops():
+    q = queue.Queue(maxsize=1)
+    handler = QueueingHandler(q)
+    args = ["a"]
+    handler.handle(_record(msg="ids=%s", args=(args,)))
+    args.append("b")
+    queued = q.get_nowait()
+    assert queued.getMessage() == "ids=['a']"
+
+    handler.handle(_record())
+    handler.handle(_record())
+    assert handler.dropped == 1
+    q.get_nowait()
+    handler.handle(_record())
+    assert q.get_nowait().getMessage() == "hello x"
+    assert handler.dropped == 1
+
+
+def test_json_line_formatter():
+    line = JsonLineFormatter().format(_record())
+    entry = json.loads(line)
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "utils.db_conn"
+    assert entry["message"] == "hello x"
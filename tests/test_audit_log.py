@@ -0,0 +1,99 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import audit_log
+from utils.audit_log import AuditWriter, make_event
+from utils.auth_utils import log_admin_action
+
+
+def _event(i):
+    return make_event(1, "ADMIN-1", "bulk_delete", "student", i, details={"n": i})
+
+
+def test_events_are_written_in_batches(tmp_path):
+    batches = []
+    writer = AuditWriter(str(tmp_path / "spill.jsonl"), batch_size=3, writer=batches.append)
+    for i in range(7):
+        writer.submit(_event(i))
+    writer.flush_all()
+
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert batches[0][0]["resource_id"] == "0"
+    assert batches[0][0]["details"] == '{"n": 0}'
+
+
+def test_overflow_and_write_failures_spill_and_replay(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    written = []
+
+    def down(events):
+        raise RuntimeError("database unavailable")
+
+    writer = AuditWriter(str(spill), max_queue=2, batch_size=10, writer=down)
+    for i in range(3):
+        writer.submit(_event(i))
+    assert len(spill.read_text().splitlines()) == 1  # queue full
+    writer.flush_all()
+    assert [json.loads(l)["resource_id"] for l in spill.read_text().splitlines()] == ["2", "0", "1"]
+
+    writer._writer = written.extend
+    assert writer.replay() == 3
+    assert not spill.exists()
+    assert sorted(e["resource_id"] for e in written) == ["0", "1", "2"]
+
+
+def test_log_admin_action_queues_when_writer_runs(tmp_path, monkeypatch):
+    writer = AuditWriter(str(tmp_path / "spill.jsonl"), writer=lambda events: None)
+    monkeypatch.setattr(audit_log, "_writer", writer)
+    context = {"admin_id": 1, "admin_school_id": "ADMIN-1", "ip_address": "10.0.0.1", "user_agent": "x"}
+
+    log_admin_action("suspend", "student", 5, context=context)
+    log_admin_action("suspend", "student", 6, context={"admin_id": None})
+
+    events = writer._take(block=False)
+    assert [(e["action"], e["resource_id"], e["ip_address"]) for e in events] == [
+        ("suspend", "5", "10.0.0.1")
+    ]
+
+
+def test_partial_replay_keeps_only_unwritten_events(tmp_path):
+    spill = tmp_path / "spill.jsonl"
+    written = []
+
+    def fails_second_batch(events):
+        if written:
+            raise RuntimeError("connection lost")
+        written.extend(events)
+
+    writer = AuditWriter(str(spill), batch_size=2, writer=fails_second_batch)
+    writer.spill([_event(i) for i in range(5)])
+    try:
+        writer.replay()
+    except RuntimeError:
+        pass
+
+    assert not spill.exists()
+    assert writer.has_spilled()
+    writer._writer = written.extend
+    assert writer.replay() == 3
+    assert [e["resource_id"] for e in written] == ["0", "1", "2", "3", "4"]
+    assert not writer.has_spilled()
+
+
+def test_replay_leaves_claims_of_live_workers(tmp_path, monkeypatch):
+    spill = tmp_path / "spill.jsonl"
+    live = tmp_path / "spill.jsonl.replay.101.0"
+    dead = tmp_path / "spill.jsonl.replay.102.0"
+    for path, i in ((live, 1), (dead, 2)):
+        path.write_text(json.dumps(_event(i)) + "\n")
+    monkeypatch.setattr(audit_log, "_pid_alive", lambda pid: pid == 101)
+    written = []
+
+    writer = AuditWriter(str(spill), writer=written.extend)
+
+    assert writer.replay() == 1
+    assert [e["resource_id"] for e in written] == ["2"]
+    assert live.exists() and not dead.exists()
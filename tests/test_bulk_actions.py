@@ -0,0 +1,81 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeConnection, FakeCursor
+from utils import bulk_actions
+
+
+class _Cursor(FakeCursor):
+    def __init__(self, students):
+        super().__init__()
+        self.students = students
+
+    def respond(self, sql, params):
+        ids = set(params or [])
+        self.rowcount = len(ids)
+        if sql.startswith("SELECT s.id"):
+            pending = "approval_status = 'pending'" in sql
+            return [
+                s for s in self.students
+                if s["id"] in ids and (not pending or s["approval_status"] == "pending")
+            ]
+        elif sql.startswith("SELECT DISTINCT class_id"):
+            return [{"class_id": 7}, {"class_id": 9}]
+
+
+def _students(n, status="approved"):
+    return [
+        {"id": i, "user_id": 100 + i, "personal_info_id": 200 + i, "course": "BSIT",
+         "year_level": 1, "school_id": f"2024-{i:04d}", "first_name": "A",
+         "last_name": "B", "email": f"s{i}@x.edu", "approval_status": status}
+        for i in range(1, n + 1)
+    ]
+
+
+def test_delete_is_set_based_per_chunk_and_bumps_each_class_once(monkeypatch):
+    bumped = []
+    counters = []
+    monkeypatch.setattr(bulk_actions, "CHUNK", 4)
+    monkeypatch.setattr(bulk_actions, "_bump", lambda ids: bumped.append(sorted(ids)))
+    monkeypatch.setattr(
+        bulk_actions.class_versions, "bump_many", lambda cursor, ids: counters.append(sorted(ids))
+    )
+    cursor = _Cursor(_students(10))
+    conn = FakeConnection(cursor)
+
+    affected, notify = bulk_actions.run(conn, "delete", list(range(1, 11)))
+
+    assert affected == 10 and notify == []
+    assert conn.commits == 3
+    # select + classes + 4 student tables + students + users + personal_info
+    assert cursor.queries == 3 * 9
+    deletes = [s.split(" WHERE")[0] for s in cursor.sql[:9] if s.startswith("DELETE")]
+    assert deletes == [
+        "DELETE FROM student_scores",
+        "DELETE FROM student_grades",
+        "DELETE FROM released_grades",
+        "DELETE FROM student_classes",
+        "DELETE FROM students",
+        "DELETE FROM users",
+        "DELETE FROM personal_info",
+    ]
+    assert bumped == [[7, 9]]
+    # The counters move inside each chunk's transaction.
+    assert counters == [[7, 9]] * 3
+
+
+def test_approve_only_touches_pending_registrations_and_notifies_them(monkeypatch):
+    monkeypatch.setattr(bulk_actions, "_bump", lambda ids: None)
+    students = _students(3, status="pending")
+    students[1]["approval_status"] = "approved"
+    cursor = _Cursor(students)
+
+    affected, notify = bulk_actions.run(FakeConnection(cursor), "approve", [1, 2, 3], admin_id=5)
+
+    assert affected == 2
+    assert [row["id"] for row in notify] == [1, 3]
+    update = cursor.sql[-1]
+    assert update.startswith("UPDATE students s JOIN users u")
+    assert cursor.queries == 2
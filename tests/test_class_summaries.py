@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeCursor
+from utils import class_summaries
+from utils.class_cache import ClassIndexedCache
+from utils.grade_calculation import perform_grade_computation
+
+STRUCTURE = {
+    "LECTURE": [{"name": "Quiz", "weight": 40}, {"name": "Exam", "weight": 60}],
+}
+
+
+class _Cursor(FakeCursor):
+    def __init__(self, rows=None):
+        super().__init__()
+        self.rows = rows or []
+
+    def respond(self, sql, params):
+        if sql.startswith("SELECT c.*"):
+            return [dict(r) for r in self.rows]
+        elif sql.startswith("SELECT class_id, structure_json"):
+            return [
+                {"class_id": c, "structure_json": json.dumps(STRUCTURE)} for c in params
+            ]
+        elif sql.startswith("SELECT gs.class_id, ga.name"):
+            return [
+                {"class_id": c, "name": name, "max_score": 50,
+                 "subcategory_name": sub, "category_name": "LECTURE"}
+                for c in params
+                for name, sub in (("Q1", "Quiz"), ("Midterm", "Exam"))
+            ]
+        elif sql.startswith("SELECT gs.class_id, ss.student_id"):
+            return [
+                {"class_id": c, "student_id": 100 + c, "score": score, "assessment_name": name}
+                for c in params
+                for name, score in (("Q1", 40), ("Midterm", 30 + c))
+            ]
+        raise AssertionError(sql)
+
+
+def _row(class_id, **counts):
+    row = {"id": class_id, "member_count": None, "approved_count": None,
+           "pending_count": None, "rejected_count": None, "dropped_count": None,
+           "released_count": None, "has_structure": 0}
+    row.update(counts)
+    return row
+
+
+def test_load_normalises_counts_and_release_status():
+    cursor = _Cursor(
+        [
+            _row(1),
+            _row(2, member_count=3, approved_count=Decimal(2), pending_count=Decimal(1),
+                 released_count=1, has_structure=1),
+            _row(3, member_count=2, approved_count=Decimal(2), released_count=2),
+        ]
+    )
+
+    rows = class_summaries.load(cursor, 7)
+
+    assert cursor.queries == 1
+    assert rows[0]["member_count"] == 0 and rows[0]["release_status"] == "none"
+    assert rows[1]["pending_count"] == 1 and rows[1]["has_structure"] is True
+    assert rows[1]["release_status"] == "partial"
+    assert rows[2]["release_status"] == "released"
+
+
+def test_computed_grades_matches_per_class_computation_in_three_queries():
+    cursor = _Cursor()
+
+    computed = class_summaries.computed_grades(cursor, [1, 2, 3])
+
+    assert cursor.queries == 3
+    for class_id in (1, 2, 3):
+        rows = [
+            {"assessment": name, "category": "LECTURE", "name": sub,
+             "weight": weight, "max_score": 50}
+            for name, sub, weight in (("Q1", "Quiz", 40), ("Midterm", "Exam", 60))
+        ]
+        scores = [
+            {"student_id": 100 + class_id, "assessment_name": "Q1", "score": 40},
+            {"student_id": 100 + class_id, "assessment_name": "Midterm", "score": 30 + class_id},
+        ]
+        assert computed[class_id] == perform_grade_computation(STRUCTURE, rows, scores)
+
+
+def test_cache_invalidation_by_class_and_owner():
+    cache = ClassIndexedCache(ttl=60, max_entries=2)
+    builds = []
+
+    def build(key, classes):
+        def _build():
+            builds.append(key)
+            return classes
+        return _build
+
+    cache.get("a", build("a", [1, 2]), list)
+    cache.get("b", build("b", [2]), list)
+    cache.get("a", build("a", [1, 2]), list)
+    assert builds == ["a", "b"]
+
+    cache.invalidate_class(1)
+    cache.get("a", build("a", [1, 2]), list)
+    cache.get("b", build("b", [2]), list)
+    assert builds == ["a", "b", "a"]
+
+    cache.invalidate("b")
+    cache.get("c", build("c", [3]), list)
+    cache.get("b", build("b", [2]), list)  # evicts "a", the least recently used
+    cache.get("c", build("c", [3]), list)
+    assert builds == ["a", "b", "a", "c", "b"]
+    cache.get("a", build("a", [1, 2]), list)
+    assert builds[-1] == "a"
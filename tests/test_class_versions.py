@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeConnection, FakeCursor
+from utils import class_versions, live
+
+
+class _Cursor(FakeCursor):
+    """Answers the table check, the counter and the live-version fingerprints."""
+
+    def __init__(self, table=True):
+        super().__init__()
+        self.table = table
+        self.counters = {}
+        self.roster = {"cnt": 2, "approved": 1, "dropped": 0}
+
+    def respond(self, sql, params):
+        if "information_schema" in sql:
+            return {"cnt": 1 if self.table else 0}
+        elif sql.startswith("INSERT INTO class_versions"):
+            self.counters[params[0]] = self.counters.get(params[0], 0) + 1
+        elif sql.startswith("SELECT version FROM class_versions"):
+            value = self.counters.get(params[0])
+            return None if value is None else {"version": value}
+        elif "FROM student_classes" in sql:
+            return dict(self.roster)
+        else:
+            return {}
+
+
+def test_bump_counts_per_class_and_is_a_no_op_before_the_migration(monkeypatch):
+    monkeypatch.setattr(class_versions, "_available", False)
+    missing = _Cursor(table=False)
+    assert class_versions.bump(missing, 7) is None
+    assert class_versions.current(missing, 7) is None
+    assert not any(s.startswith("INSERT") for s in missing.sql)
+
+    # Not cached while missing: the migration takes effect without a restart.
+    cursor = _Cursor()
+    assert class_versions.current(cursor, 7) == 0
+    assert class_versions.bump(cursor, 7) == 1
+    assert class_versions.bump(cursor, 7) == 2
+    assert class_versions.bump_many(cursor, [9, 7, 9]) == {7: 3, 9: 1}
+
+
+def test_live_version_changes_on_counter_and_roster_status(monkeypatch):
+    monkeypatch.setattr(class_versions, "_available", True)
+    cursor = _Cursor()
+
+    monkeypatch.setattr(live, "get_db_connection", lambda: FakeConnection(cursor))
+    first = live.compute_class_live_version(7)
+
+    class_versions.bump(cursor, 7)
+    second = live.compute_class_live_version(7)
+    assert second != first
+
+    # An approval keeps the row count and joined_at; the status fingerprint moves.
+    cursor.roster["approved"] = 2
+    assert live.compute_class_live_version(7) != second
@@ -0,0 +1,56 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask
+
+import gibber
+
+
+def _make_app(**config):
+    app = Flask(__name__)
+    app.secret_key = "test-secret"
+    app.config.update(config)
+    return app
+
+
+def test_token_reused_and_resolved_from_cache(monkeypatch):
+    gibber.clear_caches()
+    app = _make_app(GIBBER_MAX_AGE=300)
+    with app.app_context():
+        token = gibber.gibberize("/student/dashboard", qs="a=1")
+        assert gibber.gibberize("/student/dashboard", qs="a=1") == token
+        assert gibber.gibberize("/student/dashboard", qs="a=2") != token
+
+        # A cached token must not need the serializer again.
+        monkeypatch.setattr(gibber, "_get_serializer", lambda: None)
+        assert gibber.resolve(token, max_age=300) == {
+            "path": "/student/dashboard",
+            "qs": "a=1",
+        }
+
+
+def test_cache_is_scoped_to_secret():
+    gibber.clear_caches()
+    with _make_app().app_context():
+        token = gibber.gibberize("/admin/students")
+    other = _make_app()
+    other.secret_key = "rotated-secret"
+    with other.app_context():
+        assert gibber.resolve(token) is None
+        assert gibber.gibberize("/admin/students") != token
+
+
+def test_ttl_cache_expiry_and_bound(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(gibber.time, "monotonic", lambda: now[0])
+    cache = gibber.TTLCache(maxsize=2)
+    cache.put("a", 1, ttl=10)
+    cache.put("b", 2, ttl=10)
+    cache.get("a")
+    cache.put("c", 3, ttl=10)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    now[0] += 11
+    assert cache.get("a") is None
@@ -0,0 +1,150 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from blueprints.compute_routes import compute_major_grade, compute_minor_grade
+from utils import grade_store
+from utils.grade_store import ClassGrades
+
+
+def _random_class(rnd, with_lab=True):
+    groups = {}
+    aid = 1
+    for category in ("LECTURE", "LABORATORY") if with_lab else ("LECTURE",):
+        for sub in range(rnd.randint(1, 3)):
+            ids = list(range(aid, aid + rnd.randint(1, 4)))
+            aid += len(ids)
+            maxes = [rnd.choice([10, 20, 25.5, 50, 100]) for _ in ids]
+            groups[f"{category}::Sub{sub}"] = {
+                "ids": ids,
+                "maxes": maxes,
+                "maxTotal": sum(maxes),
+                "subweight": rnd.choice([10, 20, 33.3, 40]),
+            }
+    scores = {
+        sid: {a: (None if rnd.random() < 0.1 else round(rnd.uniform(0, 50), 2)) for a in range(1, aid)}
+        for sid in range(1, 6)
+    }
+    return groups, scores
+
+
+def _students(scores):
+    return [
+        {"student_id": sid, "scores": {str(a): v for a, v in smap.items()}}
+        for sid, smap in scores.items()
+    ]
+
+
+def _store(class_type, groups, scores):
+    state = ClassGrades(7, class_type, groups)
+    state.load_scores(
+        (sid, aid, v) for sid, smap in scores.items() for aid, v in smap.items()
+    )
+    return state
+
+
+def test_summaries_match_full_compute_after_edits():
+    rnd = random.Random(3)
+    for _ in range(50):
+        groups, scores = _random_class(rnd, with_lab=rnd.random() < 0.5)
+        state = _store("MAJOR", groups, scores)
+        aids = [a for g in groups.values() for a in g["ids"]]
+
+        for _ in range(5):
+            sid, aid = rnd.randint(1, 5), rnd.choice(aids)
+            value = None if rnd.random() < 0.2 else round(rnd.uniform(0, 50), 2)
+            assert state.set_score(sid, aid, value)
+            scores[sid][aid] = value
+
+        expected = compute_major_grade(groups, _students(scores))
+        for sid in scores:
+            assert state.summary(sid) == expected[str(sid)]["_summary"]
+
+
+def test_max_score_and_subweight_changes():
+    rnd = random.Random(5)
+    groups, scores = _random_class(rnd)
+    state = _store("MAJOR", groups, scores)
+    state.summary(1)  # warm the cache so the changes must invalidate it
+
+    gkey = next(iter(groups))
+    aid = groups[gkey]["ids"][0]
+    assert state.set_max_score(aid, 75)
+    assert state.set_subweight(gkey, 55)
+    groups[gkey]["maxes"][0] = 75
+    groups[gkey]["maxTotal"] = sum(groups[gkey]["maxes"])
+    groups[gkey]["subweight"] = 55
+
+    expected = compute_major_grade(groups, _students(scores))
+    assert state.summary(1) == expected["1"]["_summary"]
+    assert not state.set_max_score(9999, 10)
+
+
+def test_minor_summary_and_missing_groups():
+    groups = {
+        "LECTURE::Quiz": {"ids": [1, 2], "maxes": [10, 10], "subweight": 40},
+        "LECTURE::Exam": {"ids": [3], "maxes": [50], "subweight": 60},
+    }
+    scores = {1: {1: 10, 2: 9, 3: 48}, 2: {1: 5, 3: 20}}
+    state = _store("MINOR", groups, scores)
+
+    _, expected = compute_minor_grade(groups, _students(scores))
+    assert state.summary(1) == expected["1"]
+    assert state.summary(2) == expected["2"]
+    assert state.missing_groups(1) == []
+    assert state.missing_groups(2) == ["LECTURE::Quiz"]
+
+    state.set_score(2, 2, 7)
+    assert state.missing_groups(2) == []
+    # Unknown students count as having no scores at all.
+    assert state.missing_groups(99) == ["LECTURE::Quiz", "LECTURE::Exam"]
+
+
+def test_cached_class_is_reused_until_version_changes(monkeypatch):
+    loads = []
+    version = {"value": 1}
+
+    def fake_load(cursor, class_id, current=None):
+        loads.append(class_id)
+        state = ClassGrades(class_id, "MAJOR", {"LECTURE::Quiz": {"ids": [1], "maxes": [10], "subweight": 100}}, current)
+        return state
+
+    monkeypatch.setattr(grade_store, "load_class", fake_load)
+    monkeypatch.setattr(grade_store, "_current_version", lambda class_id: version["value"])
+    grade_store.clear()
+
+    state = grade_store.get_class(7, cursor=object())
+    assert grade_store.get_class(7, cursor=object()) is state
+    assert len(loads) == 1
+
+    # Our own write bumped the counter from 1 to 2: adopted without a reload.
+    version["value"] = 2
+    assert grade_store.apply_scores(7, [(1, 1, 10)], 2)[1]["final_grade"] == 100.0
+    assert grade_store.get_class(7, cursor=object()) is state
+    assert len(loads) == 1
+
+    # Someone else's write: reloaded.
+    version["value"] = 3
+    state = grade_store.get_class(7, cursor=object())
+    assert len(loads) == 2
+
+    # Another worker wrote (4) before our write (5) committed: our counter is
+    # not the cached one plus one, so the class is dropped, not patched.
+    version["value"] = 5
+    assert grade_store.apply_scores(7, [(1, 1, 5)], 5) == {}
+    assert grade_store._resident(7) is None
+    state = grade_store.get_class(7, cursor=object())
+    assert len(loads) == 3
+
+    # Unknown assessment means the structure changed: drop the class.
+    version["value"] = 6
+    assert grade_store.apply_scores(7, [(1, 404, 1)], 6) == {}
+    assert grade_store._resident(7) is None
+
+    # Without migration 0008 there is no counter: nothing is kept.
+    version["value"] = None
+    grade_store.get_class(7, cursor=object())
+    assert grade_store._resident(7) is None
+    grade_store.clear()
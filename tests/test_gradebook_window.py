@@ -0,0 +1,72 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from conftest import FakeCursor
+from utils import gradebook_window
+
+
+class _Cursor(FakeCursor):
+    def __init__(self, scores):
+        super().__init__()
+        self.scores = scores
+
+    def respond(self, sql, params):
+        wanted = set(params or [])
+        return [
+            {"student_id": sid, "assessment_id": aid, "score": score}
+            for (sid, aid), score in self.scores.items()
+            if sid in wanted and aid in wanted
+        ]
+
+
+def _manifest(n_students, n_assessments):
+    return {
+        "class_id": 3,
+        "version": "v1",
+        "students": [{"id": 100 + i} for i in range(n_students)],
+        "assessments": [{"id": 900 + j} for j in range(n_assessments)],
+    }
+
+
+def test_window_returns_matrix_aligned_with_manifest_order():
+    cursor = _Cursor({(101, 901): 8.0, (102, 900): 0.0, (105, 901): 9.5})
+    data = _manifest(300, 60)
+
+    result = gradebook_window.window(cursor, data, (1, 3), (0, 2))
+
+    assert result["student_ids"] == [101, 102]
+    assert result["assessment_ids"] == [900, 901]
+    assert result["scores"] == [[None, 8.0], [0.0, None]]
+    assert result["rows"] == {"offset": 1, "count": 2, "total": 300}
+    assert result["cols"] == {"offset": 0, "count": 2, "total": 60}
+    # Only the window's cells are read.
+    assert len(cursor.statements) == 1
+    assert list(cursor.statements[0][1]) == [101, 102, 900, 901]
+
+
+def test_empty_window_runs_no_query():
+    cursor = _Cursor({})
+
+    result = gradebook_window.window(cursor, _manifest(5, 0), (0, 5), (0, 0))
+
+    assert result["scores"] == [[] for _ in range(5)]
+    assert cursor.statements == []
+
+
+def test_parse_range_clamps_to_bounds():
+    assert gradebook_window.parse_range(None, None, 300, 200) == (0, 200)
+    assert gradebook_window.parse_range("250", "100", 300, 200) == (250, 300)
+    assert gradebook_window.parse_range("400", "10", 300, 200) == (300, 300)
+    assert gradebook_window.parse_range("-5", "1000", 60, 100) == (0, 60)
+    with pytest.raises(ValueError):
+        gradebook_window.parse_range("a", "10", 60, 100)
+
+
+def test_student_names_match_the_gradebook_page():
+    row = {"student_id": 7, "first_name": "Ana", "last_name": "Cruz", "middle_name": "Lopez"}
+    assert gradebook_window._student_name(row) == "Cruz, Ana L."
+    assert gradebook_window._student_name({"student_id": 7, "school_id": "2024-1"}) == "2024-1"
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import grading_scales
+from utils.grade_calculation import get_equivalent
+
+
+def _old_release_chain(g):
+    # The if-chain previously inlined in the release code.
+    for bound, label in [
+        (98, "1.0"), (95, "1.25"), (92, "1.5"), (89, "1.75"), (86, "2.0"),
+        (83, "2.25"), (80, "2.5"), (77, "2.75"), (75, "3.0"),
+    ]:
+        if g >= bound:
+            return label
+    return "5.0"
+
+
+GRADES = [0, 50, 74.99, 75, 76.5, 77, 79.99, 80, 83, 85.5, 86, 89, 91.99,
+          92, 95, 97.99, 98, 100, 104.2, -3]
+
+
+def test_scalar_and_bulk_match_previous_chains():
+    major = grading_scales.get_scale("MAJOR")
+    expected = [_old_release_chain(g) for g in GRADES]
+    assert [major.equivalent(g) for g in GRADES] == expected
+    assert major.equivalents(GRADES) == expected
+    assert grading_scales.bulk_equivalents([None, "x", 88.0]) == [None, None, "2.0"]
+
+
+def test_formats_kept_for_existing_callers():
+    assert get_equivalent(98) == "1.00"
+    assert get_equivalent(80.5) == "2.50"
+    assert get_equivalent(60) == "5.00"
+    minor = grading_scales.get_scale("MINOR")
+    assert [minor.equivalent(g) for g in (99, 93, 87, 76)] == ["1.0", "1.50", "2.00", "3.0"]
+
+
+def test_registry_versions():
+    latest = grading_scales.get_scale("MAJOR")
+    assert latest.key == "MAJOR@v1"
+    assert grading_scales.scale_for_class_type("minor").name == "MINOR"
+    assert grading_scales.scale_for_class_type("MAJOR_LAB").name == "MAJOR"
+    with pytest.raises(KeyError):
+        grading_scales.get_scale("MAJOR", version=99)
+    with pytest.raises(ValueError):
+        grading_scales.GradingScale("BAD", 1, (80, 75), (5.0, 3.0, 1.0), ("a", "b", "c"))
+
+
+def test_app_get_equivalent_matches_baseline_labels():
+    from app import get_equivalent as app_get_equivalent
+
+    # The if-chain app.get_equivalent used before the registry.
+    def baseline(g):
+        for bound, label in [
+            (98, "1.00"), (95, "1.25"), (92, "1.5"), (89, "1.75"), (86, "2.0"),
+            (83, "2.25"), (80, "2.5"), (77, "2.75"), (75, "3.0"),
+        ]:
+            if g >= bound:
+                return "" if g > 100 else label
+        return "5.0"
+
+    assert [app_get_equivalent(g) for g in GRADES] == [baseline(g) for g in GRADES]
+    assert app_get_equivalent(None) == "" and app_get_equivalent("x") == ""
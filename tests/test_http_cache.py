@@ -0,0 +1,55 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask, jsonify
+
+import utils.http_cache as http_cache
+
+
+def _make_app(calls):
+    app = Flask(__name__)
+    app.secret_key = "test-secret"
+
+    @app.route("/api/class/<int:class_id>/data")
+    @http_cache.class_version_etag()
+    def class_data(class_id):
+        calls.append(class_id)
+        return jsonify({"class_id": class_id})
+
+    return app
+
+
+def test_matching_if_none_match_short_circuits(monkeypatch):
+    versions = {7: "v1"}
+    monkeypatch.setattr(
+        http_cache, "get_cached_class_live_version", lambda cid: versions[cid]
+    )
+    calls = []
+    client = _make_app(calls).test_client()
+
+    first = client.get("/api/class/7/data")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    second = client.get("/api/class/7/data", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert calls == [7]
+
+    versions[7] = "v2"
+    third = client.get("/api/class/7/data", headers={"If-None-Match": etag})
+    assert third.status_code == 200
+    assert third.headers["ETag"] != etag
+
+
+def test_etag_depends_on_params_and_scope(monkeypatch):
+    monkeypatch.setattr(http_cache, "get_cached_class_live_version", lambda cid: "v1")
+    app = _make_app([])
+    with app.test_request_context():
+        base = http_cache.build_class_etag("ep", 1, "", "student:1")
+        assert base == http_cache.build_class_etag("ep", 1, "", "student:1")
+        assert base != http_cache.build_class_etag("ep", 1, "", "student:2")
+        assert base != http_cache.build_class_etag("ep", 1, "a=1", "student:1")
+        assert http_cache.build_class_etag("ep", "x", "", "") is None
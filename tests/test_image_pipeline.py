@@ -0,0 +1,151 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeConnection, FakeCursor
+from utils import image_pipeline
+
+pytestmark = pytest.mark.skipif(not image_pipeline.HAS_PIL, reason="Pillow not installed")
+
+
+def _phone_photo(path, size=(2400, 1800)):
+    from PIL import Image
+
+    image = Image.new("RGB", size, (30, 120, 200))
+    exif = Image.Exif()
+    exif[0x0110] = "Test Phone"  # Model
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees
+    image.save(path, "JPEG", exif=exif.tobytes())
+
+
+def test_process_photo_strips_metadata_and_writes_hashed_variants(tmp_path):
+    from PIL import Image
+
+    original = tmp_path / "front.jpg"
+    _phone_photo(original)
+    media = tmp_path / "media"
+
+    result = image_pipeline.process_photo(str(original), str(media))
+
+    assert set(result) == {"review", "thumb"}
+    with Image.open(original) as cleaned:
+        assert not cleaned.getexif()
+        # Orientation was applied before the tag was dropped.
+        assert cleaned.size == (1800, 2400)
+    for name, limit in (("review", image_pipeline.REVIEW_SIZE), ("thumb", image_pipeline.THUMB_SIZE)):
+        path = media / result[name]
+        assert len(result[name].split(".")[0]) == 24
+        with Image.open(path) as variant:
+            assert max(variant.size) == limit
+            assert not variant.getexif()
+
+    # Same content, same names: nothing new is written.
+    again = image_pipeline.process_photo(str(original), str(media))
+    assert again["thumb"] == result["thumb"]
+
+
+def test_process_photo_rejects_non_images(tmp_path):
+    fake = tmp_path / "id_back.png"
+    fake.write_bytes(b"<?php echo 'not an image'; ?>")
+
+    result = image_pipeline.process_photo(str(fake), str(tmp_path / "media"))
+
+    assert "error" in result
+    assert not (tmp_path / "media").exists()
+
+
+def test_variant_urls_fall_back_to_original_upload():
+    row = {
+        "id_front_path": "static/uploads/student_photos/a_id_front.jpg",
+        "id_back_path": "static/uploads/student_photos/a_id_back.jpg",
+        "face_photo_path": None,
+        "photo_variants": json.dumps(
+            {
+                "id_front_path": {"review": "r.webp", "thumb": "t.webp"},
+                "id_back_path": {"error": "not a readable image"},
+            }
+        ),
+    }
+
+    urls = image_pipeline.variant_urls(row, lambda name: f"/admin/registration-media/{name}")
+
+    assert urls["id_front_thumb_url"] == "/admin/registration-media/t.webp"
+    assert urls["id_front_review_url"] == "/admin/registration-media/r.webp"
+    assert urls["id_back_thumb_url"] == "/static/uploads/student_photos/a_id_back.jpg"
+    assert urls["face_photo_thumb_url"] == ""
+
+
+def test_process_photo_leaves_clean_originals_untouched(tmp_path):
+    from PIL import Image
+
+    original = tmp_path / "face.jpg"
+    Image.new("RGB", (800, 600), (10, 20, 30)).save(original, "JPEG")
+    before = original.read_bytes()
+
+    result = image_pipeline.process_photo(str(original), str(tmp_path / "media"))
+
+    assert set(result) == {"review", "thumb"}
+    assert original.read_bytes() == before
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".tmp")]
+
+
+class _ClaimCursor(FakeCursor):
+    """One students row; the claim UPDATE matches like MySQL would."""
+
+    def __init__(self, variants):
+        super().__init__()
+        self.row = {
+            "id": 5,
+            "id_front_path": None,
+            "id_back_path": None,
+            "face_photo_path": "static/uploads/student_photos/missing.jpg",
+            "photo_variants": variants,
+        }
+        self.updates = []
+
+    def respond(self, sql, params):
+        if sql.startswith("SELECT"):
+            return dict(self.row)
+        elif "photo_variants IS NULL" in sql:
+            self.rowcount = int(self.row["photo_variants"] is None)
+            if self.rowcount:
+                self.row["photo_variants"] = params[0]
+        elif "AND photo_variants = %s" in sql:
+            self.rowcount = int(self.row["photo_variants"] == params[2])
+            if self.rowcount:
+                self.row["photo_variants"] = params[0]
+        else:
+            self.updates.append(params)
+            self.row["photo_variants"] = params[0]
+
+
+def _pipeline_on(monkeypatch, cursor, tmp_path):
+    from utils import db_conn
+
+    monkeypatch.setattr(db_conn, "get_db_connection", lambda: FakeConnection(cursor))
+    monkeypatch.setattr(image_pipeline, "_variants_column", True)
+    return image_pipeline.ImagePipeline(str(tmp_path), str(tmp_path / "media"))
+
+
+def test_process_student_only_runs_for_the_worker_that_claims_the_row(monkeypatch, tmp_path):
+    cursor = _ClaimCursor(None)
+    pipeline = _pipeline_on(monkeypatch, cursor, tmp_path)
+
+    assert pipeline.process_student(5) == {"face_photo_path": {"error": "file missing"}}
+    assert len(cursor.updates) == 1
+
+    # A second worker that queued the same student finds it processed.
+    assert pipeline.process_student(5) == {}
+    assert len(cursor.updates) == 1
+
+    # A fresh claim by another worker is left alone; a stale one is taken over.
+    cursor.row["photo_variants"] = json.dumps({"claimed_at": int(time.time())})
+    assert pipeline.process_student(5) == {}
+    cursor.row["photo_variants"] = json.dumps({"claimed_at": 1})
+    assert pipeline.process_student(5) == {"face_photo_path": {"error": "file missing"}}
+    assert len(cursor.updates) == 2
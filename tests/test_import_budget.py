@@ -0,0 +1,22 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts")))
+
+import import_time_report
+
+# `import app` measures ~0.4-0.6 s with analytics loaded lazily (and ~1.2 s
+# with SciPy at startup); the default leaves room for slower machines.
+BUDGET_MS = int(os.environ.get("IMPORT_TIME_BUDGET_MS", "1500"))
+
+
+def test_app_import_stays_within_budget_and_skips_heavy_libraries():
+    reports = [import_time_report.measure("app") for _ in range(2)]
+    best = min(reports, key=lambda report: report["total_us"])
+
+    assert import_time_report.heavy_imports(best["modules"]) == []
+    assert 0 < best["total_us"] / 1000 <= BUDGET_MS, (
+        f"import app took {best['total_us'] / 1000:.0f} ms (budget {BUDGET_MS} ms); "
+        "see python scripts/import_time_report.py"
+    )
@@ -0,0 +1,69 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeCursor
+from utils import membership_index
+from utils.membership_index import MembershipIndex
+
+
+class _Cursor(FakeCursor):
+    def __init__(self, emails, school_ids):
+        super().__init__()
+        self.rows = {"personal_info": emails, "users": school_ids}
+        self.lookups = 0
+        self.on_select = None
+
+    def respond(self, sql, params):
+        table = "personal_info" if "personal_info" in sql else "users"
+        if params is None:
+            if self.on_select:
+                self.on_select()
+            return [{"value": v} for v in self.rows[table]]
+        self.lookups += 1
+        values = {v.lower() for v in self.rows[table]}
+        return {"id": 1} if params[0].lower() in values else None
+
+
+def test_misses_are_answered_from_memory_and_hits_confirmed():
+    cursor = _Cursor(["ana@school.edu"], ["24-00001"])
+    index = MembershipIndex()
+    index.load(cursor)
+
+    assert index.is_registered(cursor, "email", "new@school.edu") is False
+    assert index.is_registered(cursor, "school_id", "24-99999") is False
+    assert cursor.lookups == 0
+    assert index.is_registered(cursor, "email", "ANA@school.edu") is True
+    assert cursor.lookups == 1
+
+    # Deleted since the last load: the hit is confirmed and turns out stale.
+    cursor.rows["personal_info"] = []
+    assert index.is_registered(cursor, "email", "ana@school.edu") is False
+
+
+def test_updates_apply_and_survive_a_concurrent_load():
+    cursor = _Cursor(["ana@school.edu"], [])
+    index = MembershipIndex()
+    assert index.might_contain("email", "ana@school.edu") is None
+
+    cursor.on_select = lambda: index.add(email="ben@school.edu")
+    index.load(cursor)
+    cursor.on_select = None
+    assert index.might_contain("email", "ben@school.edu") is True
+
+    index.discard(email="ana@school.edu")
+    assert index.might_contain("email", "ana@school.edu") is False
+
+
+def test_probe_bursts_stop_confirming_after_the_budget(monkeypatch):
+    monkeypatch.setattr(membership_index, "PROBE_CONFIRMATIONS", 2)
+    cursor = _Cursor([], ["24-00001"])
+    index = MembershipIndex()
+    index.load(cursor)
+
+    for _ in range(5):
+        assert index.is_registered(cursor, "school_id", "24-00001", client="10.0.0.1")
+    assert cursor.lookups == 2
+    index.is_registered(cursor, "school_id", "24-00001", client="10.0.0.2")
+    assert cursor.lookups == 3
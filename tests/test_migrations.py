@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeCursor
+from utils import migrations
+
+
+def test_split_sql_statements_ignores_quoted_and_commented_semicolons():
+    sql = """
+    -- leading comment; not a statement
+    ALTER TABLE t ADD COLUMN note varchar(5) DEFAULT ';';
+    /* block; comment */
+    UPDATE t SET note = 'a\\';b' WHERE id = 1;
+    INSERT INTO t (`we;ird`) VALUES (1)
+    """
+    statements = migrations.split_sql_statements(sql)
+    assert len(statements) == 3
+    assert statements[0].endswith("DEFAULT ';'")
+    assert statements[1].startswith("UPDATE t")
+    assert "`we;ird`" in statements[2]
+
+
+def test_discovery_and_checksum_ignore_line_endings(tmp_path):
+    (tmp_path / "0002_second.sql").write_bytes(b"SELECT 1;\r\nSELECT 2;\r\n")
+    (tmp_path / "0001_first.py").write_text("def upgrade(cursor):\n    pass\n")
+    (tmp_path / "notes.txt").write_text("ignored")
+    found = migrations.discover_migrations(str(tmp_path))
+    assert [(m.version, m.name, m.kind) for m in found] == [
+        ("0001", "first", "py"),
+        ("0002", "second", "sql"),
+    ]
+    (tmp_path / "copy.sql").write_bytes(b"SELECT 1;\nSELECT 2;\n")
+    assert found[1].checksum == migrations.file_checksum(str(tmp_path / "copy.sql"))
+
+
+def test_status_flags_changed_migrations(tmp_path):
+    (tmp_path / "0001_a.sql").write_text("SELECT 1;")
+    (tmp_path / "0002_b.sql").write_text("SELECT 2;")
+    (tmp_path / "0003_c.sql").write_text("SELECT 3;")
+    found = migrations.discover_migrations(str(tmp_path))
+
+    class Cursor(FakeCursor):
+        def respond(self, sql, params):
+            return [
+                {"version": "0001", "checksum": found[0].checksum},
+                {"version": "0002", "checksum": "0" * 64},
+            ]
+
+    status = migrations.migration_status(Cursor(), found)
+    assert [state for _, state in status] == ["applied", "changed", "pending"]
+
+
+def test_shipped_migrations_are_discoverable():
+    versions = [m.version for m in migrations.discover_migrations()]
+    assert versions == sorted(set(versions))
+    assert "0001" in versions
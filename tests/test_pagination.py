@@ -0,0 +1,79 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.pagination import Sort, decode_cursor, encode_cursor, like_prefix, page, parse_limit
+
+
+def _db():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE s (id INTEGER PRIMARY KEY, last_name TEXT, first_name TEXT)")
+    names = ["Cruz", "Abad", "Cruz", None, "Bautista", "Abad", "Cruz", "Diaz"]
+    firsts = ["Ana", "Ben", "Ana", "Cy", "Dan", "Ben", "Eli", None]
+    conn.executemany(
+        "INSERT INTO s (id, last_name, first_name) VALUES (?, ?, ?)",
+        [(i + 1, ln, fn) for i, (ln, fn) in enumerate(zip(names, firsts))],
+    )
+    return conn
+
+
+def _walk(conn, sort, limit):
+    seen = []
+    token = None
+    while True:
+        where, params = "", []
+        if token:
+            clause, params = sort.after(decode_cursor(token))
+            where = "WHERE " + clause
+        sql = (
+            "SELECT id, COALESCE(last_name, '') AS sort_last_name, "
+            "COALESCE(first_name, '') AS sort_first_name FROM s "
+            f"{where} ORDER BY {sort.order_by()} LIMIT ?"
+        ).replace("%s", "?")
+        rows = [dict(r) for r in conn.execute(sql, params + [limit + 1])]
+        rows, token = page(rows, limit, sort)
+        seen.extend(r["id"] for r in rows)
+        if token is None:
+            return seen
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 8, 50])
+def test_keyset_pages_cover_every_row_once_in_order(limit):
+    conn = _db()
+    by_name = Sort(
+        ["COALESCE(last_name, '')", "COALESCE(first_name, '')", "id"],
+        ["sort_last_name", "sort_first_name", "id"],
+    )
+    expected = [
+        r[0]
+        for r in conn.execute(
+            "SELECT id FROM s ORDER BY COALESCE(last_name, ''), COALESCE(first_name, ''), id"
+        )
+    ]
+    assert _walk(conn, by_name, limit) == expected
+
+    newest = Sort(["id"], ["id"], descending=True)
+    assert _walk(conn, newest, limit) == list(range(8, 0, -1))
+
+
+def test_cursor_round_trip_and_validation():
+    token = encode_cursor(["Cruz", "Ana", 3])
+    assert "=" not in token
+    assert decode_cursor(token) == ["Cruz", "Ana", 3]
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor!")
+    with pytest.raises(ValueError):
+        Sort(["id"], ["id"]).after(["Cruz", 3])
+
+
+def test_limit_and_prefix_helpers():
+    assert parse_limit(None) == 50
+    assert parse_limit("0") == 1
+    assert parse_limit("5000") == 200
+    assert parse_limit("x", default=10) == 10
+    assert like_prefix("50%_a\\") == "50\\%\\_a\\\\%"
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from blueprints.instructor_routes import compute_release_rows
+from conftest import FakeCursor
+from recalculate_grades import diff_release_row
+
+
+class _FakeCursor(FakeCursor):
+    """Answers the handful of queries compute_release_rows issues."""
+
+    def respond(self, sql, params):
+        if "FROM student_scores" in sql:
+            return [
+                {"student_id": 10, "assessment_id": 1, "score": 50},
+                {"student_id": 12, "assessment_id": 1, "score": 10},
+            ]
+        elif "FROM classes" in sql:
+            return [{"class_type": "MAJOR"}]
+        elif "FROM grade_assessments" in sql:
+            return [
+                {
+                    "id": 1,
+                    "max_score": 50,
+                    "subcategory_id": 1,
+                    "category_name": "Lecture",
+                    "subcategory_name": "Quiz",
+                    "weight": 100,
+                }
+            ]
+        elif "FROM students" in sql:
+            return [
+                {"student_id": 10, "school_id": "A-1", "first_name": "Ana", "last_name": "Cruz", "middle_name": ""},
+                {"student_id": 11, "school_id": "A-2", "first_name": "Ben", "last_name": "Reyes", "middle_name": ""},
+                {"student_id": 12, "school_id": "A-3", "first_name": "Cy", "last_name": "Lim", "middle_name": ""},
+            ]
+        elif "FROM student_classes" in sql:
+            return [{"student_id": 12, "is_dropped": 1}]
+
+
+def test_compute_release_rows_marks_missing_and_dropped():
+    computed = compute_release_rows(_FakeCursor(), 5, [12, 10, "11"])
+    assert computed["success"]
+    rows = {r["student_id"]: r for r in computed["rows"]}
+    assert sorted(rows) == [10, 11, 12]
+
+    assert rows[10]["name"] == "Cruz, Ana"
+    assert rows[10]["equivalent"] not in ("INC", "DRP", "N/A")
+    assert rows[11]["equivalent"] == "INC"
+    assert rows[11]["remarks"] == "NO QUIZ"
+    assert rows[12]["equivalent"] == "DRP"
+    assert rows[12]["remarks"] == "DROPPED"
+    assert rows[12]["payload"]["computed"] == {}
+
+
+def test_diff_release_row_normalizes_db_types():
+    computed = {
+        "final_grade": 91.5,
+        "equivalent": "1.75",
+        "remarks": "PASSED",
+        "overall_percentage": 91.5,
+        "payload": {"final_grade": 91.5, "equivalent": "1.75"},
+    }
+    existing = {
+        "final_grade": Decimal("91.50"),
+        "equivalent": "1.75",
+        "remarks": "PASSED",
+        "overall_percentage": Decimal("91.500"),
+        "grade_payload": json.dumps({"final_grade": 91.5, "equivalent": "1.75"}),
+    }
+    assert diff_release_row(existing, computed) == {}
+
+    existing["equivalent"] = "1.5"
+    existing["grade_payload"] = json.dumps({"final_grade": 91.5, "equivalent": "1.5"})
+    assert diff_release_row(existing, computed) == {
+        "equivalent": ("1.5", "1.75"),
+        "grade_payload": None,
+    }
@@ -0,0 +1,76 @@
+import gzip
+import os
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask, jsonify
+
+import utils.response_layer as response_layer
+
+
+def _make_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    response_layer.init_response_layer(app)
+
+    @app.route("/rows")
+    def rows():
+        return jsonify(
+            {
+                "rows": [
+                    {"score": Decimal("87.50"), "at": datetime(2025, 1, 2, 3, 4, 5)}
+                    for _ in range(200)
+                ]
+            }
+        )
+
+    @app.route("/small")
+    def small():
+        return jsonify({"ok": True})
+
+    return app
+
+
+@pytest.mark.skipif(not response_layer._have_orjson, reason="orjson not installed")
+def test_orjson_provider_matches_stdlib_output():
+    app = _make_app(RESPONSE_COMPRESSION=False)
+    payload = {
+        "b": Decimal("1.25"),
+        "a": date(2025, 6, 1),
+        "c": datetime(2025, 6, 1, 8, 30),
+    }
+    with app.app_context():
+        assert isinstance(app.json, response_layer.OrjsonProvider)
+        fast = app.json.loads(app.json.dumps(payload))
+    stdlib = Flask("stdlib")
+    with stdlib.app_context():
+        slow = stdlib.json.loads(stdlib.json.dumps(payload))
+    assert fast == slow
+
+
+def test_gzip_negotiated_above_threshold():
+    client = _make_app().test_client()
+    resp = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    body = gzip.decompress(resp.get_data())
+    assert b'"score":"87.50"' in body
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in small.headers
+
+    plain = client.get("/rows")
+    assert "Content-Encoding" not in plain.headers
+
+
+@pytest.mark.skipif(not response_layer._have_brotli, reason="brotli not installed")
+def test_brotli_preferred_when_accepted():
+    client = _make_app().test_client()
+    resp = client.get("/rows", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.headers["Content-Encoding"] == "br"
+    assert response_layer.brotli.decompress(resp.get_data()).startswith(b"{")
@@ -0,0 +1,110 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from openpyxl import Workbook
+from pymysql.cursors import RE_INSERT_VALUES
+
+from conftest import FakeCursor
+from utils.roster_import import hash_passwords, insert_chunk, read_roster, validate_roster
+
+HEADER = ["School ID", "firstName", "Last Name", "Email", "Password", "Course", "Year Level", "Section"]
+
+
+class _Cursor(FakeCursor):
+    def __init__(self, school_ids=(), emails=()):
+        super().__init__()
+        self.taken = {"users": set(school_ids), "personal_info": set(emails)}
+
+    def respond(self, sql, params):
+        table = "users" if "FROM users" in sql else "personal_info"
+        column = "school_id" if table == "users" else "email"
+        return [{column: v} for v in params if v in self.taken[table]]
+
+
+def test_csv_and_xlsx_rosters_read_the_same():
+    rows = [
+        ["2024-0001", "Ana", "Cruz", "Ana@School.edu", "Str0ngPassw0rd", "bsit", "1st", "a"],
+        ["", "", "", "", "", "", "", ""],
+        ["2024-0002", "Ben", "Abad", "ben@school.edu", "Str0ngPassw0rd", "BSIT", 2, "B"],
+    ]
+    text = "\n".join(",".join(str(v) for v in r) for r in [HEADER] + rows)
+    from_csv = read_roster(io.BytesIO(("﻿" + text).encode("utf-8")), "roster.csv")
+
+    book = Workbook()
+    for r in [HEADER] + rows:
+        book.active.append([v or None for v in r])
+    data = io.BytesIO()
+    book.save(data)
+    data.seek(0)
+    from_xlsx = read_roster(data, "Roster.XLSX")
+
+    assert from_csv == from_xlsx
+    assert [r["row"] for r in from_csv] == [2, 4]
+    assert from_csv[0]["school_id"] == "2024-0001"
+    assert from_csv[1]["year_level"] == "2"
+
+
+def test_validation_reports_every_bad_row_with_batched_lookups():
+    records = [
+        {"row": 2, "school_id": "2024-0001", "first_name": "Ana", "last_name": "Cruz",
+         "email": "ANA@school.edu", "password": "Str0ngPassw0rd", "course": "bsit",
+         "year_level": "1st", "section": "a"},
+        {"row": 3, "school_id": "2024-0002", "first_name": "Ben", "last_name": "Abad",
+         "email": "ben@school.edu", "password": "Str0ngPassw0rd", "course": "BSIT",
+         "year_level": "x", "section": "B"},
+        {"row": 4, "school_id": "2024-0003", "first_name": "", "last_name": "Diaz",
+         "email": "ana@school.edu", "password": "Str0ngPassw0rd", "course": "BSIT",
+         "year_level": "3", "section": "B"},
+        {"row": 5, "school_id": "2023-0100", "first_name": "Eli", "last_name": "Go",
+         "email": "eli@school.edu", "password": "Str0ngPassw0rd", "course": "BSIT",
+         "year_level": "4", "section": "C"},
+    ]
+    cursor = _Cursor(school_ids={"2023-0100"})
+    valid, errors = validate_roster(cursor, "student", records)
+
+    assert cursor.queries == 2
+    assert valid == []
+    by_row = {e["row"]: e["errors"] for e in errors}
+    assert by_row[2] == ["Email appears more than once in the file"]
+    assert by_row[3] == ["Year level must be 1st-4th or a number"]
+    assert "First name is required" in by_row[4]
+    assert by_row[5] == ["School ID already exists"]
+    assert records[0]["course"] == "BSIT" and records[0]["year_level"] == 1
+
+
+def test_hash_passwords_without_pool():
+    from werkzeug.security import check_password_hash
+
+    hashes = hash_passwords(["a", "b"])
+    assert check_password_hash(hashes[0], "a") and check_password_hash(hashes[1], "b")
+
+
+def test_insert_chunk_statements_batch_into_multi_row_inserts():
+    class _InsertCursor(FakeCursor):
+        def __init__(self):
+            super().__init__()
+            self.inserts = []
+
+        def executemany(self, sql, rows):
+            self.inserts.append((sql, rows))
+
+        def respond(self, sql, params):
+            column = "school_id" if "FROM users" in sql else "email"
+            return [{"id": i, column: v} for i, v in enumerate(params, start=1)]
+
+    record = {"school_id": "2024-0001", "first_name": "Ana", "last_name": "Cruz",
+              "middle_name": "", "email": "ana@school.edu", "phone": "", "course": "BSIT",
+              "track": "", "year_level": 1, "section": "A", "department": "CCS",
+              "specialization": "", "employee_id": ""}
+    for role in ("student", "instructor"):
+        cursor = _InsertCursor()
+        insert_chunk(cursor, role, [record, dict(record)], ["h1", "h2"], approved_by=9)
+
+        assert len(cursor.inserts) == 3
+        for sql, rows in cursor.inserts:
+            # PyMySQL only sends one multi-row INSERT when this matches.
+            assert RE_INSERT_VALUES.match(sql), sql
+            assert len(rows) == 2
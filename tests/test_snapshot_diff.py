@@ -0,0 +1,107 @@
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeCursor
+from utils import snapshot_store
+from utils.snapshot_store import diff_documents, diff_versions
+
+
+def _student(sid, scores, grade, letter):
+    return {
+        "student_id": sid,
+        "scores": [{"assessment_id": aid, "score": v} for aid, v in scores.items()],
+        "computed": {"final_grade": grade, "letter_grade": letter},
+    }
+
+
+def _draft():
+    return {
+        "assessments": [{"id": 1}, {"id": 2}],
+        "students": [
+            _student(1, {1: 8, 2: 9}, 91.5, "1.50"),
+            _student(2, {1: 5, 2: 6}, 80.0, "2.25"),
+            _student(3, {1: 7}, 75.0, "3.00"),
+        ],
+    }
+
+
+def test_only_changed_cells_and_grades_are_reported():
+    old = _draft()
+    new = _draft()
+    new["assessments"].append({"id": 3})
+    new["students"][1] = _student(2, {1: 5, 2: 7, 3: 10}, 82.0, "2.00")
+    new["students"].pop(2)
+    new["students"].append(_student(4, {1: 9}, 88.0, "1.75"))
+
+    diff = diff_documents(old, new)
+    assert diff["students"] == {"added": [4], "removed": [3]}
+    assert diff["assessments"] == {"added": [3], "removed": []}
+    assert diff["cells"] == [
+        {"student_id": 2, "assessment_id": 2, "from": 6, "to": 7},
+        {"student_id": 2, "assessment_id": 3, "from": None, "to": 10},
+        {"student_id": 4, "assessment_id": 1, "from": None, "to": 9},
+        {"student_id": 3, "assessment_id": 1, "from": 7, "to": None},
+    ]
+    assert [g["student_id"] for g in diff["grades"]] == [2, 4, 3]
+    assert diff["grades"][0] == {
+        "student_id": 2,
+        "final_grade": {"from": 80.0, "to": 82.0},
+        "equivalent": {"from": "2.25", "to": "2.00"},
+    }
+
+
+def test_final_snapshots_compare_grades_and_equivalents():
+    old = {"students": [{"student_id": 1, "final_grade": 80.0, "computed": {"equivalent": "2.25"}}]}
+    new = {"students": [{"student_id": 1, "final_grade": 80.0, "computed": {"equivalent": "2.00"}}]}
+    diff = diff_documents(old, new)
+    assert diff["cells"] == []
+    assert diff["grades"][0]["equivalent"] == {"from": "2.25", "to": "2.00"}
+    assert diff_documents(old, old)["grades"] == []
+
+
+class _VersionCursor(FakeCursor):
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = rows
+
+    def respond(self, sql, params):
+        class_id, version = params
+        return self.rows.get(version)
+
+
+def test_diff_versions_caches_by_pair_and_draft_content(monkeypatch):
+    monkeypatch.setattr(snapshot_store, "_storage_columns", False)
+    snapshot_store._diffs.clear()
+    old, new = _draft(), _draft()
+    new["students"][0] = _student(1, {1: 10, 2: 9}, 93.0, "1.25")
+
+    def row(id_, version, status, doc, saved):
+        return {
+            "id": id_,
+            "version": version,
+            "status": status,
+            "snapshot_json": json.dumps(doc),
+            "created_at": saved,
+        }
+
+    rows = {
+        1: row(10, 1, "final", old, datetime(2026, 1, 1)),
+        2: row(11, 2, "draft", new, datetime(2026, 1, 2)),
+    }
+    cursor = _VersionCursor(rows)
+    first = diff_versions(cursor, 5, 1, 2)
+    assert first["from"]["version"] == 1 and first["to"]["status"] == "draft"
+    assert len(first["cells"]) == 1
+
+    assert diff_versions(cursor, 5, 1, 2) is first
+
+    # Saving the draft again within the same second keeps its created_at but
+    # changes its content: the cached diff is not reused.
+    rows[2] = row(11, 2, "draft", old, datetime(2026, 1, 2))
+    assert diff_versions(cursor, 5, 1, 2)["cells"] == []
+    assert diff_versions(cursor, 5, 1, 9) is None
+    snapshot_store._diffs.clear()
@@ -0,0 +1,130 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeCursor
+from utils import snapshot_store
+from utils.snapshot_store import (
+    _pack,
+    apply_delta,
+    decode_envelope,
+    encode_document,
+    load_document,
+    make_delta,
+    summarize,
+    _unpack,
+)
+
+
+def _doc(n=40, bump=None):
+    students = []
+    for sid in range(1, n + 1):
+        grade = 70 + sid % 25
+        if bump and sid in bump:
+            grade += bump[sid]
+        students.append(
+            {
+                "student_id": sid,
+                "final_grade": grade,
+                "scores": [{"assessment_id": a, "score": (sid * a) % 10} for a in range(1, 6)],
+            }
+        )
+    students[3].pop("scores")  # rows do not all share the same keys
+    return {
+        "meta": {"class_id": 9, "saved_at": "2026-01-01T00:00:00Z"},
+        "assessments": [{"id": a, "max_score": 10} for a in range(1, 6)],
+        "students": students,
+    }
+
+
+def test_columnar_keyframe_round_trips():
+    doc = _doc()
+    encoding, blob = encode_document(doc)
+    assert decode_envelope(_unpack(encoding, blob)) == doc
+    assert len(blob) < len(json.dumps(doc))
+
+
+def test_delta_round_trips_changes_additions_and_removals():
+    base = _doc()
+    doc = _doc(bump={5: 3, 17: -2})
+    doc["students"] = doc["students"][1:] + [{"student_id": 99, "final_grade": 88}]
+    doc["meta"] = {"class_id": 9, "saved_at": "2026-02-01T00:00:00Z"}
+
+    delta = make_delta(base, doc)
+    assert sorted(delta["changed"]["ids"]) == ["17", "5", "99"]
+    assert apply_delta(base, delta) == doc
+    envelope = _unpack(*_pack({"fmt": "delta-1", "delta": delta}))
+    assert decode_envelope(envelope, base) == doc
+
+
+def test_delta_needs_unique_student_ids():
+    base = _doc()
+    doc = _doc()
+    doc["students"].append(dict(doc["students"][0]))
+    assert make_delta(base, doc) is None
+
+
+def test_summarize_reads_top_level_or_computed_grades():
+    doc = {
+        "assessments": [{"id": 1}, {"id": 2}],
+        "students": [
+            {"student_id": 1, "final_grade": 80},
+            {"student_id": 2, "computed": {"final_grade": 91}},
+            {"student_id": 3, "final_grade": None},
+        ],
+    }
+    assert summarize(doc) == {"student_count": 3, "assessment_count": 2, "class_average": 85.5}
+
+
+class _FakeCursor(FakeCursor):
+    """Serves grade_snapshots rows by id for load_document's base lookups."""
+
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = {r["id"]: r for r in rows}
+
+    def respond(self, sql, params):
+        return self.rows.get(params[0])
+
+    @property
+    def lookups(self):
+        return [params[0] for _, params in self.statements]
+
+
+def _stored(snapshot_id, doc, base=None, base_id=None):
+    if base is None:
+        encoding, blob = encode_document(doc)
+    else:
+        encoding, blob = _pack({"fmt": "delta-1", "delta": make_delta(base, doc)})
+    return {
+        "id": snapshot_id,
+        "encoding": encoding,
+        "snapshot_blob": blob,
+        "base_snapshot_id": base_id,
+        "snapshot_json": None,
+        "status": "final",
+    }
+
+
+def test_load_document_follows_delta_chain_and_reads_legacy_rows():
+    snapshot_store._documents.clear()
+    v1 = _doc()
+    v2 = _doc(bump={2: 1})
+    v3 = _doc(bump={2: 1, 30: 4})
+    rows = [_stored(1, v1), _stored(2, v2, v1, 1), _stored(3, v3, v2, 2)]
+    cursor = _FakeCursor(rows)
+
+    assert load_document(cursor, rows[2]) == v3
+    assert cursor.lookups == [2, 1]
+    # Decoded finals are cached: a second read does not touch the database.
+    assert load_document(cursor, rows[2]) == v3
+    assert cursor.lookups == [2, 1]
+    # Callers get a copy: changing it does not change the cached document.
+    load_document(cursor, rows[2])["students"][0]["final_grade"] = 0
+    assert load_document(cursor, rows[2]) == v3
+
+    legacy = {"id": 7, "snapshot_json": json.dumps(v1), "snapshot_blob": None}
+    assert load_document(cursor, legacy) == v1
+    snapshot_store._documents.clear()
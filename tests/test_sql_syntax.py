@@ -0,0 +1,295 @@
+"""Syntax checks of the SQL the query builders generate.
+
+Each scenario runs real code against a recording cursor and returns the
+statements it issued. Every statement is rendered with its parameters the
+way PyMySQL does (so a placeholder/parameter mismatch fails here) and
+checked for unbalanced quotes and parentheses, leftover f-string braces,
+empty IN lists, stray commas and Python None rendered into the text.
+
+With ECLASS_MYSQL_TESTS=1 the same statements are also run against the
+database configured in .env (a disposable, migrated copy), inside a
+transaction that is rolled back: syntax errors and unknown tables or columns
+fail, constraint errors from the made-up parameter values are ignored.
+"""
+
+import os
+import re
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from pymysql.converters import escape_item
+
+from conftest import FakeConnection, FakeCursor
+from utils import (
+    admin_jobs,
+    analytics_rollups,
+    bulk_actions,
+    class_summaries,
+    class_versions,
+    db_conn,
+    gradebook_window,
+    image_pipeline,
+    live,
+    roster_import,
+    structure_diff,
+)
+
+
+class _Recorder(FakeCursor):
+    """Answers lookups with rows shaped like the real ones."""
+
+    def respond(self, sql, params):
+        if "information_schema" in sql:
+            return {"cnt": 1}
+        if sql.startswith("SELECT DISTINCT instructor_id"):
+            return [{"instructor_id": 4}]
+        if sql.startswith("SELECT DISTINCT class_id"):
+            return [{"class_id": 7}]
+        if sql.startswith("SELECT COUNT(*) AS n"):
+            return {"n": 2}
+        if sql.startswith("SELECT s.id, s.user_id"):
+            return [
+                {"id": sid, "user_id": 100 + sid, "personal_info_id": 200 + sid,
+                 "course": "BSIT", "year_level": 1, "school_id": f"2024-{sid:04d}",
+                 "first_name": "A", "last_name": "B", "email": f"s{sid}@x.edu"}
+                for sid in params
+                if isinstance(sid, int)
+            ]
+        if sql.startswith("SELECT id, school_id FROM users"):
+            return [{"id": i, "school_id": v} for i, v in enumerate(params, start=1)]
+        if sql.startswith("SELECT id, email FROM personal_info"):
+            return [{"id": i, "email": v} for i, v in enumerate(params, start=1)]
+        if sql.startswith("SELECT class_id, structure_json"):
+            return [{"class_id": c, "structure_json": '{"LECTURE": [{"name": "Quiz", "weight": 100}]}'}
+                    for c in params]
+        if sql.startswith("SELECT id, host, pid"):
+            return [{"id": "a" * 32, "host": "elsewhere", "pid": 1,
+                     "updated_at": datetime(2000, 1, 1)}]
+        return None
+
+
+def _class_summaries(monkeypatch):
+    cursor = _Recorder()
+    class_summaries.load(cursor, 4)
+    class_summaries.computed_grades(cursor, [7, 9])
+    return cursor.statements
+
+
+def _rollups(monkeypatch):
+    cursor = _Recorder()
+    analytics_rollups.refresh(cursor, [7, 9])
+    analytics_rollups.refresh(cursor, None)
+    monkeypatch.setattr(analytics_rollups, "_tables", False)
+    monkeypatch.setattr(analytics_rollups, "_filled", False)
+    source, params = analytics_rollups.instructor_source(_Recorder())
+    cursor.execute(f"SELECT * FROM {source} ir", params)
+    return cursor.statements
+
+
+def _live_version(monkeypatch):
+    cursor = _Recorder()
+    monkeypatch.setattr(class_versions, "_available", True)
+    monkeypatch.setattr(live, "get_db_connection", lambda: FakeConnection(cursor))
+    live.compute_class_live_version(7)
+    class_versions.bump_many(cursor, [7, 9])
+    class_versions.assessment_class(cursor, 5)
+    return cursor.statements
+
+
+def _bulk_actions(monkeypatch):
+    cursor = _Recorder()
+    for action in ("suspend", "unsuspend", "drop", "delete", "approve", "reject"):
+        bulk_actions.apply_chunk(cursor, action, [1, 2], admin_id=5)
+    return cursor.statements
+
+
+def _roster_insert(monkeypatch):
+    cursor = _Recorder()
+    record = {"school_id": "2024-0001", "first_name": "Ana", "last_name": "Cruz",
+              "middle_name": "", "email": "ana@school.edu", "phone": "", "course": "BSIT",
+              "track": "", "year_level": 1, "section": "A", "department": "CCS",
+              "specialization": "", "employee_id": ""}
+    other = dict(record, school_id="2024-0002", email="ben@school.edu")
+    for role in ("student", "instructor"):
+        roster_import.insert_chunk(cursor, role, [record, other], ["h1", "h2"], approved_by=9)
+    return cursor.statements
+
+
+def _structure(monkeypatch):
+    cursor = _Recorder()
+    structure_diff.load(cursor, 7)
+    existing = {
+        "LECTURE": {
+            "id": 1, "name": "LECTURE", "weight": 100.0, "position": 1,
+            "subcategories": [
+                {"id": 10, "name": "Quiz", "weight": 40.0, "position": 1,
+                 "assessments": [{"id": 100, "name": "Q1", "max_score": 20.0, "position": 1}]},
+                {"id": 11, "name": "Exam", "weight": 60.0, "position": 2, "assessments": []},
+            ],
+        },
+    }
+    structure = {
+        "LECTURE": [
+            {"id": 10, "name": "Quizzes", "weight": 50,
+             "assessments": [{"name": "Q1", "max_score": 25}, {"name": "Q2"}]},
+            {"name": "Project", "weight": 50},
+        ],
+        "LABORATORY": [{"name": "Lab Work", "weight": 100}],
+    }
+    structure_diff.apply(cursor, 7, structure_diff.diff(existing, structure))
+    return cursor.statements
+
+
+def _gradebook(monkeypatch):
+    cursor = _Recorder()
+    gradebook_window.load_manifest(cursor, 3)
+    data = {"class_id": 3, "students": [{"id": 1}, {"id": 2}], "assessments": [{"id": 9}]}
+    gradebook_window.window(cursor, data, (0, 2), (0, 1))
+    return cursor.statements
+
+
+def _admin_jobs(monkeypatch):
+    cursor = _Recorder()
+    monkeypatch.setattr(admin_jobs, "_available", True)
+    monkeypatch.setattr(db_conn, "get_db_connection", lambda: FakeConnection(cursor))
+    job = admin_jobs.Job(total=3, admin="admin-1")
+    job.save()
+    job.finished_at = job.started_at + 1
+    job.save()
+    admin_jobs.get(job.id)
+    admin_jobs.fail_orphans(cursor)
+    return cursor.statements
+
+
+def _image_pipeline(monkeypatch):
+    cursor = _Recorder()
+    monkeypatch.setattr(image_pipeline, "_variants_column", True)
+    monkeypatch.setattr(db_conn, "get_db_connection", lambda: FakeConnection(cursor))
+    pipeline = image_pipeline.ImagePipeline("/nonexistent", "/nonexistent/media")
+    pipeline.backfill()
+    pipeline._claim(cursor, 5, None)
+    pipeline._claim(cursor, 5, '{"claimed_at": 1}')
+    return cursor.statements
+
+
+SCENARIOS = {
+    "class_summaries": _class_summaries,
+    "analytics_rollups": _rollups,
+    "live_version": _live_version,
+    "bulk_actions": _bulk_actions,
+    "roster_import": _roster_insert,
+    "structure_diff": _structure,
+    "gradebook_window": _gradebook,
+    "admin_jobs": _admin_jobs,
+    "image_pipeline": _image_pipeline,
+}
+
+
+def render(sql, params):
+    """`sql` with `params` substituted as PyMySQL's mogrify() does."""
+    if params is None:
+        return sql
+    if isinstance(params, dict):
+        return sql % {k: escape_item(v, "utf8mb4") for k, v in params.items()}
+    return sql % tuple(escape_item(v, "utf8mb4") for v in params)
+
+
+_QUOTES = "'\"`"
+
+
+def problems(sql) -> list:
+    found = []
+    outside = []
+    quote = None
+    depth = 0
+    i = 0
+    while i < len(sql):
+        ch = sql[i]
+        if quote:
+            if ch == "\\" and quote != "`":
+                i += 2
+                continue
+            if ch == quote:
+                if sql[i + 1 : i + 2] == quote:
+                    i += 2
+                    continue
+                quote = None
+                outside.append("?")
+        elif ch in _QUOTES:
+            quote = ch
+        else:
+            outside.append(ch)
+            if ch == "(":
+                depth += 1
+            elif ch == ")":
+                depth -= 1
+                if depth < 0:
+                    found.append("unbalanced ')'")
+                    depth = 0
+        i += 1
+    if quote:
+        found.append(f"unterminated {quote}")
+    if depth:
+        found.append("unbalanced '('")
+    text = "".join(outside)
+    for pattern, message in (
+        (r"[{}]", "f-string braces"),
+        (r"\bIN\s*\(\s*\)", "empty IN list"),
+        (r",\s*([,)]|(FROM|WHERE|GROUP|ORDER|SET|VALUES)\b)|\(\s*,", "stray comma"),
+        (r"\bNone\b", "Python None in the SQL text"),
+        (r"%s", "unrendered placeholder"),
+    ):
+        if re.search(pattern, text):
+            found.append(message)
+    if not re.match(r"\s*(SELECT|INSERT|UPDATE|DELETE)\b", text, re.IGNORECASE):
+        found.append("not a SELECT/INSERT/UPDATE/DELETE")
+    return found
+
+
+def test_checker_catches_broken_statements():
+    assert problems(render("SELECT a FROM t WHERE id IN (%s, %s)", [1, "x'y"])) == []
+    assert problems("SELECT (a FROM t") == ["unbalanced '('"]
+    assert problems("SELECT a FROM t WHERE b = 'x") == ["unterminated '"]
+    assert problems("SELECT a FROM t WHERE id IN ()") == ["empty IN list"]
+    assert problems("SELECT a, FROM t") == ["stray comma"]
+    assert problems("SELECT a,, b FROM {table}") == ["f-string braces", "stray comma"]
+    with pytest.raises(TypeError):
+        render("SELECT a FROM t WHERE id = %s AND b = %s", [1])
+
+
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+def test_generated_sql_is_well_formed(name, monkeypatch):
+    statements = SCENARIOS[name](monkeypatch)
+
+    assert statements
+    for sql, params in statements:
+        rendered = render(sql, params)
+        assert problems(rendered) == [], rendered
+
+
+@pytest.mark.skipif(
+    os.environ.get("ECLASS_MYSQL_TESTS") != "1",
+    reason="set ECLASS_MYSQL_TESTS=1 to run against the .env database",
+)
+@pytest.mark.parametrize("name", sorted(SCENARIOS))
+def test_generated_sql_runs_on_mysql(name, monkeypatch):
+    import pymysql
+
+    statements = SCENARIOS[name](monkeypatch)
+    monkeypatch.undo()
+    conn = db_conn.get_db_connection()
+    try:
+        for sql, params in statements:
+            conn.begin()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute(sql, params)
+            except (pymysql.err.IntegrityError, pymysql.err.DataError):
+                pass
+            finally:
+                conn.rollback()
+    finally:
+        db_conn.close_db_connection()
@@ -0,0 +1,210 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeCursor
+from utils import structure_diff
+
+
+def _existing():
+    return {
+        "LECTURE": {
+            "id": 1, "name": "LECTURE", "weight": 100.0, "position": 1,
+            "subcategories": [
+                {"id": 10, "name": "Quiz", "weight": 40.0, "position": 1,
+                 "assessments": [
+                     {"id": 100, "name": "Q1", "max_score": 20.0, "position": 1},
+                     {"id": 101, "name": "Q2", "max_score": 20.0, "position": 2},
+                 ]},
+                {"id": 11, "name": "Exam", "weight": 60.0, "position": 2,
+                 "assessments": [
+                     {"id": 110, "name": "Midterm", "max_score": 50.0, "position": 1},
+                 ]},
+            ],
+        },
+    }
+
+
+class _Cursor(FakeCursor):
+    def __init__(self):
+        super().__init__()
+        self.lastrowid = 500
+
+    def respond(self, sql, params):
+        self.lastrowid += 1
+
+
+def test_unchanged_structure_writes_nothing():
+    structure = {
+        "LECTURE": [
+            {"name": "Quiz", "weight": 40, "assessments": []},
+            {"name": "Exam", "weight": 60},
+        ],
+        "LABORATORY": [],
+    }
+
+    plan = structure_diff.diff(_existing(), structure)
+
+    assert not structure_diff.has_changes(plan)
+    cursor = _Cursor()
+    assert structure_diff.apply(cursor, 7, plan) == 0
+    assert cursor.statements == []
+
+
+def test_rename_and_reweight_keep_row_ids():
+    structure = {
+        "LECTURE": [
+            {"id": 10, "name": "Quizzes", "weight": 30},
+            {"name": "exam", "weight": 70},
+        ],
+        "LABORATORY": [],
+    }
+
+    plan = structure_diff.diff(_existing(), structure)
+
+    subs = plan["categories"][0]["subcategories"]
+    assert [s["id"] for s in subs] == [10, 11]
+    assert subs[0]["set"] == {"name": "Quizzes", "weight": 30.0}
+    assert subs[1]["set"] == {"name": "exam", "weight": 70.0}
+    assert plan["summary"]["renamed"][0] == {"from": "LECTURE/Quiz", "to": "LECTURE/Quizzes"}
+    assert plan["summary"]["reweighted"] == ["LECTURE/Quizzes", "LECTURE/exam"]
+    assert plan["summary"]["rename_candidates"] == []
+    assert not any(plan["delete"].values())
+
+    cursor = _Cursor()
+    structure_diff.apply(cursor, 7, plan)
+    assert [sql.split(" SET")[0] for sql, _ in cursor.statements] == [
+        "UPDATE grade_subcategories",
+        "UPDATE grade_subcategories",
+    ]
+
+
+def test_added_and_removed_groups_and_assessments():
+    structure = {
+        "LECTURE": [
+            {"name": "Exam", "weight": 60, "assessments": [
+                {"name": "Midterm", "max_score": 50},
+                {"name": "Finals", "max_score": 100},
+            ]},
+            {"name": "Project", "weight": 40},
+        ],
+        "LABORATORY": [{"name": "Lab Work", "weight": 100}],
+    }
+
+    plan = structure_diff.diff(_existing(), structure)
+
+    # Project lands in Exam's slot, which Exam itself keeps: Quiz is removed.
+    assert plan["summary"]["renamed"] == []
+    assert plan["delete"]["subcategories"] == [10]
+    lecture, lab = plan["categories"]
+    assert [s["id"] for s in lecture["subcategories"]] == [11, None]
+    assert [a["id"] for a in lecture["subcategories"][0]["assessments"]] == [110, None]
+    assert lecture["subcategories"][1]["assessments"] is None
+    assert lab["id"] is None and lab["subcategories"][0]["id"] is None
+    assert plan["summary"]["added"] == [
+        "LECTURE/Exam/Finals", "LECTURE/Project", "LABORATORY", "LABORATORY/Lab Work",
+    ]
+
+    cursor = _Cursor()
+    structure_diff.apply(cursor, 7, plan)
+    kinds = [sql.split(" ")[0] for sql, _ in cursor.statements]
+    assert kinds.count("INSERT") == 4 and kinds.count("DELETE") == 1
+
+
+def test_removed_rows_are_deleted_by_id():
+    structure = {
+        "LECTURE": [
+            {"name": "Quiz", "weight": 100, "assessments": [{"name": "Q2", "max_score": 25}]},
+        ],
+        "LABORATORY": [],
+    }
+
+    plan = structure_diff.diff(_existing(), structure)
+
+    assert plan["delete"] == {"categories": [], "subcategories": [11], "assessments": [100]}
+    assert plan["summary"]["removed"] == ["LECTURE/Exam", "LECTURE/Quiz/Q1"]
+    assessments = plan["categories"][0]["subcategories"][0]["assessments"]
+    assert assessments == [{"id": 101, "set": {"max_score": 25.0, "position": 1}}]
+
+
+def test_load_groups_joined_rows():
+    class _LoadCursor(FakeCursor):
+        def respond(self, sql, params):
+            assert params == (7,)
+            base = {"category_id": 1, "category": "LECTURE", "category_weight": 100,
+                    "category_position": 1}
+            return [
+                dict(base, subcategory_id=10, subcategory="Quiz", subcategory_weight=40,
+                     subcategory_position=1, assessment_id=100, assessment="Q1",
+                     max_score=20, assessment_position=1),
+                dict(base, subcategory_id=10, subcategory="Quiz", subcategory_weight=40,
+                     subcategory_position=1, assessment_id=101, assessment="Q2",
+                     max_score=20, assessment_position=2),
+                dict(base, subcategory_id=11, subcategory="Exam", subcategory_weight=60,
+                     subcategory_position=2, assessment_id=110, assessment="Midterm",
+                     max_score=50, assessment_position=1),
+            ]
+
+    assert structure_diff.load(_LoadCursor(), 7) == _existing()
+
+
+def test_remove_and_add_in_one_slot_is_not_a_rename():
+    structure = {
+        "LECTURE": [
+            {"name": "Project", "weight": 30},
+            {"name": "Exam", "weight": 40},
+            {"name": "Recitation", "weight": 30},
+        ],
+        "LABORATORY": [],
+    }
+
+    plan = structure_diff.diff(_existing(), structure)
+
+    subs = plan["categories"][0]["subcategories"]
+    assert [s["id"] for s in subs] == [None, 11, None]
+    assert plan["delete"]["subcategories"] == [10]
+    assert plan["summary"]["renamed"] == []
+    assert plan["summary"]["rename_candidates"] == [
+        {"from": "LECTURE/Quiz", "to": "LECTURE/Project"}
+    ]
+
+    # With the row id the client asks for a rename, and Quiz's scores stay.
+    structure["LECTURE"][0]["id"] = 10
+    plan = structure_diff.diff(_existing(), structure)
+    assert [s["id"] for s in plan["categories"][0]["subcategories"]] == [10, 11, None]
+    assert plan["summary"]["renamed"] == [{"from": "LECTURE/Quiz", "to": "LECTURE/Project"}]
+    assert plan["summary"]["rename_candidates"] == []
+
+
+def test_same_length_lists_do_not_rename_by_position():
+    structure = {
+        "LECTURE": [
+            {"name": "Project", "weight": 40, "assessments": [
+                {"name": "Proposal", "max_score": 20},
+                {"name": "Q2", "max_score": 20},
+            ]},
+            {"name": "Exam", "weight": 60},
+        ],
+        "LABORATORY": [],
+    }
+
+    plan = structure_diff.diff(_existing(), structure)
+
+    subs = plan["categories"][0]["subcategories"]
+    assert [s["id"] for s in subs] == [None, 11]
+    assert plan["delete"]["subcategories"] == [10]
+    assert plan["summary"]["renamed"] == []
+    assert plan["summary"]["rename_candidates"] == [
+        {"from": "LECTURE/Quiz", "to": "LECTURE/Project"}
+    ]
+
+    # Same inside a kept subcategory: Q1 -> Proposal is remove + add.
+    structure["LECTURE"][0]["id"] = 10
+    plan = structure_diff.diff(_existing(), structure)
+    quiz = plan["categories"][0]["subcategories"][0]
+    assert [a["id"] for a in quiz["assessments"]] == [None, 101]
+    assert plan["delete"]["assessments"] == [100]
+    assert plan["summary"]["rename_candidates"] == [
+        {"from": "LECTURE/Project/Q1", "to": "LECTURE/Project/Proposal"}
+    ]
@@ -0,0 +1,113 @@
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeCursor
+from utils import student_dashboard
+
+
+class _Cursor(FakeCursor):
+    def __init__(self, classes, released=None, assessments=None):
+        super().__init__()
+        self.classes = classes
+        self.released = released or []
+        self.assessments = assessments or []
+
+    def respond(self, sql, params):
+        if sql.startswith("SELECT id FROM students"):
+            return [{"id": 5}]
+        elif "FROM classes c" in sql:
+            return self.classes
+        elif "FROM released_grades" in sql:
+            return self.released
+        elif "FROM grade_structures gs" in sql:
+            wanted = set(params[1:])
+            return [a for a in self.assessments if a["class_id"] in wanted]
+        raise AssertionError(sql)
+
+
+def _class(class_id, status="approved"):
+    return {
+        "id": class_id, "year": "2025", "semester": "1st Semester", "course": "BSIT",
+        "section": "A", "track": "WEB", "subject_code": "IT101", "subject": "Intro",
+        "status": status, "joined_at": datetime(2025, 8, 1), "first_name": "Ana",
+        "last_name": "Cruz",
+    }
+
+
+def setup_function():
+    student_dashboard.configure(ttl=60)
+    student_dashboard.clear()
+
+
+def test_query_count_does_not_grow_with_classes():
+    few = _Cursor([_class(1)])
+    many = _Cursor([_class(i) for i in range(1, 41)])
+
+    student_dashboard.build(few, 10)
+    student_dashboard.build(many, 10)
+
+    assert few.queries == many.queries == 4
+
+
+def test_missing_assessments_and_release_status():
+    cursor = _Cursor(
+        [_class(1), _class(2), _class(3, status="pending")],
+        released=[{"class_id": 2, "final_grade": 1.5, "equivalent": "1.50",
+                   "released_at": datetime(2025, 12, 1)}],
+        assessments=[
+            {"class_id": 1, "name": "Quiz 1", "scored": 1},
+            {"class_id": 1, "name": "Quiz 2", "scored": 0},
+            {"class_id": 2, "name": "Exam", "scored": 0},
+        ],
+    )
+
+    dashboard = student_dashboard.build(cursor, 10)
+    by_id = {c["id"]: c for c in dashboard["classes"]}
+
+    assert by_id[1]["missing_assessments"] == ["Quiz 2"]
+    assert by_id[1]["class_id"] == "25-1 BSIT A-WEB (IT101 - Intro)"
+    assert by_id[1]["instructor_name"] == "Ana Cruz"
+    assert by_id[2]["released"] and by_id[2]["missing_assessments"] == []
+    assert by_id[2]["released_at"] == "2025-12-01T00:00:00"
+
+    analytics = student_dashboard.analytics_view(dashboard)
+    assert [a["missing_assessments"] for a in analytics] == [["Quiz 2"], []]
+    assert analytics[1]["released_grades"][0]["final_grade"] == 1.5
+
+
+def test_cache_is_dropped_for_students_of_a_changed_class():
+    cursor = _Cursor([_class(1), _class(2)])
+
+    first = student_dashboard.get(cursor, 10)
+    assert student_dashboard.get(cursor, 10) is first
+    assert cursor.queries == 4
+
+    student_dashboard.invalidate_class(3)
+    assert student_dashboard.get(cursor, 10) is first
+
+    student_dashboard.invalidate_class(2)
+    assert student_dashboard.get(cursor, 10) is not first
+    assert cursor.queries == 8
+
+    student_dashboard.invalidate_user(10)
+    student_dashboard.get(cursor, 10)
+    assert cursor.queries == 12
+
+
+def test_build_racing_an_invalidation_is_not_cached():
+    cursor = _Cursor([_class(1)])
+    original = cursor.execute
+
+    def execute(sql, params=None):
+        original(sql, params)
+        if "FROM released_grades" in sql:
+            student_dashboard.invalidate_class(1)
+
+    cursor.execute = execute
+    student_dashboard.get(cursor, 10)
+    student_dashboard.get(cursor, 10)
+
+    assert cursor.queries == 8
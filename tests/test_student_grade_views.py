@@ -0,0 +1,72 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import FakeCursor
+from utils.student_grade_views import build_views, score_color
+
+STRUCTURE = {
+    "LECTURE": [{"name": "Quiz", "weight": 40}, {"name": "Exam", "weight": 60}],
+}
+ASSESSMENTS = [
+    {"id": 11, "max_score": 30, "position": 1, "subcategory_name": "Exam", "category_name": "LECTURE"},
+    {"id": 10, "max_score": 9, "position": 1, "subcategory_name": "Quiz", "category_name": "LECTURE"},
+    {"id": 12, "max_score": 9, "position": 2, "subcategory_name": "Quiz", "category_name": "LECTURE"},
+]
+
+
+class _Cursor(FakeCursor):
+    def __init__(self, scores):
+        super().__init__()
+        self.scores = scores
+
+    def respond(self, sql, params):
+        if "structure_json" in sql:
+            return {"structure_json": json.dumps(STRUCTURE)}
+        elif "FROM grade_assessments" in sql:
+            return ASSESSMENTS
+        elif "FROM student_scores" in sql:
+            return [r for r in self.scores if r["student_id"] in params]
+
+
+def test_views_are_built_for_the_class_with_one_score_query():
+    cursor = _Cursor(
+        [
+            {"student_id": 1, "assessment_id": 10, "score": 2},
+            {"student_id": 1, "assessment_id": 11, "score": 25},
+            {"student_id": 2, "assessment_id": 12, "score": 5},
+        ]
+    )
+    payloads = {
+        1: {"computed": {"final_grade": 88.5}},
+        2: json.dumps({"computed": {"final_grade": 75.0}}),
+    }
+    views = build_views(cursor, 4, payloads)
+
+    assert len(cursor.statements) == 3
+    one = views[1]
+    assert one["computed"] == {"final_grade": 88.5}
+    assert one["details"]["scores"] == [
+        {"assessment_id": 11, "score": 25},
+        {"assessment_id": 10, "score": 2},
+        {"assessment_id": 12, "score": None},
+    ]
+    quiz = one["details"]["structure_json"]["LECTURE"][0]["assessments"]
+    assert [(a["id"], a["released_score"], a["color"]) for a in quiz] == [
+        (10, 2, "red"),
+        (12, None, "gray"),
+    ]
+    # Students do not share the merged structure.
+    two_quiz = views[2]["details"]["structure_json"]["LECTURE"][0]["assessments"]
+    assert [a["released_score"] for a in two_quiz] == [None, 5]
+    assert views[2]["computed"] == {"final_grade": 75.0}
+
+
+def test_score_color_thresholds():
+    assert score_color(None, 9) == "gray"
+    assert score_color(2, 9) == "red"
+    assert score_color(5, 9) == "yellow"
+    assert score_color(6, 9) == "green"
+    assert build_views(_Cursor([]), 4, {}) == {}
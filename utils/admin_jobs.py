@@ -0,0 +1,304 @@
+"""
+Background jobs for long-running admin operations (roster imports, bulk
+student actions).
+
+A job runs in a daemon thread of the worker that started it, with its own
+database connection. Its status, counters and errors are saved to the
+admin_jobs table (migration 0009) when it starts, after every step and when
+it ends, so a status poll can be served by any worker. After every step the
+counters are also pushed to connected admins as a Socket.IO "<kind>_progress"
+event (see utils.live.emit_admin_event).
+
+A job whose worker exits mid-way would stay "running" forever; at startup
+(init_admin_jobs) jobs of dead processes on this host, and jobs not updated
+for STALE_AFTER seconds, are marked failed, and polls report a stale job as
+failed as well. Before the migration jobs are kept in the memory of the
+worker that started them, as before.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from utils.audit_log import _pid_alive
+
+logger = logging.getLogger(__name__)
+
+_KEEP_JOBS = 20
+# A running job saves its state after every chunk; one that has been silent
+# this long has lost its worker.
+STALE_AFTER = 1800
+KEEP_DAYS = 7
+FINISHED = ("completed", "failed")
+_HOST = socket.gethostname()[:255]
+_LOST = "The worker running this job exited before it finished"
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_available = False
+
+
+def available(cursor) -> bool:
+    """True once migration 0009 has created admin_jobs. Only a positive
+    answer is cached, so running the migration takes effect without a
+    restart."""
+    global _available
+    if not _available:
+        from utils.migrations import table_exists
+
+        try:
+            _available = table_exists(cursor, "admin_jobs")
+        except Exception as e:
+            logger.warning(f"Could not inspect admin_jobs: {e}")
+            return False
+    return _available
+
+
+def _stamp(ts):
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts else None
+
+
+class Job:
+    kind = "job"
+
+    def __init__(self, total=0, admin=None):
+        self.id = uuid.uuid4().hex
+        self.admin = admin
+        self.status = "queued"
+        self.total = total
+        self.processed = 0
+        self.errors = []
+        self.message = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._saved_errors = None
+
+    def to_dict(self, errors=True) -> dict:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "processed": self.processed,
+            "failed": len(self.errors),
+            "message": self.message,
+            "elapsed": round((self.finished_at or time.time()) - self.started_at, 1),
+        }
+        if errors:
+            data["errors"] = self.errors
+        return data
+
+    def execute(self, conn):
+        raise NotImplementedError
+
+    def save(self) -> None:
+        """Write the job's state to admin_jobs on this thread's connection and
+        commit. Call it between the job's transactions. The error list is only
+        rewritten when it changed."""
+        from utils.db_conn import get_db_connection
+
+        conn = None
+        try:
+            conn = get_db_connection()
+            with conn.cursor() as cursor:
+                if not available(cursor):
+                    return
+                errors = None
+                if self._saved_errors != len(self.errors) or self.finished_at:
+                    errors = json.dumps(self.errors, default=str)
+                cursor.execute(
+                    """
+                    INSERT INTO admin_jobs
+                        (id, kind, status, message, admin, host, pid, state, errors,
+                         started_at, updated_at, finished_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        status = VALUES(status),
+                        message = VALUES(message),
+                        state = VALUES(state),
+                        errors = COALESCE(VALUES(errors), errors),
+                        updated_at = VALUES(updated_at),
+                        finished_at = VALUES(finished_at)
+                    """,
+                    (
+                        self.id,
+                        self.kind,
+                        self.status,
+                        self.message,
+                        self.admin,
+                        _HOST,
+                        os.getpid(),
+                        json.dumps(self.to_dict(errors=False), default=str),
+                        errors,
+                        _stamp(self.started_at),
+                        _stamp(time.time()),
+                        _stamp(self.finished_at),
+                    ),
+                )
+            conn.commit()
+            self._saved_errors = len(self.errors)
+        except Exception as e:
+            logger.warning(f"Could not save {self.kind} job {self.id}: {e}")
+            if conn is not None:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+
+    def progress(self):
+        from utils.live import emit_admin_event
+
+        self.save()
+        emit_admin_event(f"{self.kind}_progress", self.to_dict(errors=False))
+
+    def run(self):
+        from utils.db_conn import close_db_connection, get_db_connection
+
+        self.status = "running"
+        conn = get_db_connection()
+        self.save()
+        try:
+            self.execute(conn)
+            self.status = "completed"
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            self.status = "failed"
+            self.message = str(e)
+            logger.error(f"{self.kind} job {self.id} failed: {e}")
+        finally:
+            self.finished_at = time.time()
+            self.progress()
+            close_db_connection()
+
+
+class StoredJob:
+    """A job as last saved to admin_jobs by the worker running it."""
+
+    def __init__(self, row, now=None):
+        self.id = row["id"]
+        self.kind = row["kind"]
+        self.status = row["status"]
+        self.message = row.get("message")
+        self.state = json.loads(row.get("state") or "{}")
+        self.errors = json.loads(row.get("errors") or "[]")
+        now = now or datetime.now()
+        end = row.get("finished_at")
+        if self.status not in FINISHED and row["updated_at"] < now - timedelta(seconds=STALE_AFTER):
+            self.status = "failed"
+            self.message = _LOST
+            end = row["updated_at"]
+        self.elapsed = round(((end or now) - row["started_at"]).total_seconds(), 1)
+
+    def to_dict(self, errors=True) -> dict:
+        data = dict(self.state)
+        data.update(
+            job_id=self.id,
+            kind=self.kind,
+            status=self.status,
+            message=self.message,
+            failed=len(self.errors),
+            elapsed=self.elapsed,
+        )
+        if errors:
+            data["errors"] = self.errors
+        return data
+
+
+def start(job: Job) -> Job:
+    """Register `job` and run it in a background thread."""
+    job.save()
+    with _jobs_lock:
+        _jobs[job.id] = job
+        finished = sorted(
+            (j for j in _jobs.values() if j.finished_at), key=lambda j: j.finished_at
+        )
+        for old in finished[: max(0, len(_jobs) - _KEEP_JOBS)]:
+            _jobs.pop(old.id, None)
+    threading.Thread(
+        target=job.run, name=f"{job.kind}-{job.id[:8]}", daemon=True
+    ).start()
+    return job
+
+
+def get(job_id, kind=None):
+    """The job with `job_id`, from admin_jobs or, before the migration, from
+    this worker's memory. None if unknown or of another kind."""
+    from utils.db_conn import get_db_connection
+
+    job = None
+    stored = False
+    try:
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            if available(cursor):
+                stored = True
+                cursor.execute("SELECT * FROM admin_jobs WHERE id = %s", (job_id,))
+                row = cursor.fetchone()
+                job = StoredJob(row) if row else None
+        conn.commit()
+    except Exception as e:
+        logger.warning(f"Could not read job {job_id}: {e}")
+    if not stored:
+        with _jobs_lock:
+            job = _jobs.get(job_id)
+    if job is None or (kind and job.kind != kind):
+        return None
+    return job
+
+
+def fail_orphans(cursor) -> int:
+    """Mark unfinished jobs whose worker is gone as failed and drop finished
+    jobs older than KEEP_DAYS. Returns the number of jobs failed."""
+    if not available(cursor):
+        return 0
+    now = datetime.now()
+    cursor.execute(
+        f"SELECT id, host, pid, updated_at FROM admin_jobs "
+        f"WHERE status NOT IN ({', '.join(['%s'] * len(FINISHED))})",
+        FINISHED,
+    )
+    stale = now - timedelta(seconds=STALE_AFTER)
+    orphans = [
+        row["id"]
+        for row in cursor.fetchall() or []
+        if row["updated_at"] < stale
+        or (row["host"] == _HOST and row["pid"] != os.getpid() and not _pid_alive(row["pid"]))
+    ]
+    if orphans:
+        cursor.execute(
+            f"UPDATE admin_jobs SET status = 'failed', message = %s, finished_at = updated_at "
+            f"WHERE id IN ({', '.join(['%s'] * len(orphans))})",
+            [_LOST] + orphans,
+        )
+    cursor.execute(
+        "DELETE FROM admin_jobs WHERE finished_at < %s",
+        (now - timedelta(days=KEEP_DAYS),),
+    )
+    return len(orphans)
+
+
+def init_admin_jobs() -> int:
+    """Fail jobs left running by exited workers. Called from app.py."""
+    from utils.db_conn import close_db_connection, get_db_connection
+
+    try:
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            failed = fail_orphans(cursor)
+        conn.commit()
+        if failed:
+            logger.warning(f"Marked {failed} orphaned admin job(s) as failed")
+        return failed
+    except Exception as e:
+        logger.warning(f"Could not check for orphaned admin jobs: {e}")
+        return 0
+    finally:
+        close_db_connection()
@@ -0,0 +1,358 @@
+"""
+Rollup tables behind the admin analytics endpoints.
+
+get_system_analytics, get_grade_release_monitoring and the department part of
+get_class_overview used to join classes with student_classes, grade_snapshots,
+released_grades and student_grades on every request. Those counts now live in
+three small tables (migration 0005):
+
+* class_rollups: per class, students enrolled, students with student_grades
+  rows, final snapshots, released_grades rows and first/last release time;
+* instructor_rollups: per instructor, totals over their classes;
+* department_rollups: per instructor department ('Not Assigned' for classes
+  whose instructor has none).
+
+They are kept current by a background refresher. Write paths that go through
+utils.live.emit_live_version_update mark their class dirty, and dirty classes
+(plus their instructor and department) are recomputed every
+ANALYTICS_ROLLUP_INTERVAL seconds. Every ANALYTICS_ROLLUP_FULL_INTERVAL
+seconds everything is recomputed, which also picks up writes made by other
+worker processes. A database advisory lock keeps workers from running the same
+refresh at the same time.
+
+Until the migration has run and the first (full) refresh has filled
+class_rollups, readers use class_source(), which computes the class rollup
+inline, so the endpoints keep working (slowly) on an unmigrated database and
+never read empty rollup tables.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_LOCK_NAME = "eclass_analytics_rollups"
+_CHUNK = 500
+
+_tables = False
+_filled = False
+
+
+def rollups_available(cursor) -> bool:
+    """True once migration 0005 has created the rollup tables. Only a
+    positive answer is cached, so running the migration takes effect without
+    a restart."""
+    global _tables
+    if not _tables:
+        from utils.migrations import table_exists
+
+        try:
+            _tables = table_exists(cursor, "class_rollups")
+        except Exception as e:
+            logger.warning(f"Could not inspect rollup tables: {e}")
+            return False
+    return _tables
+
+
+def rollups_ready(cursor) -> bool:
+    """True once the rollup tables exist and class_rollups has rows, i.e. the
+    first refresh has run. Readers fall back to the inline query until then;
+    only a positive answer is cached."""
+    global _filled
+    if not _filled and rollups_available(cursor):
+        cursor.execute("SELECT 1 FROM class_rollups LIMIT 1")
+        _filled = bool(cursor.fetchone())
+    return _filled
+
+
+def _in(column, ids):
+    return f"{column} IN ({','.join(['%s'] * len(ids))})", list(ids)
+
+
+def class_rollup_select(class_ids=None):
+    """(sql, params) computing class_rollups rows from the source tables."""
+    params = []
+
+    def scoped(column):
+        if class_ids is None:
+            return ""
+        clause, p = _in(column, class_ids)
+        params.extend(p)
+        return " WHERE " + clause
+
+    sc = f"SELECT class_id, COUNT(*) AS n FROM student_classes{scoped('class_id')} GROUP BY class_id"
+    sg = (
+        "SELECT class_id, COUNT(DISTINCT student_id) AS n FROM student_grades"
+        f"{scoped('class_id')} GROUP BY class_id"
+    )
+    gs_where = scoped("class_id")
+    gs_where = (gs_where + " AND" if gs_where else " WHERE") + " status = 'final'"
+    gs = f"SELECT class_id, COUNT(*) AS n FROM grade_snapshots{gs_where} GROUP BY class_id"
+    rg = (
+        "SELECT class_id, COUNT(*) AS n, MIN(released_at) AS first_at, MAX(released_at) AS last_at "
+        f"FROM released_grades{scoped('class_id')} GROUP BY class_id"
+    )
+    where = scoped("c.id")
+    sql = f"""
+        SELECT c.id AS class_id, c.instructor_id,
+               COALESCE(sc.n, 0) AS student_count,
+               COALESCE(sg.n, 0) AS graded_students,
+               COALESCE(gs.n, 0) AS final_snapshots,
+               COALESCE(rg.n, 0) AS released_grades,
+               rg.first_at AS first_released_at,
+               rg.last_at AS last_released_at
+        FROM classes c
+        LEFT JOIN ({sc}) sc ON sc.class_id = c.id
+        LEFT JOIN ({sg}) sg ON sg.class_id = c.id
+        LEFT JOIN ({gs}) gs ON gs.class_id = c.id
+        LEFT JOIN ({rg}) rg ON rg.class_id = c.id
+        {where}
+    """
+    return sql, params
+
+
+def class_source(cursor):
+    """(table expression, params) for reading per-class rollups."""
+    if rollups_ready(cursor):
+        return "class_rollups", []
+    sql, params = class_rollup_select()
+    return f"({sql})", params
+
+
+def _instructor_select(source, where=""):
+    return f"""
+        SELECT i.id AS instructor_id, i.department,
+               COUNT(cr.class_id) AS total_classes,
+               COALESCE(SUM(cr.final_snapshots), 0) AS total_snapshots,
+               COALESCE(SUM(cr.released_grades), 0) AS total_releases,
+               COALESCE(SUM(cr.student_count), 0) AS enrolled_students,
+               ROUND(COALESCE(AVG(NULLIF(cr.student_count, 0)), 0), 1) AS avg_students_per_class
+        FROM instructors i
+        LEFT JOIN {source} cr ON cr.instructor_id = i.id
+        {where}
+        GROUP BY i.id, i.department
+    """
+
+
+def instructor_source(cursor):
+    """(table expression, params) for reading per-instructor rollups."""
+    if rollups_ready(cursor):
+        return "instructor_rollups", []
+    source, params = class_source(cursor)
+    return f"({_instructor_select(source)})", params
+
+
+# --- refresh -----------------------------------------------------------------
+
+
+def refresh(cursor, class_ids=None) -> int:
+    """Recompute rollups for `class_ids` (None = everything). Returns classes refreshed.
+
+    The caller commits.
+    """
+    if class_ids is not None:
+        class_ids = sorted({int(c) for c in class_ids})
+        if not class_ids:
+            return 0
+
+    instructor_ids = set()
+    if class_ids is None:
+        cursor.execute(
+            "DELETE cr FROM class_rollups cr LEFT JOIN classes c ON c.id = cr.class_id "
+            "WHERE c.id IS NULL"
+        )
+        chunks = [None]
+    else:
+        chunks = [class_ids[i : i + _CHUNK] for i in range(0, len(class_ids), _CHUNK)]
+
+    refreshed = 0
+    for chunk in chunks:
+        if chunk is not None:
+            # Instructors the classes belonged to before (a class may have
+            # moved or been deleted) and after.
+            clause, params = _in("class_id", chunk)
+            cursor.execute(f"SELECT DISTINCT instructor_id FROM class_rollups WHERE {clause}", params)
+            instructor_ids.update(r["instructor_id"] for r in cursor.fetchall() or [])
+            cursor.execute(f"DELETE FROM class_rollups WHERE {clause}", params)
+        sql, params = class_rollup_select(chunk)
+        cursor.execute(
+            f"""
+            INSERT INTO class_rollups
+                (class_id, instructor_id, student_count, graded_students,
+                 final_snapshots, released_grades, first_released_at,
+                 last_released_at, refreshed_at)
+            SELECT r.*, NOW() FROM ({sql}) r
+            ON DUPLICATE KEY UPDATE
+                instructor_id = VALUES(instructor_id),
+                student_count = VALUES(student_count),
+                graded_students = VALUES(graded_students),
+                final_snapshots = VALUES(final_snapshots),
+                released_grades = VALUES(released_grades),
+                first_released_at = VALUES(first_released_at),
+                last_released_at = VALUES(last_released_at),
+                refreshed_at = NOW()
+            """,
+            params,
+        )
+        if chunk is not None:
+            clause, params = _in("class_id", chunk)
+            cursor.execute(f"SELECT DISTINCT instructor_id FROM class_rollups WHERE {clause}", params)
+            instructor_ids.update(r["instructor_id"] for r in cursor.fetchall() or [])
+            refreshed += len(chunk)
+
+    where, params = "", []
+    if class_ids is None:
+        cursor.execute("DELETE FROM instructor_rollups")
+        cursor.execute("SELECT COUNT(*) AS n FROM class_rollups")
+        refreshed = int((cursor.fetchone() or {}).get("n") or 0)
+    else:
+        instructor_ids.discard(None)
+        if not instructor_ids:
+            return refreshed
+        clause, params = _in("i.id", sorted(instructor_ids))
+        where = "WHERE " + clause
+    cursor.execute(
+        f"""
+        INSERT INTO instructor_rollups
+            (instructor_id, department, total_classes, total_snapshots,
+             total_releases, enrolled_students, avg_students_per_class, refreshed_at)
+        SELECT r.*, NOW() FROM ({_instructor_select("class_rollups", where)}) r
+        ON DUPLICATE KEY UPDATE
+            department = VALUES(department),
+            total_classes = VALUES(total_classes),
+            total_snapshots = VALUES(total_snapshots),
+            total_releases = VALUES(total_releases),
+            enrolled_students = VALUES(enrolled_students),
+            avg_students_per_class = VALUES(avg_students_per_class),
+            refreshed_at = NOW()
+        """,
+        params,
+    )
+
+    # One row per department: small enough to rebuild every time.
+    cursor.execute("DELETE FROM department_rollups")
+    cursor.execute(
+        """
+        INSERT INTO department_rollups
+            (department, total_classes, total_instructors, total_students,
+             released_classes, total_releases, refreshed_at)
+        SELECT COALESCE(i.department, 'Not Assigned'),
+               COUNT(cr.class_id),
+               COUNT(DISTINCT cr.instructor_id),
+               COALESCE(SUM(cr.student_count), 0),
+               SUM(cr.released_grades > 0),
+               COALESCE(SUM(cr.released_grades), 0),
+               NOW()
+        FROM class_rollups cr
+        LEFT JOIN instructors i ON i.id = cr.instructor_id
+        GROUP BY COALESCE(i.department, 'Not Assigned')
+        """
+    )
+    return refreshed
+
+
+# --- background refresher ----------------------------------------------------
+
+_dirty = set()
+_dirty_lock = threading.Lock()
+_refresher = None
+
+
+def mark_dirty(class_id) -> None:
+    """Queue a class for the next incremental refresh (cheap; no database work)."""
+    if _refresher is None:
+        return
+    try:
+        class_id = int(class_id)
+    except (TypeError, ValueError):
+        return
+    with _dirty_lock:
+        _dirty.add(class_id)
+
+
+def _take_dirty():
+    with _dirty_lock:
+        ids = set(_dirty)
+        _dirty.clear()
+    return ids
+
+
+class RollupRefresher:
+    def __init__(self, interval: float = 30, full_interval: float = 900):
+        self.interval = max(1.0, float(interval))
+        self.full_interval = max(self.interval, float(full_interval))
+        self._stopping = threading.Event()
+        self._thread = None
+        # The first pass is a full refresh, so an incremental one never
+        # leaves class_rollups holding only a few dirty classes.
+        self._last_full = None
+
+    def run_once(self, full: bool = False) -> int:
+        from utils.db_conn import get_db_connection
+
+        ids = None if full else _take_dirty()
+        if ids is not None and not ids:
+            return 0
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                if not rollups_available(cursor):
+                    return 0
+                cursor.execute("SELECT GET_LOCK(%s, 0) AS got", (_LOCK_NAME,))
+                if not (cursor.fetchone() or {}).get("got"):
+                    if ids:
+                        with _dirty_lock:
+                            _dirty.update(ids)  # another worker is refreshing; retry later
+                    return 0
+                try:
+                    count = refresh(cursor, ids)
+                    conn.commit()
+                finally:
+                    cursor.execute("SELECT RELEASE_LOCK(%s)", (_LOCK_NAME,))
+            return count
+        except Exception:
+            conn.rollback()
+            if ids:
+                with _dirty_lock:
+                    _dirty.update(ids)
+            raise
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            full = (
+                self._last_full is None
+                or time.monotonic() - self._last_full >= self.full_interval
+            )
+            try:
+                count = self.run_once(full=full)
+                if full:
+                    self._last_full = time.monotonic()
+                    logger.info(f"Refreshed analytics rollups for {count} classes")
+            except Exception as e:
+                logger.warning(f"Analytics rollup refresh failed: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="analytics-rollups", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+def init_rollups(interval=30, full_interval=900):
+    """Start the background refresher. Called from app.py."""
+    global _refresher
+    if _refresher is None:
+        _refresher = RollupRefresher(interval, full_interval)
+        _refresher.start()
+        logger.info(
+            f"Analytics rollups: dirty classes every {interval}s, full refresh every {full_interval}s"
+        )
+    return _refresher
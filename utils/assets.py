@@ -0,0 +1,144 @@
+"""
+Fingerprinted static assets.
+
+scripts/build_assets.py copies files under static/ into static/dist/ with a
+content hash in the name (css/site.css -> css/site.3f9a0c12d4.css), writes
+.gz/.br siblings for text assets and records everything in
+static/dist/manifest.json.
+
+At runtime init_assets(app):
+- rewrites url_for('static', filename=...) to the hashed name when the file is
+  in the manifest (unknown files keep their plain URL),
+- serves the precompressed sibling matching the client's Accept-Encoding,
+- marks hashed files as Cache-Control: public, max-age=31536000, immutable,
+- exposes asset_bundle_urls(name) to templates for per-page CSS/JS bundles.
+"""
+
+import json
+import logging
+import mimetypes
+import os
+
+from flask import request, send_from_directory, url_for
+
+logger = logging.getLogger(__name__)
+
+DIST_DIRNAME = "dist"
+MANIFEST_FILENAME = "manifest.json"
+IMMUTABLE_MAX_AGE = 31536000
+
+# Per-page bundles: name -> ordered list of static/ paths concatenated by the
+# build step. Only stylesheets and classic (non-module) scripts belong here;
+# ES modules resolve their imports by relative path and must stay separate.
+ASSET_BUNDLES = {
+    "gradebuilder-v2.css": [
+        "css/instructor-dashboard.css",
+        "css/gradebuilder_v2.css",
+    ],
+}
+
+# Precompressed siblings, in order of preference.
+_PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+_manifest = {"assets": {}, "bundles": {}, "compressed": {}}
+
+
+def load_manifest(static_folder: str) -> dict:
+    """Read static/dist/manifest.json, returning an empty manifest if absent."""
+    path = os.path.join(static_folder, DIST_DIRNAME, MANIFEST_FILENAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {"assets": {}, "bundles": {}, "compressed": {}}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable asset manifest {path}: {e}")
+        return {"assets": {}, "bundles": {}, "compressed": {}}
+    return {
+        "assets": data.get("assets") or {},
+        "bundles": data.get("bundles") or {},
+        "compressed": data.get("compressed") or {},
+    }
+
+
+def hashed_filename(filename: str):
+    """Return the dist/ path for a static file, or None if it is not fingerprinted."""
+    hashed = _manifest["assets"].get(filename)
+    return f"{DIST_DIRNAME}/{hashed}" if hashed else None
+
+
+def asset_bundle_urls(name: str) -> list:
+    """URLs to include for a bundle: the built bundle, or its parts as a fallback."""
+    built = _manifest["bundles"].get(name)
+    if built:
+        return [url_for("static", filename=f"{DIST_DIRNAME}/{built}")]
+    return [url_for("static", filename=part) for part in ASSET_BUNDLES.get(name, [])]
+
+
+def _set_immutable(response):
+    response.cache_control.public = True
+    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+    response.cache_control.immutable = True
+    response.cache_control.no_cache = None
+    return response
+
+
+def _serve_dist_file(static_folder: str, filename: str):
+    """Serve a hashed file, preferring a precompressed sibling when accepted."""
+    relative = filename[len(DIST_DIRNAME) + 1 :]
+    encodings = _manifest["compressed"].get(relative) or []
+    for coding, suffix in _PRECOMPRESSED:
+        if coding in encodings and request.accept_encodings[coding] > 0:
+            mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            response = send_from_directory(
+                static_folder, filename + suffix, mimetype=mimetype
+            )
+            response.headers["Content-Encoding"] = coding
+            response.vary.add("Accept-Encoding")
+            return _set_immutable(response)
+
+    response = send_from_directory(static_folder, filename)
+    if encodings:
+        response.vary.add("Accept-Encoding")
+    return _set_immutable(response)
+
+
+def init_assets(app, enabled: bool = True):
+    """Load the asset manifest and install URL rewriting and dist/ serving."""
+    global _manifest
+
+    app.jinja_env.globals.update(asset_bundle_urls=asset_bundle_urls)
+
+    if not enabled or not app.static_folder:
+        logger.info("Static asset fingerprinting disabled")
+        return
+
+    _manifest = load_manifest(app.static_folder)
+    if not _manifest["assets"]:
+        logger.info(
+            "No static/dist/manifest.json found; run scripts/build_assets.py to fingerprint assets"
+        )
+        return
+
+    @app.url_defaults
+    def _fingerprint_static_urls(endpoint, values):
+        if endpoint != "static":
+            return
+        filename = values.get("filename")
+        if filename:
+            hashed = hashed_filename(filename)
+            if hashed:
+                values["filename"] = hashed
+
+    original_static_view = app.view_functions.get("static")
+    static_folder = app.static_folder
+
+    def static_with_fingerprints(filename):
+        if filename.startswith(f"{DIST_DIRNAME}/"):
+            return _serve_dist_file(static_folder, filename)
+        return original_static_view(filename=filename)
+
+    app.view_functions["static"] = static_with_fingerprints
+    logger.info(
+        f"Static asset fingerprinting enabled ({len(_manifest['assets'])} files, {len(_manifest['bundles'])} bundles)"
+    )
@@ -0,0 +1,173 @@
+"""
+Asynchronous logging helpers.
+
+Request threads only put records on a bounded in-memory queue; a
+QueueListener thread does the formatting and the console/file I/O. This keeps
+slow stdout (e.g. the cPanel Passenger log pipe) off the request path.
+
+- QueueingHandler: QueueHandler that never blocks. When the queue is full the
+  record is dropped and counted, and the next record that fits reports how
+  many were lost.
+- SamplingFilter: keeps 1 in N INFO/DEBUG records for configured loggers
+  (WARNING and above always pass).
+- JsonLineFormatter: one JSON object per line for log shippers.
+
+Wired up by app._configure_logging() through start_queue_logging().
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime, timezone
+
+DEFAULT_QUEUE_SIZE = 10000
+
+_active_listener = None
+
+
+def parse_sample_rates(raw: str) -> dict:
+    """Parse "utils.db_conn=10,blueprints.instructor_routes=5" into {name: n}."""
+    rates = {}
+    for part in (raw or "").split(","):
+        name, sep, value = part.strip().partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            n = int(value)
+        except ValueError:
+            continue
+        if n > 1:
+            rates[name.strip()] = n
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep every Nth INFO/DEBUG record per configured logger (prefix match)."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        # Longest prefix first so "blueprints.auth_routes" beats "blueprints".
+        self.rates = sorted(rates.items(), key=lambda kv: len(kv[0]), reverse=True)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _rate_for(self, name: str):
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return prefix, rate
+        return None, 1
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        prefix, rate = self._rate_for(record.name)
+        if rate <= 1:
+            return True
+        with self._lock:
+            count = self._counters.get(prefix, 0)
+            self._counters[prefix] = count + 1
+        return count % rate == 0
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueueingHandler(logging.handlers.QueueHandler):
+    """Non-blocking QueueHandler that defers formatting to the listener thread."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._traceback_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve %-args now (they may reference objects that change later) but
+        # leave the line layout to the sink handlers' own formatters.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._traceback_formatter.formatException(
+                record.exc_info
+            )
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            lost, self.dropped = self.dropped, 0
+            notice = logging.makeLogRecord(
+                {
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": f"Log queue was full; dropped {lost} records",
+                }
+            )
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self.dropped += lost
+
+
+def start_queue_logging(handlers, queue_size: int = DEFAULT_QUEUE_SIZE, filters=()):
+    """Start a QueueListener feeding `handlers` and return the request-side handler.
+
+    The listener is stopped (and the queue drained) at interpreter exit.
+    """
+    global _active_listener
+
+    log_queue = queue.Queue(maxsize=max(int(queue_size), 1))
+    queue_handler = QueueingHandler(log_queue)
+    for f in filters:
+        queue_handler.addFilter(f)
+
+    if _active_listener is not None:
+        stop_queue_logging()
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    _active_listener = listener
+    return queue_handler
+
+
+def stop_queue_logging():
+    """Flush pending records and stop the background listener."""
+    global _active_listener
+    listener, _active_listener = _active_listener, None
+    if listener is not None:
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+
+atexit.register(stop_queue_logging)
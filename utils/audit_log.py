@@ -0,0 +1,281 @@
+"""
+Background writer for admin audit events (utils.auth_utils.log_admin_action).
+
+log_admin_action used to INSERT into audit_logs and commit on the request's
+connection, which also committed whatever the caller had pending and cost
+one round trip and commit per event. With the writer running (AUDIT_LOG_ASYNC,
+the default) events go onto a bounded in-process queue and a background
+thread writes them with multi-row INSERTs on its own connection, at most
+AUDIT_LOG_BATCH rows per transaction, every AUDIT_LOG_FLUSH_INTERVAL_MS.
+
+Events are not dropped: when the queue is full, or a batch cannot be written,
+they are appended to a local spill file (JSON lines, fsync'd). The spill file
+is replayed into audit_logs when the writer starts, and the queue is drained
+at interpreter exit. Workers share the spill file, so a replay first renames
+it to a per-process claim file and trims that file as batches are written.
+"""
+
+import atexit
+import glob
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPILL_PATH = ".audit_spill.jsonl"
+COLUMNS = (
+    "admin_id",
+    "admin_school_id",
+    "action",
+    "resource_type",
+    "resource_id",
+    "details",
+    "ip_address",
+    "user_agent",
+    "created_at",
+)
+_INSERT = (
+    f"INSERT INTO audit_logs ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(COLUMNS))})"
+)
+
+
+def make_event(admin_id, admin_school_id, action, resource_type, resource_id=None,
+               details=None, ip_address=None, user_agent=None) -> dict:
+    if details is not None and not isinstance(details, str):
+        details = json.dumps(details, default=str)
+    return {
+        "admin_id": admin_id,
+        "admin_school_id": admin_school_id,
+        "action": action,
+        "resource_type": resource_type,
+        "resource_id": None if resource_id is None else str(resource_id),
+        "details": details,
+        "ip_address": ip_address,
+        "user_agent": (user_agent or "")[:255] or None,
+        # The time of the action, not of the flush.
+        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def write_events(cursor, events) -> None:
+    cursor.executemany(_INSERT, [tuple(e.get(c) for c in COLUMNS) for e in events])
+
+
+def _write_batch(events) -> None:
+    from utils.db_conn import get_db_connection
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            write_events(cursor, events)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+class AuditWriter:
+    def __init__(self, spill_path=DEFAULT_SPILL_PATH, max_queue=10000, interval=1.0,
+                 batch_size=500, writer=_write_batch):
+        self.spill_path = spill_path
+        self.interval = max(0.05, float(interval))
+        self.batch_size = max(1, int(batch_size))
+        self._writer = writer
+        self._queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._spill_lock = threading.Lock()
+        self._claims = itertools.count()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    # --- spill file ----------------------------------------------------------
+
+    def spill(self, events) -> None:
+        with self._spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event, separators=(",", ":"), default=str) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _claim_path(self) -> str:
+        return f"{self.spill_path}.replay.{os.getpid()}.{next(self._claims)}"
+
+    def _claim(self) -> list:
+        """Move spilled events out of the shared spill file before reading.
+
+        Every worker appends to the same spill file, so it is renamed to a
+        per-process claim file first; os.replace is atomic, so only one
+        worker gets each generation of it. Claim files left by this process
+        (a failed replay) or by one that has exited are picked up too.
+        """
+        claimed = []
+        for path in sorted(glob.glob(glob.escape(self.spill_path) + ".replay.*")):
+            try:
+                pid = int(path.rsplit(".", 2)[-2])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                claimed.append(path)
+            elif not _pid_alive(pid):
+                claim = self._claim_path()
+                try:
+                    os.replace(path, claim)
+                except FileNotFoundError:
+                    continue  # another worker adopted it first
+                claimed.append(claim)
+        claim = self._claim_path()
+        try:
+            os.replace(self.spill_path, claim)
+            claimed.append(claim)
+        except FileNotFoundError:
+            pass
+        return claimed
+
+    def _replay_file(self, path) -> int:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        events = []
+        for line in lines:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue  # torn final line from a crash
+        for start in range(0, len(events), self.batch_size):
+            self._writer(events[start : start + self.batch_size])
+            # Drop the written batch so a failure later on cannot write it twice.
+            remaining = events[start + self.batch_size :]
+            if remaining:
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    for event in remaining:
+                        f.write(json.dumps(event, separators=(",", ":"), default=str) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(path + ".tmp", path)
+        os.remove(path)
+        return len(events)
+
+    def has_spilled(self) -> bool:
+        return os.path.exists(self.spill_path) or bool(
+            glob.glob(glob.escape(self.spill_path) + f".replay.{os.getpid()}.*")
+        )
+
+    def replay(self) -> int:
+        """Write events spilled by this or an earlier run. Returns events written."""
+        written = 0
+        with self._spill_lock:
+            for path in self._claim():
+                written += self._replay_file(path)
+        if written:
+            logger.warning(f"Replayed {written} audit event(s) from {self.spill_path}")
+        return written
+
+    # --- queue ---------------------------------------------------------------
+
+    def submit(self, event: dict) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.spill([event])
+
+    def _take(self, block: bool) -> list:
+        events = []
+        try:
+            events.append(self._queue.get(timeout=self.interval) if block else self._queue.get_nowait())
+            while len(events) < self.batch_size:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+    def flush(self, block: bool = False) -> int:
+        """Write one batch. Returns events taken off the queue."""
+        events = self._take(block)
+        if not events:
+            return 0
+        try:
+            self._writer(events)
+        except Exception as e:
+            logger.error(f"Could not write {len(events)} audit event(s), spilled to {self.spill_path}: {e}")
+            self.spill(events)
+        return len(events)
+
+    def flush_all(self) -> None:
+        while self.flush():
+            pass
+
+    def _run(self):
+        from utils.db_conn import close_db_connection
+
+        spilled = self.has_spilled()
+        while not self._stopping.is_set():
+            written = self.flush(block=True)
+            if written and spilled:
+                # The database is reachable again; retry what was spilled.
+                try:
+                    self.replay()
+                    spilled = False
+                except Exception as e:
+                    logger.warning(f"Audit spill replay failed: {e}")
+            spilled = spilled or self.has_spilled()
+        close_db_connection()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush_all()
+
+
+_writer = None
+
+
+def get_writer():
+    return _writer
+
+
+def init_audit_writer(spill_path=None, max_queue=10000, interval_ms=1000, batch_size=500):
+    """Replay any spilled events, then start the writer. Called from app.py."""
+    global _writer
+    if _writer is not None:
+        return _writer
+    writer = AuditWriter(
+        spill_path or DEFAULT_SPILL_PATH,
+        max_queue=max_queue,
+        interval=interval_ms / 1000.0,
+        batch_size=batch_size,
+    )
+    try:
+        writer.replay()
+    except Exception as e:
+        logger.error(f"Could not replay audit spill file {writer.spill_path}: {e}")
+    writer.start()
+    atexit.register(writer.stop)
+    _writer = writer
+    logger.info(
+        f"Audit log writer: batches of {batch_size} every {interval_ms}ms, spill file {writer.spill_path}"
+    )
+    return writer
@@ -3,6 +3,7 @@ import os
 from functools import wraps
 from flask import session, flash, redirect, url_for, request, jsonify
 
+from utils import audit_log
 from utils.db_conn import get_db_connection
 
 logger = logging.getLogger(__name__)
@@ -134,35 +135,46 @@ def role_required(allowed_roles):
     return decorator
 
 
-def log_admin_action(action, resource_type, resource_id=None, details=None):
-    """Log an admin action to the audit_logs table."""
+def audit_context() -> dict:
+    """Who is acting, captured from the current request for log_admin_action."""
+    return {
+        "admin_id": session.get("user_id"),
+        "admin_school_id": session.get("school_id"),
+        "ip_address": request.remote_addr if request else None,
+        "user_agent": request.headers.get("User-Agent") if request else None,
+    }
+
+
+def log_admin_action(action, resource_type, resource_id=None, details=None, context=None):
+    """Log an admin action to the audit_logs table.
+
+    With the audit writer running (utils/audit_log.py) the event is queued and
+    written in the background; the caller's transaction is left alone. Pass
+    `context` (from audit_context()) when logging outside the request.
+    """
     try:
-        admin_id = session.get("user_id")
-        admin_school_id = session.get("school_id")
+        context = context or audit_context()
+        admin_id = context.get("admin_id")
+        admin_school_id = context.get("admin_school_id")
 
         if not admin_id or not admin_school_id:
             logger.warning("Attempted to log admin action without valid session")
             return
 
-        ip_address = request.remote_addr if request else None
-        user_agent = request.headers.get("User-Agent") if request else None
+        event = audit_log.make_event(
+            action=action,
+            resource_type=resource_type,
+            resource_id=resource_id,
+            details=details,
+            **context,
+        )
+        writer = audit_log.get_writer()
+        if writer is not None:
+            writer.submit(event)
+            return
 
         with get_db_connection().cursor() as cursor:
-            cursor.execute(
-                """INSERT INTO audit_logs
-                (admin_id, admin_school_id, action, resource_type, resource_id, details, ip_address, user_agent)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
-                (
-                    admin_id,
-                    admin_school_id,
-                    action,
-                    resource_type,
-                    resource_id,
-                    details,
-                    ip_address,
-                    user_agent,
-                ),
-            )
+            audit_log.write_events(cursor, [event])
 
         get_db_connection().commit()
         logger.info(
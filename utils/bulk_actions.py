@@ -0,0 +1,256 @@
+"""
+Set-based bulk actions on student accounts (admin dashboard bulk menu and
+registration approval).
+
+Every action runs over chunks of CHUNK student ids with one statement per
+table per chunk, and each chunk is its own transaction:
+
+* suspend / unsuspend: users.account_status;
+* drop: student_classes.is_dropped;
+* delete: student_scores, student_grades, released_grades, student_classes,
+  students, users and personal_info rows of the students;
+* approve: pending registrations become approved and their accounts active;
+* reject: pending registrations are deleted like `delete`.
+
+Classes whose rosters or grades changed have their class_versions counter
+bumped in the chunk's transaction; they are collected and their live update
+is sent once per class after the last chunk. Batches larger than one chunk
+run as a background job (utils/admin_jobs.py).
+"""
+
+import logging
+import threading
+
+from utils import admin_jobs, class_versions, membership_index
+
+logger = logging.getLogger(__name__)
+
+CHUNK = 500
+
+# Removed before the students row; the foreign keys cascade as well, but
+# deleting explicitly keeps older databases without them consistent.
+_STUDENT_TABLES = (
+    "student_scores",
+    "student_grades",
+    "released_grades",
+    "student_classes",
+)
+
+
+def _in(ids):
+    return ",".join(["%s"] * len(ids))
+
+
+def _chunks(ids):
+    size = CHUNK
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def _class_ids(cursor, student_ids, where=""):
+    cursor.execute(
+        f"SELECT DISTINCT class_id FROM student_classes WHERE student_id IN ({_in(student_ids)}){where}",
+        student_ids,
+    )
+    return {row["class_id"] for row in cursor.fetchall() or []}
+
+
+def _delete_students(cursor, rows) -> int:
+    student_ids = [row["id"] for row in rows]
+    placeholders = _in(student_ids)
+    for table in _STUDENT_TABLES:
+        cursor.execute(f"DELETE FROM {table} WHERE student_id IN ({placeholders})", student_ids)
+    cursor.execute(f"DELETE FROM students WHERE id IN ({placeholders})", student_ids)
+    deleted = cursor.rowcount
+    user_ids = [row["user_id"] for row in rows]
+    cursor.execute(f"DELETE FROM users WHERE id IN ({_in(user_ids)})", user_ids)
+    info_ids = [row["personal_info_id"] for row in rows if row.get("personal_info_id")]
+    if info_ids:
+        cursor.execute(f"DELETE FROM personal_info WHERE id IN ({_in(info_ids)})", info_ids)
+    return deleted
+
+
+def apply_chunk(cursor, action: str, student_ids, admin_id=None):
+    """Run `action` for one chunk of student ids.
+
+    Returns (affected rows, class ids to bump, the approved or removed student
+    rows). The caller commits.
+    """
+    student_ids = list(student_ids)
+    placeholders = _in(student_ids)
+    class_ids = set()
+
+    if action in ("suspend", "unsuspend"):
+        status = "suspended" if action == "suspend" else "active"
+        cursor.execute(
+            f"""UPDATE users u JOIN students s ON s.user_id = u.id
+            SET u.account_status = %s
+            WHERE s.id IN ({placeholders}) AND u.role = 'student'""",
+            [status] + student_ids,
+        )
+        return cursor.rowcount, class_ids, []
+
+    if action == "drop":
+        class_ids = _class_ids(cursor, student_ids, " AND COALESCE(is_dropped, 0) = 0")
+        cursor.execute(
+            f"UPDATE student_classes SET is_dropped = 1 WHERE student_id IN ({placeholders})",
+            student_ids,
+        )
+        return cursor.rowcount, class_ids, []
+
+    pending = " AND s.approval_status = 'pending'" if action in ("approve", "reject") else ""
+    cursor.execute(
+        f"""SELECT s.id, s.user_id, s.personal_info_id, s.course, s.year_level,
+                   u.school_id, pi.first_name, pi.last_name, pi.email
+        FROM students s
+        JOIN users u ON s.user_id = u.id
+        LEFT JOIN personal_info pi ON s.personal_info_id = pi.id
+        WHERE s.id IN ({placeholders}){pending}""",
+        student_ids,
+    )
+    rows = cursor.fetchall() or []
+    if not rows:
+        return 0, class_ids, []
+
+    if action == "approve":
+        ids = [row["id"] for row in rows]
+        cursor.execute(
+            f"""UPDATE students s JOIN users u ON s.user_id = u.id
+            SET s.approval_status = 'approved', s.approved_by = %s, s.approved_at = NOW(),
+                u.account_status = 'active'
+            WHERE s.id IN ({_in(ids)})""",
+            [admin_id] + ids,
+        )
+        affected = len(rows)
+    else:
+        class_ids = _class_ids(cursor, [row["id"] for row in rows])
+        affected = _delete_students(cursor, rows)
+    return affected, class_ids, rows
+
+
+def _bump(class_ids):
+    from utils import grade_store
+    from utils.live import emit_live_version_update
+
+    for class_id in sorted(class_ids):
+        grade_store.invalidate(class_id)
+        emit_live_version_update(class_id)
+
+
+def _send_notifications(action, rows, reason=None):
+    from utils.email_service import email_service
+
+    for row in rows:
+        full_name = f"{row.get('first_name') or ''} {row.get('last_name') or ''}".strip()
+        try:
+            if action == "approve":
+                email_service.send_registration_approval_email(
+                    row["email"], full_name, row["school_id"], row["course"], row["year_level"]
+                )
+            else:
+                email_service.send_registration_rejection_email(
+                    row["email"], full_name, row["school_id"], reason or None
+                )
+        except Exception as e:
+            logger.error(f"Failed to send {action} email to {row['school_id']}: {e}")
+
+
+def _audit(action, student_ids, audit):
+    from utils.auth_utils import log_admin_action
+
+    for student_id in student_ids:
+        log_admin_action(f"bulk_{action}", "student", student_id, context=audit)
+
+
+def run(conn, action, student_ids, admin_id=None, on_chunk=None, audit=None):
+    """Apply `action` to all `student_ids`, one transaction per chunk.
+
+    Returns (affected, notify rows). `on_chunk(done, affected)` is called after
+    each committed chunk. With `audit` (utils.auth_utils.audit_context()) one
+    audit event is logged per student.
+    """
+    affected = 0
+    done = 0
+    class_ids = set()
+    notify = []
+    try:
+        for chunk in _chunks(list(student_ids)):
+            with conn.cursor() as cursor:
+                count, classes, rows = apply_chunk(cursor, action, chunk, admin_id)
+                class_versions.bump_many(cursor, classes)
+            conn.commit()
+            if action in ("delete", "reject"):
+                for row in rows:
+                    membership_index.discard(email=row["email"], school_id=row["school_id"])
+            if action in ("approve", "reject"):
+                notify.extend(row for row in rows if row.get("email"))
+            if audit:
+                _audit(action, chunk, audit)
+            affected += count
+            class_ids |= classes
+            done += len(chunk)
+            if on_chunk is not None:
+                on_chunk(done, affected)
+    finally:
+        # Committed chunks stay committed; refresh what they touched.
+        _bump(class_ids)
+    return affected, notify
+
+
+class BulkActionJob(admin_jobs.Job):
+    kind = "bulk_action"
+
+    def __init__(self, action, student_ids, admin_id=None, admin=None, reason=None, audit=None):
+        super().__init__(total=len(student_ids), admin=admin)
+        self.audit = audit
+        self.action = action
+        self.student_ids = list(student_ids)
+        self.admin_id = admin_id
+        self.reason = reason
+        self.affected = 0
+
+    def to_dict(self, errors=True) -> dict:
+        data = super().to_dict(errors)
+        data.update(action=self.action, affected_count=self.affected)
+        return data
+
+    def _chunk_done(self, done, affected):
+        self.processed = done
+        self.affected = affected
+        self.progress()
+
+    def execute(self, conn):
+        _, notify = run(
+            conn,
+            self.action,
+            self.student_ids,
+            self.admin_id,
+            on_chunk=self._chunk_done,
+            audit=self.audit,
+        )
+        logger.info(
+            f"Admin {self.admin} executed student bulk action {self.action} for {self.total} targets"
+        )
+        if notify:
+            self.status = "notifying"
+            _send_notifications(self.action, notify, self.reason)
+
+
+def start_job(action, student_ids, admin_id=None, admin=None, reason=None, audit=None):
+    return admin_jobs.start(
+        BulkActionJob(
+            action, student_ids, admin_id=admin_id, admin=admin, reason=reason, audit=audit
+        )
+    )
+
+
+def get_job(job_id):
+    return admin_jobs.get(job_id, kind=BulkActionJob.kind)
+
+
+def send_notifications_async(action, rows, reason=None):
+    """Send approval / rejection emails for a synchronous batch off the request."""
+    if rows:
+        threading.Thread(
+            target=_send_notifications, args=(action, rows, reason), daemon=True
+        ).start()
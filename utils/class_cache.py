@@ -0,0 +1,95 @@
+"""
+Small per-owner cache whose entries are dropped when one of their classes
+changes. Used for the student dashboard (keyed by user id) and the
+instructor class summaries (keyed by instructor id).
+
+Each entry remembers the class ids it was built from; invalidate_class()
+drops every entry that covers the class. Entries also expire after `ttl`
+seconds, which bounds staleness from writes made by other workers. A build
+that was running while anything was invalidated is returned but not stored,
+so it cannot keep data read before the write.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class ClassIndexedCache:
+    def __init__(self, ttl: int, max_entries: int):
+        self.ttl = max(0, int(ttl))
+        self.max_entries = max(1, int(max_entries))
+        self._entries = OrderedDict()  # key -> (value, class ids, built at)
+        self._by_class = {}  # class id -> keys with a cached entry
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def configure(self, ttl: int = None, max_entries: int = None):
+        """ttl=0 disables caching."""
+        with self._lock:
+            if ttl is not None:
+                self.ttl = max(0, int(ttl))
+            if max_entries:
+                self.max_entries = max(1, int(max_entries))
+            if not self.ttl:
+                self._entries.clear()
+                self._by_class.clear()
+            self._trim()
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for class_id in entry[1]:
+            keys = self._by_class.get(class_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_class[class_id]
+
+    def _trim(self):
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def get(self, key, build, class_ids_of):
+        """The cached value for `key`, or build() it and index it under
+        class_ids_of(value). A None build is returned and not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() - entry[2] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    return entry[0]
+                self._drop(key)
+            epoch = self._epoch
+
+        value = build()
+        if value is None or not self.ttl:
+            return value
+
+        class_ids = set(class_ids_of(value))
+        with self._lock:
+            if epoch == self._epoch:
+                self._drop(key)
+                self._entries[key] = (value, class_ids, time.monotonic())
+                for class_id in class_ids:
+                    self._by_class.setdefault(class_id, set()).add(key)
+                self._trim()
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._epoch += 1
+            self._drop(key)
+
+    def invalidate_class(self, class_id):
+        with self._lock:
+            self._epoch += 1
+            for key in list(self._by_class.get(class_id, ())):
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._by_class.clear()
@@ -0,0 +1,210 @@
+"""
+Per-instructor class summaries: every class of an instructor with member
+counts by status, pending join requests, whether it has an active grade
+structure and how far its grades are released.
+
+/api/instructor/classes and the release-grades page used to count members
+with one query per class, and the grades overview checked the structure and
+recomputed grades class by class. load() reads all of it in one grouped
+query and computed_grades() computes several classes from three queries.
+
+Summaries are cached per instructor for CLASS_SUMMARY_CACHE_TTL seconds and
+dropped through utils.live.invalidate_class_caches() whenever one of the
+classes changes (live version updates, join requests, structure saves);
+creating a class drops the instructor's entry.
+"""
+
+import json
+import logging
+
+from utils.class_cache import ClassIndexedCache
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_TTL_SECONDS = 60
+_DEFAULT_MAX_INSTRUCTORS = 512
+
+_COUNT_COLUMNS = (
+    "member_count",
+    "approved_count",
+    "pending_count",
+    "rejected_count",
+    "dropped_count",
+    "released_count",
+)
+
+
+def _in(ids):
+    return ",".join(["%s"] * len(ids))
+
+
+def _release_status(row) -> str:
+    if not row["released_count"]:
+        return "none"
+    if row["released_count"] >= row["approved_count"]:
+        return "released"
+    return "partial"
+
+
+def load(cursor, instructor_id: int) -> list:
+    """Class rows (classes.*) of an instructor with their summary columns,
+    newest first."""
+    cursor.execute(
+        """
+        SELECT c.*,
+               m.member_count, m.approved_count, m.pending_count,
+               m.rejected_count, m.dropped_count,
+               r.released_count, r.last_released_at,
+               EXISTS(
+                   SELECT 1 FROM grade_structures gs
+                   WHERE gs.class_id = c.id AND gs.is_active = 1
+               ) AS has_structure
+        FROM classes c
+        LEFT JOIN (
+            SELECT sc.class_id,
+                   COUNT(*) AS member_count,
+                   SUM(sc.status = 'approved') AS approved_count,
+                   SUM(sc.status = 'pending') AS pending_count,
+                   SUM(sc.status = 'rejected') AS rejected_count,
+                   SUM(sc.status = 'approved' AND sc.is_dropped = 1) AS dropped_count
+            FROM student_classes sc
+            JOIN classes mc ON mc.id = sc.class_id
+            WHERE mc.instructor_id = %s
+            GROUP BY sc.class_id
+        ) m ON m.class_id = c.id
+        LEFT JOIN (
+            SELECT rg.class_id,
+                   COUNT(*) AS released_count,
+                   MAX(rg.released_at) AS last_released_at
+            FROM released_grades rg
+            JOIN classes rc ON rc.id = rg.class_id
+            WHERE rc.instructor_id = %s AND rg.status = 'released'
+            GROUP BY rg.class_id
+        ) r ON r.class_id = c.id
+        WHERE c.instructor_id = %s
+        ORDER BY c.created_at DESC, c.id DESC
+        """,
+        (instructor_id, instructor_id, instructor_id),
+    )
+    rows = cursor.fetchall() or []
+    for row in rows:
+        for column in _COUNT_COLUMNS:
+            row[column] = int(row.get(column) or 0)
+        row["has_structure"] = bool(row.get("has_structure"))
+        row["release_status"] = _release_status(row)
+    return rows
+
+
+_cache = ClassIndexedCache(_DEFAULT_TTL_SECONDS, _DEFAULT_MAX_INSTRUCTORS)
+
+
+def configure(ttl: int = None, max_instructors: int = None):
+    """Apply CLASS_SUMMARY_* settings from app config. ttl=0 disables caching."""
+    _cache.configure(ttl=ttl, max_entries=max_instructors)
+
+
+def get(cursor, instructor_id: int) -> list:
+    """The cached summaries of `instructor_id`, loading them on a miss."""
+    return _cache.get(
+        int(instructor_id),
+        lambda: load(cursor, instructor_id),
+        lambda rows: (row["id"] for row in rows),
+    )
+
+
+def invalidate_instructor(instructor_id: int):
+    _cache.invalidate(int(instructor_id))
+
+
+def invalidate_class(class_id: int):
+    _cache.invalidate_class(int(class_id))
+
+
+def clear():
+    _cache.clear()
+
+
+def computed_grades(cursor, class_ids) -> dict:
+    """{class id: computed grades} for the classes with an active structure,
+    computed like /api/classes/<id>/calculate from three queries in total."""
+    from utils.grade_calculation import perform_grade_computation
+
+    class_ids = list(class_ids)
+    if not class_ids:
+        return {}
+    placeholders = _in(class_ids)
+
+    cursor.execute(
+        f"""SELECT class_id, structure_json FROM grade_structures
+        WHERE class_id IN ({placeholders}) AND is_active = 1""",
+        class_ids,
+    )
+    structures = {}
+    for row in cursor.fetchall() or []:
+        structures.setdefault(row["class_id"], row["structure_json"])
+    if not structures:
+        return {}
+
+    cursor.execute(
+        f"""
+        SELECT gs.class_id, ga.name, ga.max_score,
+               gsc.name AS subcategory_name, gc.name AS category_name
+        FROM grade_assessments ga
+        JOIN grade_subcategories gsc ON ga.subcategory_id = gsc.id
+        JOIN grade_categories gc ON gsc.category_id = gc.id
+        JOIN grade_structures gs ON gc.structure_id = gs.id
+        WHERE gs.class_id IN ({placeholders}) AND gs.is_active = 1
+        """,
+        class_ids,
+    )
+    assessments = {}
+    for row in cursor.fetchall() or []:
+        assessments.setdefault(row["class_id"], []).append(row)
+
+    cursor.execute(
+        f"""
+        SELECT gs.class_id, ss.student_id, ss.score, ga.name AS assessment_name
+        FROM student_scores ss
+        JOIN grade_assessments ga ON ss.assessment_id = ga.id
+        JOIN grade_subcategories gsc ON ga.subcategory_id = gsc.id
+        JOIN grade_categories gc ON gsc.category_id = gc.id
+        JOIN grade_structures gs ON gc.structure_id = gs.id
+        WHERE gs.class_id IN ({placeholders}) AND gs.is_active = 1
+        """,
+        class_ids,
+    )
+    scores = {}
+    for row in cursor.fetchall() or []:
+        scores.setdefault(row["class_id"], []).append(
+            {
+                "student_id": row["student_id"],
+                "assessment_name": row["assessment_name"],
+                "score": row["score"],
+            }
+        )
+
+    results = {}
+    for class_id, structure_json in structures.items():
+        try:
+            structure = json.loads(structure_json)
+            weights = {
+                (category, subcat["name"]): subcat.get("weight", 0)
+                for category, subcats in structure.items()
+                for subcat in subcats
+            }
+            normalized_rows = [
+                {
+                    "assessment": a["name"],
+                    "category": a["category_name"],
+                    "name": a["subcategory_name"],
+                    "weight": weights.get((a["category_name"], a["subcategory_name"]), 0),
+                    "max_score": a["max_score"],
+                }
+                for a in assessments.get(class_id, [])
+            ]
+            results[class_id] = perform_grade_computation(
+                structure, normalized_rows, scores.get(class_id, [])
+            )
+        except Exception as e:
+            logger.warning(f"Failed to compute grades for class {class_id}: {e}")
+    return results
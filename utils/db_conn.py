@@ -217,11 +217,9 @@ def get_db_connection():
 
             # Load environment variables
             load_dotenv()
-            logger.info("Environment variables loaded from .env file")
 
             # Determine database configuration based on environment
             environment = os.getenv("ENVIRONMENT", "local").lower()
-            logger.info(f"Database environment: {environment}")
 
             if environment == "local":
                 db_host = os.getenv("LOCAL_DB_HOST", "localhost")
@@ -258,7 +256,8 @@ def get_db_connection():
                 autocommit=False,
             )
             _set_thread_conn(conn)
-            logger.info(
+            # Connections are opened per request thread; keep this out of INFO.
+            logger.debug(
                 f"PyMySQL database connection established for {environment} (thread-local)"
             )
         except Exception as e:
@@ -288,6 +287,6 @@ def close_db_connection():
             except Exception:
                 pass
             _set_thread_conn(None)
-            logger.info("Thread-local DB connection closed")
+            logger.debug("Thread-local DB connection closed")
     except Exception as e:
         logger.warning(f"Error closing thread-local DB connection: {e}")
@@ -1,41 +1,16 @@
 from flask import request
 from utils.db_conn import get_db_connection
+from utils.grading_scales import equivalent_for
 
 
 def get_equivalent(final_grade: float) -> str:
     """
-    Map numeric grade to ISU equivalent string.
-    Based on Isabela State University official grading system:
-    - 1.0  = 98-100
-    - 1.25 = 95-97
-    - 1.5  = 92-94
-    - 1.75 = 89-91
-    - 2.0  = 86-88
-    - 2.25 = 83-85
-    - 2.5  = 80-82
-    - 2.75 = 77-79
-    - 3.0  = 75-76
-    - 5.0  = Below 75 (Failure)
+    Map numeric grade to ISU equivalent string ("1.00" ... "5.00").
+    Thresholds come from the MAJOR scale in utils.grading_scales:
+    98+ 1.00, 95+ 1.25, 92+ 1.50, 89+ 1.75, 86+ 2.00, 83+ 2.25, 80+ 2.50,
+    77+ 2.75, 75+ 3.00, below 75 5.00.
     """
-    if final_grade >= 98:
-        return "1.00"
-    if final_grade >= 95:
-        return "1.25"
-    if final_grade >= 92:
-        return "1.50"
-    if final_grade >= 89:
-        return "1.75"
-    if final_grade >= 86:
-        return "2.00"
-    if final_grade >= 83:
-        return "2.25"
-    if final_grade >= 80:
-        return "2.50"
-    if final_grade >= 77:
-        return "2.75"
-    if final_grade >= 75:
-        return "3.00"
-    return "5.00"
+    return equivalent_for(final_grade, "MAJOR", decimals=2)
 
 
 def perform_grade_computation(
@@ -48,7 +23,7 @@ def perform_grade_computation(
     - To change how group/category weights are handled, modify the logic in the category_group_weights and category_weight_structure sections.
     - To change how category contributions are scaled, adjust the scaling logic in the 'cat_contrib' calculation.
     - To change how final grades are computed, modify the 'total_grade' and 'final_grade' calculations.
-    - To change grade equivalency, edit the get_equivalent() function above.
+    - To change grade equivalency, register a new scale version in utils/grading_scales.py.
     - To add new grading rules, insert your logic in the relevant sections below.
     Each calculation step is commented for easy modification.
     """
@@ -0,0 +1,393 @@
+"""
+Incremental per-class grade store.
+
+For each class read recently this keeps the grade structure (groups of
+assessment ids with their maxes and subweight) together with every student's
+scores, per-group totals and missing-score counts. A score edit re-sums only
+the group it belongs to and re-derives that student's summary from the cached
+group totals, so serving final grades after a single-cell edit costs
+microseconds instead of rescanning student_scores for the whole class.
+
+    grade_store.get_class(class_id).summary(student_id)
+    grade_store.apply_scores(class_id, [(student_id, assessment_id, 92.0)], version)
+    grade_store.apply_max_score(class_id, assessment_id, 50, version)
+    grade_store.apply_subweight(class_id, "LECTURE::Quiz", 25, version)
+
+Summaries are built with the same helpers as compute_routes, so they match
+/api/grade-entry/compute exactly. Every cached class remembers the
+class_versions counter (utils/class_versions.py) it was built at. Each
+writer bumps that counter in its own transaction. The apply_* hooks take the
+value their write produced, and it is adopted only when it is the cached one
+plus one, i.e. no other write landed in between. Any other change (the grade
+builder, roster changes, another worker process) moves the counter past the
+cached value and the class is reloaded on its next read. GRADE_STORE_TTL
+bounds how long a class is trusted without a reload. Before migration 0008
+there is no counter and every read reloads.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from blueprints.compute_routes import (
+    _group_metrics,
+    _has_laboratory,
+    _major_summary,
+    _minor_summary,
+)
+from utils import class_versions
+from utils.grading_scales import get_scale
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_CLASSES = 64
+_DEFAULT_TTL_SECONDS = 600
+
+
+def _ordered_sum(values) -> float:
+    # Left-to-right float addition like compute_routes (sum() compensates on
+    # newer Pythons), so cached totals are bit-identical to a full recompute.
+    total = 0.0
+    for v in values:
+        if v is not None:
+            total += v
+    return total
+
+
+def _to_score(value):
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+class ClassGrades:
+    """Scores and per-group totals for one class."""
+
+    def __init__(self, class_id: int, class_type: str, groups: dict, version=None):
+        self.class_id = int(class_id)
+        self.class_type = (class_type or "MAJOR").upper()
+        self.groups = OrderedDict()
+        self._where = {}  # assessment id -> (group key, position)
+        for gkey, g in (groups or {}).items():
+            ids = [int(a) for a in g.get("ids", [])]
+            maxes = [float(m or 0) for m in g.get("maxes", [])]
+            self.groups[gkey] = {
+                "ids": ids,
+                "maxes": maxes,
+                "maxTotal": _ordered_sum(maxes),
+                "subweight": float(g.get("subweight") or 0),
+                "category": (gkey.split("::", 1)[0] or "").strip().upper(),
+            }
+            for pos, aid in enumerate(ids):
+                self._where[aid] = (gkey, pos)
+        self.has_lab = _has_laboratory(self.groups)
+
+        self.scores = {}  # student id -> {assessment id: float | None}
+        self.totals = {}  # student id -> {group key: float}
+        self.missing = {}  # student id -> {group key: count of blank scores}
+        self._summaries = {}
+
+        self.version = version  # class_versions counter, None before 0008
+        self.loaded_at = time.monotonic()
+        self.lock = threading.RLock()
+
+    # --- per-student state -------------------------------------------------
+
+    def _ensure_student(self, sid: int):
+        if sid not in self.scores:
+            self.scores[sid] = {}
+            self.totals[sid] = {gkey: 0.0 for gkey in self.groups}
+            self.missing[sid] = {gkey: len(g["ids"]) for gkey, g in self.groups.items()}
+
+    def _refresh_group(self, sid: int, gkey: str):
+        score_map = self.scores[sid]
+        values = [score_map.get(aid) for aid in self.groups[gkey]["ids"]]
+        self.totals[sid][gkey] = _ordered_sum(values)
+        self.missing[sid][gkey] = sum(1 for v in values if v is None)
+
+    def load_scores(self, rows):
+        """Bulk-load (student_id, assessment_id, score) rows from the database."""
+        touched = set()
+        for sid, aid, score in rows:
+            aid = int(aid)
+            if aid not in self._where:
+                continue
+            sid = int(sid)
+            self._ensure_student(sid)
+            self.scores[sid][aid] = None if score is None else float(score)
+            touched.add(sid)
+        for sid in touched:
+            for gkey in self.groups:
+                self._refresh_group(sid, gkey)
+            self._summaries.pop(sid, None)
+
+    def set_score(self, sid: int, aid: int, value) -> bool:
+        """Apply one score edit; False if the assessment is not in this class."""
+        location = self._where.get(int(aid))
+        if location is None:
+            return False
+        sid = int(sid)
+        self._ensure_student(sid)
+        self.scores[sid][int(aid)] = _to_score(value)
+        self._refresh_group(sid, location[0])
+        self._summaries.pop(sid, None)
+        return True
+
+    def set_max_score(self, aid: int, max_score) -> bool:
+        location = self._where.get(int(aid))
+        if location is None:
+            return False
+        gkey, pos = location
+        group = self.groups[gkey]
+        group["maxes"][pos] = float(max_score or 0)
+        group["maxTotal"] = _ordered_sum(group["maxes"])
+        self._summaries.clear()
+        return True
+
+    def set_subweight(self, gkey: str, weight) -> bool:
+        group = self.groups.get(gkey)
+        if group is None:
+            return False
+        group["subweight"] = float(weight or 0)
+        self._summaries.clear()
+        return True
+
+    # --- derived values ----------------------------------------------------
+
+    def group_results(self, sid: int) -> dict:
+        """Per-group metrics for a student, shaped like compute results."""
+        sid = int(sid)
+        self._ensure_student(sid)
+        totals = self.totals[sid]
+        return {
+            gkey: _group_metrics(totals[gkey], g["maxTotal"], g["subweight"])[0]
+            for gkey, g in self.groups.items()
+        }
+
+    def summary(self, sid: int) -> dict:
+        """Final-grade summary, identical to compute_major/minor_grade's."""
+        sid = int(sid)
+        cached = self._summaries.get(sid)
+        if cached is not None:
+            return dict(cached)
+        self._ensure_student(sid)
+        totals = self.totals[sid]
+        weighted_raw = {}
+        for gkey, g in self.groups.items():
+            if not g["category"]:
+                continue
+            _, reqpct_raw = _group_metrics(totals[gkey], g["maxTotal"], g["subweight"])
+            weighted_raw[g["category"]] = weighted_raw.get(g["category"], 0.0) + reqpct_raw
+
+        if self.class_type == "MINOR":
+            summary = _minor_summary(weighted_raw)
+            summary["equivalent"] = get_scale("MINOR").equivalent(summary["final_grade"])
+        else:
+            summary = _major_summary(weighted_raw, self.has_lab)
+        self._summaries[sid] = summary
+        return dict(summary)
+
+    def missing_groups(self, sid: int) -> list:
+        """Group keys (in structure order) where the student has a blank score."""
+        sid = int(sid)
+        self._ensure_student(sid)
+        counts = self.missing[sid]
+        return [gkey for gkey in self.groups if counts[gkey]]
+
+
+def load_class(cursor, class_id: int, version=None) -> ClassGrades:
+    """Build a ClassGrades from the database with one query per table."""
+    cursor.execute("SELECT class_type FROM classes WHERE id = %s", (class_id,))
+    class_row = cursor.fetchone() or {}
+    class_type = class_row.get("class_type") or "MAJOR"
+
+    cursor.execute(
+        """
+        SELECT
+            ga.id,
+            ga.max_score,
+            gc.name as category_name,
+            gs_sub.name as subcategory_name,
+            gs_sub.weight
+        FROM grade_assessments ga
+        JOIN grade_subcategories gs_sub ON ga.subcategory_id = gs_sub.id
+        JOIN grade_categories gc ON gs_sub.category_id = gc.id
+        JOIN grade_structures gs ON gc.structure_id = gs.id
+        WHERE gs.class_id = %s
+        ORDER BY gc.name, gs_sub.name, ga.position
+        """,
+        (class_id,),
+    )
+    groups = {}
+    for row in cursor.fetchall() or []:
+        category = str(row.get("category_name") or "").upper()
+        group_key = f"{category}::{row.get('subcategory_name') or ''}"
+        group = groups.setdefault(
+            group_key,
+            {"ids": [], "maxes": [], "subweight": float(row.get("weight") or 0)},
+        )
+        group["ids"].append(int(row["id"]))
+        group["maxes"].append(float(row.get("max_score") or 0))
+
+    state = ClassGrades(class_id, class_type, groups, version)
+    if state.groups:
+        cursor.execute(
+            """
+            SELECT ss.student_id, ss.assessment_id, ss.score
+            FROM student_scores ss
+            JOIN grade_assessments ga ON ss.assessment_id = ga.id
+            JOIN grade_subcategories gs_sub ON ga.subcategory_id = gs_sub.id
+            JOIN grade_categories gc ON gs_sub.category_id = gc.id
+            JOIN grade_structures gs ON gc.structure_id = gs.id
+            WHERE gs.class_id = %s
+            """,
+            (class_id,),
+        )
+        state.load_scores(
+            (r["student_id"], r["assessment_id"], r["score"])
+            for r in cursor.fetchall() or []
+        )
+    return state
+
+
+_classes = OrderedDict()
+_lock = threading.Lock()
+_settings = {
+    "enabled": True,
+    "max_classes": _DEFAULT_MAX_CLASSES,
+    "ttl": _DEFAULT_TTL_SECONDS,
+}
+
+
+def configure(enabled: bool = None, max_classes: int = None, ttl: int = None):
+    """Apply GRADE_STORE_* settings from app config."""
+    with _lock:
+        if enabled is not None:
+            _settings["enabled"] = bool(enabled)
+        if max_classes:
+            _settings["max_classes"] = max(1, int(max_classes))
+        if ttl:
+            _settings["ttl"] = max(1, int(ttl))
+        if not _settings["enabled"]:
+            _classes.clear()
+        while len(_classes) > _settings["max_classes"]:
+            _classes.popitem(last=False)
+
+
+def _current_version(class_id: int):
+    from utils.db_conn import get_db_connection
+
+    with get_db_connection().cursor() as cursor:
+        return class_versions.current(cursor, class_id)
+
+
+def _is_fresh(state: ClassGrades, version) -> bool:
+    if version is None or state.version != version:
+        return False
+    return time.monotonic() - state.loaded_at <= _settings["ttl"]
+
+
+def _adopt(state: ClassGrades, version) -> bool:
+    """Move the cached class to the counter our write produced; False when
+    another write got in between (or there is no counter)."""
+    if version is None or state.version is None or version != state.version + 1:
+        return False
+    state.version = version
+    return True
+
+
+def get_class(class_id: int, cursor=None) -> ClassGrades:
+    """Return the up-to-date grade state for a class, loading it if needed."""
+    class_id = int(class_id)
+    version = _current_version(class_id)
+    with _lock:
+        state = _classes.get(class_id)
+        if state is not None:
+            _classes.move_to_end(class_id)
+    if state is not None:
+        with state.lock:
+            if _is_fresh(state, version):
+                return state
+
+    if cursor is None:
+        from utils.db_conn import get_db_connection
+
+        with get_db_connection().cursor() as own_cursor:
+            state = load_class(own_cursor, class_id, version)
+    else:
+        state = load_class(cursor, class_id, version)
+    logger.debug(
+        f"Loaded grade store for class {class_id}: {len(state.groups)} groups, "
+        f"{len(state.scores)} students"
+    )
+
+    if _settings["enabled"] and version is not None:
+        with _lock:
+            _classes[class_id] = state
+            _classes.move_to_end(class_id)
+            while len(_classes) > _settings["max_classes"]:
+                _classes.popitem(last=False)
+    return state
+
+
+def _resident(class_id: int):
+    with _lock:
+        return _classes.get(int(class_id))
+
+
+def apply_scores(class_id: int, entries, version) -> dict:
+    """Apply committed (student_id, assessment_id, score) edits to a cached class.
+
+    `version` is what class_versions.bump() returned in the writing
+    transaction. Returns {student_id: summary} for the students touched, or
+    {} when the class is not cached or another write got in between (it will
+    be loaded fresh on its next read).
+    """
+    state = _resident(class_id)
+    if state is None:
+        return {}
+    with state.lock:
+        if not _adopt(state, version):
+            invalidate(class_id)
+            return {}
+        touched = []
+        for sid, aid, score in entries:
+            if not state.set_score(sid, aid, score):
+                # Unknown assessment: the structure changed under us.
+                invalidate(class_id)
+                return {}
+            touched.append(int(sid))
+        return {sid: state.summary(sid) for sid in touched}
+
+
+def apply_max_score(class_id: int, assessment_id: int, max_score, version) -> bool:
+    state = _resident(class_id)
+    if state is None:
+        return False
+    with state.lock:
+        if not _adopt(state, version) or not state.set_max_score(assessment_id, max_score):
+            invalidate(class_id)
+            return False
+        return True
+
+
+def apply_subweight(class_id: int, group_key: str, weight, version) -> bool:
+    state = _resident(class_id)
+    if state is None:
+        return False
+    with state.lock:
+        if not _adopt(state, version) or not state.set_subweight(group_key, weight):
+            invalidate(class_id)
+            return False
+        return True
+
+
+def invalidate(class_id: int):
+    with _lock:
+        _classes.pop(int(class_id), None)
+
+
+def clear():
+    with _lock:
+        _classes.clear()
@@ -0,0 +1,147 @@
+"""
+Windowed reads of a class gradebook for the grade entry grid.
+
+The gradebook page renders every student x assessment cell server-side and
+GET /scores?class_id= returns every score row; for combined sections of
+300+ students and 60 assessments that is a large payload and a slow render.
+Instead a client can fetch:
+
+* the manifest: the ordered student rows and assessment columns (ids, names,
+  max scores, grouping) without any scores;
+* windows: a row range x column range slice of the score matrix, as a list of
+  lists aligned with the manifest order (None where no score is recorded).
+
+Ordering is stable and matches the gradebook page: students by last name,
+first name, then id; assessments by category, subcategory and assessment
+position, then id. The manifest is kept in utils.live's normalized cache
+under the class live version, so windows resolve their ids without querying
+the roster again. Both endpoints carry class_version_etag ETags, which
+include the window parameters, so each window revalidates on its own.
+"""
+
+from utils.live import _cache_get, _cache_put, get_cached_class_live_version
+
+MAX_WINDOW_ROWS = 200
+MAX_WINDOW_COLS = 100
+
+
+def _in(ids):
+    return ",".join(["%s"] * len(ids))
+
+
+def _student_name(row) -> str:
+    first_name = row.get("first_name") or ""
+    middle_name = row.get("middle_name") or ""
+    last_name = row.get("last_name") or ""
+    if first_name and last_name:
+        middle_initial = f" {middle_name[0]}." if middle_name else ""
+        return f"{last_name}, {first_name}{middle_initial}"
+    return row.get("school_id") or f"Student {row['student_id']}"
+
+
+def load_manifest(cursor, class_id: int) -> dict:
+    cursor.execute(
+        """
+        SELECT sc.student_id, u.school_id, pi.first_name, pi.last_name,
+               pi.middle_name, sc.is_dropped
+        FROM student_classes sc
+        JOIN students s ON sc.student_id = s.id
+        JOIN users u ON s.user_id = u.id
+        LEFT JOIN personal_info pi ON s.personal_info_id = pi.id
+        WHERE sc.class_id = %s AND sc.status = 'approved'
+        ORDER BY pi.last_name, pi.first_name, sc.student_id
+        """,
+        (class_id,),
+    )
+    students = [
+        {
+            "id": row["student_id"],
+            "name": _student_name(row),
+            "school_id": row.get("school_id") or "",
+            "is_dropped": bool(row.get("is_dropped")),
+        }
+        for row in cursor.fetchall() or []
+    ]
+
+    cursor.execute(
+        """
+        SELECT ga.id, ga.name, ga.max_score,
+               gsc.name AS subcategory, gc.name AS category
+        FROM grade_assessments ga
+        JOIN grade_subcategories gsc ON ga.subcategory_id = gsc.id
+        JOIN grade_categories gc ON gsc.category_id = gc.id
+        JOIN grade_structures gs ON gc.structure_id = gs.id
+        WHERE gs.class_id = %s AND gs.is_active = 1
+        ORDER BY gc.position, gsc.position, ga.position, ga.id
+        """,
+        (class_id,),
+    )
+    assessments = [
+        {
+            "id": row["id"],
+            "name": row["name"],
+            "max_score": row["max_score"],
+            "category": row["category"],
+            "subcategory": row["subcategory"],
+        }
+        for row in cursor.fetchall() or []
+    ]
+    return {"class_id": class_id, "students": students, "assessments": assessments}
+
+
+def manifest(cursor, class_id: int) -> dict:
+    """The manifest for the current live version of the class (cached)."""
+    class_id = int(class_id)
+    version = get_cached_class_live_version(class_id)
+    key = f"gradebook-manifest:{class_id}:{version}"
+    cached = _cache_get(key) if version else None
+    if cached is not None:
+        return cached
+    data = load_manifest(cursor, class_id)
+    data["version"] = version
+    if version:
+        _cache_put(key, data)
+    return data
+
+
+def parse_range(offset, limit, total: int, max_limit: int):
+    """Clamp a requested (offset, limit) to [0, total). Raises ValueError for
+    non-integers."""
+    offset = max(0, int(offset or 0))
+    limit = int(limit) if limit not in (None, "") else max_limit
+    limit = min(max(0, limit), max_limit)
+    return min(offset, total), min(offset + limit, total)
+
+
+def window(cursor, data: dict, rows, cols) -> dict:
+    """Scores for students[rows[0]:rows[1]] x assessments[cols[0]:cols[1]]."""
+    student_ids = [s["id"] for s in data["students"][rows[0] : rows[1]]]
+    assessment_ids = [a["id"] for a in data["assessments"][cols[0] : cols[1]]]
+
+    scores = {}
+    if student_ids and assessment_ids:
+        cursor.execute(
+            f"""
+            SELECT student_id, assessment_id, score
+            FROM student_scores
+            WHERE student_id IN ({_in(student_ids)})
+              AND assessment_id IN ({_in(assessment_ids)})
+            """,
+            student_ids + assessment_ids,
+        )
+        for row in cursor.fetchall() or []:
+            scores[(row["student_id"], row["assessment_id"])] = row["score"]
+
+    return {
+        "class_id": data["class_id"],
+        "version": data.get("version"),
+        "rows": {"offset": rows[0], "count": len(student_ids), "total": len(data["students"])},
+        "cols": {
+            "offset": cols[0],
+            "count": len(assessment_ids),
+            "total": len(data["assessments"]),
+        },
+        "student_ids": student_ids,
+        "assessment_ids": assessment_ids,
+        "scores": [[scores.get((sid, aid)) for aid in assessment_ids] for sid in student_ids],
+    }
@@ -0,0 +1,179 @@
+"""
+Grading-scale registry: percent grade -> ISU equivalent.
+
+Each scale is named (MAJOR, MINOR, ...) and versioned, and stores its lower
+bounds as a sorted threshold array with one label per bucket. Lookups are a
+binary search (bisect for one grade, numpy.searchsorted for a whole column),
+so changing the scale means registering a new version here instead of editing
+if-chains across the code base.
+
+    equivalent_for(91.2)                    -> "1.75"
+    equivalent_for(91.2, decimals=2)        -> "1.75"  ("1.00", "2.50", ...)
+    bulk_equivalents([99, 74.5, None])      -> ["1.0", "5.0", None]
+
+Released grades record the scale key (e.g. "MAJOR@v1") in grade_payload, so
+rows released under an older scale differ in the payload recalculate_grades.py
+compares and are rewritten on its next run.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Isabela State University scale: lower bounds of each bucket, ascending.
+ISU_THRESHOLDS = (75.0, 77.0, 80.0, 83.0, 86.0, 89.0, 92.0, 95.0, 98.0)
+ISU_POINTS = (5.0, 3.0, 2.75, 2.5, 2.25, 2.0, 1.75, 1.5, 1.25, 1.0)
+
+
+@dataclass(frozen=True)
+class GradingScale:
+    """A percent -> equivalent mapping.
+
+    `points[i]` / `labels[i]` apply to grades in [thresholds[i-1], thresholds[i]);
+    index 0 is everything below the lowest threshold.
+    """
+
+    name: str
+    version: int
+    thresholds: tuple
+    points: tuple
+    labels: tuple
+    description: str = ""
+
+    def __post_init__(self):
+        if list(self.thresholds) != sorted(self.thresholds):
+            raise ValueError(f"{self.key}: thresholds must be ascending")
+        if not (len(self.points) == len(self.labels) == len(self.thresholds) + 1):
+            raise ValueError(f"{self.key}: need one point and label per bucket")
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@v{self.version}"
+
+    def _label(self, index: int, decimals):
+        if decimals is None:
+            return self.labels[index]
+        return f"{self.points[index]:.{decimals}f}"
+
+    def equivalent(self, grade, decimals=None):
+        """Equivalent for one grade, or None if it is not a number."""
+        value = _to_float(grade)
+        if value is None:
+            return None
+        return self._label(bisect_right(self.thresholds, value), decimals)
+
+    def equivalents(self, grades, decimals=None) -> list:
+        """Equivalents for a sequence of grades in one searchsorted call."""
+        values = [_to_float(g) for g in grades]
+        try:
+            import numpy as np
+        except ImportError:
+            return [
+                None if v is None else self._label(bisect_right(self.thresholds, v), decimals)
+                for v in values
+            ]
+
+        arr = np.array([np.nan if v is None else v for v in values], dtype=float)
+        indexes = np.searchsorted(_threshold_array(self), arr, side="right")
+        labels = [self._label(i, decimals) for i in range(len(self.points))]
+        missing = np.isnan(arr)
+        return [None if missing[i] else labels[idx] for i, idx in enumerate(indexes.tolist())]
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "version": self.version,
+            "key": self.key,
+            "thresholds": list(self.thresholds),
+            "points": list(self.points),
+            "labels": list(self.labels),
+            "description": self.description,
+        }
+
+
+def _to_float(grade):
+    if grade is None:
+        return None
+    try:
+        value = float(grade)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value  # NaN
+
+
+@lru_cache(maxsize=None)
+def _threshold_array(scale: GradingScale):
+    import numpy as np
+
+    return np.asarray(scale.thresholds, dtype=float)
+
+
+_REGISTRY = {}
+_LATEST = {}
+
+
+def register_scale(scale: GradingScale) -> GradingScale:
+    """Add a scale version; the highest version of a name becomes the default."""
+    _REGISTRY[(scale.name, scale.version)] = scale
+    if scale.version >= _LATEST.get(scale.name, -1):
+        _LATEST[scale.name] = scale.version
+    return scale
+
+
+def get_scale(name: str = "MAJOR", version: int = None) -> GradingScale:
+    """Return a registered scale (latest version unless `version` is given)."""
+    name = (name or "MAJOR").upper()
+    if version is None:
+        if name not in _LATEST:
+            raise KeyError(f"Unknown grading scale: {name}")
+        version = _LATEST[name]
+    try:
+        return _REGISTRY[(name, int(version))]
+    except KeyError:
+        raise KeyError(f"Unknown grading scale: {name}@v{version}") from None
+
+
+def list_scales() -> list:
+    return [_REGISTRY[k] for k in sorted(_REGISTRY)]
+
+
+def scale_for_class_type(class_type: str) -> GradingScale:
+    """MINOR classes use the MINOR scale; MAJOR and MAJOR_LAB use MAJOR."""
+    if (class_type or "").upper() == "MINOR":
+        return get_scale("MINOR")
+    return get_scale("MAJOR")
+
+
+def equivalent_for(grade, scale: str = "MAJOR", decimals=None, version: int = None):
+    """Scalar lookup for existing callers; None for missing/non-numeric grades."""
+    return get_scale(scale, version).equivalent(grade, decimals)
+
+
+def bulk_equivalents(grades, scale: str = "MAJOR", decimals=None, version: int = None) -> list:
+    """Vectorized lookup for a whole column of grades."""
+    return get_scale(scale, version).equivalents(grades, decimals)
+
+
+# Labels are kept exactly as they were stored before the registry existed:
+# released grades use the short form ("1.5", "2.0"), MINOR summaries the form
+# produced by the old compute_routes mapping ("1.50", "2.00").
+register_scale(
+    GradingScale(
+        name="MAJOR",
+        version=1,
+        thresholds=ISU_THRESHOLDS,
+        points=ISU_POINTS,
+        labels=("5.0", "3.0", "2.75", "2.5", "2.25", "2.0", "1.75", "1.5", "1.25", "1.0"),
+        description="ISU scale: 98+ 1.0, 95+ 1.25, ..., 75+ 3.0, below 75 5.0",
+    )
+)
+register_scale(
+    GradingScale(
+        name="MINOR",
+        version=1,
+        thresholds=ISU_THRESHOLDS,
+        points=ISU_POINTS,
+        labels=("5.0", "3.0", "2.75", "2.50", "2.25", "2.00", "1.75", "1.50", "1.25", "1.0"),
+        description="ISU scale for MINOR classes (same thresholds as MAJOR)",
+    )
+)
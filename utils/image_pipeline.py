@@ -0,0 +1,354 @@
+"""
+Background processing of registration photo uploads (ID front, ID back and
+face photo).
+
+/register saves the uploads as before and queues the new student here. A
+worker thread then, for each photo:
+
+* opens it with Pillow and rejects anything that is not a JPEG, PNG or WebP
+  image (the extension check in the request only looks at the name);
+* rewrites the original without its EXIF/XMP metadata (phone photos carry
+  GPS coordinates and device details), keeping the upright orientation;
+  originals that carry no metadata are left as they are, so a second pass
+  does not re-encode them;
+* writes a review-size (REVIEW_SIZE px) and a thumbnail (THUMB_SIZE px)
+  compressed variant into REGISTRATION_MEDIA_DIR, named after a hash of their
+  content.
+
+The variant names are stored in students.photo_variants (migration 0007) and
+served to admins by /admin/registration-media/<name> with an immutable
+Cache-Control, so the pending-registrations list can show thumbnails instead
+of full-size phone photos. Pillow is optional: without it, or before the
+migration, the list keeps returning the original files.
+
+Every Passenger worker runs its own pipeline and startup backfill, so a
+worker first claims a student by swapping photo_variants from NULL to a
+{"claimed_at": <unix time>} marker; only the worker whose UPDATE matched
+processes the photos. A claim older than CLAIM_TIMEOUT (the worker died
+mid-way) is taken over by the next backfill. Files are written through
+per-process temp names (tempfile.mkstemp) and os.replace.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+
+try:
+    from PIL import Image, ImageOps, features
+
+    HAS_PIL = True
+except ImportError:
+    Image = ImageOps = features = None
+    HAS_PIL = False
+
+logger = logging.getLogger(__name__)
+
+PHOTO_COLUMNS = ("id_front_path", "id_back_path", "face_photo_path")
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "MPO"}
+REVIEW_SIZE = 1600
+THUMB_SIZE = 320
+MAX_PIXELS = 40_000_000
+CLAIM_TIMEOUT = 3600
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "icc_profile", "comment")
+
+_variants_column = None
+
+
+def variants_available(cursor) -> bool:
+    """True once migration 0007 has added students.photo_variants."""
+    global _variants_column
+    if _variants_column is None:
+        from utils.migrations import column_exists
+
+        try:
+            _variants_column = column_exists(cursor, "students", "photo_variants")
+        except Exception as e:
+            logger.warning(f"Could not inspect students.photo_variants: {e}")
+            return False
+    return _variants_column
+
+
+def _variant_format():
+    if features is not None and features.check("webp"):
+        return "WEBP", "webp"
+    return "JPEG", "jpg"
+
+
+def _encode(image, fmt, quality) -> bytes:
+    options = {
+        "JPEG": {"quality": quality, "optimize": True},
+        "WEBP": {"quality": quality, "method": 4},
+    }.get(fmt, {"optimize": True})
+    out = io.BytesIO()
+    image.save(out, fmt, **options)
+    return out.getvalue()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write through a temp file unique to this process, then rename it over
+    `path`, so concurrent writers never share a half-written file."""
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(path) or ".", prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _has_metadata(image) -> bool:
+    if any(image.info.get(key) for key in METADATA_KEYS):
+        return True
+    if getattr(image, "text", None):
+        return True
+    return bool(image.getexif())
+
+
+def process_photo(path: str, media_dir: str) -> dict:
+    """Verify, strip and resize one photo. Returns {"review", "thumb"} names
+    (relative to media_dir) or {"error"}."""
+    try:
+        with Image.open(path) as probe:
+            fmt = probe.format
+            probe.verify()
+        if fmt not in ALLOWED_FORMATS:
+            return {"error": f"unsupported image format {fmt}"}
+        with Image.open(path) as opened:
+            if opened.width * opened.height > MAX_PIXELS:
+                return {"error": "image too large"}
+            needs_strip = fmt == "MPO" or _has_metadata(opened)
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except Exception as e:
+        return {"error": f"not a readable image: {e}"}
+
+    if image.mode not in ("RGB", "L"):
+        background = Image.new("RGB", image.size, "white")
+        rgba = image.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        image = background
+    elif image.mode == "L":
+        image = image.convert("RGB")
+
+    # Rewrite the original in place without metadata (a new image object has
+    # no EXIF/XMP/ICC info attached). Already-clean files are not re-encoded.
+    clean = Image.new(image.mode, image.size)
+    clean.paste(image)
+    if needs_strip:
+        original_format = "JPEG" if fmt == "MPO" else fmt
+        _write_atomic(path, _encode(clean, original_format, 90))
+
+    variant_format, ext = _variant_format()
+    result = {}
+    os.makedirs(media_dir, exist_ok=True)
+    for name, size, quality in (("review", REVIEW_SIZE, 80), ("thumb", THUMB_SIZE, 70)):
+        variant = clean.copy()
+        variant.thumbnail((size, size), Image.LANCZOS)
+        data = _encode(variant, variant_format, quality)
+        filename = f"{hashlib.sha256(data).hexdigest()[:24]}.{ext}"
+        target = os.path.join(media_dir, filename)
+        if not os.path.exists(target):
+            _write_atomic(target, data)
+        result[name] = filename
+    return result
+
+
+def variant_urls(row, url_for_media) -> dict:
+    """{"<column>_thumb_url", "<column>_review_url"} for a students row.
+
+    Photos without variants (not processed yet, or failed) fall back to the
+    original upload.
+    """
+    try:
+        variants = json.loads(row.get("photo_variants") or "{}")
+    except (TypeError, ValueError):
+        variants = {}
+    urls = {}
+    for column in PHOTO_COLUMNS:
+        original = row.get(column) or ""
+        original_url = f"/{original.lstrip('/')}" if original else ""
+        entry = variants.get(column) or {}
+        base = column[: -len("_path")]
+        urls[f"{base}_thumb_url"] = (
+            url_for_media(entry["thumb"]) if entry.get("thumb") else original_url
+        )
+        urls[f"{base}_review_url"] = (
+            url_for_media(entry["review"]) if entry.get("review") else original_url
+        )
+    return urls
+
+
+def _stale_claim(value) -> bool:
+    """True for a claim marker older than CLAIM_TIMEOUT."""
+    try:
+        data = json.loads(value)
+    except (TypeError, ValueError):
+        return False
+    if not isinstance(data, dict) or set(data) != {"claimed_at"}:
+        return False
+    try:
+        return time.time() - float(data["claimed_at"]) > CLAIM_TIMEOUT
+    except (TypeError, ValueError):
+        return False
+
+
+class ImagePipeline:
+    def __init__(self, root_path: str, media_dir: str):
+        self.root_path = root_path
+        self.media_dir = media_dir
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def submit(self, student_id: int) -> None:
+        self._queue.put(int(student_id))
+
+    @staticmethod
+    def _claim(cursor, student_id: int, current) -> bool:
+        """Swap photo_variants from `current` (NULL or a stale claim) to a new
+        claim marker. True only for the worker whose UPDATE matched the row."""
+        marker = json.dumps({"claimed_at": int(time.time())})
+        if current is None:
+            cursor.execute(
+                "UPDATE students SET photo_variants = %s WHERE id = %s AND photo_variants IS NULL",
+                (marker, student_id),
+            )
+        else:
+            cursor.execute(
+                "UPDATE students SET photo_variants = %s WHERE id = %s AND photo_variants = %s",
+                (marker, student_id, current),
+            )
+        return cursor.rowcount == 1
+
+    def process_student(self, student_id: int) -> dict:
+        from utils.db_conn import get_db_connection
+
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            if not variants_available(cursor):
+                return {}
+            cursor.execute(
+                f"SELECT id, {', '.join(PHOTO_COLUMNS)}, photo_variants FROM students WHERE id = %s",
+                (student_id,),
+            )
+            row = cursor.fetchone()
+            current = row.get("photo_variants") if row else None
+            if row and current is not None and not _stale_claim(current):
+                # Processed already, or another worker is on it.
+                row = None
+            if row and not self._claim(cursor, student_id, current):
+                row = None
+        conn.commit()
+        if not row:
+            return {}
+
+        variants = {}
+        for column in PHOTO_COLUMNS:
+            relative = row.get(column)
+            if not relative:
+                continue
+            path = os.path.join(self.root_path, relative)
+            if not os.path.isfile(path):
+                variants[column] = {"error": "file missing"}
+                continue
+            variants[column] = process_photo(path, self.media_dir)
+            if "error" in variants[column]:
+                logger.warning(
+                    f"Registration photo {column} of student {student_id} rejected: {variants[column]['error']}"
+                )
+
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "UPDATE students SET photo_variants = %s WHERE id = %s",
+                (json.dumps(variants), student_id),
+            )
+        conn.commit()
+        return variants
+
+    def backfill(self) -> int:
+        """Queue students with uploaded photos but no variants yet, plus those
+        whose claim has gone stale. process_student() claims each one, so
+        workers backfilling at the same time do not process a row twice."""
+        from utils.db_conn import get_db_connection
+
+        conn = get_db_connection()
+        with conn.cursor() as cursor:
+            if not variants_available(cursor):
+                return 0
+            cursor.execute(
+                """
+                SELECT id, photo_variants FROM students
+                WHERE (photo_variants IS NULL OR photo_variants LIKE '{"claimed_at":%')
+                  AND (id_front_path IS NOT NULL OR id_back_path IS NOT NULL
+                       OR face_photo_path IS NOT NULL)
+                ORDER BY approval_status = 'pending' DESC, id DESC
+                """
+            )
+            ids = [
+                row["id"]
+                for row in cursor.fetchall() or []
+                if row["photo_variants"] is None or _stale_claim(row["photo_variants"])
+            ]
+        conn.commit()
+        for student_id in ids:
+            self.submit(student_id)
+        return len(ids)
+
+    def _run(self):
+        try:
+            queued = self.backfill()
+            if queued:
+                logger.info(f"Queued {queued} student(s) for registration photo processing")
+        except Exception as e:
+            logger.warning(f"Registration photo backfill failed: {e}")
+        while True:
+            student_id = self._queue.get()
+            try:
+                self.process_student(student_id)
+            except Exception as e:
+                logger.error(f"Registration photo processing failed for student {student_id}: {e}")
+                try:
+                    from utils.db_conn import get_db_connection
+
+                    get_db_connection().rollback()
+                except Exception:
+                    pass
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="registration-photos", daemon=True
+            )
+            self._thread.start()
+
+
+_pipeline = None
+
+
+def submit(student_id) -> None:
+    """Queue a student's registration photos; no-op when the pipeline is off."""
+    if _pipeline is not None:
+        _pipeline.submit(student_id)
+
+
+def init_image_pipeline(root_path: str, media_dir: str):
+    """Start the background worker. Called from app.py."""
+    global _pipeline
+    if not HAS_PIL:
+        logger.warning("Pillow is not installed; registration photos are served as uploaded")
+        return None
+    if _pipeline is None:
+        _pipeline = ImagePipeline(root_path, media_dir)
+        _pipeline.start()
+    return _pipeline
@@ -3,12 +3,15 @@ import hashlib
 from datetime import datetime
 from flask import request, session
 from flask_socketio import emit, join_room, leave_room, SocketIO
+from utils.analytics_rollups import mark_dirty
+from utils import class_summaries, class_versions, student_dashboard
 from utils.db_conn import get_db_connection
 
 
 _socketio: SocketIO | None = None
 _logger = logging.getLogger(__name__)
 _ALLOWED_SOCKET_ROLES = {"admin", "instructor", "student"}
+_ADMIN_ROOM = "admins"
 
 
 def _get_socket_identity():
@@ -91,6 +94,8 @@ def register_socketio_handlers(socketio: SocketIO):
                 f"Rejected unauthenticated Socket.IO connection from {_get_socket_ip()}"
             )
             return False
+        if role == "admin":
+            join_room(_ADMIN_ROOM)
         emit("connected", {"message": "connected", "role": role, "user_id": user_id})
 
     @socketio.on("disconnect")
@@ -174,9 +179,22 @@ def register_socketio_handlers(socketio: SocketIO):
             _logger.error(f"Failed to broadcast grade_edit for class {class_id}: {e}")
 
 
+def invalidate_class_caches(class_id: int):
+    """Drop cached student dashboards and instructor class summaries that
+    include the class. Routes that change a class without a live update
+    (class edits, structure deletes) call this directly."""
+    student_dashboard.invalidate_class(class_id)
+    class_summaries.invalidate_class(class_id)
+
+
 def emit_live_version_update(class_id: int):
     """Emit the latest live version for a class to its room."""
     try:
+        # Callers invoke this right after a write; drop the micro-cached value so
+        # the broadcast (and any ETag computed from it) reflects the change.
+        invalidate_class_live_version(class_id)
+        mark_dirty(class_id)
+        invalidate_class_caches(class_id)
         version = get_cached_class_live_version(class_id)
         if _socketio is not None:
             _socketio.emit(
@@ -188,6 +206,33 @@ def emit_live_version_update(class_id: int):
         _logger.error(f"Failed to emit live version for class {class_id}: {str(e)}")
 
 
+def emit_admin_event(event: str, payload: dict):
+    """Send an event to every connected admin (background job progress)."""
+    try:
+        if _socketio is not None:
+            _socketio.emit(event, payload, room=_ADMIN_ROOM)
+    except Exception as e:
+        _logger.error(f"Failed to emit {event} to admins: {str(e)}")
+
+
+def emit_scores_flushed(class_id: int, seq: int):
+    """Tell grade-entry clients that buffered edits up to `seq` are saved."""
+    emit_live_version_update(class_id)
+    try:
+        if _socketio is not None:
+            _socketio.emit(
+                "scores_flushed",
+                {
+                    "class_id": class_id,
+                    "flushed_seq": seq,
+                    "version": get_cached_class_live_version(class_id),
+                },
+                room=f"class-{class_id}",
+            )
+    except Exception as e:
+        _logger.error(f"Failed to emit scores_flushed for class {class_id}: {str(e)}")
+
+
 # Simple in-memory cache for normalized structures, keyed by class_id + live version
 _NORMALIZED_CACHE = {}
 _NORMALIZED_CACHE_MAX = 200  # basic cap to prevent unbounded growth
@@ -240,9 +285,18 @@ def _grouped_cache_get(key: str):
 
 
 def compute_class_live_version(class_id: int) -> str:
-    """Compute the live version hash for a class, matching the API endpoint logic."""
+    """Compute the live version hash for a class, matching the API endpoint logic.
+
+    The class_versions counter catches every write made through the app,
+    including same-second edits that leave counts and timestamps unchanged.
+    The row fingerprints below still cover writes made outside it (scripts,
+    manual SQL) and databases without migration 0008; they use checksums of
+    the row contents rather than sums, which different edits can share.
+    """
     try:
         with get_db_connection().cursor() as cursor:
+            counter = class_versions.current(cursor, class_id)
+
             cursor.execute(
                 """
                 SELECT COALESCE(MAX(updated_at), '1970-01-01 00:00:00') AS max_updated,
@@ -266,7 +320,10 @@ def compute_class_live_version(class_id: int) -> str:
 
             cursor.execute(
                 """
-                SELECT COUNT(*) AS cnt, COALESCE(MAX(joined_at), '1970-01-01 00:00:00') AS max_joined
+                SELECT COUNT(*) AS cnt, COALESCE(MAX(joined_at), '1970-01-01 00:00:00') AS max_joined,
+                       COALESCE(SUM(status = 'approved'), 0) AS approved,
+                       COALESCE(SUM(is_dropped), 0) AS dropped,
+                       COALESCE(MAX(approved_at), '1970-01-01 00:00:00') AS max_approved
                 FROM student_classes
                 WHERE class_id = %s
                 """,
@@ -276,7 +333,8 @@ def compute_class_live_version(class_id: int) -> str:
 
             cursor.execute(
                 """
-                SELECT COUNT(*) AS cnt, COALESCE(MAX(ss.updated_at), '1970-01-01 00:00:00') AS max_score_updated
+                SELECT COUNT(*) AS cnt, COALESCE(MAX(ss.updated_at), '1970-01-01 00:00:00') AS max_score_updated,
+                       COALESCE(BIT_XOR(CRC32(CONCAT_WS(',', ss.id, ss.score))), 0) AS checksum
                 FROM student_scores ss
                 WHERE ss.student_id IN (
                     SELECT sc2.student_id FROM student_classes sc2 WHERE sc2.class_id = %s
@@ -298,15 +356,52 @@ def compute_class_live_version(class_id: int) -> str:
             )
             pi = cursor.fetchone() or {}
 
+            cursor.execute(
+                """
+                SELECT COUNT(*) AS cnt, COALESCE(MAX(updated_at), '1970-01-01 00:00:00') AS max_release_updated
+                FROM released_grades
+                WHERE class_id = %s
+                """,
+                (class_id,),
+            )
+            rg = cursor.fetchone() or {}
+
+            # grade_assessments has no updated_at; checksum names, max scores
+            # and subweights so edits to any of them change the version.
+            cursor.execute(
+                """
+                SELECT COUNT(ga.id) AS cnt, COALESCE(MAX(ga.id), 0) AS max_id,
+                       COALESCE(BIT_XOR(CRC32(CONCAT_WS(',', ga.id, ga.name, ga.max_score,
+                                                        gsc.id, gsc.name, gsc.weight))), 0) AS checksum
+                FROM grade_assessments ga
+                JOIN grade_subcategories gsc ON ga.subcategory_id = gsc.id
+                JOIN grade_categories gc ON gsc.category_id = gc.id
+                JOIN grade_structures gs4 ON gc.structure_id = gs4.id
+                WHERE gs4.class_id = %s
+                """,
+                (class_id,),
+            )
+            ga = cursor.fetchone() or {}
+
         parts = [
+            str(counter),
             str(gs.get("max_updated")),
             str(gs.get("max_version")),
             str(cls.get("class_updated")),
             str(sc.get("cnt")),
             str(sc.get("max_joined")),
+            str(sc.get("approved")),
+            str(sc.get("dropped")),
+            str(sc.get("max_approved")),
             str(ss.get("cnt")),
             str(ss.get("max_score_updated")),
+            str(ss.get("checksum")),
             str(pi.get("max_pi_updated")),
+            str(rg.get("cnt")),
+            str(rg.get("max_release_updated")),
+            str(ga.get("cnt")),
+            str(ga.get("max_id")),
+            str(ga.get("checksum")),
         ]
         payload = "|".join(parts)
         return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -333,3 +428,11 @@ def get_cached_class_live_version(class_id: int) -> str:
     except Exception as e:
         _logger.error(f"Live-version micro-cache error for class {class_id}: {str(e)}")
         return compute_class_live_version(class_id)
+
+
+def invalidate_class_live_version(class_id: int):
+    """Drop the micro-cached live version for a class after a write."""
+    try:
+        _LIVE_VERSION_CACHE.pop(int(class_id), None)
+    except Exception:
+        pass
@@ -0,0 +1,176 @@
+"""
+In-memory index of registered emails and school IDs for the registration
+availability probe (/api/check-registration-availability).
+
+The index keeps a 64-bit hash of every personal_info.email and
+users.school_id (case-folded, like the database collation) in two sets, so a
+miss - the common case while someone picks a new address - is answered
+without touching MySQL. A hit is confirmed with the indexed lookup the probe
+used to run, because hashes can collide and the entry may belong to a
+since-deleted account.
+
+Write paths in this process call add() / discard() after committing. Changes
+made by other workers are picked up by a full rebuild every
+MEMBERSHIP_INDEX_REFRESH seconds; until then the index may miss a value
+registered elsewhere, which the registration itself still rejects.
+
+Each client IP gets a small budget of confirmation queries
+(PROBE_CONFIRMATIONS per PROBE_WINDOW seconds); past it a hit is reported
+as taken without asking the database, so a burst of probes stays cheap.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+FIELDS = {
+    "email": ("personal_info", "email"),
+    "school_id": ("users", "school_id"),
+}
+PROBE_CONFIRMATIONS = 5
+PROBE_WINDOW = 10.0
+_MAX_CLIENTS = 4096
+
+
+def _key(value) -> int:
+    text = str(value or "").strip().lower()
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class MembershipIndex:
+    def __init__(self):
+        self._sets = None  # {field: set of hashes}; None until loaded
+        self._pending = None  # add/discard calls made while a load runs
+        self._lock = threading.Lock()
+        self._clients = OrderedDict()
+        self._clients_lock = threading.Lock()
+        self.loaded_at = None
+
+    @property
+    def ready(self) -> bool:
+        return self._sets is not None
+
+    def load(self, cursor) -> int:
+        """Rebuild both sets from the database. Returns entries loaded."""
+        with self._lock:
+            self._pending = []
+        try:
+            sets = {}
+            for field, (table, column) in FIELDS.items():
+                cursor.execute(f"SELECT {column} AS value FROM {table}")
+                sets[field] = {
+                    _key(row["value"]) for row in cursor.fetchall() or [] if row["value"]
+                }
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            # Writes committed while the SELECTs ran may be missing from them.
+            for op, field, key in self._pending:
+                getattr(sets[field], op)(key)
+            self._pending = None
+            self._sets = sets
+            self.loaded_at = time.time()
+        return sum(len(s) for s in sets.values())
+
+    def _apply(self, op, email, school_id):
+        with self._lock:
+            for field, value in (("email", email), ("school_id", school_id)):
+                if not value:
+                    continue
+                key = _key(value)
+                if self._pending is not None:
+                    self._pending.append((op, field, key))
+                if self._sets is not None:
+                    getattr(self._sets[field], op)(key)
+
+    def add(self, email=None, school_id=None) -> None:
+        self._apply("add", email, school_id)
+
+    def discard(self, email=None, school_id=None) -> None:
+        self._apply("discard", email, school_id)
+
+    def might_contain(self, field: str, value):
+        """False if `value` is certainly not registered, True if it may be,
+        None if the index is not loaded."""
+        with self._lock:
+            if self._sets is None:
+                return None
+            return _key(value) in self._sets[field]
+
+    def allow_confirmation(self, client: str) -> bool:
+        now = time.monotonic()
+        with self._clients_lock:
+            recent = self._clients.pop(client, None) or deque()
+            while recent and now - recent[0] > PROBE_WINDOW:
+                recent.popleft()
+            allowed = len(recent) < PROBE_CONFIRMATIONS
+            if allowed:
+                recent.append(now)
+            self._clients[client] = recent
+            while len(self._clients) > _MAX_CLIENTS:
+                self._clients.popitem(last=False)
+        return allowed
+
+    def is_registered(self, cursor, field: str, value, client: str = "") -> bool:
+        """Whether `value` is already used for `field` ("email" or "school_id")."""
+        table, column = FIELDS[field]
+        hit = self.might_contain(field, value)
+        if hit is False:
+            return False
+        if hit and not self.allow_confirmation(client):
+            return True
+        cursor.execute(f"SELECT id FROM {table} WHERE {column} = %s", (value,))
+        return cursor.fetchone() is not None
+
+
+_index = MembershipIndex()
+_refresher = None
+
+
+def get_index() -> MembershipIndex:
+    return _index
+
+
+def add(email=None, school_id=None) -> None:
+    _index.add(email=email, school_id=school_id)
+
+
+def discard(email=None, school_id=None) -> None:
+    _index.discard(email=email, school_id=school_id)
+
+
+def refresh() -> int:
+    from utils.db_conn import get_db_connection
+
+    conn = get_db_connection()
+    with conn.cursor() as cursor:
+        count = _index.load(cursor)
+    conn.commit()
+    return count
+
+
+def _run(interval):
+    while True:
+        try:
+            count = refresh()
+            logger.info(f"Registration membership index loaded ({count} entries)")
+        except Exception as e:
+            logger.warning(f"Could not load registration membership index: {e}")
+        time.sleep(interval)
+
+
+def init_membership_index(interval=300):
+    """Load the index and keep refreshing it in the background. Called from app.py."""
+    global _refresher
+    if _refresher is None:
+        _refresher = threading.Thread(
+            target=_run, args=(max(10, interval),), name="membership-index", daemon=True
+        )
+        _refresher.start()
+    return _index
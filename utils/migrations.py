@@ -0,0 +1,321 @@
+"""
+Versioned schema migrations.
+
+Migrations live in db/migrations/ and are applied in filename order:
+
+    0001_hot_path_indexes.py
+    0002_classes_join_code_norm.py
+    0003_something.sql
+
+A .sql file is a list of statements separated by ';'. A .py file defines
+upgrade(cursor) and should use ensure_index()/ensure_column() so it can be
+re-run safely (MySQL DDL auto-commits, so a migration that fails halfway is
+finished by running it again, not rolled back).
+
+Every applied migration is recorded in the schema_migrations ledger with a
+SHA-256 checksum of its file. Editing an already-applied migration is
+reported as drift and stops the runner; add a new migration instead.
+
+db/migrate.py is the command-line entry point.
+"""
+
+import hashlib
+import importlib.util
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "db", "migrations")
+)
+LEDGER_TABLE = "schema_migrations"
+
+_FILENAME_RE = re.compile(r"^(\d{4,})_([A-Za-z0-9_]+)\.(sql|py)$")
+_IDENTIFIER_RE = re.compile(r"^[A-Za-z0-9_]+$")
+
+
+class MigrationError(Exception):
+    """Raised when the ledger and the migration files disagree."""
+
+
+class Migration:
+    def __init__(self, version: str, name: str, path: str):
+        self.version = version
+        self.name = name
+        self.path = path
+        self.kind = os.path.splitext(path)[1].lstrip(".")
+
+    @property
+    def checksum(self) -> str:
+        return file_checksum(self.path)
+
+    def __repr__(self):
+        return f"<Migration {self.version}_{self.name}.{self.kind}>"
+
+
+def file_checksum(path: str) -> str:
+    """SHA-256 of a migration file with line endings normalized (Windows checkouts)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    return hashlib.sha256(data.replace(b"\r\n", b"\n")).hexdigest()
+
+
+def discover_migrations(directory: str = MIGRATIONS_DIR) -> list:
+    """Return Migration objects for db/migrations, sorted by version."""
+    migrations = []
+    seen = {}
+    if not os.path.isdir(directory):
+        return migrations
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME_RE.match(filename)
+        if not match:
+            continue
+        version, name, _ = match.groups()
+        if version in seen:
+            raise MigrationError(
+                f"Duplicate migration version {version}: {seen[version]} and {filename}"
+            )
+        seen[version] = filename
+        migrations.append(Migration(version, name, os.path.join(directory, filename)))
+    return migrations
+
+
+def split_sql_statements(sql: str) -> list:
+    """Split a SQL script on ';', ignoring semicolons in quotes and comments."""
+    statements = []
+    current = []
+    i = 0
+    n = len(sql)
+    quote = None
+    while i < n:
+        ch = sql[i]
+        if quote:
+            current.append(ch)
+            if ch == "\\" and quote != "`" and i + 1 < n:
+                current.append(sql[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+        if ch in ("'", '"', "`"):
+            quote = ch
+            current.append(ch)
+            i += 1
+            continue
+        if sql.startswith("--", i) or ch == "#":
+            end = sql.find("\n", i)
+            i = n if end == -1 else end + 1
+            current.append("\n")
+            continue
+        if sql.startswith("/*", i) and not sql.startswith("/*!", i):
+            end = sql.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if ch == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+            i += 1
+            continue
+        current.append(ch)
+        i += 1
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+
+def _quote_identifier(name: str) -> str:
+    if not _IDENTIFIER_RE.match(name or ""):
+        raise ValueError(f"Unsafe SQL identifier: {name!r}")
+    return f"`{name}`"
+
+
+def _count(row) -> int:
+    if isinstance(row, dict):
+        return int(next(iter(row.values())) or 0)
+    return int(row[0] or 0) if row else 0
+
+
+def table_exists(cursor, table: str) -> bool:
+    cursor.execute(
+        """
+        SELECT COUNT(*) AS cnt FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table,),
+    )
+    return _count(cursor.fetchone()) > 0
+
+
+def column_exists(cursor, table: str, column: str) -> bool:
+    cursor.execute(
+        """
+        SELECT COUNT(*) AS cnt FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        (table, column),
+    )
+    return _count(cursor.fetchone()) > 0
+
+
+def index_exists(cursor, table: str, index_name: str) -> bool:
+    cursor.execute(
+        """
+        SELECT COUNT(*) AS cnt FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+        """,
+        (table, index_name),
+    )
+    return _count(cursor.fetchone()) > 0
+
+
+def ensure_column(cursor, table: str, column: str, definition: str) -> bool:
+    """Add `column` to `table` unless it already exists. Returns True if added."""
+    if not table_exists(cursor, table):
+        logger.warning(f"Skipping column {table}.{column}: table does not exist")
+        return False
+    if column_exists(cursor, table, column):
+        return False
+    cursor.execute(
+        f"ALTER TABLE {_quote_identifier(table)} "
+        f"ADD COLUMN {_quote_identifier(column)} {definition}"
+    )
+    logger.info(f"Added column {table}.{column}")
+    return True
+
+
+def ensure_index(cursor, table: str, index_name: str, columns, unique: bool = False) -> bool:
+    """Create an index unless one with the same name exists. Returns True if created."""
+    if not table_exists(cursor, table):
+        logger.warning(f"Skipping index {table}.{index_name}: table does not exist")
+        return False
+    if index_exists(cursor, table, index_name):
+        return False
+    cols = ", ".join(_quote_identifier(c) for c in columns)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    cursor.execute(
+        f"ALTER TABLE {_quote_identifier(table)} ADD {kind} {_quote_identifier(index_name)} ({cols})"
+    )
+    logger.info(f"Created index {table}.{index_name} ({cols})")
+    return True
+
+
+def ensure_ledger(cursor):
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS `{LEDGER_TABLE}` (
+            `version` varchar(32) NOT NULL,
+            `name` varchar(255) NOT NULL,
+            `checksum` char(64) NOT NULL,
+            `applied_at` datetime NOT NULL DEFAULT current_timestamp(),
+            `execution_ms` int(11) NOT NULL DEFAULT 0,
+            PRIMARY KEY (`version`)
+        ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4
+        """
+    )
+
+
+def applied_migrations(cursor) -> dict:
+    """Map version -> ledger row for every applied migration."""
+    cursor.execute(
+        f"SELECT version, name, checksum, applied_at, execution_ms FROM `{LEDGER_TABLE}`"
+    )
+    rows = cursor.fetchall() or []
+    return {str(r["version"]): r for r in rows}
+
+
+def migration_status(cursor, migrations=None) -> list:
+    """Return (migration, state) pairs; state is applied, pending or changed."""
+    migrations = discover_migrations() if migrations is None else migrations
+    applied = applied_migrations(cursor)
+    status = []
+    for m in migrations:
+        row = applied.get(m.version)
+        if row is None:
+            state = "pending"
+        elif row["checksum"] != m.checksum:
+            state = "changed"
+        else:
+            state = "applied"
+        status.append((m, state))
+    return status
+
+
+def _load_python_migration(migration: Migration):
+    spec = importlib.util.spec_from_file_location(
+        f"eclass_migration_{migration.version}", migration.path
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not callable(getattr(module, "upgrade", None)):
+        raise MigrationError(f"{migration.path} does not define upgrade(cursor)")
+    return module
+
+
+def apply_migration(conn, migration: Migration):
+    """Run one migration and record it in the ledger."""
+    started = time.perf_counter()
+    with conn.cursor() as cursor:
+        if migration.kind == "py":
+            _load_python_migration(migration).upgrade(cursor)
+        else:
+            with open(migration.path, "r", encoding="utf-8") as f:
+                for statement in split_sql_statements(f.read()):
+                    cursor.execute(statement)
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        cursor.execute(
+            f"""
+            INSERT INTO `{LEDGER_TABLE}` (version, name, checksum, execution_ms)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE name = VALUES(name), checksum = VALUES(checksum),
+                applied_at = NOW(), execution_ms = VALUES(execution_ms)
+            """,
+            (migration.version, migration.name, migration.checksum, elapsed_ms),
+        )
+    conn.commit()
+    return elapsed_ms
+
+
+def run_migrations(conn, target: str = None, dry_run: bool = False, allow_changed: bool = False) -> list:
+    """Apply pending migrations up to `target` (inclusive). Returns those applied.
+
+    Raises MigrationError if an applied migration's file has changed, unless
+    allow_changed is set.
+    """
+    with conn.cursor() as cursor:
+        ensure_ledger(cursor)
+        status = migration_status(cursor)
+    conn.commit()
+
+    changed = [m for m, state in status if state == "changed"]
+    if changed and not allow_changed:
+        names = ", ".join(os.path.basename(m.path) for m in changed)
+        raise MigrationError(
+            f"Applied migrations were modified after being run: {names}. "
+            "Restore them and add a new migration instead."
+        )
+
+    pending = [
+        m for m, state in status
+        if state == "pending" and (target is None or m.version <= target)
+    ]
+    if dry_run:
+        return pending
+
+    applied = []
+    for m in pending:
+        logger.info(f"Applying migration {m.version}_{m.name}")
+        try:
+            apply_migration(conn, m)
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(m)
+    return applied
@@ -0,0 +1,90 @@
+"""
+Keyset (seek) pagination helpers for list endpoints.
+
+A page is requested with ?limit=N and continued with the opaque ?cursor=
+token returned as `next_cursor`. The cursor holds the sort-key values of the
+last row served, and the next page starts with a WHERE condition on those
+values instead of an OFFSET, so every page costs the same however deep it is.
+Every sort ends with the table's primary key to make the order total.
+"""
+
+import base64
+import json
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class Sort:
+    """A named ordering: SQL expressions, the row keys holding their values,
+    and the direction (all expressions share one direction)."""
+
+    def __init__(self, exprs, keys, descending=False):
+        self.exprs = list(exprs)
+        self.keys = list(keys)
+        self.descending = descending
+
+    def order_by(self) -> str:
+        direction = "DESC" if self.descending else "ASC"
+        return ", ".join(f"{expr} {direction}" for expr in self.exprs)
+
+    def values(self, row) -> list:
+        return [_plain(row.get(key)) for key in self.keys]
+
+    def after(self, values):
+        """(sql, params) selecting rows strictly after `values` in this order."""
+        if len(values) != len(self.exprs):
+            raise ValueError("cursor does not match the sort order")
+        op = "<" if self.descending else ">"
+        clauses = []
+        params = []
+        for i, expr in enumerate(self.exprs):
+            parts = [f"{e} = %s" for e in self.exprs[:i]] + [f"{expr} {op} %s"]
+            clauses.append("(" + " AND ".join(parts) + ")")
+            params.extend(values[: i + 1])
+        return "(" + " OR ".join(clauses) + ")", params
+
+
+def _plain(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat(sep=" ") if hasattr(value, "hour") else value.isoformat()
+    return value
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> list:
+    """Values from a cursor token; raises ValueError if it is malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("invalid cursor")
+    if not isinstance(values, list):
+        raise ValueError("invalid cursor")
+    return values
+
+
+def parse_limit(raw, default=DEFAULT_LIMIT, maximum=MAX_LIMIT) -> int:
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def like_prefix(text: str) -> str:
+    """LIKE pattern matching values that start with `text`."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def page(rows: list, limit: int, sort: Sort):
+    """Split a fetch of limit + 1 rows into (page rows, next cursor or None)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(sort.values(rows[-1]))
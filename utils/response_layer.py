@@ -0,0 +1,201 @@
+"""
+Response layer: fast JSON serialization and negotiated compression.
+
+- OrjsonProvider is an optional drop-in for Flask's JSON provider. It keeps the
+  output contract of the stdlib provider (sorted keys, RFC 822 dates, Decimal as
+  string) so existing front-end code keeps working, but encodes PyMySQL rows
+  several times faster.
+- compress_response() gzip/brotli-encodes large textual responses according to
+  the client's Accept-Encoding header.
+
+Both are wired up by init_response_layer(app).
+"""
+
+import decimal
+import gzip
+import logging
+import uuid
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, timedelta
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+
+    _have_orjson = True
+except Exception:
+    orjson = None
+    _have_orjson = False
+
+try:
+    import brotli
+
+    _have_brotli = True
+except Exception:
+    brotli = None
+    _have_brotli = False
+
+logger = logging.getLogger(__name__)
+
+# Only these types are worth compressing; images, fonts, archives and PDFs
+# are already compressed and would only burn CPU.
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "image/svg+xml",
+}
+
+
+def _json_default(o):
+    """Mirror flask.json.provider._default, plus timedelta from MySQL TIME columns."""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if isinstance(o, timedelta):
+        return str(o)
+    if is_dataclass(o) and not isinstance(o, type):
+        return asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, falling back to the stdlib encoder."""
+
+    def _orjson_options(self, indent: bool = False) -> int:
+        # Datetimes go through _json_default so they keep the RFC 822 format
+        # the stdlib provider produced.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        return orjson.dumps(
+            obj, default=_json_default, option=self._orjson_options(indent)
+        )
+
+    def dumps(self, obj, **kwargs) -> str:
+        # Callers passing stdlib-specific options (cls, custom separators, ...)
+        # get the stdlib encoder so behaviour stays identical.
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._dumps_bytes(obj).decode("utf-8")
+        except TypeError:
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            return super().loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._dumps_bytes(obj, indent=indent) + b"\n"
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def _negotiate_encoding(accept_encoding) -> str | None:
+    """Pick the best supported content-coding from an Accept-Encoding header."""
+    if _have_brotli and accept_encoding["br"] > 0:
+        return "br"
+    if accept_encoding["gzip"] > 0:
+        return "gzip"
+    return None
+
+
+def compress_response(response, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5):
+    """Compress a response in place if the client and payload allow it."""
+    try:
+        if request.method == "HEAD" or response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        if response.direct_passthrough or response.is_streamed:
+            return response
+        if "Content-Encoding" in response.headers:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        encoding = _negotiate_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=brotli_quality)
+        else:
+            compressed = gzip.compress(data, compresslevel=gzip_level)
+
+        if len(compressed) >= len(data):
+            return response
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        response.headers["Content-Length"] = str(len(compressed))
+
+        # A strong validator must change with the byte representation.
+        etag, is_weak = response.get_etag()
+        if etag and not is_weak:
+            response.set_etag(etag, weak=True)
+    except Exception as e:
+        logger.warning(f"Response compression skipped: {e}")
+    return response
+
+
+def init_response_layer(app):
+    """Install the fast JSON provider and the compression hook on `app`.
+
+    Reads RESPONSE_FAST_JSON, RESPONSE_COMPRESSION, COMPRESS_MIN_SIZE,
+    COMPRESS_GZIP_LEVEL and COMPRESS_BROTLI_QUALITY from app.config.
+    """
+    if app.config.get("RESPONSE_FAST_JSON", True):
+        if _have_orjson:
+            app.json = OrjsonProvider(app)
+            logger.info("orjson JSON provider enabled")
+        else:
+            logger.info("orjson not installed; using the stdlib JSON provider")
+
+    if not app.config.get("RESPONSE_COMPRESSION", True):
+        return
+
+    min_size = int(app.config.get("COMPRESS_MIN_SIZE", 1024))
+    gzip_level = int(app.config.get("COMPRESS_GZIP_LEVEL", 6))
+    brotli_quality = int(app.config.get("COMPRESS_BROTLI_QUALITY", 5))
+
+    @app.after_request
+    def _compress_after_request(response):
+        return compress_response(
+            response,
+            min_size=min_size,
+            gzip_level=gzip_level,
+            brotli_quality=brotli_quality,
+        )
+
+    logger.info(
+        f"Response compression enabled (gzip{', br' if _have_brotli else ''}, min {min_size} bytes)"
+    )
@@ -0,0 +1,429 @@
+"""
+Bulk student / instructor import from CSV or XLSX rosters.
+
+The admin uploads a roster to POST /api/admin/imports/<students|instructors>.
+The file is parsed in the request (XLSX through openpyxl in read_only mode),
+then a background job:
+
+1. validates every row in one pass: fields are normalized column by column,
+   duplicates inside the file are found with a counter, and school IDs /
+   emails already in the database are looked up with one IN query per chunk
+   instead of one SELECT per row;
+2. works through the valid rows in chunks of ROSTER_IMPORT_CHUNK, hashing the
+   chunk's passwords across a process pool (generate_password_hash is
+   deliberately slow) and inserting personal_info, users and the profile rows
+   with multi-row INSERTs, one transaction per chunk.
+
+Progress and per-row errors are polled from GET /api/admin/imports/<job_id>
+(see utils/admin_jobs.py).
+"""
+
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from werkzeug.security import generate_password_hash
+
+from utils import admin_jobs, membership_index
+from utils.auth_utils import validate_password_policy
+
+logger = logging.getLogger(__name__)
+
+MAX_ROWS = 20000
+DEFAULT_CHUNK = 500
+_LOOKUP_CHUNK = 1000
+_EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]+$")
+_YEAR_LEVELS = {"1st": 1, "2nd": 2, "3rd": 3, "4th": 4}
+
+REQUIRED = {
+    "student": (
+        "school_id",
+        "first_name",
+        "last_name",
+        "email",
+        "password",
+        "course",
+        "year_level",
+        "section",
+    ),
+    "instructor": (
+        "school_id",
+        "first_name",
+        "last_name",
+        "email",
+        "password",
+        "department",
+    ),
+}
+OPTIONAL = {
+    "student": ("middle_name", "track"),
+    "instructor": ("middle_name", "specialization", "employee_id", "phone"),
+}
+
+
+class RosterError(ValueError):
+    """The uploaded file cannot be read as a roster."""
+
+
+# --- parsing -----------------------------------------------------------------
+
+
+def _column(header) -> str:
+    """'School ID', 'schoolId' and 'school-id' all become 'school_id'."""
+    text = re.sub(r"(?<=[a-z0-9])(?=[A-Z])", "_", str(header or "").strip())
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _records(header, rows):
+    columns = [_column(h) for h in header]
+    records = []
+    for line, values in enumerate(rows, start=2):
+        values = list(values or [])
+        if not any(_text(v) for v in values):
+            continue
+        if len(records) >= MAX_ROWS:
+            raise RosterError(f"Roster has more than {MAX_ROWS} rows")
+        record = {"row": line}
+        for column, value in zip(columns, values):
+            if column:
+                record[column] = _text(value)
+        records.append(record)
+    return records
+
+
+def read_roster(stream, filename: str) -> list:
+    """Rows of a .csv or .xlsx roster as dicts keyed by normalized header,
+    each with its spreadsheet line number under "row"."""
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        try:
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(stream, read_only=True, data_only=True)
+        except Exception as e:
+            raise RosterError(f"Could not read workbook: {e}")
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header:
+                raise RosterError("Roster is empty")
+            return _records(header, rows)
+        finally:
+            workbook.close()
+    if name.endswith(".csv"):
+        raw = stream.read()
+        try:
+            text = raw.decode("utf-8-sig") if isinstance(raw, bytes) else raw
+        except UnicodeDecodeError:
+            raise RosterError("CSV files must be UTF-8 encoded")
+        rows = csv.reader(io.StringIO(text))
+        header = next(rows, None)
+        if not header:
+            raise RosterError("Roster is empty")
+        return _records(header, rows)
+    raise RosterError("Upload a .csv or .xlsx file")
+
+
+# --- validation ----------------------------------------------------------------
+
+
+def _existing(cursor, sql, values) -> set:
+    found = set()
+    values = sorted(values)
+    for start in range(0, len(values), _LOOKUP_CHUNK):
+        chunk = values[start : start + _LOOKUP_CHUNK]
+        cursor.execute(sql.format(",".join(["%s"] * len(chunk))), chunk)
+        found.update(str(v).lower() for row in cursor.fetchall() or [] for v in row.values())
+    return found
+
+
+def _normalize(role, records):
+    for record in records:
+        for column in REQUIRED[role] + OPTIONAL[role]:
+            record[column] = record.get(column, "")
+        record["email"] = record["email"].lower()
+        if role == "student":
+            record["course"] = record["course"].upper()
+            record["section"] = record["section"].upper()
+            level = record["year_level"].lower()
+            if level in _YEAR_LEVELS:
+                record["year_level"] = _YEAR_LEVELS[level]
+            elif level.isdigit():
+                record["year_level"] = int(level)
+        else:
+            record["school_id"] = record["school_id"].upper()
+
+
+def validate_roster(cursor, role: str, records: list):
+    """Split normalized records into (valid, errors).
+
+    `errors` holds {"row", "school_id", "errors"} for every rejected line.
+    """
+    if role not in REQUIRED:
+        raise ValueError(f"Unknown roster role: {role}")
+    _normalize(role, records)
+
+    school_ids = Counter(r["school_id"].lower() for r in records if r["school_id"])
+    emails = Counter(r["email"] for r in records if r["email"])
+    employee_ids = Counter(r["employee_id"].lower() for r in records if r.get("employee_id"))
+
+    taken_ids = _existing(
+        cursor, "SELECT school_id FROM users WHERE school_id IN ({})", school_ids
+    )
+    taken_emails = _existing(
+        cursor, "SELECT email FROM personal_info WHERE email IN ({})", emails
+    )
+    taken_employee_ids = set()
+    if employee_ids:
+        taken_employee_ids = _existing(
+            cursor,
+            "SELECT employee_id FROM instructors WHERE employee_id IN ({})",
+            employee_ids,
+        )
+
+    valid = []
+    errors = []
+    for record in records:
+        problems = [
+            f"{column.replace('_', ' ').capitalize()} is required"
+            for column in REQUIRED[role]
+            if record[column] in ("", None)
+        ]
+        school_id = record["school_id"]
+        email = record["email"]
+        if email and not _EMAIL_RE.match(email):
+            problems.append("Please enter a valid email address")
+        if role == "student":
+            if record["year_level"] != "" and not isinstance(record["year_level"], int):
+                problems.append("Year level must be 1st-4th or a number")
+        else:
+            if school_id and not re.fullmatch(r"INS-\d{3}", school_id):
+                problems.append("School ID must use INS-$$$ format (example: INS-001)")
+            employee_id = record["employee_id"].lower()
+            if employee_id in taken_employee_ids:
+                problems.append("Employee ID already exists")
+            elif employee_id and employee_ids[employee_id] > 1:
+                problems.append("Employee ID appears more than once in the file")
+        if school_id.lower() in taken_ids:
+            problems.append("School ID already exists")
+        elif school_id and school_ids[school_id.lower()] > 1:
+            problems.append("School ID appears more than once in the file")
+        if email in taken_emails:
+            problems.append("Email already exists")
+        elif email and emails[email] > 1:
+            problems.append("Email appears more than once in the file")
+        if record["password"]:
+            problems.extend(
+                validate_password_policy(record["password"], school_id=school_id, email=email)
+            )
+
+        if problems:
+            errors.append({"row": record["row"], "school_id": school_id, "errors": problems})
+        else:
+            valid.append(record)
+    return valid, errors
+
+
+# --- hashing and inserts -------------------------------------------------------
+
+
+def default_workers() -> int:
+    return max(1, min(8, os.cpu_count() or 1))
+
+
+def open_hash_pool(workers: int):
+    """A process pool for password hashing, or None to hash in-process.
+
+    Uses the spawn start method: forking a threaded web worker is unsafe.
+    """
+    if workers <= 1:
+        return None
+    try:
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    except Exception as e:
+        logger.warning(f"Could not start password hashing pool, hashing in-process: {e}")
+        return None
+
+
+def hash_passwords(passwords, pool=None) -> list:
+    passwords = list(passwords)
+    if pool is None or len(passwords) < 4:
+        return [generate_password_hash(p) for p in passwords]
+    workers = getattr(pool, "_max_workers", 1) or 1
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(pool.map(generate_password_hash, passwords, chunksize=chunksize))
+
+
+def _ids_by(cursor, table, column, keys) -> dict:
+    cursor.execute(
+        f"SELECT id, {column} FROM {table} WHERE {column} IN ({','.join(['%s'] * len(keys))})",
+        list(keys),
+    )
+    return {str(row[column]).lower(): row["id"] for row in cursor.fetchall() or []}
+
+
+def insert_chunk(cursor, role: str, records: list, hashes: list, approved_by=None) -> None:
+    """Create accounts for validated `records` with multi-row INSERTs.
+
+    Generated ids are read back through the unique email / school_id columns,
+    so the inserts do not rely on consecutive auto-increment values. PyMySQL
+    only folds executemany() into one multi-row INSERT when VALUES holds
+    nothing but placeholders, so constants are passed as parameters too.
+    """
+    phone = role == "instructor"
+    cursor.executemany(
+        "INSERT INTO personal_info (first_name, last_name, middle_name, email, phone) "
+        "VALUES (%s, %s, %s, %s, %s)",
+        [
+            (
+                r["first_name"],
+                r["last_name"],
+                r["middle_name"] or None,
+                r["email"],
+                (r["phone"] or None) if phone else None,
+            )
+            for r in records
+        ],
+    )
+    personal_ids = _ids_by(cursor, "personal_info", "email", [r["email"] for r in records])
+
+    cursor.executemany(
+        "INSERT INTO users (school_id, password_hash, role, account_status) "
+        "VALUES (%s, %s, %s, %s)",
+        [(r["school_id"], h, role, "active") for r, h in zip(records, hashes)],
+    )
+    user_ids = _ids_by(cursor, "users", "school_id", [r["school_id"] for r in records])
+
+    if role == "student":
+        approved_at = datetime.now()
+        cursor.executemany(
+            """INSERT INTO students
+            (user_id, personal_info_id, course, track, year_level, section, approval_status, approved_by, approved_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+            [
+                (
+                    user_ids[r["school_id"].lower()],
+                    personal_ids[r["email"]],
+                    r["course"],
+                    r["track"] or None,
+                    r["year_level"],
+                    r["section"],
+                    "approved",
+                    approved_by,
+                    approved_at,
+                )
+                for r in records
+            ],
+        )
+    else:
+        cursor.executemany(
+            """INSERT INTO instructors
+            (user_id, personal_info_id, department, specialization, employee_id)
+            VALUES (%s, %s, %s, %s, %s)""",
+            [
+                (
+                    user_ids[r["school_id"].lower()],
+                    personal_ids[r["email"]],
+                    r["department"],
+                    r["specialization"] or None,
+                    r["employee_id"] or None,
+                )
+                for r in records
+            ],
+        )
+
+
+# --- jobs ----------------------------------------------------------------------
+
+
+class ImportJob(admin_jobs.Job):
+    kind = "roster_import"
+
+    def __init__(self, role, records, approved_by=None, admin=None, chunk_size=DEFAULT_CHUNK, workers=None):
+        super().__init__(total=len(records), admin=admin)
+        self.role = role
+        self.records = records
+        self.approved_by = approved_by
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.created = 0
+
+    def to_dict(self, errors=True) -> dict:
+        data = super().to_dict(errors)
+        data.update(role=self.role, created=self.created)
+        return data
+
+    def execute(self, conn):
+        self.status = "validating"
+        with conn.cursor() as cursor:
+            valid, self.errors = validate_roster(cursor, self.role, self.records)
+        conn.commit()
+        self.records = None
+        self.processed = self.total - len(valid)
+        self.status = "importing"
+        self.progress()
+        pool = open_hash_pool(self.workers or default_workers())
+        try:
+            for start in range(0, len(valid), self.chunk_size):
+                chunk = valid[start : start + self.chunk_size]
+                try:
+                    hashes = hash_passwords((r["password"] for r in chunk), pool)
+                    with conn.cursor() as cursor:
+                        insert_chunk(cursor, self.role, chunk, hashes, self.approved_by)
+                    conn.commit()
+                    for r in chunk:
+                        membership_index.add(email=r["email"], school_id=r["school_id"])
+                    self.created += len(chunk)
+                except Exception as e:
+                    conn.rollback()
+                    logger.error(f"Roster import {self.id} chunk at row {chunk[0]['row']} failed: {e}")
+                    self.errors.extend(
+                        {
+                            "row": r["row"],
+                            "school_id": r["school_id"],
+                            "errors": [f"Not imported: {e}"],
+                        }
+                        for r in chunk
+                    )
+                self.processed += len(chunk)
+                self.progress()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.errors.sort(key=lambda e: e["row"])
+        logger.info(
+            f"Admin {self.admin} imported {self.created} {self.role}(s), {len(self.errors)} row(s) rejected"
+        )
+
+
+def start_import(role, records, approved_by=None, admin=None, chunk_size=DEFAULT_CHUNK, workers=None):
+    return admin_jobs.start(
+        ImportJob(
+            role,
+            records,
+            approved_by=approved_by,
+            admin=admin,
+            chunk_size=chunk_size,
+            workers=workers,
+        )
+    )
+
+
+def get_job(job_id):
+    return admin_jobs.get(job_id, kind=ImportJob.kind)
@@ -0,0 +1,354 @@
+"""
+Write-behind buffer for grade-entry score edits (optional, SCORE_WRITE_BEHIND).
+
+/scores POST normally writes every edit to student_scores and bumps the class
+live version. With the buffer enabled, validated edits are appended to a
+local journal (fsync'd before the request is acknowledged) and held in memory
+per class, where repeated writes to the same (student, assessment) cell
+collapse into one. A background thread writes each class in one batch every
+SCORE_FLUSH_INTERVAL_MS, or sooner once SCORE_FLUSH_MAX_BATCH cells are
+waiting. A POST with "flush": true, a GET of the class's scores and a
+snapshot save flush the class synchronously first.
+
+Acknowledgements carry two per-class sequence numbers: `seq` (the batch of
+edits just accepted) and `flushed_seq` (every batch up to it is in the
+database). After each flush the class room receives `scores_flushed` with the
+flushed seq and the new live version.
+
+The buffer is flushed at interpreter exit; after a crash, edits left in the
+journal are replayed on the next start. The journal belongs to one process,
+so enable the buffer on single-worker deployments (or give each worker its
+own SCORE_JOURNAL_PATH).
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = ".score_journal.jsonl"
+_WRITE_CHUNK = 500
+
+
+def write_scores(class_id: int, entries):
+    """Write (student_id, assessment_id, score) cells in one transaction.
+
+    Same semantics as the synchronous /scores POST: existing rows for a cell
+    are updated, missing ones inserted. Returns the class_versions counter
+    the write produced.
+    """
+    from utils import class_versions
+    from utils.db_conn import get_db_connection
+
+    entries = list(entries)
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            for start in range(0, len(entries), _WRITE_CHUNK):
+                chunk = entries[start : start + _WRITE_CHUNK]
+                placeholders = ",".join(["(%s, %s)"] * len(chunk))
+                cursor.execute(
+                    f"""
+                    SELECT DISTINCT student_id, assessment_id
+                    FROM student_scores
+                    WHERE (student_id, assessment_id) IN ({placeholders})
+                    """,
+                    [v for sid, aid, _ in chunk for v in (sid, aid)],
+                )
+                existing = {
+                    (int(r["student_id"]), int(r["assessment_id"]))
+                    for r in cursor.fetchall() or []
+                }
+                updates = [(score, sid, aid) for sid, aid, score in chunk if (sid, aid) in existing]
+                inserts = [(aid, sid, score) for sid, aid, score in chunk if (sid, aid) not in existing]
+                if updates:
+                    cursor.executemany(
+                        "UPDATE student_scores SET score = %s WHERE student_id = %s AND assessment_id = %s",
+                        updates,
+                    )
+                if inserts:
+                    cursor.executemany(
+                        "INSERT INTO student_scores (assessment_id, student_id, score) VALUES (%s, %s, %s)",
+                        inserts,
+                    )
+            version = class_versions.bump(cursor, class_id)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return version
+
+
+def notify_flushed(class_id: int, seq: int, entries, version=None) -> None:
+    """Post-flush hook: update the grade store and tell the class room.
+    `version` is the class_versions counter returned by the writer."""
+    from utils import grade_store
+    from utils.live import emit_scores_flushed
+
+    try:
+        grade_store.apply_scores(class_id, entries, version)
+    except Exception as e:
+        logger.warning(f"Grade store update failed for class {class_id}: {e}")
+        grade_store.invalidate(class_id)
+    emit_scores_flushed(class_id, seq)
+
+
+class _ClassBuffer:
+    __slots__ = ("cells", "seq", "flushed_seq", "since", "inflight", "flush_lock")
+
+    def __init__(self):
+        self.cells = {}  # (student_id, assessment_id) -> score
+        self.seq = 0
+        self.flushed_seq = 0
+        self.since = None  # monotonic time of the oldest unflushed edit
+        self.inflight = False  # cells taken by a flush that has not committed yet
+        self.flush_lock = threading.Lock()
+
+
+class ScoreBuffer:
+    """Per-class coalescing buffer with an fsync'd journal."""
+
+    def __init__(
+        self,
+        journal_path: str = DEFAULT_JOURNAL_PATH,
+        interval: float = 0.5,
+        max_batch: int = 500,
+        writer=write_scores,
+        on_flush=notify_flushed,
+    ):
+        self.journal_path = journal_path
+        self.interval = max(0.05, float(interval))
+        self.max_batch = max(1, int(max_batch))
+        self._writer = writer
+        self._on_flush = on_flush
+        self._classes = {}
+        self._lock = threading.Lock()
+        self._journal = None
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    # --- journal -----------------------------------------------------------
+
+    def _append(self, record: dict):
+        if self._journal is None:
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def _compact_if_idle(self):
+        # Called with self._lock held: once nothing is pending the journal
+        # holds no information, so start it over.
+        if self._journal is None or any(
+            b.cells or b.inflight for b in self._classes.values()
+        ):
+            return
+        self._journal.seek(0)
+        self._journal.truncate()
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    def unflushed_journal(self) -> dict:
+        """Read the journal: {class_id: [(sid, aid, score), ...]} not yet flushed."""
+        pending = {}
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash
+                    class_id = int(record["c"])
+                    if "f" in record:
+                        flushed = int(record["f"])
+                        cells = pending.get(class_id, {})
+                        for key in [k for k, (s, _) in cells.items() if s <= flushed]:
+                            del cells[key]
+                        continue
+                    cells = pending.setdefault(class_id, {})
+                    for sid, aid, score in record.get("e", []):
+                        cells[(int(sid), int(aid))] = (int(record["s"]), score)
+        except FileNotFoundError:
+            return {}
+        return {
+            cid: [(sid, aid, score) for (sid, aid), (_, score) in cells.items()]
+            for cid, cells in pending.items()
+            if cells
+        }
+
+    def replay(self) -> int:
+        """Write edits left in the journal by a previous run. Returns cells written."""
+        written = 0
+        for class_id, entries in self.unflushed_journal().items():
+            self._writer(class_id, entries)
+            written += len(entries)
+            logger.warning(
+                f"Replayed {len(entries)} buffered score(s) for class {class_id} from {self.journal_path}"
+            )
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "w", encoding="utf-8") as f:
+                f.flush()
+                os.fsync(f.fileno())
+        return written
+
+    # --- buffering ---------------------------------------------------------
+
+    def submit(self, class_id: int, entries) -> dict:
+        """Accept edits for a class; returns the acknowledgement."""
+        entries = [(int(sid), int(aid), score) for sid, aid, score in entries]
+        with self._lock:
+            buf = self._classes.setdefault(int(class_id), _ClassBuffer())
+            buf.seq += 1
+            self._append({"c": int(class_id), "s": buf.seq, "e": entries})
+            for sid, aid, score in entries:
+                buf.cells[(sid, aid)] = score
+            if buf.since is None:
+                buf.since = time.monotonic()
+            full = len(buf.cells) >= self.max_batch
+            ack = {"seq": buf.seq, "flushed_seq": buf.flushed_seq, "pending": len(buf.cells)}
+        if full:
+            self._wake.set()
+        return ack
+
+    def flush(self, class_id: int) -> int:
+        """Write a class's pending cells now. Returns its flushed seq."""
+        class_id = int(class_id)
+        with self._lock:
+            buf = self._classes.get(class_id)
+        if buf is None:
+            return 0
+
+        with buf.flush_lock:
+            with self._lock:
+                cells, seq = buf.cells, buf.seq
+                if not cells:
+                    return buf.flushed_seq
+                buf.cells, buf.since, buf.inflight = {}, None, True
+
+            entries = [(sid, aid, score) for (sid, aid), score in cells.items()]
+            try:
+                version = self._writer(class_id, entries)
+            except Exception:
+                with self._lock:
+                    # Edits accepted meanwhile are newer; keep them.
+                    cells.update(buf.cells)
+                    buf.cells = cells
+                    buf.since = buf.since or time.monotonic()
+                    buf.inflight = False
+                raise
+
+            with self._lock:
+                buf.flushed_seq = seq
+                buf.inflight = False
+                self._append({"c": class_id, "f": seq})
+                self._compact_if_idle()
+
+        try:
+            self._on_flush(class_id, seq, entries, version)
+        except Exception as e:
+            logger.error(f"Post-flush notification failed for class {class_id}: {e}")
+        return seq
+
+    def flush_all(self):
+        with self._lock:
+            class_ids = [cid for cid, b in self._classes.items() if b.cells]
+        for class_id in class_ids:
+            try:
+                self.flush(class_id)
+            except Exception as e:
+                logger.error(f"Failed to flush buffered scores for class {class_id}: {e}")
+
+    def status(self, class_id: int) -> dict:
+        with self._lock:
+            buf = self._classes.get(int(class_id))
+            if buf is None:
+                return {"seq": 0, "flushed_seq": 0, "pending": 0}
+            return {"seq": buf.seq, "flushed_seq": buf.flushed_seq, "pending": len(buf.cells)}
+
+    # --- background flusher ------------------------------------------------
+
+    def _due(self) -> list:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                cid
+                for cid, b in self._classes.items()
+                if b.cells
+                and (len(b.cells) >= self.max_batch or now - b.since >= self.interval)
+            ]
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            for class_id in self._due():
+                try:
+                    self.flush(class_id)
+                except Exception as e:
+                    logger.error(f"Failed to flush buffered scores for class {class_id}: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="score-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush_all()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+
+_buffer = None
+
+
+def init_score_buffer(journal_path=None, interval_ms=500, max_batch=500):
+    """Replay any leftover journal, then start buffering. Called from app.py."""
+    global _buffer
+    if _buffer is not None:
+        return _buffer
+    buffer = ScoreBuffer(
+        journal_path or DEFAULT_JOURNAL_PATH,
+        interval=interval_ms / 1000.0,
+        max_batch=max_batch,
+    )
+    try:
+        buffer.replay()
+    except Exception as e:
+        # Set the journal aside instead of truncating it later, so the edits
+        # can still be recovered by hand.
+        kept = f"{buffer.journal_path}.{int(time.time())}.unreplayed"
+        os.replace(buffer.journal_path, kept)
+        logger.error(f"Could not replay score journal (kept as {kept}): {e}")
+    buffer.start()
+    atexit.register(buffer.stop)
+    _buffer = buffer
+    logger.info(
+        f"Score write-behind enabled (flush every {interval_ms} ms, journal {buffer.journal_path})"
+    )
+    return buffer
+
+
+def get_score_buffer():
+    """The process-wide buffer, or None when write-behind is disabled."""
+    return _buffer
+
+
+def flush_class(class_id: int) -> int:
+    """Flush a class if buffering is on; a no-op otherwise."""
+    if _buffer is None:
+        return 0
+    return _buffer.flush(class_id)
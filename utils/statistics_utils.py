@@ -1,5 +1,3 @@
-import numpy as np
-from scipy.stats import linregress, skew, kurtosis, norm
 from utils.db_conn import get_db_connection
 
 
@@ -20,6 +18,9 @@ def get_class_scores(class_id):
 
 
 def get_class_advanced_stats(class_id):
+    import numpy as np
+    from scipy.stats import linregress
+
     rows = get_class_scores(class_id)
     scores = [row["score"] for row in rows if row["score"] is not None]
     student_ids = [row["student_id"] for row in rows if row["score"] is not None]
@@ -64,6 +65,9 @@ def get_class_advanced_stats(class_id):
 
 def calculate_performance_trends(class_id):
     """Calculate performance trends including skewness, kurtosis, and quartile analysis"""
+    import numpy as np
+    from scipy.stats import skew, kurtosis
+
     rows = get_class_scores(class_id)
     scores = [row["score"] for row in rows if row["score"] is not None]
 
@@ -114,6 +118,8 @@ def calculate_performance_trends(class_id):
 
 def calculate_assessment_difficulty_analysis(class_id):
     """Analyze assessment difficulty and student performance patterns"""
+    import numpy as np
+
     with get_db_connection().cursor() as cursor:
         # Get all assessments and their scores for this class
         cursor.execute(
@@ -218,6 +224,8 @@ def calculate_assessment_difficulty_analysis(class_id):
 
 def calculate_learning_progress_analysis(class_id):
     """Analyze student learning progress and predict future performance"""
+    import numpy as np
+
     rows = get_class_scores(class_id)
 
     if not rows or len(rows) < 5:
@@ -334,6 +342,8 @@ def get_comprehensive_class_analytics(class_id):
 
 def calculate_correlation_analysis(class_id):
     """Analyze correlations between different assessment types and performance factors"""
+    import numpy as np
+
     rows = get_class_scores(class_id)
 
     if not rows or len(rows) < 10:
@@ -452,6 +462,9 @@ def calculate_correlation_analysis(class_id):
 
 def calculate_grade_distribution_analysis(class_id):
     """Analyze grade distribution patterns and predict grade outcomes"""
+    import numpy as np
+    from scipy.stats import skew, norm
+
     rows = get_class_scores(class_id)
     scores = [row["score"] for row in rows if row["score"] is not None]
 
@@ -563,6 +576,8 @@ def calculate_grade_distribution_analysis(class_id):
 
 def calculate_risk_analysis(class_id):
     """Identify students at risk and predict intervention needs"""
+    import numpy as np
+
     rows = get_class_scores(class_id)
 
     if not rows or len(rows) < 3:
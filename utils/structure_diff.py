@@ -0,0 +1,355 @@
+"""
+Apply a grade builder structure as a diff against its normalized rows.
+
+Saving a structure used to delete every grade_categories/grade_subcategories
+row and insert them again, which cascaded to grade_assessments and dropped
+the student_scores recorded against them. Instead:
+
+    existing = load(cursor, structure_id)
+    plan = diff(existing, structure_obj)
+    apply(cursor, structure_id, plan)
+
+diff() matches categories by name and, within each, subcategories and
+assessments by explicit "id", then by name (case-insensitive). A rename
+needs the row's "id": an item left over in the same list position as an
+unmatched old one is "remove A, add B", and the pair is only reported under
+"rename_candidates" in the summary so the client can resend it with "id".
+Only rows that were added, removed, renamed, reweighted or moved are
+written, so untouched assessments keep their ids and scores.
+
+Assessments are only diffed for subcategories whose JSON carries a non-empty
+"assessments" list. The current builder sends empty lists and manages
+assessments from the grade entry page, so an empty or missing list leaves
+that subcategory's assessments alone.
+"""
+
+CATEGORY_ORDER = ("LECTURE", "LABORATORY")
+
+_DEFAULT_SUBCATEGORY_MAX_SCORE = 100.0
+_DEFAULT_ASSESSMENT_MAX_SCORE = 100.0
+
+
+def _float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _key(name) -> str:
+    return str(name or "").strip().lower()
+
+
+def load(cursor, structure_id: int) -> dict:
+    """{category name: category row with "subcategories" and their
+    "assessments"} for a structure."""
+    cursor.execute(
+        """
+        SELECT gc.id AS category_id, gc.name AS category, gc.weight AS category_weight,
+               gc.position AS category_position,
+               gsc.id AS subcategory_id, gsc.name AS subcategory,
+               gsc.weight AS subcategory_weight, gsc.position AS subcategory_position,
+               ga.id AS assessment_id, ga.name AS assessment, ga.max_score,
+               ga.position AS assessment_position
+        FROM grade_categories gc
+        LEFT JOIN grade_subcategories gsc ON gsc.category_id = gc.id
+        LEFT JOIN grade_assessments ga ON ga.subcategory_id = gsc.id
+        WHERE gc.structure_id = %s
+        ORDER BY gc.position, gc.id, gsc.position, gsc.id, ga.position, ga.id
+        """,
+        (structure_id,),
+    )
+    categories = {}
+    subcategories = {}
+    for row in cursor.fetchall() or []:
+        category = categories.get(row["category"])
+        if category is None:
+            category = categories[row["category"]] = {
+                "id": row["category_id"],
+                "name": row["category"],
+                "weight": _float(row["category_weight"]),
+                "position": row["category_position"],
+                "subcategories": [],
+            }
+        elif category["id"] != row["category_id"]:
+            # Duplicate category rows from older saves; diff() removes them.
+            category.setdefault("duplicates", set()).add(row["category_id"])
+            continue
+        if row["subcategory_id"] is None:
+            continue
+        sub = subcategories.get(row["subcategory_id"])
+        if sub is None:
+            sub = subcategories[row["subcategory_id"]] = {
+                "id": row["subcategory_id"],
+                "name": row["subcategory"],
+                "weight": _float(row["subcategory_weight"]),
+                "position": row["subcategory_position"],
+                "assessments": [],
+            }
+            category["subcategories"].append(sub)
+        if row["assessment_id"] is not None:
+            sub["assessments"].append(
+                {
+                    "id": row["assessment_id"],
+                    "name": row["assessment"],
+                    "max_score": _float(row["max_score"]),
+                    "position": row["assessment_position"],
+                }
+            )
+    return categories
+
+
+def _match(old_items, new_items):
+    """Pair new items with old ones: by id, then name. Returns
+    ([(old or None, new)], [unmatched old], [(old, new) leftovers in the same
+    list position, reported as rename candidates but not paired])."""
+    pairs = [None] * len(new_items)
+    unmatched = {id(old): old for old in old_items}
+
+    by_id = {str(old["id"]): old for old in old_items}
+    for i, new in enumerate(new_items):
+        old = by_id.get(str(new.get("id")))
+        if old is not None and id(old) in unmatched:
+            pairs[i] = unmatched.pop(id(old))
+
+    for i, new in enumerate(new_items):
+        if pairs[i] is None:
+            for old in old_items:
+                if id(old) in unmatched and _key(old["name"]) == _key(new["name"]):
+                    pairs[i] = unmatched.pop(id(old))
+                    break
+
+    candidates = []
+    for i, new in enumerate(new_items):
+        if pairs[i] is None and i < len(old_items) and id(old_items[i]) in unmatched:
+            candidates.append((old_items[i], new))
+
+    removed = [old for old in old_items if id(old) in unmatched]
+    return list(zip(pairs, new_items)), removed, candidates
+
+
+def _note_candidates(summary, candidates, parent: str):
+    for old, new in candidates:
+        summary["rename_candidates"].append(
+            {"from": f"{parent}/{old['name']}", "to": f"{parent}/{str(new['name']).strip()}"}
+        )
+
+
+def _changed(old, fields: dict) -> dict:
+    return {
+        column: value
+        for column, value in fields.items()
+        if old is None
+        or (
+            abs(_float(old[column]) - value) > 1e-9
+            if isinstance(value, float)
+            else old[column] != value
+        )
+    }
+
+
+def _note(summary, old, set_, parent: str, name: str, weight_column: str):
+    path = f"{parent}/{name}"
+    if old is None:
+        summary["added"].append(path)
+        return
+    if "name" in set_:
+        summary["renamed"].append({"from": f"{parent}/{old['name']}", "to": path})
+    if weight_column in set_:
+        summary["reweighted"].append(path)
+
+
+def _assessment_items(sub) -> list:
+    items = []
+    for a in sub.get("assessments") or []:
+        if isinstance(a, str):
+            a = {"name": a}
+        if isinstance(a, dict) and str(a.get("name") or "").strip():
+            items.append(a)
+    return items
+
+
+def diff(existing: dict, structure: dict) -> dict:
+    """The changes that turn `existing` (from load()) into `structure_json`.
+
+    Returns {"categories": [...], "delete": {...}, "summary": {...}}: each
+    category/subcategory/assessment node has the row "id" (None to insert)
+    and "set", the columns to write; "delete" lists row ids per table.
+    """
+    plan = {
+        "categories": [],
+        "delete": {"categories": [], "subcategories": [], "assessments": []},
+        "summary": {"added": [], "removed": [], "renamed": [], "reweighted": [],
+                    "rename_candidates": []},
+    }
+    summary = plan["summary"]
+    delete = plan["delete"]
+
+    position = 0
+    for name in CATEGORY_ORDER:
+        old_cat = existing.get(name)
+        subs = [
+            s for s in (structure.get(name) or [])
+            if isinstance(s, dict) and str(s.get("name") or "").strip()
+        ]
+        if old_cat is not None:
+            delete["categories"].extend(sorted(old_cat.get("duplicates", ())))
+        if not subs:
+            if old_cat is not None:
+                delete["categories"].append(old_cat["id"])
+                if old_cat["subcategories"]:
+                    summary["removed"].append(name)
+            continue
+
+        position += 1
+        weight = sum(_float(s.get("weight")) for s in subs)
+        set_ = _changed(old_cat, {"name": name, "weight": weight, "position": position})
+        if old_cat is None:
+            summary["added"].append(name)
+        category = {"id": old_cat["id"] if old_cat else None, "set": set_,
+                    "subcategories": []}
+        plan["categories"].append(category)
+
+        pairs, removed, candidates = _match(
+            old_cat["subcategories"] if old_cat else [], subs
+        )
+        _note_candidates(summary, candidates, name)
+        for old in removed:
+            delete["subcategories"].append(old["id"])
+            summary["removed"].append(f"{name}/{old['name']}")
+        for sub_pos, (old_sub, new_sub) in enumerate(pairs, start=1):
+            sub_name = str(new_sub["name"]).strip()
+            path = f"{name}/{sub_name}"
+            set_ = _changed(
+                old_sub,
+                {"name": sub_name, "weight": _float(new_sub.get("weight")),
+                 "position": sub_pos},
+            )
+            _note(summary, old_sub, set_, name, sub_name, "weight")
+            node = {"id": old_sub["id"] if old_sub else None, "set": set_,
+                    "assessments": None}
+            category["subcategories"].append(node)
+
+            items = _assessment_items(new_sub)
+            if not items:
+                continue
+            node["assessments"] = []
+            a_pairs, a_removed, a_candidates = _match(
+                old_sub["assessments"] if old_sub else [], items
+            )
+            _note_candidates(summary, a_candidates, path)
+            for old in a_removed:
+                delete["assessments"].append(old["id"])
+                summary["removed"].append(f"{path}/{old['name']}")
+            for a_pos, (old_a, new_a) in enumerate(a_pairs, start=1):
+                a_name = str(new_a["name"]).strip()
+                max_score = new_a.get("max_score")
+                if max_score in (None, ""):
+                    max_score = old_a["max_score"] if old_a else _DEFAULT_ASSESSMENT_MAX_SCORE
+                set_ = _changed(
+                    old_a,
+                    {"name": a_name, "max_score": _float(max_score), "position": a_pos},
+                )
+                _note(summary, old_a, set_, path, a_name, "max_score")
+                node["assessments"].append(
+                    {"id": old_a["id"] if old_a else None, "set": set_}
+                )
+
+    for name, old_cat in existing.items():
+        if name not in CATEGORY_ORDER:
+            delete["categories"].append(old_cat["id"])
+            delete["categories"].extend(sorted(old_cat.get("duplicates", ())))
+            summary["removed"].append(name)
+    return plan
+
+
+def has_changes(plan: dict) -> bool:
+    if any(plan["delete"].values()):
+        return True
+    for category in plan["categories"]:
+        if category["id"] is None or category["set"]:
+            return True
+        for sub in category["subcategories"]:
+            if sub["id"] is None or sub["set"]:
+                return True
+            for a in sub["assessments"] or []:
+                if a["id"] is None or a["set"]:
+                    return True
+    return False
+
+
+def _in(ids):
+    return ",".join(["%s"] * len(ids))
+
+
+def _update(cursor, table: str, row_id: int, set_: dict):
+    columns = ", ".join(f"{column} = %s" for column in set_)
+    cursor.execute(
+        f"UPDATE {table} SET {columns} WHERE id = %s",
+        tuple(set_.values()) + (row_id,),
+    )
+
+
+def apply(cursor, structure_id: int, plan: dict) -> int:
+    """Write `plan` to the rows of `structure_id`; returns the number of
+    statements executed."""
+    statements = 0
+    # Deletes first so renames into a removed row's name never collide.
+    for table, column in (
+        ("grade_assessments", "assessments"),
+        ("grade_subcategories", "subcategories"),
+        ("grade_categories", "categories"),
+    ):
+        ids = plan["delete"][column]
+        if ids:
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({_in(ids)})", tuple(ids))
+            statements += 1
+
+    for category in plan["categories"]:
+        cat_id, set_ = category["id"], category["set"]
+        if cat_id is None:
+            cursor.execute(
+                """
+                INSERT INTO grade_categories (structure_id, name, weight, position, description)
+                VALUES (%s, %s, %s, %s, NULL)
+                """,
+                (structure_id, set_["name"], set_["weight"], set_["position"]),
+            )
+            cat_id = cursor.lastrowid
+            statements += 1
+        elif set_:
+            _update(cursor, "grade_categories", cat_id, set_)
+            statements += 1
+
+        for sub in category["subcategories"]:
+            sub_id, set_ = sub["id"], sub["set"]
+            if sub_id is None:
+                cursor.execute(
+                    """
+                    INSERT INTO grade_subcategories (category_id, name, weight, max_score, passing_score, position, description)
+                    VALUES (%s, %s, %s, %s, NULL, %s, NULL)
+                    """,
+                    (cat_id, set_["name"], set_["weight"],
+                     _DEFAULT_SUBCATEGORY_MAX_SCORE, set_["position"]),
+                )
+                sub_id = cursor.lastrowid
+                statements += 1
+            elif set_:
+                _update(cursor, "grade_subcategories", sub_id, set_)
+                statements += 1
+
+            for a in sub["assessments"] or []:
+                if a["id"] is None:
+                    cursor.execute(
+                        """
+                        INSERT INTO grade_assessments (subcategory_id, name, weight, max_score, passing_score, position, description)
+                        VALUES (%s, %s, NULL, %s, NULL, %s, NULL)
+                        """,
+                        (sub_id, a["set"]["name"], a["set"]["max_score"],
+                         a["set"]["position"]),
+                    )
+                    statements += 1
+                elif a["set"]:
+                    _update(cursor, "grade_assessments", a["id"], a["set"])
+                    statements += 1
+    return statements
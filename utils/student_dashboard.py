@@ -0,0 +1,195 @@
+"""
+Per-student dashboard aggregate: joined classes, release status, missing
+assessments and released grade summaries.
+
+The dashboard used to build this from /api/student/joined-classes and
+/api/student/analytics, which resolved students.id on every call and ran an
+assessment, snapshot and released-grade query per class. build() reads
+everything with four set-based queries whatever the number of classes:
+
+1. the student row;
+2. enrollments with their class and instructor name;
+3. the student's released grades;
+4. active assessments of the approved classes, flagged when the student has
+   a recorded score.
+
+Results are cached per user for STUDENT_DASHBOARD_CACHE_TTL seconds.
+emit_live_version_update() drops the entries of every student in the class
+(roster, release and score changes all go through it), and routes that change
+enrollment or releases without a live update call invalidate_class()
+directly. Other workers' changes are picked up when the TTL expires.
+"""
+
+import logging
+
+from utils.class_cache import ClassIndexedCache
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_TTL_SECONDS = 60
+_DEFAULT_MAX_STUDENTS = 2048
+
+
+def _in(ids):
+    return ",".join(["%s"] * len(ids))
+
+
+def _class_label(row) -> str:
+    year = str(row.get("year") or "")
+    semester = str(row.get("semester") or "").lower()
+    subject_code = row.get("subject_code") or ""
+    subject = row.get("subject") or ""
+    subject_part = f" ({subject_code} - {subject})" if subject_code and subject else ""
+    return (
+        f"{year[-2:] if year else 'XX'}-{'2' if '2nd' in semester else '1'} "
+        f"{row.get('course')} {row.get('section')}-{row.get('track') or ''}{subject_part}"
+    )
+
+
+def _isoformat(value):
+    if not value:
+        return None
+    try:
+        return value.isoformat()
+    except AttributeError:
+        return str(value)
+
+
+def build(cursor, user_id: int):
+    """The dashboard aggregate for a student user, or None without a profile."""
+    cursor.execute("SELECT id FROM students WHERE user_id = %s", (user_id,))
+    student = cursor.fetchone()
+    if not student:
+        return None
+    student_id = student["id"]
+
+    cursor.execute(
+        """SELECT c.*, sc.joined_at, sc.status,
+               pi.first_name, pi.last_name
+        FROM classes c
+        JOIN student_classes sc ON c.id = sc.class_id
+        LEFT JOIN instructors i ON c.instructor_id = i.id
+        LEFT JOIN personal_info pi ON i.personal_info_id = pi.id
+        WHERE sc.student_id = %s AND sc.status IN ('approved', 'pending')
+        ORDER BY sc.joined_at DESC""",
+        (student_id,),
+    )
+    enrollments = cursor.fetchall() or []
+
+    cursor.execute(
+        """SELECT class_id, final_grade, equivalent, released_at
+        FROM released_grades
+        WHERE student_id = %s AND status = 'released'""",
+        (student_id,),
+    )
+    released = {row["class_id"]: row for row in cursor.fetchall() or []}
+
+    approved_ids = [row["id"] for row in enrollments if row.get("status") == "approved"]
+    missing = {class_id: [] for class_id in approved_ids}
+    if approved_ids:
+        cursor.execute(
+            f"""SELECT gs.class_id, ga.name, MAX(ss.id IS NOT NULL) AS scored
+            FROM grade_structures gs
+            JOIN grade_categories gc ON gc.structure_id = gs.id
+            JOIN grade_subcategories gsc ON gsc.category_id = gc.id
+            JOIN grade_assessments ga ON ga.subcategory_id = gsc.id
+            LEFT JOIN student_scores ss
+              ON ss.assessment_id = ga.id AND ss.student_id = %s
+            WHERE gs.class_id IN ({_in(approved_ids)}) AND gs.is_active = 1
+            GROUP BY gs.class_id, ga.id, ga.name
+            ORDER BY gs.class_id, ga.id""",
+            [student_id] + approved_ids,
+        )
+        for row in cursor.fetchall() or []:
+            # A score of 0 is recorded, not missing.
+            if not row["scored"]:
+                missing[row["class_id"]].append(row["name"])
+
+    classes = []
+    for row in enrollments:
+        first_name = row.get("first_name") or ""
+        last_name = row.get("last_name") or ""
+        grade = released.get(row["id"])
+        classes.append(
+            {
+                "id": row["id"],
+                "class_id": _class_label(row),
+                "year": row.get("year"),
+                "semester": row.get("semester"),
+                "course": row.get("course"),
+                "subject": row.get("subject"),
+                "subject_code": row.get("subject_code"),
+                "units": row.get("units"),
+                "track": row.get("track"),
+                "section": row.get("section"),
+                "schedule": row.get("schedule"),
+                "class_code": row.get("class_code"),
+                "join_code": row.get("join_code"),
+                "instructor_name": f"{first_name} {last_name}".strip() or "Instructor",
+                "joined_at": _isoformat(row.get("joined_at")),
+                "status": row.get("status"),
+                "released": grade is not None,
+                "final_grade": grade["final_grade"] if grade else None,
+                "equivalent": grade["equivalent"] if grade else None,
+                "released_at": _isoformat(grade["released_at"]) if grade else None,
+                # A released grade settles whatever was missing.
+                "missing_assessments": [] if grade else missing.get(row["id"], []),
+            }
+        )
+    return {"student_id": student_id, "classes": classes}
+
+
+def analytics_view(dashboard) -> list:
+    """The /api/student/analytics `classes` list (approved classes only)."""
+    return [
+        {
+            "class_id": cls["class_id"],
+            "class_name": cls["class_id"],
+            "missing_assessments": cls["missing_assessments"],
+            "released_grades": (
+                [
+                    {
+                        "final_grade": cls["final_grade"],
+                        "equivalent": cls["equivalent"],
+                        "released_at": cls["released_at"],
+                    }
+                ]
+                if cls["released"]
+                else []
+            ),
+        }
+        for cls in dashboard["classes"]
+        if cls["status"] == "approved"
+    ]
+
+
+# --- per-student cache -------------------------------------------------------
+
+_cache = ClassIndexedCache(_DEFAULT_TTL_SECONDS, _DEFAULT_MAX_STUDENTS)
+
+
+def configure(ttl: int = None, max_students: int = None):
+    """Apply STUDENT_DASHBOARD_* settings from app config. ttl=0 disables caching."""
+    _cache.configure(ttl=ttl, max_entries=max_students)
+
+
+def get(cursor, user_id: int):
+    """The cached dashboard for `user_id`, building it on a miss."""
+    return _cache.get(
+        int(user_id),
+        lambda: build(cursor, user_id),
+        lambda dashboard: (cls["id"] for cls in dashboard["classes"]),
+    )
+
+
+def invalidate_user(user_id: int):
+    _cache.invalidate(int(user_id))
+
+
+def invalidate_class(class_id: int):
+    """Drop the cached dashboards of every student in `class_id`."""
+    _cache.invalidate_class(int(class_id))
+
+
+def clear():
+    _cache.clear()
@@ -0,0 +1,167 @@
+"""
+Precomputed student-facing grade documents for released grades.
+
+The student grade view of a released class (score breakdown merged into the
+grade structure, plus the computed summary) only changes when grades are
+released again or recalculated. It is built once for the whole class by
+_finalize_snapshot_and_store_release (and by recalculate_grades.py) and kept
+in released_grades.student_view, so get_student_class_grades serves it with a
+single indexed read. Rows released before migration 0004, or on a database
+that has not run it, are built on first read instead.
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+_CHUNK = 500
+
+_views_column = None
+
+
+def views_available(cursor) -> bool:
+    """True once migration 0004 has added released_grades.student_view."""
+    global _views_column
+    if _views_column is None:
+        from utils.migrations import column_exists
+
+        try:
+            _views_column = column_exists(cursor, "released_grades", "student_view")
+        except Exception as e:
+            logger.warning(f"Could not inspect released_grades columns: {e}")
+            return False
+    return _views_column
+
+
+def score_color(score, max_score) -> str:
+    if score is None:
+        return "gray"
+    if score < max_score / 3:
+        return "red"
+    if score < 2 * max_score / 3:
+        return "yellow"
+    return "green"
+
+
+def _load_payload(payload) -> dict:
+    if isinstance(payload, str):
+        try:
+            return json.loads(payload)
+        except ValueError:
+            return {}
+    return payload or {}
+
+
+def build_views(cursor, class_id, payloads: dict) -> dict:
+    """Build {student_id: view} for released students of a class.
+
+    `payloads` maps student_id to that student's released grade_payload
+    (dict or JSON string). Structure and assessments are read once for the
+    class, and scores in chunks of student ids.
+    """
+    if not payloads:
+        return {}
+
+    cursor.execute(
+        "SELECT structure_json FROM grade_structures WHERE class_id = %s AND is_active = 1",
+        (class_id,),
+    )
+    structure_row = cursor.fetchone()
+    structure_raw = structure_row["structure_json"] if structure_row else None
+
+    cursor.execute(
+        """
+        SELECT
+            ga.id, ga.max_score, ga.position,
+            gs_sub.name as subcategory_name,
+            gc.name as category_name
+        FROM grade_assessments ga
+        JOIN grade_subcategories gs_sub ON ga.subcategory_id = gs_sub.id
+        JOIN grade_categories gc ON gs_sub.category_id = gc.id
+        JOIN grade_structures gs ON gc.structure_id = gs.id
+        WHERE gs.class_id = %s AND gs.is_active = 1
+        ORDER BY gc.name, gs_sub.name, ga.position
+        """,
+        (class_id,),
+    )
+    assessment_rows = cursor.fetchall() or []
+    assessment_ids = [row["id"] for row in assessment_rows]
+
+    scores = {}
+    student_ids = list(payloads)
+    if assessment_ids:
+        aid_placeholders = ",".join(["%s"] * len(assessment_ids))
+        for start in range(0, len(student_ids), _CHUNK):
+            chunk = student_ids[start : start + _CHUNK]
+            sid_placeholders = ",".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"""
+                SELECT student_id, assessment_id, score
+                FROM student_scores
+                WHERE student_id IN ({sid_placeholders})
+                  AND assessment_id IN ({aid_placeholders})
+                """,
+                list(chunk) + assessment_ids,
+            )
+            for r in cursor.fetchall() or []:
+                scores.setdefault(r["student_id"], {})[r["assessment_id"]] = r["score"]
+
+    views = {}
+    for sid in student_ids:
+        own = scores.get(sid, {})
+        assessments = [
+            {
+                "id": row["id"],
+                "name": f"Assessment {row['position']}",
+                "max_score": row["max_score"],
+                "category": row["category_name"],
+                "subcategory": row["subcategory_name"],
+                "score": own.get(row["id"]),
+            }
+            for row in assessment_rows
+        ]
+
+        # Each student gets its own copy of the structure to merge into.
+        structure_json = json.loads(structure_raw) if structure_raw else {}
+        if structure_json:
+            for category, subcats in structure_json.items():
+                for subcat in subcats:
+                    subcat["assessments"] = [
+                        {
+                            "id": a["id"],
+                            "name": a["name"],
+                            "max_score": a["max_score"],
+                            "released_score": a["score"],
+                            "color": score_color(a["score"], a["max_score"]),
+                        }
+                        for a in assessments
+                        if a["category"] == category and a["subcategory"] == subcat["name"]
+                    ]
+
+        views[sid] = {
+            "details": {
+                "scores": [{"assessment_id": a["id"], "score": a["score"]} for a in assessments],
+                "structure_json": structure_json,
+            },
+            "computed": _load_payload(payloads[sid]).get("computed", {}),
+        }
+    return views
+
+
+def store_views(cursor, class_id, views: dict, touch: bool = True) -> None:
+    """Write built views to released_grades.student_view.
+
+    With touch=False the row's updated_at (part of the student ETag) is kept,
+    for views built lazily from unchanged released data.
+    """
+    if not views or not views_available(cursor):
+        return
+    keep = "" if touch else ", updated_at = updated_at"
+    cursor.executemany(
+        f"UPDATE released_grades SET student_view = %s{keep} WHERE class_id = %s AND student_id = %s",
+        [
+            (json.dumps(view, default=str), class_id, sid)
+            for sid, view in views.items()
+        ],
+    )